@@ -1,4 +1,12 @@
 # AI Analyzer package initialization
-from .analyzer import RedditAnalyzer
+# RedditAnalyzer is imported on first access so that light submodules
+# (e.g. topic_matrix) don't pull in pandas, scikit-learn and NLTK.
 
 __all__ = ['RedditAnalyzer']
+
+
+def __getattr__(name):
+    if name == 'RedditAnalyzer':
+        from .analyzer import RedditAnalyzer
+        return RedditAnalyzer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
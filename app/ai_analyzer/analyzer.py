@@ -1,36 +1,133 @@
-import nltk
-from nltk.sentiment import SentimentIntensityAnalyzer
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.decomposition import NMF
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any
+import numpy as np
 import pandas as pd
+from app.core.instrumentation import get_logger, metrics
+from app.scraper.items import ItemBatch
+from .batch import score_problems
+from .near_duplicates import NearDuplicateCollapser, collapse_texts
+from .sentiment import COMPOUND, BatchSentimentScorer, scores_to_dicts, sentiment_counts
+from .sentiment_cache import SentimentCache
+from .topic_engine import IncrementalTopicModel, saved_model_lock
+from .topic_matrix import encode_topic_matrix
+from .relevance import RelevanceFilter
+from .rollups import RollupStore
+from .vector_index import VectorIndex, index_items
+
+logger = get_logger(__name__)
+
+# Bump when the analysis logic changes so cached validation results are invalidated
+ANALYZER_VERSION = 1
+
+
+def _as_frame(scraped_data) -> pd.DataFrame:
+    """Converts an ItemBatch to a DataFrame of the analyzed columns; DataFrames pass through."""
+    if isinstance(scraped_data, ItemBatch):
+        columns = ['subreddit', 'type', 'title', 'content', 'upvotes']
+        return scraped_data.to_frame(columns + (['weight'] if scraped_data.weighted else []))
+    return scraped_data
+
 
 class RedditAnalyzer:
-    def __init__(self):
-        """Initialize the analyzer with required models and tools."""
+    def __init__(self, sentiment_cache: SentimentCache | bool = True, sentiment_cache_path: str | None = None,
+                 topic_engine: IncrementalTopicModel | None = None, topic_model_path: str | None = None,
+                 relevance_filter: RelevanceFilter | bool = True, near_duplicate_threshold: float | None = 0.8):
+        """
+        Initialize the analyzer with required models and tools.
+
+        Args:
+            sentiment_cache: SentimentCache to share, True for a private in-memory
+                             cache, or False to re-score every text
+            sentiment_cache_path: SQLite file for the on-disk cache tier (used when
+                                  a private cache is created)
+            topic_engine: Incremental topic model to start from (updates publish copies of it)
+            topic_model_path: File the topic model is shared through: every update
+                              is applied to the latest saved model and saved again,
+                              so processes build on each other's updates
+            relevance_filter: RelevanceFilter used to keep only items related to the
+                              problem statement, True for the default one, or False
+                              to analyze every item
+            near_duplicate_threshold: Estimated Jaccard similarity above which items
+                                      are collapsed into one weighted representative
+                                      before analysis, or None to analyze every copy
+        """
+        # NLTK takes seconds to import, so it is loaded with the first analyzer
+        import nltk
+
         # Download required NLTK data
         try:
             nltk.data.find('vader_lexicon')
         except LookupError:
             nltk.download('vader_lexicon')
         
-        # Initialize NLTK's VADER sentiment analyzer
-        self.sentiment_analyzer = SentimentIntensityAnalyzer()
-        
-        # Initialize text vectorizer for topic modeling
-        self.vectorizer = TfidfVectorizer(
-            max_features=1000,
-            stop_words='english',
-            max_df=0.95,
-            min_df=2
-        )
+        # NLTK's VADER, batched and cached (see app.ai_analyzer.sentiment)
+        self.sentiment_scorer = BatchSentimentScorer(cache=sentiment_cache, cache_path=sentiment_cache_path)
         
-        # Initialize topic modeling
-        self.topic_model = NMF(n_components=5, random_state=42)
+        # Initialize the incremental topic model (hashed TF-IDF + NMF). Requests read
+        # the published model and never modify it; texts that should update it are
+        # queued to one background thread, which publishes an updated copy
+        self.topic_model_path = topic_model_path
+        self.topic_engine = topic_engine or IncrementalTopicModel.load_or_create(topic_model_path, n_components=5)
+        # Modification time of the saved model this process's model matches
+        self._topic_model_mtime = self._saved_topic_model_mtime() if topic_engine is None else None
+        self._topic_updates = ThreadPoolExecutor(max_workers=1, thread_name_prefix='topic-update')
+
+        # Embedding-based relevance stage (the model loads lazily on first use)
+        if relevance_filter is True:
+            relevance_filter = RelevanceFilter()
+        self.relevance_filter = relevance_filter or None
+
+        # MinHash/LSH collapsing of crossposts, megathreads and bot comments
+        self.near_duplicate_threshold = near_duplicate_threshold or None
+
+    @property
+    def version(self) -> str:
+        """
+        Identifies everything that shapes a validation result besides the data:
+        the analysis logic, the sentiment scorer and lexicon, and the relevance
+        and near-duplicate settings.
+        """
+        relevance = (f"{self.relevance_filter.model_name}@{self.relevance_filter.threshold}"
+                     f"/{self.relevance_filter.top_k}" if self.relevance_filter is not None else "off")
+        return (f"analyzer-{ANALYZER_VERSION}|{self.sentiment_scorer.version}|relevance-{relevance}"
+                f"|dedup-{self.near_duplicate_threshold or 'off'}")
+
+    def score_sentiment(self, texts) -> np.ndarray:
+        """
+        Score sentiment of many texts in one batch using NLTK's VADER.
+
+        Args:
+            texts: List or pandas Series of text content to analyze
+
+        Returns:
+            float32 array of shape (len(texts), 4) with compound, pos, neg and neu
+            columns; rows for empty or non-string texts are NaN
+        """
+        try:
+            with metrics.timer('stage', stage='sentiment'):
+                return self.sentiment_scorer.score(texts)
+        except Exception as e:
+            logger.error("Error in sentiment analysis: %s", e)
+            return np.empty((0, 4), dtype=np.float32)
+
+    def sentiment_cache_stats(self) -> Dict[str, Any]:
+        """
+        Hit-rate, eviction and size statistics of the sentiment cache.
+
+        Returns:
+            Dictionary of cache statistics (empty if caching is disabled)
+        """
+        cache = self.sentiment_scorer.cache
+        return cache.stats() if cache is not None else {}
 
     def analyze_sentiment(self, texts: List[str]) -> List[Dict[str, Any]]:
         """
         Analyze sentiment of given texts using NLTK's VADER.
+
+        Per-item dict view over score_sentiment(); prefer score_sentiment() for
+        large inputs.
         
         Args:
             texts: List of text content to analyze
@@ -38,30 +135,23 @@ class RedditAnalyzer:
         Returns:
             List of sentiment analysis results
         """
-        try:
-            results = []
-            for text in texts:
-                if not text or not isinstance(text, str):
-                    continue
-                    
-                scores = self.sentiment_analyzer.polarity_scores(text)
-                sentiment_label = 'POSITIVE' if scores['compound'] > 0 else 'NEGATIVE'
-                results.append({
-                    'label': sentiment_label,
-                    'score': abs(scores['compound']),
-                    'details': scores
-                })
-            return results
-        except Exception as e:
-            print(f"Error in sentiment analysis: {e}")
-            return []
+        return scores_to_dicts(self.score_sentiment(texts))
 
-    def extract_topics(self, texts: List[str]) -> Dict[str, Any]:
+    def extract_topics(self, texts: List[str], update: bool = True,
+                       topic_matrix_format: str = 'float32') -> Dict[str, Any]:
         """
-        Extract main topics from the texts using NMF.
+        Extract main topics from the texts using the incremental NMF topic model.
+
+        The texts are projected onto the current topics. With ``update`` they are
+        also queued to update the shared model in the background, so the call
+        does not wait for a refit (see flush_topic_updates).
         
         Args:
             texts: List of text content for topic modeling
+            update: Whether the texts should update the shared model
+            topic_matrix_format: Encoding of the document-topic matrix, one of
+                                 'topk', 'float32' (base64, lossless) or 'dense'
+                                 (nested lists); see app.ai_analyzer.topic_matrix
             
         Returns:
             Dictionary containing topics and their key terms
@@ -69,67 +159,404 @@ class RedditAnalyzer:
         try:
             # Remove empty texts
             texts = [text for text in texts if text and isinstance(text, str)]
+            with metrics.timer('stage', stage='topics'):
+                topics, topic_matrix = self._update_and_transform_topics(texts, update)
             
-            # Create document-term matrix
-            dtm = self.vectorizer.fit_transform(texts)
-            
-            # Extract topics
-            topic_matrix = self.topic_model.fit_transform(dtm)
-            
-            # Get feature names (terms)
-            feature_names = self.vectorizer.get_feature_names_out()
-            
-            # Extract top terms for each topic
-            topics = {}
-            for topic_idx, topic in enumerate(self.topic_model.components_):
-                top_terms = [feature_names[i] for i in topic.argsort()[:-10:-1]]
-                topics[f"topic_{topic_idx+1}"] = top_terms
-                
             return {
                 "topics": topics,
-                "document_topic_matrix": topic_matrix.tolist()
+                "document_topic_matrix": encode_topic_matrix(topic_matrix, topic_matrix_format)
             }
         except Exception as e:
-            print(f"Error in topic modeling: {e}")
-            return {"topics": {}, "document_topic_matrix": []}
+            logger.error("Error in topic modeling: %s", e)
+            return {"topics": {}, "document_topic_matrix": encode_topic_matrix(np.empty((0, 0)), topic_matrix_format)}
 
-    def validate_problem(self, scraped_data: pd.DataFrame, problem_statement: str) -> Dict[str, Any]:
+    def _topic_snapshot(self, texts: List[str], update: bool) -> IncrementalTopicModel:
         """
-        Validate a proposed problem using scraped Reddit data.
+        Topic model to project non-empty texts with, queueing them to update the shared model.
+
+        Until the shared model has been fitted, this is a private copy fitted
+        on the texts, so the first requests still get topics.
+        """
+        # Published models are never modified, so this is a consistent snapshot
+        engine = self.topic_engine
+        if update and texts:
+            if not engine.is_fitted:
+                engine = engine.copy().partial_fit(texts)
+            self._topic_updates.submit(self._update_topic_engine, texts)
+        return engine
+
+    def _update_and_transform_topics(self, texts: List[str], update: bool) -> tuple[Dict[str, List[str]], np.ndarray]:
+        """
+        Project non-empty texts onto the topics, queueing them to update the shared model.
+        """
+        engine = self._topic_snapshot(texts, update)
+        topic_matrix = engine.transform(texts)
+        topics = engine.top_terms(n_terms=9)
+        return topics, topic_matrix
+
+    def _saved_topic_model_mtime(self) -> int | None:
+        try:
+            return os.stat(self.topic_model_path).st_mtime_ns if self.topic_model_path else None
+        except FileNotFoundError:
+            return None
+
+    def _update_topic_engine(self, texts: List[str]):
+        """Fit a copy of the shared topic model on the texts, then publish and save it (topic-update thread)."""
+        try:
+            if not self.topic_model_path:
+                engine = self.topic_engine.copy()
+                engine.partial_fit(texts)
+                self.topic_engine = engine
+                return
+            # Job and web workers save their updates to the same file; applying the texts to
+            # the latest saved model under its lock keeps every process's updates
+            with saved_model_lock(self.topic_model_path):
+                engine = None
+                mtime = self._saved_topic_model_mtime()
+                if mtime is not None and mtime != self._topic_model_mtime:
+                    try:
+                        engine = IncrementalTopicModel.load(self.topic_model_path)
+                    except ValueError as e:
+                        logger.warning("Replacing the saved topic model: %s", e)
+                engine = engine or self.topic_engine.copy()
+                engine.partial_fit(texts)
+                engine.save(self.topic_model_path)
+                self._topic_model_mtime = self._saved_topic_model_mtime()
+            self.topic_engine = engine
+        except Exception as e:
+            logger.error("Error updating the topic model: %s", e)
+
+    def flush_topic_updates(self):
+        """Block until every queued topic model update has been applied."""
+        self._topic_updates.submit(lambda: None).result()
+
+    def collapse_near_duplicates(self, scraped_data: pd.DataFrame) -> tuple[pd.DataFrame, Dict[str, Any]]:
+        """
+        Collapse near-duplicate items into one representative each.
+
+        Representatives get a ``weight`` column with the number of items they
+        stand for, which the sentiment counts and data volume honor. Data that
+        already has a weight column (e.g. collapsed while streaming the scrape
+        with NearDuplicateCollapser.collapse) is returned as is.
         
         Args:
             scraped_data: DataFrame containing Reddit posts and comments
+            
+        Returns:
+            Tuple of the representative rows and a dictionary describing the collapsing
+        """
+        total = len(scraped_data)
+        if 'weight' in scraped_data:
+            return scraped_data, {'enabled': True, 'items': int(scraped_data['weight'].fillna(1).sum()),
+                                  'representatives': total}
+        if self.near_duplicate_threshold is None or total == 0:
+            return scraped_data, {'enabled': False, 'items': total, 'representatives': total}
+
+        try:
+            titles = scraped_data['title'].fillna('') if 'title' in scraped_data else pd.Series('', index=scraped_data.index)
+            texts = (titles + '\n' + scraped_data['content'].fillna('')).str.strip().tolist()
+            collapser = NearDuplicateCollapser(self.near_duplicate_threshold)
+            with metrics.timer('stage', stage='near_duplicates'):
+                keep, weights = collapse_texts(texts, collapser=collapser)
+            return scraped_data.iloc[keep].assign(weight=weights), collapser.stats()
+        except Exception as e:
+            logger.error("Error collapsing near-duplicates, analyzing every item: %s", e)
+            return scraped_data, {'enabled': False, 'items': total, 'representatives': total}
+
+    def select_relevant(self, scraped_data: pd.DataFrame, problem_statement: str) -> tuple[pd.DataFrame, Dict[str, Any]]:
+        """
+        Keep only the items semantically related to the problem statement.
+        
+        Args:
+            scraped_data: DataFrame containing Reddit posts and comments
+            problem_statement: The problem to validate
+            
+        Returns:
+            Tuple of the relevant rows and a dictionary describing the selection
+        """
+        total = len(scraped_data)
+        if self.relevance_filter is None or not problem_statement or total == 0:
+            return scraped_data, {'enabled': False, 'items_considered': total, 'items_relevant': total}
+
+        try:
+            # Posts are judged on title and body, comments on their body
+            titles = scraped_data['title'].fillna('') if 'title' in scraped_data else pd.Series('', index=scraped_data.index)
+            texts = (titles + '\n' + scraped_data['content'].fillna('')).str.strip().tolist()
+            with metrics.timer('stage', stage='relevance'):
+                selected, similarities = self.relevance_filter.select(problem_statement, texts)
+            relevant = scraped_data.iloc[selected]
+            return relevant, {
+                'enabled': True,
+                'items_considered': total,
+                'items_relevant': len(relevant),
+                'threshold': self.relevance_filter.threshold,
+                'mean_similarity': round(float(similarities[selected].mean()), 4) if len(selected) else 0.0
+            }
+        except Exception as e:
+            # E.g. the embedding model is not cached locally: fall back to analyzing everything
+            logger.error("Error in relevance filtering, analyzing all items: %s", e)
+            return scraped_data, {'enabled': False, 'items_considered': total, 'items_relevant': total}
+
+    def validate_problem(self, scraped_data: pd.DataFrame, problem_statement: str,
+                         topic_matrix_format: str = 'float32') -> Dict[str, Any]:
+        """
+        Validate a proposed problem using scraped Reddit data.
+
+        Near-duplicates are collapsed first (see collapse_near_duplicates), and
+        only items relevant to the problem statement are analyzed (see select_relevant).
+        
+        Args:
+            scraped_data: DataFrame or ItemBatch containing Reddit posts and comments
             problem_statement: The problem to validate
+            topic_matrix_format: Encoding of the document-topic matrix (see extract_topics)
             
         Returns:
             Dictionary containing validation results
         """
         try:
-            # Combine post and comment content
-            all_content = scraped_data['content'].fillna('').tolist()
+            scraped_data = _as_frame(scraped_data)
+            with metrics.timer('stage', stage='validate_problem'):
+                collapsed_data, duplicate_stats = self.collapse_near_duplicates(scraped_data)
+                # Drop items unrelated to the problem before the expensive stages
+                relevant_data, relevance_stats = self.select_relevant(collapsed_data, problem_statement)
+                metrics.incr('analyzer_items', len(scraped_data), stage='considered')
+                metrics.incr('analyzer_items', len(collapsed_data), stage='deduplicated')
+                metrics.incr('analyzer_items', len(relevant_data), stage='analyzed')
+                results = self._analyze(relevant_data, problem_statement, relevance_stats, topic_matrix_format)
+                results['near_duplicates'] = duplicate_stats
+                return results
+        except Exception as e:
+            logger.error("Error in problem validation: %s", e)
+            return {}
+
+    def validate_problems(self, scraped_data: pd.DataFrame, problem_statements: List[str],
+                          n_jobs: int | None = None, topic_matrix_format: str = 'float32') -> Dict[str, Any]:
+        """
+        Validate many proposed problems against the same scraped Reddit data.
+
+        Sentiment, topic weights and embeddings are computed once for all items;
+        only the per-problem relevance selection and scoring run per problem, on a
+        process pool sharing the feature arrays when there are many problems.
+        Near-duplicates are collapsed once for all problems, and unlike
+        validate_problem, the topic model is updated once with all items.
+        
+        Args:
+            scraped_data: DataFrame or ItemBatch containing Reddit posts and comments
+            problem_statements: The problems to validate
+            n_jobs: Worker processes for per-problem scoring (defaults to the CPU count)
+            topic_matrix_format: Encoding of the document-topic matrices (see extract_topics)
             
-            # Analyze sentiment
-            sentiment_results = self.analyze_sentiment(all_content)
+        Returns:
+            Dictionary with 'results' (one validate_problem-style result per problem,
+            in order) and 'timings' (seconds per stage)
+        """
+        timings = {}
+        try:
+            start = time.perf_counter()
+            scraped_data, duplicate_stats = self.collapse_near_duplicates(_as_frame(scraped_data))
+            timings['near_duplicates'] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            all_content = scraped_data['content'].fillna('').tolist()
+            has_text = np.array([bool(text) and isinstance(text, str) for text in all_content], dtype=np.uint8)
+            arrays = {'has_text': has_text}
+            if 'weight' in scraped_data:
+                arrays['weights'] = scraped_data['weight'].fillna(1).to_numpy(dtype=np.int64)
+            params = {}
+
+            # Shared features: sentiment of every item
+            arrays['sentiment'] = self.score_sentiment(all_content)
+            timings['sentiment'] = time.perf_counter() - start
+
+            # Shared features: topic weights of every item
+            start = time.perf_counter()
+            try:
+                topics, topic_matrix = self._update_and_transform_topics(
+                    [text for text in all_content if text and isinstance(text, str)], update=True
+                )
+            except Exception as e:
+                logger.error("Error in topic modeling: %s", e)
+                topics, topic_matrix = {}, np.empty((0, 0), dtype=np.float32)
+            # One row per item (zeros for empty texts) so rows line up with the other features
+            full_matrix = np.zeros((len(all_content), topic_matrix.shape[1]), dtype=np.float32)
+            if len(topic_matrix):
+                full_matrix[has_text.astype(bool)] = topic_matrix
+            arrays['topic_matrix'] = full_matrix
+            timings['topics'] = time.perf_counter() - start
+
+            # Shared features: embeddings of every item and problem
+            start = time.perf_counter()
+            if self.relevance_filter is not None and len(scraped_data):
+                try:
+                    titles = scraped_data['title'].fillna('') if 'title' in scraped_data else pd.Series('', index=scraped_data.index)
+                    texts = (titles + '\n' + scraped_data['content'].fillna('')).str.strip().tolist()
+                    arrays['embeddings'] = self.relevance_filter.embed(texts)
+                    arrays['problems'] = self.relevance_filter.embed(list(problem_statements))
+                    params = {
+                        'threshold': self.relevance_filter.threshold,
+                        'top_k': self.relevance_filter.top_k,
+                        'min_items': self.relevance_filter.min_items
+                    }
+                except Exception as e:
+                    logger.error("Error in relevance filtering, analyzing all items: %s", e)
+                    arrays.pop('embeddings', None)
+            timings['embeddings'] = time.perf_counter() - start
+
+            # Per-problem selection and scoring
+            start = time.perf_counter()
+            scored = score_problems(arrays, params, len(problem_statements), n_jobs=n_jobs)
+            results = []
+            for problem_statement, problem in zip(problem_statements, scored):
+                problem_topics = {
+                    'topics': topics,
+                    'document_topic_matrix': encode_topic_matrix(problem['document_topic_matrix'], topic_matrix_format)
+                }
+                results.append({
+                    'problem_statement': problem_statement,
+                    'sentiment_analysis': problem['sentiment_analysis'],
+                    'topic_analysis': problem_topics,
+                    'relevance': problem['relevance'],
+                    'data_volume': problem['data_volume'],
+                    'validation_score': self._calculate_validation_score(problem['sentiment_analysis'], problem_topics),
+                    'near_duplicates': duplicate_stats
+                })
+            timings['scoring'] = time.perf_counter() - start
+
+            for stage, seconds in timings.items():
+                metrics.observe('batch_stage', seconds, stage=stage)
+            return {'results': results, 'timings': {stage: round(seconds, 4) for stage, seconds in timings.items()}}
+        except Exception as e:
+            logger.error("Error in batch problem validation: %s", e)
+            return {'results': [], 'timings': {stage: round(seconds, 4) for stage, seconds in timings.items()}}
+
+    def validate_problem_historical(self, vector_index: VectorIndex, problem_statement: str,
+                                    top_n: int = 1000, topic_matrix_format: str = 'float32') -> Dict[str, Any]:
+        """
+        Validate a problem against the most similar previously scraped items, without scraping.
+
+        Args:
+            vector_index: Index of historical items (see index_items)
+            problem_statement: The problem to validate
+            top_n: Number of most similar historical items to analyze
+            topic_matrix_format: Encoding of the document-topic matrix (see extract_topics)
             
-            # Extract topics
-            topic_results = self.extract_topics(all_content)
+        Returns:
+            Dictionary containing validation results (same keys as validate_problem)
+        """
+        try:
+            if self.relevance_filter is None:
+                raise ValueError("Historical validation needs a relevance filter to embed the problem")
+            query = self.relevance_filter.embed([problem_statement])[0]
+            rows, similarities = vector_index.search(query, k=top_n)
+            relevant_data = pd.DataFrame(vector_index.get_items(rows))
+            if relevant_data.empty:
+                relevant_data = pd.DataFrame(columns=['content'])
+            return self._analyze(relevant_data, problem_statement, {
+                'enabled': True,
+                'source': 'vector_index',
+                'items_considered': len(vector_index),
+                'items_relevant': len(relevant_data),
+                'mean_similarity': round(float(similarities.mean()), 4) if len(similarities) else 0.0
+            }, topic_matrix_format)
+        except Exception as e:
+            logger.error("Error in historical problem validation: %s", e)
+            return {}
+
+    def index_items(self, vector_index: VectorIndex, items: List[Dict[str, Any]]) -> int:
+        """
+        Add scraped items to a vector index of historical items.
+
+        Items embedded by an earlier relevance pass come from the embedding cache.
+        
+        Args:
+            vector_index: Index to extend
+            items: Scraped item dictionaries or an ItemBatch
             
-            # Calculate validation metrics
-            sentiment_stats = {
-                'positive': sum(1 for result in sentiment_results if result['label'] == 'POSITIVE'),
-                'negative': sum(1 for result in sentiment_results if result['label'] == 'NEGATIVE')
-            }
+        Returns:
+            Number of items added (items already indexed are skipped)
+        """
+        if self.relevance_filter is None or not items:
+            return 0
+        try:
+            return index_items(vector_index, items, self.relevance_filter.embed)
+        except Exception as e:
+            logger.error("Error indexing items: %s", e)
+            return 0
+
+    def update_rollups(self, rollups: RollupStore, items: List[Dict[str, Any]], update_topics: bool = False) -> int:
+        """
+        Fold scraped items into the time-windowed rollups (see app.ai_analyzer.rollups).
+
+        Sentiment of items analyzed just before comes from the sentiment cache.
+        Each item is assigned the key of its dominant topic under the current
+        topic model (see IncrementalTopicModel.topic_keys), and that model's
+        topic names are recorded so readers can resolve them (see
+        RollupStore.record_topics).
+        
+        Args:
+            rollups: Rollup store to update
+            items: Scraped item dictionaries or an ItemBatch
+            update_topics: Whether the items should also be queued to update the
+                           topic model (validations have already queued theirs)
             
-            return {
-                'problem_statement': problem_statement,
-                'sentiment_analysis': sentiment_stats,
-                'topic_analysis': topic_results,
-                'data_volume': len(all_content),
-                'validation_score': self._calculate_validation_score(sentiment_stats, topic_results)
-            }
+        Returns:
+            Number of items added or changed
+        """
+        if not items:
+            return 0
+        try:
+            contents = items.contents if isinstance(items, ItemBatch) else [item.get('content') for item in items]
+            texts = [content or '' for content in contents]
+            scores = self.score_sentiment(texts)
+            compound = scores[:, COMPOUND] if len(scores) == len(items) else np.full(len(items), np.nan)
+
+            has_text = np.array([bool(text) and isinstance(text, str) for text in texts])
+            topics = [''] * len(items)
+            valid_texts = [text for text, valid in zip(texts, has_text) if valid]
+            engine = self._topic_snapshot(valid_texts, update_topics)
+            topic_matrix = engine.transform(valid_texts)
+            if topic_matrix.size:
+                # '' when no topic has any weight
+                keys = np.array(engine.topic_keys + [''], dtype=object)
+                dominant = np.where(topic_matrix.max(axis=1) > 0, topic_matrix.argmax(axis=1), -1)
+                for position, key in zip(np.flatnonzero(has_text), keys[dominant]):
+                    topics[position] = key
+            with metrics.timer('stage', stage='rollups'):
+                added = rollups.add(items, compound, topics)
+                if engine.is_fitted:
+                    rollups.record_topics(engine.topic_keys, list(engine.top_terms(n_terms=9).values()))
+                return added
         except Exception as e:
-            print(f"Error in problem validation: {e}")
-            return {}
+            logger.error("Error updating rollups: %s", e)
+            return 0
+
+    def _analyze(self, relevant_data: pd.DataFrame, problem_statement: str,
+                 relevance_stats: Dict[str, Any], topic_matrix_format: str = 'float32') -> Dict[str, Any]:
+        """
+        Run sentiment and topic analysis on the selected items and score the problem.
+        """
+        # Combine post and comment content
+        all_content = relevant_data['content'].fillna('').tolist()
+        # Representatives of collapsed near-duplicates count once per item they stand for
+        weights = relevant_data['weight'].fillna(1).to_numpy(dtype=np.int64) if 'weight' in relevant_data else None
+        
+        # Analyze sentiment
+        sentiment_scores = self.score_sentiment(all_content)
+        
+        # Extract topics
+        topic_results = self.extract_topics(all_content, topic_matrix_format=topic_matrix_format)
+        
+        # Calculate validation metrics
+        sentiment_stats = sentiment_counts(sentiment_scores, weights)
+        
+        return {
+            'problem_statement': problem_statement,
+            'sentiment_analysis': sentiment_stats,
+            'topic_analysis': topic_results,
+            'relevance': relevance_stats,
+            'data_volume': int(weights.sum()) if weights is not None else len(all_content),
+            'validation_score': self._calculate_validation_score(sentiment_stats, topic_results)
+        }
 
     def _calculate_validation_score(self, sentiment_stats: Dict[str, int], topic_results: Dict[str, Any]) -> float:
         """
@@ -160,5 +587,5 @@ class RedditAnalyzer:
             
             return round(final_score, 2)
         except Exception as e:
-            print(f"Error calculating validation score: {e}")
+            logger.error("Error calculating validation score: %s", e)
             return 0.0
@@ -0,0 +1,132 @@
+"""
+Per-problem scoring for RedditAnalyzer.validate_problems.
+
+The per-item features (sentiment scores, embeddings, topic weights) are
+computed once by the analyzer and placed in shared memory. Worker processes
+attach to the blocks by name, so every problem is scored against the same
+arrays without pickling them to each worker.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from .relevance import select_top
+from .sentiment import sentiment_counts
+
+# (shared memory block name, shape, dtype string) of every shared array
+Descriptors = Dict[str, Tuple[str, Tuple[int, ...], str]]
+
+# Arrays and parameters attached by pool workers
+_worker_arrays: Dict[str, np.ndarray] = {}
+_worker_params: Dict[str, Any] = {}
+_worker_blocks: List[shared_memory.SharedMemory] = []
+
+
+class SharedArrays:
+    """
+    Copies NumPy arrays into shared memory blocks for the lifetime of a with-block.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.arrays = arrays
+        self.descriptors: Descriptors = {}
+        self._blocks: List[shared_memory.SharedMemory] = []
+
+    def __enter__(self) -> "SharedArrays":
+        for name, array in self.arrays.items():
+            array = np.ascontiguousarray(array)
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            self._blocks.append(block)
+            np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+            self.descriptors[name] = (block.name, array.shape, array.dtype.str)
+        return self
+
+    def __exit__(self, *exc_info):
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks.clear()
+
+
+def _init_worker(descriptors: Descriptors, params: Dict[str, Any]):
+    for name, (block_name, shape, dtype) in descriptors.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        # Keep the handle alive for as long as the view is used
+        _worker_blocks.append(block)
+        _worker_arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+    _worker_params.update(params)
+
+
+def _score_in_worker(index: int) -> Dict[str, Any]:
+    return score_problem(_worker_arrays, _worker_params, index)
+
+
+def score_problem(arrays: Dict[str, np.ndarray], params: Dict[str, Any], index: int) -> Dict[str, Any]:
+    """
+    Selects the items relevant to one problem and summarizes their shared features.
+
+    Args:
+        arrays: ``sentiment`` (n, 4), ``topic_matrix`` (n, n_topics), ``has_text`` (n,),
+                ``weights`` (n,) when near-duplicates were collapsed, and, when
+                relevance filtering is enabled, ``embeddings`` (n, d) and
+                ``problems`` (n_problems, d).
+        params: ``threshold``, ``top_k`` and ``min_items`` of the relevance filter.
+        index: Position of the problem.
+
+    Returns:
+        Dictionary with sentiment counts, the topic rows of the selected items,
+        relevance statistics and the number of analyzed items.
+    """
+    total = len(arrays['sentiment'])
+    if 'embeddings' in arrays and total:
+        similarities = arrays['embeddings'] @ arrays['problems'][index]
+        selected = select_top(similarities, params['threshold'], params['top_k'], params['min_items'])
+        relevance = {
+            'enabled': True,
+            'items_considered': total,
+            'items_relevant': len(selected),
+            'threshold': params['threshold'],
+            'mean_similarity': round(float(similarities[selected].mean()), 4) if len(selected) else 0.0
+        }
+    else:
+        selected = np.arange(total)
+        relevance = {'enabled': False, 'items_considered': total, 'items_relevant': total}
+
+    # Topic rows exist only for non-empty texts, as in RedditAnalyzer.extract_topics
+    with_text = selected[arrays['has_text'][selected].astype(bool)]
+    weights = arrays['weights'][selected] if 'weights' in arrays else None
+    return {
+        'sentiment_analysis': sentiment_counts(arrays['sentiment'][selected], weights),
+        'document_topic_matrix': np.array(arrays['topic_matrix'][with_text]),
+        'relevance': relevance,
+        'data_volume': int(weights.sum()) if weights is not None else len(selected)
+    }
+
+
+def score_problems(arrays: Dict[str, np.ndarray], params: Dict[str, Any], n_problems: int,
+                   n_jobs: int | None = None, parallel_threshold: int = 8) -> List[Dict[str, Any]]:
+    """
+    Scores every problem, on a process pool over shared memory when there are enough of them.
+
+    Args:
+        arrays: Shared per-item features (see score_problem).
+        params: Relevance filter parameters (see score_problem).
+        n_problems: Number of problems.
+        n_jobs: Worker processes (defaults to the CPU count).
+        parallel_threshold: Minimum number of problems before the pool is used.
+
+    Returns:
+        One score_problem result per problem, in order.
+    """
+    n_jobs = min(n_jobs or os.cpu_count() or 1, n_problems)
+    if n_jobs <= 1 or n_problems < parallel_threshold:
+        return [score_problem(arrays, params, index) for index in range(n_problems)]
+
+    with SharedArrays(arrays) as shared:
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                                 initargs=(shared.descriptors, params)) as pool:
+            return list(pool.map(_score_in_worker, range(n_problems),
+                                 chunksize=max(1, n_problems // (n_jobs * 4))))
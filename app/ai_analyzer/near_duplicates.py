@@ -0,0 +1,270 @@
+"""
+Near-duplicate collapsing with MinHash signatures and LSH banding.
+
+Crossposts, weekly megathreads and bot or AutoModerator comments repeat nearly
+the same text many times, which skews sentiment counts and wastes VADER and
+NMF time. NearDuplicateCollapser keeps the first item of every cluster of
+near-identical texts as its representative and adds the others to the
+representative's ``weight``, so weighted counts still match the raw data.
+
+Each text is compared only with the representatives that share one of its
+LSH bands, so the cost per item is constant: collapsing is linear in the
+number of items, runs in one pass over a stream, and its memory grows with
+the number of distinct texts only.
+"""
+import re
+import zlib
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, Sequence, Tuple
+
+import numpy as np
+
+from app.scraper.items import ItemBatch
+
+_TOKEN = re.compile(r"\w+")
+_NUMBER = re.compile(r"\b\d+\b")
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+_GRAM_MULTIPLIER = np.uint64(1000003)
+
+
+def item_text(item: Dict[str, Any]) -> str:
+    """Text an item is compared on: title (posts only) and body."""
+    title, content = item.get('title'), item.get('content')
+    title = title if isinstance(title, str) else ''
+    content = content if isinstance(content, str) else ''
+    return f"{title}\n{content}".strip()
+
+
+def shingle_hashes(text: str, size: int = 3) -> np.ndarray:
+    """
+    32-bit hashes of the word ``size``-grams of a text (texts shorter than
+    ``size`` words form one shingle).
+
+    Case is ignored and every number counts as the same word, so e.g. weekly
+    threads that differ only in their date still match.
+    """
+    tokens = _TOKEN.findall(_NUMBER.sub('0', text.lower()))
+    if not tokens:
+        return np.empty(0, dtype=np.uint64)
+    # Hash every word once, then combine neighbouring hashes into n-gram hashes
+    words = np.fromiter(map(zlib.crc32, map(str.encode, tokens)), dtype=np.uint64, count=len(tokens))
+    n_grams = max(1, len(words) - size + 1)
+    grams = words[:n_grams].copy()
+    for offset in range(1, min(size, len(words))):
+        grams = grams * _GRAM_MULTIPLIER ^ words[offset:offset + n_grams]
+    return (grams ^ (grams >> np.uint64(32))) & _MAX_HASH
+
+
+class MinHasher:
+    """Computes MinHash signatures whose agreement estimates the Jaccard similarity of shingle sets."""
+
+    # Shingles hashed per vectorized step (bounds the temporary array to 128 MiB at 64 permutations)
+    max_shingles_per_step = 1 << 18
+
+    def __init__(self, num_perm: int = 64, shingle_size: int = 3, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        # Multiply-shift hashes: the high 32 bits of (a * x + b) mod 2**64, a odd
+        self._a = rng.integers(0, 1 << 63, num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = rng.integers(0, 1 << 63, num_perm, dtype=np.uint64)
+
+    def signatures(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Computes the signatures of a batch of texts in a few vectorized steps.
+
+        Returns:
+            uint32 array of shape (len(texts), num_perm) and a boolean mask of
+            the texts that have words (the other rows are meaningless).
+        """
+        hashes = [shingle_hashes(text, self.shingle_size) for text in texts]
+        lengths = np.fromiter(map(len, hashes), dtype=np.int64, count=len(hashes))
+        has_words = lengths > 0
+        signatures = np.zeros((len(texts), self.num_perm), dtype=np.uint32)
+        rows = np.flatnonzero(has_words)
+        start = 0
+        while start < len(rows):
+            # As many texts as fit in one step (at least one)
+            ends = np.cumsum(lengths[rows[start:]])
+            stop = start + max(1, int(np.searchsorted(ends, self.max_shingles_per_step, side='right')))
+            step = rows[start:stop]
+            # One row per permutation, so the per-text minimums reduce contiguous runs
+            values = (np.outer(self._a, np.concatenate([hashes[row] for row in step])) + self._b[:, None]) >> np.uint64(32)
+            offsets = np.concatenate([[0], np.cumsum(lengths[step])[:-1]])
+            signatures[step] = np.minimum.reduceat(values, offsets, axis=1).T
+            start = stop
+        return signatures, has_words
+
+    def signature(self, text: str) -> np.ndarray | None:
+        """Returns the uint32 signature of a text, or None when it has no words."""
+        signatures, has_words = self.signatures([text])
+        return signatures[0] if has_words[0] else None
+
+
+class NearDuplicateCollapser:
+    """
+    Streaming MinHash/LSH clustering of near-identical texts.
+
+    A text joins the cluster of the first representative that shares one of
+    its ``bands`` signature bands and whose estimated Jaccard similarity is at
+    least ``threshold``; otherwise it becomes a new representative. Texts
+    without words are never collapsed.
+
+    The defaults (64 permutations in 8 bands of 8) find pairs with a Jaccard
+    similarity of 0.8 about 3 times out of 4, and of 0.9 almost always.
+    """
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 64, bands: int = 8,
+                 shingle_size: int = 3, seed: int = 1, batch_size: int = 1024):
+        """
+        Args:
+            threshold: Minimum estimated Jaccard similarity of word shingles.
+            num_perm: Signature length.
+            bands: LSH bands; ``num_perm`` must be a multiple of it.
+            shingle_size: Words per shingle.
+            seed: Seed of the hash functions.
+            batch_size: Texts whose signatures are computed together.
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm, shingle_size, seed)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.batch_size = batch_size
+        # One bucket table per band: band bytes -> first representative with them
+        self._buckets = [{} for _ in range(bands)]
+        self._signatures = np.empty((1024, num_perm), dtype=np.uint32)
+        self._weights = np.empty(1024, dtype=np.int64)
+        self._representatives = []
+        self.items_seen = 0
+
+    def __len__(self) -> int:
+        return len(self._representatives)
+
+    def add(self, text: str, weight: int = 1, key: Any = None) -> Tuple[int, bool]:
+        """
+        Assigns one text to a cluster.
+
+        Args:
+            text: Text to compare.
+            weight: Number of raw items the text stands for.
+            key: Stored for new representatives (see representative).
+
+        Returns:
+            (cluster index, whether the text started a new cluster).
+        """
+        return self.add_signature(self.hasher.signature(text), weight, key)
+
+    def add_signature(self, signature: np.ndarray | None, weight: int = 1, key: Any = None) -> Tuple[int, bool]:
+        """Like add(), for a signature from self.hasher (None for a text without words)."""
+        self.items_seen += 1
+        if signature is not None:
+            band_keys = [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+            checked = set()
+            for buckets, band_key in zip(self._buckets, band_keys):
+                candidate = buckets.get(band_key)
+                if candidate is None or candidate in checked:
+                    continue
+                checked.add(candidate)
+                agreement = np.count_nonzero(self._signatures[candidate] == signature) / len(signature)
+                if agreement >= self.threshold:
+                    self._weights[candidate] += weight
+                    return candidate, False
+
+        index = len(self._representatives)
+        if index == len(self._weights):
+            self._signatures = np.concatenate([self._signatures, np.empty_like(self._signatures)])
+            self._weights = np.concatenate([self._weights, np.empty_like(self._weights)])
+        self._weights[index] = weight
+        self._representatives.append(key)
+        if signature is not None:
+            self._signatures[index] = signature
+            for buckets, band_key in zip(self._buckets, band_keys):
+                buckets.setdefault(band_key, index)
+        return index, True
+
+    def representative(self, index: int) -> Any:
+        """Key passed to add() for the representative of a cluster."""
+        return self._representatives[index]
+
+    def weights(self) -> np.ndarray:
+        """Cluster weights (raw items per representative), by cluster index."""
+        return self._weights[:len(self._representatives)].copy()
+
+    def collapse(self, items: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Yields the representative of every cluster as soon as it is seen.
+
+        Representatives are copies of the input items with a ``weight`` field.
+        Later duplicates increase that weight in place, so it is final once the
+        stream is exhausted. Items that already have a weight (collapsed
+        earlier) carry it over.
+        """
+        iterator = iter(items)
+        # Signatures are computed per chunk, which holds back at most batch_size items
+        while chunk := list(islice(iterator, self.batch_size)):
+            signatures, has_words = self.hasher.signatures([item_text(item) for item in chunk])
+            for item, signature, words in zip(chunk, signatures, has_words):
+                representative = dict(item, weight=int(item.get('weight') or 1))
+                index, is_new = self.add_signature(signature if words else None, representative['weight'],
+                                                   key=representative)
+                if is_new:
+                    yield representative
+                else:
+                    self._representatives[index]['weight'] = int(self._weights[index])
+
+    def collapse_into(self, items: Iterable[Dict[str, Any]], batch: ItemBatch) -> Iterator[int]:
+        """
+        Like collapse(), but appends the representatives to an ItemBatch.
+
+        Yields the batch row of every new representative; later duplicates
+        update ``batch.weights`` in place.
+        """
+        iterator = iter(items)
+        while chunk := list(islice(iterator, self.batch_size)):
+            signatures, has_words = self.hasher.signatures([item_text(item) for item in chunk])
+            for item, signature, words in zip(chunk, signatures, has_words):
+                weight = int(item.get('weight') or 1)
+                index, is_new = self.add_signature(signature if words else None, weight, key=len(batch))
+                if is_new:
+                    yield batch.append(item, weight=weight)
+                else:
+                    batch.weights[self._representatives[index]] = int(self._weights[index])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'enabled': True,
+            'items': self.items_seen,
+            'representatives': len(self._representatives),
+            'threshold': self.threshold
+        }
+
+
+def collapse_texts(texts: Sequence[str], weights: Sequence[int] | None = None,
+                   collapser: NearDuplicateCollapser | None = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Collapses a batch of texts.
+
+    Args:
+        texts: Texts to compare (non-strings count as empty).
+        weights: Raw items each text stands for (defaults to 1 each).
+        collapser: Collapser to use (defaults to a new one with default settings).
+                   Texts may also join clusters it already holds; those count
+                   towards the earlier representatives.
+
+    Returns:
+        Positions of the representative texts (in input order) and their weights.
+    """
+    collapser = collapser if collapser is not None else NearDuplicateCollapser()
+    offset = len(collapser)
+    keep = []
+    for start in range(0, len(texts), collapser.batch_size):
+        batch = [text if isinstance(text, str) else '' for text in texts[start:start + collapser.batch_size]]
+        signatures, has_words = collapser.hasher.signatures(batch)
+        for position, signature, words in zip(range(start, start + len(batch)), signatures, has_words):
+            _, is_new = collapser.add_signature(signature if words else None,
+                                                1 if weights is None else int(weights[position]), key=position)
+            if is_new:
+                keep.append(position)
+    return np.asarray(keep, dtype=np.int64), collapser.weights()[offset:]
@@ -0,0 +1,161 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List
+
+import numpy as np
+
+from app.core.instrumentation import metrics
+
+from .sentiment_cache import content_key
+
+DEFAULT_MODEL = os.getenv("RELEVANCE_MODEL", "all-MiniLM-L6-v2")
+
+
+def select_top(similarities: np.ndarray, threshold: float, top_k: int | None, min_items: int) -> np.ndarray:
+    """
+    Picks the items clearing the similarity threshold (see RelevanceFilter for the parameters).
+
+    Returns:
+        Indices of the selected items in their original order.
+    """
+    ranked = np.argsort(-similarities, kind='stable')
+    keep = int(np.count_nonzero(similarities >= threshold))
+    keep = max(keep, min(min_items, len(similarities)))
+    if top_k is not None:
+        keep = min(keep, top_k)
+    return np.sort(ranked[:keep])
+
+
+class RelevanceFilter:
+    """
+    Selects the scraped items that are semantically related to a problem statement.
+
+    The problem and the items are embedded with a small sentence-transformers
+    model on CPU, and only the items whose cosine similarity clears a threshold
+    (and at most ``top_k`` of them) go on to sentiment and topic analysis. Item
+    embeddings are cached by content hash, so items seen by earlier validations
+    are not embedded again.
+
+    The model is loaded lazily and only from the local cache (no network), so it
+    must be downloaded once beforehand, e.g.:
+        python -c "from sentence_transformers import SentenceTransformer; SentenceTransformer('all-MiniLM-L6-v2')"
+    """
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, threshold: float = 0.3, top_k: int | None = 2000,
+                 min_items: int = 20, batch_size: int = 64, cache_size: int = 100_000,
+                 cache_folder: str | None = None, local_files_only: bool = True):
+        """
+        Args:
+            model_name: sentence-transformers model name or local directory.
+            threshold: Minimum cosine similarity for an item to count as relevant.
+            top_k: Maximum number of items kept (most similar first), or None for no cap.
+            min_items: Number of most similar items kept even if they fall below the threshold,
+                       so downstream topic modeling always has something to work with.
+            batch_size: Texts per embedding batch.
+            cache_size: Maximum number of item embeddings kept in memory.
+            cache_folder: Where sentence-transformers looks for downloaded models.
+            local_files_only: Never download the model; run fully offline.
+        """
+        self.model_name = model_name
+        self.threshold = threshold
+        self.top_k = top_k
+        self.min_items = min_items
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        self.cache_folder = cache_folder
+        self.local_files_only = local_files_only
+        self._model = None
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()
+        self._stats = {'embedded': 0, 'cache_hits': 0}
+
+    def _get_model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    # Imported lazily: sentence-transformers pulls in torch
+                    from sentence_transformers import SentenceTransformer
+                    self._model = SentenceTransformer(
+                        self.model_name,
+                        device='cpu',
+                        cache_folder=self.cache_folder,
+                        local_files_only=self.local_files_only
+                    )
+        return self._model
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Embeds texts, reusing cached embeddings of previously seen texts.
+
+        Args:
+            texts: Texts to embed.
+
+        Returns:
+            float32 array of L2-normalized embeddings, one row per text.
+        """
+        keys = [content_key(text) for text in texts]
+        vectors = [None] * len(texts)
+        with self._lock:
+            for position, key in enumerate(keys):
+                vector = self._cache.get(key)
+                if vector is not None:
+                    self._cache.move_to_end(key)
+                    vectors[position] = vector
+            missing = [position for position, vector in enumerate(vectors) if vector is None]
+            self._stats['cache_hits'] += len(texts) - len(missing)
+        metrics.incr('cache_lookups', len(texts) - len(missing), cache='embedding', result='hit')
+        metrics.incr('cache_lookups', len(missing), cache='embedding', result='miss')
+
+        if missing:
+            model = self._get_model()
+            with metrics.timer('stage', stage='embedding'):
+                embeddings = model.encode(
+                    [texts[position] for position in missing],
+                    batch_size=self.batch_size,
+                    convert_to_numpy=True,
+                    normalize_embeddings=True,
+                    show_progress_bar=False
+                ).astype(np.float32)
+            metrics.incr('texts_embedded', len(missing))
+            with self._lock:
+                for position, embedding in zip(missing, embeddings):
+                    vectors[position] = embedding
+                    self._cache[keys[position]] = embedding
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+                self._stats['embedded'] += len(missing)
+
+        if not vectors:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.vstack(vectors)
+
+    def score(self, problem_statement: str, texts: List[str]) -> np.ndarray:
+        """
+        Returns the cosine similarity of every text to the problem statement.
+        """
+        if not texts:
+            return np.empty(0, dtype=np.float32)
+        problem_vector = self.embed([problem_statement])[0]
+        return self.embed(texts) @ problem_vector
+
+    def select(self, problem_statement: str, texts: List[str]) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Picks the texts relevant to the problem statement.
+
+        Args:
+            problem_statement: The problem being validated.
+            texts: Candidate texts.
+
+        Returns:
+            (indices of the selected texts in their original order, similarity of every text)
+        """
+        similarities = self.score(problem_statement, texts)
+        return select_top(similarities, self.threshold, self.top_k, self.min_items), similarities
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns embedding and cache counters."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['cached_embeddings'] = len(self._cache)
+        return stats
@@ -0,0 +1,528 @@
+"""
+Time-windowed rollups of scraped items.
+
+validate_problem answers "how negative is this corpus", not "are complaints
+about it growing". Answering the latter from raw CSVs means re-scoring and
+scanning the whole corpus per query, so ingested items are folded into daily
+aggregates per (day, subreddit, topic) instead, and trend queries read only
+those rows. Weeks (starting Monday) are summed from the days at query time.
+
+Each aggregate row holds item, post and comment counts, upvotes, positive and
+negative counts (weighted by near-duplicate weight, labeled like
+sentiment_counts) and upvote-weighted sentiment. An item's upvote weight is
+``weight * (1 + ln(1 + max(upvotes, 0)))``: a highly upvoted complaint counts
+more than an ignored one, without one viral post drowning out the rest.
+
+Every item's contribution is also kept by item id, so ingesting an item again
+(e.g. re-scraped with more upvotes) replaces its old contribution instead of
+counting it twice, and the aggregates can be recomputed from them (rebuild).
+
+Topics are keyed by the incremental topic model's topic keys (see
+IncrementalTopicModel.topic_keys), not by topic number: a topic keeps its key
+across refits only while it stays the same topic, so one topic's trend never
+mixes items of different topics that held its number at ingestion time. ''
+means no topic. Writers also record which ``topic_<n>`` name and top terms
+each key had (record_topics), so readers whose own topic model differs, like
+the web process, resolve topic names against the keys actually stored.
+
+Usage:
+    python -m app.ai_analyzer.rollups [data/scraped_data/*.csv]
+"""
+import glob
+import json
+import math
+import os
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Sequence
+
+import numpy as np
+
+from app.core.config import project_path
+
+DEFAULT_DB_PATH = project_path("data/rollups.sqlite3")
+# Bump when the table layout changes (see RollupStore._migrate)
+SCHEMA_VERSION = 2
+PERIODS = ('day', 'week')
+# Relative change of complaints per period above which a trend counts as growing (or below its negative, shrinking)
+TREND_THRESHOLD = 0.1
+
+# Aggregate columns, in the order of contribution vectors
+_COLUMNS = ('items', 'posts', 'comments', 'upvotes', 'positive', 'negative',
+            'sentiment_weight', 'sentiment_sum', 'negative_weight')
+
+
+def _day(created_utc) -> str | None:
+    """UTC calendar day (YYYY-MM-DD) of an ISO timestamp or epoch seconds."""
+    if created_utc is None or created_utc == '':
+        return None
+    if isinstance(created_utc, (int, float, np.integer, np.floating)):
+        if created_utc != created_utc:  # NaN
+            return None
+        return datetime.fromtimestamp(float(created_utc), timezone.utc).date().isoformat()
+    if isinstance(created_utc, datetime):
+        moment = created_utc
+    else:
+        moment = datetime.fromisoformat(str(created_utc))
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc)
+    return moment.date().isoformat()
+
+
+def _as_day(value) -> str | None:
+    """Normalizes a query bound (date, datetime, ISO string or epoch seconds) to a day."""
+    if value is None:
+        return None
+    if isinstance(value, date) and not isinstance(value, datetime):
+        return value.isoformat()
+    return _day(value)
+
+
+def _period_start(day: str, period: str) -> str:
+    if period == 'week':
+        parsed = date.fromisoformat(day)
+        return (parsed - timedelta(days=parsed.weekday())).isoformat()
+    return day
+
+
+def upvote_weight(upvotes, weight: int = 1) -> float:
+    """Weight of an item in upvote-weighted aggregates."""
+    try:
+        upvotes = max(float(upvotes or 0), 0.0)
+    except (TypeError, ValueError):
+        upvotes = 0.0
+    if upvotes != upvotes:
+        upvotes = 0.0
+    return weight * (1.0 + math.log1p(upvotes))
+
+
+class RollupStore:
+    """
+    Daily per-subreddit, per-topic aggregates in SQLite, shared across processes.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        """
+        Args:
+            db_path: SQLite file of the rollups, or ":memory:".
+        """
+        self.db_path = db_path
+        if db_path != ":memory:":
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._transaction():
+            self._migrate()
+            self._create_tables()
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    @contextmanager
+    def _transaction(self):
+        """IMMEDIATE transaction, so concurrent writers (and migrations) take turns."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _create_tables(self):
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS rollup_items (
+                item_id TEXT PRIMARY KEY,
+                day TEXT NOT NULL,
+                subreddit TEXT NOT NULL,
+                topic TEXT NOT NULL,
+                is_comment INTEGER NOT NULL,
+                weight INTEGER NOT NULL,
+                upvotes INTEGER NOT NULL,
+                compound REAL
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS daily_rollups (
+                day TEXT NOT NULL,
+                subreddit TEXT NOT NULL,
+                topic TEXT NOT NULL,
+                items INTEGER NOT NULL DEFAULT 0,
+                posts INTEGER NOT NULL DEFAULT 0,
+                comments INTEGER NOT NULL DEFAULT 0,
+                upvotes INTEGER NOT NULL DEFAULT 0,
+                positive INTEGER NOT NULL DEFAULT 0,
+                negative INTEGER NOT NULL DEFAULT 0,
+                sentiment_weight REAL NOT NULL DEFAULT 0,
+                sentiment_sum REAL NOT NULL DEFAULT 0,
+                negative_weight REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, subreddit, topic)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS daily_rollups_subreddit ON daily_rollups (subreddit, day)")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS topic_labels (
+                key TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                terms TEXT NOT NULL,
+                recorded_at REAL NOT NULL
+            )
+        """)
+
+    def _migrate(self):
+        """Brings rollups written by an older layout up to SCHEMA_VERSION (caller holds a transaction)."""
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        exists = self._conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'rollup_items'").fetchone()
+        if version >= SCHEMA_VERSION or not exists:
+            return
+        # Version 1 keyed topics by their number at ingestion time, which named different
+        # topics as the model changed; those items are kept without a topic
+        self._conn.execute("ALTER TABLE rollup_items RENAME TO rollup_items_v1")
+        self._conn.execute("DROP TABLE IF EXISTS daily_rollups")
+        self._create_tables()
+        self._conn.execute(
+            "INSERT INTO rollup_items (item_id, day, subreddit, topic, is_comment, weight, upvotes, compound) "
+            "SELECT item_id, day, subreddit, '', is_comment, weight, upvotes, compound FROM rollup_items_v1"
+        )
+        self._conn.execute("DROP TABLE rollup_items_v1")
+        self._rebuild()
+
+    def _rebuild(self):
+        """Recomputes every aggregate from the per-item contributions (caller holds a transaction)."""
+        totals = {}
+        for row in self._conn.execute(
+            "SELECT day, subreddit, topic, is_comment, weight, upvotes, compound FROM rollup_items"
+        ):
+            total = totals.setdefault(row[:3], [0.0] * len(_COLUMNS))
+            for index, value in enumerate(self._contribution(*row[3:])):
+                total[index] += value
+        self._conn.execute("DELETE FROM daily_rollups")
+        self._conn.executemany(
+            f"INSERT INTO daily_rollups (day, subreddit, topic, {', '.join(_COLUMNS)}) "
+            f"VALUES (?, ?, ?, {', '.join('?' * len(_COLUMNS))})",
+            [(*key, *total) for key, total in totals.items()]
+        )
+
+    def rebuild(self):
+        """Recomputes the daily aggregates from the stored per-item contributions."""
+        with self._transaction():
+            self._rebuild()
+
+    @staticmethod
+    def _contribution(is_comment: int, weight: int, upvotes: int, compound: float | None) -> List[float]:
+        """An item's addition to each aggregate column (see _COLUMNS)."""
+        vector = [weight, 0 if is_comment else weight, weight if is_comment else 0, weight * upvotes,
+                  0, 0, 0.0, 0.0, 0.0]
+        if compound is not None:
+            share = upvote_weight(upvotes, weight)
+            if compound > 0:
+                vector[4] = weight
+            else:
+                vector[5] = weight
+                vector[8] = share
+            vector[6] = share
+            vector[7] = share * compound
+        return vector
+
+    def add(self, items: Sequence[Dict[str, Any]], compound: Sequence[float], topics: Sequence[str | None]) -> int:
+        """
+        Folds scored items into the rollups.
+
+        Args:
+            items: Item dictionaries with item_id, subreddit, type, upvotes,
+                   created_utc and optionally weight (near-duplicate count).
+            compound: VADER compound score per item (NaN for items without text).
+            topics: Key of each item's dominant topic (see IncrementalTopicModel.topic_keys),
+                    '' or None for none.
+
+        Returns:
+            Number of items added or changed (items ingested before with the same
+            values are skipped; items without a timestamp or subreddit are ignored).
+        """
+        rows = {}
+        for item, score, topic in zip(items, compound, topics):
+            day = _day(item.get('created_utc'))
+            if not item.get('item_id') or not item.get('subreddit') or day is None:
+                continue
+            score = float(score)
+            try:
+                upvotes = int(item.get('upvotes') or 0)
+            except (TypeError, ValueError):
+                upvotes = 0
+            rows[item['item_id']] = (
+                day, item['subreddit'], topic or '', int(item.get('type') == 'comment'),
+                int(item.get('weight') or 1), upvotes, None if score != score else round(score, 4)
+            )
+        if not rows:
+            return 0
+
+        with self._transaction():
+            previous = {}
+            ids = list(rows)
+            for start in range(0, len(ids), 500):
+                batch = ids[start:start + 500]
+                for row in self._conn.execute(
+                    "SELECT item_id, day, subreddit, topic, is_comment, weight, upvotes, compound "
+                    f"FROM rollup_items WHERE item_id IN ({','.join('?' * len(batch))})", batch
+                ):
+                    previous[row[0]] = tuple(row[1:])
+
+            deltas = {}
+            changed = []
+            for item_id, row in rows.items():
+                old = previous.get(item_id)
+                if old == row:
+                    continue
+                changed.append((item_id, *row))
+                for sign, values in ((-1, old), (1, row)):
+                    if values is None:
+                        continue
+                    key = values[:3]
+                    delta = deltas.setdefault(key, [0.0] * len(_COLUMNS))
+                    for index, value in enumerate(self._contribution(*values[3:])):
+                        delta[index] += sign * value
+
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO rollup_items (item_id, day, subreddit, topic, is_comment, weight, upvotes, "
+                "compound) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", changed
+            )
+            self._conn.executemany(
+                f"INSERT INTO daily_rollups (day, subreddit, topic, {', '.join(_COLUMNS)}) "
+                f"VALUES (?, ?, ?, {', '.join('?' * len(_COLUMNS))}) "
+                "ON CONFLICT (day, subreddit, topic) DO UPDATE SET "
+                + ', '.join(f"{column} = {column} + excluded.{column}" for column in _COLUMNS),
+                [(*key, *delta) for key, delta in deltas.items()]
+            )
+        return len(changed)
+
+    def _query(self, subreddits: Iterable[str] | None, topics: Iterable | None,
+               since: str | None, until: str | None, columns: str | None = None) -> List[tuple]:
+        clauses, params = [], []
+        if subreddits:
+            subreddits = list(subreddits)
+            clauses.append(f"subreddit IN ({','.join('?' * len(subreddits))})")
+            params.extend(subreddits)
+        if topics:
+            topics = [str(topic) for topic in topics]
+            clauses.append(f"topic IN ({','.join('?' * len(topics))})")
+            params.extend(topics)
+        if since:
+            clauses.append("day >= ?")
+            params.append(since)
+        if until:
+            clauses.append("day <= ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        if columns is None:
+            columns = f"day, {', '.join(f'SUM({column})' for column in _COLUMNS)}"
+            where += " GROUP BY day ORDER BY day"
+        with self._lock:
+            return self._conn.execute(f"SELECT {columns} FROM daily_rollups {where}", params).fetchall()
+
+    def _totals(self, subreddits, topics, period: str, since, until) -> List[tuple]:
+        """(period start, column totals) per period, gaps filled with zeros."""
+        if period not in PERIODS:
+            raise ValueError(f"period must be one of {', '.join(PERIODS)}")
+        since, until = _as_day(since), _as_day(until)
+        buckets = {}
+        for day, *values in self._query(subreddits, topics, since, until):
+            totals = buckets.setdefault(_period_start(day, period), [0.0] * len(_COLUMNS))
+            for index, value in enumerate(values):
+                totals[index] += value or 0
+        if not buckets and not (since and until):
+            return []
+
+        last = _period_start(until or max(buckets), period)
+        step = timedelta(days=7 if period == 'week' else 1)
+        current = date.fromisoformat(_period_start(since or min(buckets), period))
+        totals = []
+        while current.isoformat() <= last:
+            totals.append((current.isoformat(), dict(zip(_COLUMNS, buckets.get(current.isoformat(), [0.0] * len(_COLUMNS))))))
+            current += step
+        return totals
+
+    @staticmethod
+    def _bucket(period_start: str, totals: Dict[str, float]) -> Dict[str, Any]:
+        weight = totals['sentiment_weight']
+        return {
+            'period_start': period_start,
+            **{column: int(round(totals[column])) for column in _COLUMNS[:6]},
+            'weighted_sentiment': round(totals['sentiment_sum'] / weight, 4) if weight > 1e-9 else None,
+            'weighted_negative_share': round(totals['negative_weight'] / weight, 4) if weight > 1e-9 else None,
+        }
+
+    def trend(self, subreddits: Iterable[str] | None = None, topics: Iterable | None = None, period: str = 'day',
+              since=None, until=None) -> List[Dict[str, Any]]:
+        """
+        Aggregates per day or week, oldest first.
+
+        Periods without items between the first one and the last one (or the
+        ``since``/``until`` bounds, when given) are included with zero counts.
+
+        Args:
+            subreddits: Subreddits to include (all by default).
+            topics: Keys of the topics to include (all by default).
+            period: 'day' or 'week' (starting Monday).
+            since: First day to include (date, datetime, ISO string or epoch seconds).
+            until: Last day to include.
+
+        Returns:
+            Dictionaries with period_start, items, posts, comments, upvotes,
+            positive, negative, weighted_sentiment (upvote-weighted mean compound
+            score) and weighted_negative_share (upvote-weighted share of negative items).
+        """
+        return [self._bucket(start, totals) for start, totals in self._totals(subreddits, topics, period, since, until)]
+
+    def complaint_trend(self, subreddits: Iterable[str] | None = None, topics: Iterable | None = None,
+                        period: str = 'week', periods: int = 8, until=None) -> Dict[str, Any]:
+        """
+        Whether complaints are growing, from the most recent periods.
+
+        Complaints are the upvote-weighted volume of negative items per period.
+        Their least-squares slope over the periods, relative to their mean, is
+        the growth per period. Periods before the first matching item are left
+        out, so a newly tracked subreddit does not read as growing.
+
+        The upvote-weighted validation score mirrors RedditAnalyzer's score,
+        with the topic term replaced by growth: 0.7 * weighted negative share
+        + 0.3 * clip(0.5 + relative growth, 0, 1).
+
+        Args:
+            subreddits: Subreddits to include (all by default).
+            topics: Keys of the topics to include (all by default).
+            period: 'day' or 'week'.
+            periods: Most periods to include, ending at ``until``.
+            until: Last day to include (defaults to the latest day with matching items).
+
+        Returns:
+            Dictionary with period, buckets (see trend), complaints_slope,
+            relative_growth, direction ('growing', 'shrinking', 'stable' or
+            'no_data'), weighted_negative_share and validation_score.
+        """
+        if periods < 1:
+            raise ValueError("periods must be positive")
+        first, last = self.day_range(subreddits, topics)
+        until = _as_day(until) or last
+        if until is None or first is None or first > until:
+            return {'period': period, 'buckets': [], 'complaints_slope': 0.0, 'relative_growth': 0.0,
+                    'direction': 'no_data', 'weighted_negative_share': None, 'validation_score': 0.0}
+        step = timedelta(days=7 if period == 'week' else 1)
+        since = date.fromisoformat(_period_start(until, period)) - step * (periods - 1)
+        # Periods before the first item would read as growth from nothing
+        since = max(since.isoformat(), _period_start(first, period))
+        totals = self._totals(subreddits, topics, period, since, until)
+
+        complaints = np.array([bucket['negative_weight'] for _, bucket in totals])
+        sentiment_weight = sum(bucket['sentiment_weight'] for _, bucket in totals)
+        slope = float(np.polyfit(np.arange(len(complaints)), complaints, 1)[0]) if len(complaints) > 1 else 0.0
+        mean = float(complaints.mean()) if len(complaints) else 0.0
+        relative_growth = slope / mean if mean > 1e-9 else 0.0
+        if sentiment_weight <= 1e-9:
+            direction = 'no_data'
+        elif relative_growth > TREND_THRESHOLD:
+            direction = 'growing'
+        elif relative_growth < -TREND_THRESHOLD:
+            direction = 'shrinking'
+        else:
+            direction = 'stable'
+        negative_share = float(complaints.sum()) / sentiment_weight if sentiment_weight > 1e-9 else None
+        score = 0.0
+        if negative_share is not None:
+            score = 0.7 * negative_share + 0.3 * min(max(0.5 + relative_growth, 0.0), 1.0)
+        return {
+            'period': period,
+            'buckets': [self._bucket(start, bucket) for start, bucket in totals],
+            'complaints_slope': round(slope, 4),
+            'relative_growth': round(relative_growth, 4),
+            'direction': direction,
+            'weighted_negative_share': round(negative_share, 4) if negative_share is not None else None,
+            'validation_score': round(score, 2),
+        }
+
+    def record_topics(self, keys: Sequence[str], terms: Sequence[Sequence[str]]):
+        """
+        Records the topics of the model the latest items were rolled up with.
+
+        Args:
+            keys: Stable key of each topic, in topic order (``topic_1`` first).
+            terms: Top terms of each topic, in the same order.
+        """
+        now = time.time()
+        with self._transaction():
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO topic_labels (key, name, terms, recorded_at) VALUES (?, ?, ?, ?)",
+                [(key, f"topic_{index + 1}", json.dumps(list(topic_terms)), now)
+                 for index, (key, topic_terms) in enumerate(zip(keys, terms))]
+            )
+
+    def topics(self) -> List[Dict[str, Any]]:
+        """Recorded topics, most recently recorded first: key, name, terms and recorded_at."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, name, terms, recorded_at FROM topic_labels ORDER BY recorded_at DESC, name"
+            ).fetchall()
+        return [{'key': key, 'name': name, 'terms': json.loads(terms), 'recorded_at': recorded_at}
+                for key, name, terms, recorded_at in rows]
+
+    def topic_keys_by_name(self) -> Dict[str, str]:
+        """Mapping of ``topic_<n>`` to the key it had when topics were last recorded."""
+        keys = {}
+        for topic in self.topics():
+            keys.setdefault(topic['name'], topic['key'])
+        return keys
+
+    def subreddit_marks(self, subreddits: Iterable[str]) -> Dict[str, List]:
+        """
+        Cheap summary of the rolled-up data of each subreddit: items, upvotes,
+        negative items and last day. It changes whenever items of the subreddit
+        are added or re-scraped with new values.
+        """
+        subreddits = list(subreddits)
+        if not subreddits:
+            return {}
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT subreddit, SUM(items), SUM(upvotes), SUM(negative), MAX(day) FROM daily_rollups "
+                f"WHERE subreddit IN ({','.join('?' * len(subreddits))}) GROUP BY subreddit", subreddits
+            ).fetchall()
+        return {subreddit: [int(round(items)), int(round(upvotes)), int(round(negative)), day]
+                for subreddit, items, upvotes, negative, day in rows}
+
+    def day_range(self, subreddits: Iterable[str] | None = None,
+                  topics: Iterable | None = None) -> tuple[str | None, str | None]:
+        """First and last day with matching items, or (None, None)."""
+        return self._query(subreddits, topics, None, None, columns="MIN(day), MAX(day)")[0]
+
+    def __len__(self) -> int:
+        """Number of items ingested."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM rollup_items").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def main(argv: List[str]):
+    """Folds the items of CSV dumps into the default rollups."""
+    import pandas as pd
+    from app.ai_analyzer.analyzer import RedditAnalyzer
+    from app.core.config import ROLLUP_DB, SCRAPED_DATA_DIR
+
+    paths = argv or sorted(glob.glob(os.path.join(SCRAPED_DATA_DIR, "*.csv")))
+    store = RollupStore(ROLLUP_DB)
+    analyzer = RedditAnalyzer(relevance_filter=False)
+    for path in paths:
+        df = pd.read_csv(path)
+        items = df.astype(object).where(df.notna(), None).to_dict('records')
+        print(f"Rolled up {analyzer.update_rollups(store, items, update_topics=True)} new or changed items from {path} ({len(store)} total)")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
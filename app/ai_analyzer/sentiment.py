@@ -0,0 +1,175 @@
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from app.core.instrumentation import metrics
+
+from .sentiment_cache import SentimentCache, content_key
+
+# Bump when the scoring logic changes so cached scores are invalidated
+SCORER_VERSION = 1
+
+# Column layout of the score arrays returned by BatchSentimentScorer
+SCORE_COLUMNS = ('compound', 'pos', 'neg', 'neu')
+COMPOUND, POS, NEG, NEU = range(len(SCORE_COLUMNS))
+
+# Per-process VADER instance used by pool workers
+_worker_analyzer = None
+
+
+def _init_worker():
+    global _worker_analyzer
+    from nltk.sentiment import SentimentIntensityAnalyzer
+    _worker_analyzer = SentimentIntensityAnalyzer()
+
+
+def _score_chunk(texts: List[str]) -> np.ndarray:
+    return _polarity_array(_worker_analyzer, texts)
+
+
+def _polarity_array(analyzer: 'SentimentIntensityAnalyzer', texts: Sequence[str]) -> np.ndarray:
+    scores = np.empty((len(texts), len(SCORE_COLUMNS)), dtype=np.float32)
+    for row, text in enumerate(texts):
+        polarity = analyzer.polarity_scores(text)
+        scores[row] = (polarity['compound'], polarity['pos'], polarity['neg'], polarity['neu'])
+    return scores
+
+
+def scorer_version(analyzer: 'SentimentIntensityAnalyzer') -> str:
+    """Identifies the scorer, NLTK release and VADER lexicon contents, for cache invalidation."""
+    import nltk
+
+    digest = hashlib.blake2b(digest_size=8)
+    for word, valence in sorted(analyzer.lexicon.items()):
+        digest.update(f"{word}\t{valence}\n".encode('utf-8'))
+    return f"vader-{SCORER_VERSION}-nltk{nltk.__version__}-{digest.hexdigest()}"
+
+
+class BatchSentimentScorer:
+    """
+    Scores many texts with VADER and returns one compact float32 array.
+
+    Identical texts in a batch are scored once, and texts scored before are
+    served from the optional content-hash cache. The remaining texts of large
+    batches are split into chunks and scored on a process pool, since VADER
+    itself is pure Python and bound to one core.
+    """
+
+    def __init__(self, n_jobs: int | None = None, parallel_threshold: int = 5000, chunk_size: int = 2000,
+                 cache: SentimentCache | bool = False, cache_size: int = 200_000, cache_path: str | None = None):
+        """
+        Args:
+            n_jobs: Worker processes for large batches (defaults to the CPU count).
+            parallel_threshold: Minimum number of texts to score before the pool is used.
+            chunk_size: Texts per pool task.
+            cache: A SentimentCache to use, True to create one, or False to disable caching.
+            cache_size: In-memory capacity of a created cache.
+            cache_path: SQLite file for the on-disk tier of a created cache.
+        """
+        self.n_jobs = n_jobs or os.cpu_count() or 1
+        self.parallel_threshold = parallel_threshold
+        self.chunk_size = chunk_size
+        # NLTK takes seconds to import, so it is loaded with the first scorer
+        from nltk.sentiment import SentimentIntensityAnalyzer
+        self.analyzer = SentimentIntensityAnalyzer()
+        self.version = scorer_version(self.analyzer)
+        if cache is True:
+            cache = SentimentCache(self.version, max_entries=cache_size, db_path=cache_path)
+        self.cache = cache or None
+
+    def score(self, texts) -> np.ndarray:
+        """
+        Scores a batch of texts.
+
+        Args:
+            texts: List or pandas Series of texts. Empty or non-string entries get NaN rows.
+
+        Returns:
+            Array of shape (len(texts), 4) with columns compound, pos, neg, neu (see SCORE_COLUMNS).
+        """
+        texts = list(texts)
+        scores = np.full((len(texts), len(SCORE_COLUMNS)), np.nan, dtype=np.float32)
+
+        # Map every valid text to its first occurrence so duplicates are scored once
+        unique_index = {}
+        rows, positions = [], []
+        for row, text in enumerate(texts):
+            if not text or not isinstance(text, str):
+                continue
+            rows.append(row)
+            positions.append(unique_index.setdefault(text, len(unique_index)))
+        if not rows:
+            return scores
+
+        unique_texts = list(unique_index)
+        unique_scores = np.empty((len(unique_texts), len(SCORE_COLUMNS)), dtype=np.float32)
+
+        to_score = range(len(unique_texts))
+        if self.cache is not None:
+            keys = [content_key(text) for text in unique_texts]
+            cached = self.cache.get_many(keys)
+            to_score = []
+            for position, key in enumerate(keys):
+                row = cached.get(key)
+                if row is None:
+                    to_score.append(position)
+                else:
+                    unique_scores[position] = row
+            metrics.incr('cache_lookups', len(keys) - len(to_score), cache='sentiment', result='hit')
+            metrics.incr('cache_lookups', len(to_score), cache='sentiment', result='miss')
+
+        if len(to_score):
+            with metrics.timer('stage', stage='vader'):
+                fresh = self._score_uncached([unique_texts[position] for position in to_score])
+            metrics.incr('texts_scored', len(to_score), scorer='vader')
+            unique_scores[list(to_score)] = fresh
+            if self.cache is not None:
+                self.cache.put_many({keys[position]: row for position, row in zip(to_score, fresh)})
+
+        scores[rows] = unique_scores[positions]
+        return scores
+
+    def _score_uncached(self, texts: List[str]) -> np.ndarray:
+        if self.n_jobs > 1 and len(texts) >= self.parallel_threshold:
+            chunks = [texts[i:i + self.chunk_size] for i in range(0, len(texts), self.chunk_size)]
+            with ProcessPoolExecutor(max_workers=self.n_jobs, initializer=_init_worker) as pool:
+                return np.concatenate(list(pool.map(_score_chunk, chunks)))
+        return _polarity_array(self.analyzer, texts)
+
+
+def sentiment_counts(scores: np.ndarray, weights: np.ndarray | None = None) -> Dict[str, int]:
+    """
+    Counts positive and negative texts the way RedditAnalyzer labels them
+    (compound > 0 is POSITIVE, anything else NEGATIVE). NaN rows are ignored.
+    With ``weights`` (e.g. of collapsed near-duplicates), each row counts that many times.
+    """
+    compound = scores[:, COMPOUND]
+    valid = ~np.isnan(compound)
+    if weights is None:
+        positive = int(np.count_nonzero(compound[valid] > 0))
+        return {'positive': positive, 'negative': int(np.count_nonzero(valid)) - positive}
+    weights = np.asarray(weights, dtype=np.int64)[valid]
+    positive = int(weights[compound[valid] > 0].sum())
+    return {'positive': positive, 'negative': int(weights.sum()) - positive}
+
+
+def scores_to_dicts(scores: np.ndarray) -> List[Dict[str, Any]]:
+    """
+    Expands a score array into RedditAnalyzer's per-item dict view.
+    NaN rows (empty texts) are skipped, as in the original loop.
+    """
+    results = []
+    for row in scores.tolist():
+        if row[COMPOUND] != row[COMPOUND]:  # NaN
+            continue
+        # VADER reports 4 decimals at most; rounding undoes the float32 storage error
+        compound, pos, neg, neu = (round(value, 4) for value in row)
+        results.append({
+            'label': 'POSITIVE' if compound > 0 else 'NEGATIVE',
+            'score': abs(compound),
+            'details': {'neg': neg, 'neu': neu, 'pos': pos, 'compound': compound}
+        })
+    return results
@@ -0,0 +1,205 @@
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, List
+
+import numpy as np
+
+# Bytes of one cached score row: compound, pos, neg, neu as float32
+ROW_BYTES = 4 * np.dtype(np.float32).itemsize
+
+# Entries of every scorer version are kept side by side
+_CREATE_TABLE = ("CREATE TABLE {table} (key BLOB NOT NULL, version TEXT NOT NULL, scores BLOB NOT NULL, "
+                 "PRIMARY KEY (key, version)) WITHOUT ROWID")
+
+
+def content_key(text: str) -> bytes:
+    """Returns the 16-byte cache key of a text."""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+
+class SentimentCache:
+    """
+    Two-tier cache of sentiment scores keyed by a hash of the text content.
+
+    The first tier is an in-memory LRU holding up to ``max_entries`` rows. The
+    optional second tier is a SQLite file shared across processes and runs.
+    Every entry is stored under the scorer version (VADER/lexicon) and only
+    entries of this cache's version are read, so processes running different
+    versions (e.g. during a deploy) can share the file without evicting each
+    other. Entries of old versions stay until prune_versions() removes them.
+    """
+
+    def __init__(self, version: str, max_entries: int = 200_000, db_path: str | None = None):
+        """
+        Args:
+            version: Identifier of the scorer and lexicon that produced the scores.
+            max_entries: Capacity of the in-memory LRU tier.
+            db_path: SQLite file for the on-disk tier, or None for memory only.
+        """
+        self.version = version
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'invalidated': 0,
+        }
+        self._conn = None
+        if db_path:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._create_table()
+
+    def _primary_key(self) -> List[str]:
+        columns = [row for row in self._conn.execute("PRAGMA table_info(sentiment_cache)") if row[5]]
+        return [row[1] for row in sorted(columns, key=lambda row: row[5])]
+
+    def _create_table(self):
+        self._conn.execute(_CREATE_TABLE.format(table="IF NOT EXISTS sentiment_cache"))
+        self._conn.commit()
+        if self._primary_key() != ['key']:
+            return
+        # Files written before versions were kept side by side hold one row per text
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            if self._primary_key() == ['key']:  # Another process may have migrated it meanwhile
+                self._conn.execute("ALTER TABLE sentiment_cache RENAME TO sentiment_cache_unversioned")
+                self._conn.execute(_CREATE_TABLE.format(table="sentiment_cache"))
+                self._conn.execute("INSERT INTO sentiment_cache SELECT key, version, scores "
+                                   "FROM sentiment_cache_unversioned")
+                self._conn.execute("DROP TABLE sentiment_cache_unversioned")
+            self._conn.commit()
+        except Exception:
+            self._conn.rollback()
+            raise
+
+    def get_many(self, keys: List[bytes]) -> Dict[bytes, np.ndarray]:
+        """
+        Looks up many keys at once.
+
+        Args:
+            keys: Keys from content_key().
+
+        Returns:
+            Mapping of the keys found to their float32 score rows.
+        """
+        found = {}
+        with self._lock:
+            missing = []
+            for key in keys:
+                row = self._memory.get(key)
+                if row is None:
+                    missing.append(key)
+                    continue
+                self._memory.move_to_end(key)
+                found[key] = row
+            self._stats['memory_hits'] += len(found)
+
+            if missing and self._conn is not None:
+                for start in range(0, len(missing), 500):
+                    batch = missing[start:start + 500]
+                    placeholders = ",".join("?" * len(batch))
+                    for key, scores in self._conn.execute(
+                        f"SELECT key, scores FROM sentiment_cache WHERE version = ? AND key IN ({placeholders})",
+                        [self.version, *batch]
+                    ):
+                        row = np.frombuffer(scores, dtype=np.float32)
+                        found[key] = row
+                        self._store_memory(key, row)
+                        self._stats['disk_hits'] += 1
+            self._stats['misses'] += len(keys) - len(found)
+        return found
+
+    def put_many(self, entries: Dict[bytes, np.ndarray]):
+        """
+        Stores freshly computed score rows in both tiers.
+
+        Args:
+            entries: Mapping of content_key() to a 4-element float32 score row.
+        """
+        if not entries:
+            return
+        with self._lock:
+            rows = []
+            for key, scores in entries.items():
+                # Copy so the cache never pins the caller's whole batch array
+                row = np.array(scores, dtype=np.float32)
+                self._store_memory(key, row)
+                rows.append((key, self.version, row.tobytes()))
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO sentiment_cache (key, version, scores) VALUES (?, ?, ?)", rows
+                    )
+
+    def _store_memory(self, key: bytes, row: np.ndarray):
+        self._memory[key] = row
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._stats['evictions'] += 1
+
+    def stats(self) -> Dict[str, float]:
+        """Returns hit, miss and eviction counters plus the current size of each tier."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['memory_entries'] = len(self._memory)
+            stats['memory_payload_bytes'] = len(self._memory) * ROW_BYTES
+            if self._conn is not None:
+                stats['disk_entries'] = self._conn.execute("SELECT COUNT(*) FROM sentiment_cache").fetchone()[0]
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['memory_hits'] + stats['disk_hits']) / lookups, 3) if lookups else 0.0
+        return stats
+
+    def prune_versions(self, keep: str | None = None) -> int:
+        """
+        Deletes disk entries written by other scorer versions.
+
+        Run it as maintenance once no process uses the old versions any more,
+        not on every open.
+
+        Args:
+            keep: Version to keep (defaults to this cache's version).
+
+        Returns:
+            Number of entries deleted.
+        """
+        if self._conn is None:
+            return 0
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM sentiment_cache WHERE version != ?", (keep or self.version,))
+            self._stats['invalidated'] += cursor.rowcount
+        return cursor.rowcount
+
+    def clear(self):
+        """Empties both tiers."""
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute("DELETE FROM sentiment_cache")
+
+
+def main(argv: List[str]):
+    """Prunes the entries of old scorer versions from the given cache files."""
+    from .sentiment import BatchSentimentScorer
+
+    version = BatchSentimentScorer().version
+    for path in argv:
+        cache = SentimentCache(version, db_path=path)
+        print(f"Pruned {cache.prune_versions()} entries of other versions from {path} (keeping {version})")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
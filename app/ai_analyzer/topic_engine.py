@@ -0,0 +1,401 @@
+import copy
+import fcntl
+import os
+import tempfile
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, List
+
+import joblib
+import numpy as np
+import scipy.sparse as sp
+from sklearn.decomposition import NMF
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+from sklearn.utils import murmurhash3_32
+
+from app.core.instrumentation import get_logger, metrics
+
+logger = get_logger(__name__)
+
+# Bump when the saved state layout changes
+STATE_VERSION = 3
+# A refitted topic at least this similar to the previous topic of its number
+# (cosine over the shared vocabulary) is the same topic and keeps its key
+TOPIC_IDENTITY_SIMILARITY = 0.5
+
+
+def _match_topics(previous: np.ndarray, previous_vocabulary: np.ndarray,
+                  components: np.ndarray, vocabulary: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Orders new topics like the previous ones.
+
+    Returns:
+        For every previous topic number, the row of the most similar new topic
+        (cosine similarity over the shared vocabulary, matched one to one),
+        and the similarity of each matched pair.
+    """
+    from scipy.optimize import linear_sum_assignment
+
+    _, old_columns, new_columns = np.intersect1d(previous_vocabulary, vocabulary,
+                                                 assume_unique=True, return_indices=True)
+    similarity = normalize(previous[:, old_columns]) @ normalize(components[:, new_columns]).T
+    rows, order = linear_sum_assignment(-similarity)
+    return order, similarity[rows, order]
+
+
+def _new_topic_key() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+@contextmanager
+def saved_model_lock(path: str):
+    """Exclusive lock across processes on the model saved at ``path``, held while updating it."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(f"{path}.lock", 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class IncrementalTopicModel:
+    """
+    Incremental TF-IDF + NMF topic model that is updated in place as new documents arrive.
+
+    Terms are counted in a hashed feature space (HashingVectorizer), so running
+    term and document frequencies are kept for every term without a vocabulary
+    pass. The factorization works on a bounded vocabulary, chosen like
+    TfidfVectorizer(max_features=...): the ``max_features`` most frequent hashed
+    columns within the min_df/max_df bounds. It is refitted on a bounded
+    reservoir sample of the documents seen so far, so while the reservoir holds
+    every document the topics are those of a full TF-IDF + NMF refit, and
+    memory stays bounded however many documents are added. A refit only runs
+    once the documents added since the last one reach ``refit_growth`` times
+    the documents it was fitted on, so the refits of a growing corpus cost a
+    bounded amount per document; smaller updates only count terms and sample.
+    Topics keep their numbers across updates as long as their terms stay
+    similar.
+
+    Every topic also has a key (``topic_keys``) that outlives refits while the
+    topic stays the same, and is replaced when a refit turns the topic into a
+    different one. Data recorded per topic over time, such as the rollups,
+    is keyed by it rather than by the topic number.
+
+    Any documents can be transformed without a refit, and the fitted state can
+    be saved and reloaded between processes.
+    """
+
+    def __init__(self, n_components: int = 5, n_features: int = 2 ** 18, max_features: int = 1000,
+                 batch_size: int = 1024, min_df: int = 2, max_df: float = 0.95, sample_size: int = 20_000,
+                 max_iter: int = 400, random_state: int = 42, refit_growth: float = 0.1):
+        """
+        Args:
+            n_components: Number of topics.
+            n_features: Size of the hashed feature space counted.
+            max_features: Size of the vocabulary the topics are fitted on.
+            batch_size: Documents vectorized at once.
+            min_df: Minimum document frequency of a vocabulary term.
+            max_df: Maximum document frequency (fraction of documents) of a vocabulary term.
+            sample_size: Documents kept in the reservoir sample the factorization is fitted on.
+            max_iter: Iteration limit of each fit.
+            random_state: Seed for the NMF initialization and the reservoir sample.
+            refit_growth: Refit once the documents added since the last fit reach
+                          this fraction of the documents seen at that fit.
+        """
+        self.n_components = n_components
+        self.n_features = n_features
+        self.max_features = max_features
+        self.batch_size = batch_size
+        self.min_df = min_df
+        self.max_df = max_df
+        self.sample_size = sample_size
+        self.max_iter = max_iter
+        self.random_state = random_state
+        self.refit_growth = refit_growth
+
+        self.doc_freq = np.zeros(n_features, dtype=np.int64)
+        self.term_freq = np.zeros(n_features, dtype=np.int64)
+        self.n_docs = 0
+        # Hashed feature index -> a term that maps to it, for readable topics
+        self.terms: Dict[int, str] = {}
+        # Hashed feature indices of the fitted vocabulary, sorted
+        self.vocabulary = np.empty(0, dtype=np.int64)
+        # Reservoir sample of the documents seen, as hashed term counts
+        self.sample = sp.csr_matrix((0, n_features), dtype=np.float64)
+        self.nmf = None
+        self.is_fitted = False
+        # Documents seen at the last fit
+        self.fitted_docs = 0
+        # Stable key of every topic, in topic order
+        self.topic_keys: List[str] = []
+        self._rng = np.random.default_rng(random_state)
+        self._lock = threading.RLock()
+        self._vectorizer = self._build_vectorizer()
+
+    @property
+    def lock(self) -> threading.RLock:
+        """Re-entrant lock guarding the model; hold it to update and read the model atomically."""
+        return self._lock
+
+    def _build_vectorizer(self) -> HashingVectorizer:
+        return HashingVectorizer(
+            n_features=self.n_features,
+            stop_words='english',
+            alternate_sign=False,
+            norm=None
+        )
+
+    def _select_vocabulary(self) -> np.ndarray:
+        """The max_features most frequent terms within the document frequency bounds, as TfidfVectorizer picks them."""
+        eligible = np.flatnonzero((self.doc_freq >= self.min_df) & (self.doc_freq <= self.max_df * self.n_docs))
+        if len(eligible) > self.max_features:
+            # Ties broken by feature index, so the choice is deterministic
+            order = np.lexsort((eligible, -self.term_freq[eligible]))
+            eligible = eligible[order[:self.max_features]]
+        return np.sort(eligible)
+
+    def _tfidf(self, counts) -> sp.csr_matrix:
+        """Smoothed TF-IDF over the fitted vocabulary, as in TfidfVectorizer(smooth_idf=True)."""
+        idf = np.log((1 + self.n_docs) / (1 + self.doc_freq[self.vocabulary])) + 1.0
+        return normalize(sp.csr_matrix(counts[:, self.vocabulary].multiply(idf)))
+
+    def _add_to_sample(self, counts: sp.csr_matrix, seen_before: int):
+        """Reservoir sampling (algorithm R) of the hashed count rows."""
+        free = max(0, self.sample_size - self.sample.shape[0])
+        sample = sp.vstack([self.sample, counts[:free]], format='csr') if free else self.sample
+        replaced = {}
+        for offset in range(free, counts.shape[0]):
+            slot = int(self._rng.integers(0, seen_before + offset + 1))
+            if slot < self.sample_size:
+                replaced[slot] = offset
+        if replaced:
+            keep = np.ones(sample.shape[0], dtype=bool)
+            keep[list(replaced)] = False
+            # The order of the reservoir does not matter, so replacements are appended
+            sample = sp.vstack([sample[keep], counts[list(replaced.values())]], format='csr')
+        self.sample = sample
+
+    def _fit(self):
+        """
+        Refits the factorization on the reservoir over the currently selected vocabulary.
+
+        Every fit starts from an nndsvda initialization, which is deterministic
+        and does not inherit a poor optimum from fits on fewer documents. The
+        new topics are then ordered to match the previous ones, so a topic
+        keeps its number while its terms stay similar, and its key while it is
+        at least TOPIC_IDENTITY_SIMILARITY similar to its predecessor.
+        """
+        vocabulary = self._select_vocabulary()
+        if len(vocabulary) < self.n_components or self.sample.shape[0] < self.n_components:
+            return
+        previous_vocabulary, self.vocabulary = self.vocabulary, vocabulary
+        nmf = NMF(n_components=self.n_components, init='nndsvda', max_iter=self.max_iter,
+                  random_state=self.random_state)
+        with metrics.timer('stage', stage='nmf'):
+            nmf.fit(self._tfidf(self.sample))
+        if self.is_fitted:
+            order, similarity = _match_topics(self.nmf.components_, previous_vocabulary, nmf.components_, vocabulary)
+            nmf.components_ = nmf.components_[order]
+            self.topic_keys = [key if match >= TOPIC_IDENTITY_SIMILARITY else _new_topic_key()
+                               for key, match in zip(self.topic_keys, similarity)]
+        else:
+            self.topic_keys = [_new_topic_key() for _ in range(self.n_components)]
+        self.nmf = nmf
+        self.is_fitted = True
+        self.fitted_docs = self.n_docs
+
+    def _refit_due(self) -> bool:
+        return not self.is_fitted or self.n_docs - self.fitted_docs >= self.refit_growth * self.fitted_docs
+
+    def partial_fit(self, texts: List[str]) -> "IncrementalTopicModel":
+        """
+        Updates the term statistics and the reservoir with new documents, then
+        the topics if a refit is due (see refit_growth).
+
+        The first fit waits until the documents seen so far yield a vocabulary
+        of at least ``n_components`` terms.
+
+        Args:
+            texts: New documents. Empty and non-string entries are ignored.
+        """
+        texts = [text for text in texts if text and isinstance(text, str)]
+        if not texts:
+            return self
+        with self._lock:
+            analyzer = self._vectorizer.build_analyzer()
+            for start in range(0, len(texts), self.batch_size):
+                batch = texts[start:start + self.batch_size]
+                with metrics.timer('stage', stage='tfidf'):
+                    counts = self._vectorizer.transform(batch)
+                    seen_before = self.n_docs
+                    self.n_docs += counts.shape[0]
+                    self.doc_freq += np.bincount(counts.indices, minlength=self.n_features)
+                    self.term_freq += np.bincount(counts.indices, weights=counts.data,
+                                                  minlength=self.n_features).astype(np.int64)
+                    self._remember_terms(analyzer, batch)
+                    self._add_to_sample(counts, seen_before)
+            if self._refit_due():
+                self._fit()
+            return self
+
+    def refit(self) -> "IncrementalTopicModel":
+        """Refits the topics on the documents seen so far, whether or not a refit is due."""
+        with self._lock:
+            self._fit()
+            return self
+
+    def _remember_terms(self, analyzer, texts: List[str]):
+        tokens = set()
+        for text in texts:
+            tokens.update(analyzer(text))
+        for token in tokens:
+            # Same index HashingVectorizer assigns with alternate_sign=False
+            index = abs(murmurhash3_32(token, seed=0)) % self.n_features
+            self.terms.setdefault(index, token)
+
+    def transform(self, texts: List[str]) -> np.ndarray:
+        """
+        Projects documents onto the current topics without refitting.
+
+        Args:
+            texts: Documents to transform. Empty and non-string entries are ignored.
+
+        Returns:
+            Document-topic matrix of shape (n_valid_docs, n_components).
+        """
+        texts = [text for text in texts if text and isinstance(text, str)]
+        with self._lock:
+            if not self.is_fitted or not texts:
+                return np.zeros((len(texts), self.n_components))
+            with metrics.timer('stage', stage='tfidf'):
+                tfidf = self._tfidf(self._vectorizer.transform(texts))
+            with metrics.timer('stage', stage='nmf_transform'):
+                return self.nmf.transform(tfidf)
+
+    def top_terms(self, n_terms: int = 9) -> Dict[str, List[str]]:
+        """
+        Returns the highest-weighted terms of every topic.
+
+        Args:
+            n_terms: Number of terms per topic.
+
+        Returns:
+            Mapping of ``topic_<n>`` to its top terms.
+        """
+        with self._lock:
+            if not self.is_fitted:
+                return {}
+            topics = {}
+            for topic_idx, topic in enumerate(self.nmf.components_):
+                top = []
+                for column in np.argsort(topic)[::-1]:
+                    if len(top) >= n_terms or topic[column] <= 0:
+                        break
+                    term = self.terms.get(int(self.vocabulary[column]))
+                    if term is not None:
+                        top.append(term)
+                topics[f"topic_{topic_idx+1}"] = top
+            return topics
+
+    def topic_keys_by_name(self) -> Dict[str, str]:
+        """Mapping of ``topic_<n>`` (as in top_terms) to the topic's stable key."""
+        with self._lock:
+            return {f"topic_{topic_idx+1}": key for topic_idx, key in enumerate(self.topic_keys)}
+
+    def copy(self) -> "IncrementalTopicModel":
+        """Returns an independent copy that can be updated without affecting this model."""
+        with self._lock:
+            state = copy.deepcopy(self._state())
+        model = IncrementalTopicModel(**self._params())
+        model._set_state(state)
+        return model
+
+    def _params(self) -> Dict[str, Any]:
+        return {
+            'n_components': self.n_components,
+            'n_features': self.n_features,
+            'max_features': self.max_features,
+            'batch_size': self.batch_size,
+            'min_df': self.min_df,
+            'max_df': self.max_df,
+            'sample_size': self.sample_size,
+            'max_iter': self.max_iter,
+            'random_state': self.random_state,
+            'refit_growth': self.refit_growth,
+        }
+
+    def _state(self) -> Dict[str, Any]:
+        return {
+            'doc_freq': self.doc_freq,
+            'term_freq': self.term_freq,
+            'n_docs': self.n_docs,
+            'terms': self.terms,
+            'vocabulary': self.vocabulary,
+            'sample': self.sample,
+            'nmf': self.nmf,
+            'is_fitted': self.is_fitted,
+            'fitted_docs': self.fitted_docs,
+            'topic_keys': self.topic_keys,
+            'rng': self._rng.bit_generator.state,
+        }
+
+    def _set_state(self, state: Dict[str, Any]):
+        self.doc_freq = state['doc_freq']
+        self.term_freq = state['term_freq']
+        self.n_docs = state['n_docs']
+        self.terms = state['terms']
+        self.vocabulary = state['vocabulary']
+        self.sample = state['sample']
+        self.nmf = state['nmf']
+        self.is_fitted = state['is_fitted']
+        # Older states were refitted on every update
+        self.fitted_docs = state.get('fitted_docs', state['n_docs'])
+        self.topic_keys = state['topic_keys']
+        self._rng.bit_generator.state = state['rng']
+
+    def save(self, path: str):
+        """Writes the fitted state to ``path``, atomically replacing any earlier file."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            state = {'version': STATE_VERSION, 'params': self._params(), **self._state()}
+        # A crash mid-write must not leave a truncated model behind
+        fd, tmp_path = tempfile.mkstemp(dir=directory or '.', prefix=os.path.basename(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                joblib.dump(state, f, compress=3)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> "IncrementalTopicModel":
+        """Restores a model written by save()."""
+        state = joblib.load(path)
+        if state.get('version') != STATE_VERSION:
+            raise ValueError(f"Unsupported topic model state version: {state.get('version')}")
+        model = cls(**state['params'])
+        model._set_state(state)
+        return model
+
+    @classmethod
+    def load_or_create(cls, path: str | None = None, **params: Any) -> "IncrementalTopicModel":
+        """
+        Loads the model at ``path`` if it exists, otherwise creates a new one with ``params``.
+
+        A file written by an older, incompatible version is replaced by the new
+        model on its next save.
+        """
+        if path and os.path.exists(path):
+            try:
+                return cls.load(path)
+            except ValueError as e:
+                logger.warning("Starting a new topic model instead of %s: %s", path, e)
+        return cls(**params)
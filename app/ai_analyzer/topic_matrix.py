@@ -0,0 +1,82 @@
+"""
+Compact encodings of the document-topic matrix returned by topic analysis.
+
+Formats:
+    topk     the k strongest topics of every document with their weights (default for API responses)
+    float32  the full matrix as little-endian float32 bytes, base64 encoded (lossless)
+    dense    the full matrix as nested lists of floats (the original, largest form)
+"""
+import base64
+from typing import Any, Dict
+
+import numpy as np
+
+MATRIX_FORMATS = ('topk', 'float32', 'dense')
+
+
+def encode_topic_matrix(matrix: np.ndarray, matrix_format: str = 'float32', top_k: int = 2) -> Dict[str, Any]:
+    """
+    Encodes an (n_docs, n_topics) matrix for JSON output.
+
+    Args:
+        matrix: Document-topic weights.
+        matrix_format: One of MATRIX_FORMATS.
+        top_k: Topics kept per document in the topk format.
+
+    Returns:
+        JSON-serializable dictionary with the format, the full shape and the data.
+    """
+    if matrix_format not in MATRIX_FORMATS:
+        raise ValueError(f"Unknown topic matrix format {matrix_format!r}, expected one of {MATRIX_FORMATS}")
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if matrix.ndim != 2:
+        matrix = matrix.reshape(len(matrix), -1) if matrix.size else np.empty((len(matrix), 0), dtype=np.float32)
+    payload = {'format': matrix_format, 'shape': list(matrix.shape)}
+
+    if matrix_format == 'float32':
+        payload['data'] = base64.b64encode(matrix.astype('<f4').tobytes()).decode('ascii')
+    elif matrix_format == 'dense':
+        payload['data'] = np.round(matrix, 4).tolist()
+    else:
+        k = min(top_k, matrix.shape[1])
+        topics = np.argsort(-matrix, axis=1, kind='stable')[:, :k]
+        payload['k'] = k
+        payload['topics'] = topics.tolist()
+        payload['weights'] = np.round(np.take_along_axis(matrix, topics, axis=1), 4).tolist()
+    return payload
+
+
+def decode_topic_matrix(payload: Dict[str, Any]) -> np.ndarray:
+    """
+    Rebuilds the float32 matrix from an encoded payload. Topics dropped by the
+    topk format come back as zeros.
+    """
+    shape = tuple(payload['shape'])
+    if payload['format'] == 'float32':
+        return np.frombuffer(base64.b64decode(payload['data']), dtype='<f4').reshape(shape).copy()
+    if payload['format'] == 'dense':
+        return np.asarray(payload['data'], dtype=np.float32).reshape(shape)
+    if payload['format'] == 'topk':
+        matrix = np.zeros(shape, dtype=np.float32)
+        if shape[0]:
+            np.put_along_axis(matrix, np.asarray(payload['topics'], dtype=np.int64),
+                              np.asarray(payload['weights'], dtype=np.float32), axis=1)
+        return matrix
+    raise ValueError(f"Unknown topic matrix format {payload['format']!r}")
+
+
+def reencode_result(result: Dict[str, Any], matrix_format: str | None, top_k: int = 2) -> Dict[str, Any]:
+    """
+    Returns a validation result with its document-topic matrix in another format,
+    or without the matrix when matrix_format is None. The input is not modified.
+    """
+    topic_analysis = result.get('topic_analysis') if isinstance(result, dict) else None
+    if not topic_analysis or 'document_topic_matrix' not in topic_analysis:
+        return result
+    topic_analysis = dict(topic_analysis)
+    matrix = topic_analysis.pop('document_topic_matrix')
+    if matrix_format is not None:
+        # Results stored before the compact encodings hold a plain nested list
+        dense = decode_topic_matrix(matrix) if isinstance(matrix, dict) else np.asarray(matrix, dtype=np.float32)
+        topic_analysis['document_topic_matrix'] = encode_topic_matrix(dense, matrix_format, top_k)
+    return {**result, 'topic_analysis': topic_analysis}
@@ -0,0 +1,355 @@
+"""
+Persistent approximate-nearest-neighbour index over embeddings of scraped items.
+
+Layout of the index directory:
+    meta.json       dimension, row count and training state
+    vectors.f32     float32 embeddings, one row per item, memory-mapped for search
+    assign.i32      inverted-file (IVF) list of every row
+    centroids.npy   IVF centroids (spherical k-means over the embeddings)
+    items.sqlite3   the item dictionaries, keyed by row number and item_id
+
+New items are appended and assigned to their nearest centroid, so the index
+grows incrementally. The centroids are retrained when the index has grown
+well past the size they were trained on. A search only scans the ``n_probe``
+lists closest to the query, which keeps lookups in the millisecond range on
+hundreds of thousands of items.
+
+Build or extend the index from CSV dumps:
+    python -m app.ai_analyzer.vector_index data/scraped_data/*.csv
+"""
+import fcntl
+import glob
+import json
+import os
+import sqlite3
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from app.core.config import project_path
+
+DEFAULT_INDEX_DIR = project_path("data/vector_index")
+
+
+def spherical_kmeans(vectors: np.ndarray, n_clusters: int, n_iter: int = 10, seed: int = 42,
+                     chunk_size: int = 65536) -> np.ndarray:
+    """
+    Clusters L2-normalized vectors by cosine similarity.
+
+    Returns:
+        float32 array of shape (n_clusters, dim) with normalized centroids.
+    """
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=n_clusters, replace=False)].copy()
+    for _ in range(n_iter):
+        sums = np.zeros_like(centroids)
+        counts = np.zeros(n_clusters, dtype=np.int64)
+        for start in range(0, len(vectors), chunk_size):
+            chunk = vectors[start:start + chunk_size]
+            labels = np.argmax(chunk @ centroids.T, axis=1)
+            np.add.at(sums, labels, chunk)
+            counts += np.bincount(labels, minlength=n_clusters)
+        empty = counts == 0
+        # Re-seed empty clusters with random vectors
+        sums[empty] = vectors[rng.choice(len(vectors), size=int(empty.sum()))]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        centroids = (sums / np.maximum(norms, 1e-12)).astype(np.float32)
+    return centroids
+
+
+class VectorIndex:
+    """
+    Memory-mapped IVF index of item embeddings with the items stored alongside.
+
+    Safe for concurrent readers and writers across processes: writers hold an
+    exclusive file lock, and readers only see rows committed to meta.json.
+    """
+
+    def __init__(self, root: str = DEFAULT_INDEX_DIR, n_probe: int = 8, min_train_size: int = 1024,
+                 retrain_growth: float = 4.0):
+        """
+        Args:
+            root: Index directory.
+            n_probe: Number of IVF lists scanned per query (higher = better recall, slower).
+            min_train_size: Below this many rows the index searches exhaustively.
+            retrain_growth: Retrain the centroids once the index has grown by this factor.
+        """
+        self.root = root
+        self.n_probe = n_probe
+        self.min_train_size = min_train_size
+        self.retrain_growth = retrain_growth
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._meta = {}
+        self._vectors = None
+        self._centroids = None
+        self._list_rows = None
+        self._list_offsets = None
+        self._db = sqlite3.connect(self._path('items.sqlite3'), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS items (row INTEGER PRIMARY KEY, item_id TEXT UNIQUE, data TEXT NOT NULL)"
+        )
+        self._db.commit()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def _read_meta(self) -> Dict:
+        try:
+            with open(self._path('meta.json')) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'dim': None, 'count': 0, 'trained_count': 0}
+
+    def _write_meta(self, meta: Dict):
+        tmp = self._path('meta.json.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp, self._path('meta.json'))
+
+    @contextmanager
+    def _write_lock(self):
+        with open(self._path('write.lock'), 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def __len__(self) -> int:
+        return self._read_meta()['count']
+
+    def refresh(self):
+        """Maps rows committed by any process since the last refresh."""
+        meta = self._read_meta()
+        with self._lock:
+            if meta == self._meta:
+                return
+            # Until a committed training is moved into place, map again on the next refresh
+            self._meta = {} if os.path.exists(self._path('assign.i32.tmp')) else meta
+            count, dim = meta['count'], meta['dim']
+            if not count:
+                self._vectors = None
+                return
+            self._vectors = np.memmap(self._path('vectors.f32'), dtype=np.float32, mode='r', shape=(count, dim))
+            if meta['trained_count']:
+                self._centroids = np.load(self._path('centroids.npy'))
+                assign = np.fromfile(self._path('assign.i32'), dtype=np.int32, count=count)
+                # Inverted lists: rows sorted by list, plus the start offset of every list
+                self._list_rows = np.argsort(assign, kind='stable').astype(np.int64)
+                self._list_offsets = np.searchsorted(
+                    assign[self._list_rows], np.arange(len(self._centroids) + 1)
+                )
+            else:
+                self._centroids = None
+
+    def add(self, items: List[Dict], embeddings: np.ndarray) -> int:
+        """
+        Appends items and their embeddings. Items whose item_id is already indexed are skipped.
+
+        Args:
+            items: Item dictionaries (must contain ``item_id``).
+            embeddings: L2-normalized float32 embeddings, one row per item.
+
+        Returns:
+            Number of items added.
+        """
+        if not items:
+            return 0
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        with self._write_lock():
+            meta = self._read_meta()
+            self._install_training(meta)
+            ids = [item['item_id'] for item in items]
+            existing = set()
+            with self._db_lock:
+                # Item rows are committed before meta.json: rows past its count belong to an
+                # interrupted add and must not make their items look indexed
+                with self._db:
+                    self._db.execute("DELETE FROM items WHERE row >= ?", (meta['count'],))
+                for start in range(0, len(ids), 500):
+                    batch = ids[start:start + 500]
+                    existing.update(row[0] for row in self._db.execute(
+                        f"SELECT item_id FROM items WHERE item_id IN ({','.join('?' * len(batch))})", batch
+                    ))
+            # Also drop duplicates within this batch
+            keep, seen = [], set(existing)
+            for position, item_id in enumerate(ids):
+                if item_id not in seen:
+                    seen.add(item_id)
+                    keep.append(position)
+            if not keep:
+                return 0
+
+            new_vectors = embeddings[keep]
+            if meta['dim'] is None:
+                meta['dim'] = int(new_vectors.shape[1])
+            elif new_vectors.shape[1] != meta['dim']:
+                raise ValueError(f"Embedding dimension {new_vectors.shape[1]} does not match index ({meta['dim']})")
+
+            count = meta['count']
+            row_bytes = meta['dim'] * 4
+            # Drop any tail left by an interrupted write before appending
+            for name, width in (('vectors.f32', row_bytes), ('assign.i32', 4)):
+                path = self._path(name)
+                if os.path.exists(path) and os.path.getsize(path) != count * width:
+                    os.truncate(path, count * width)
+
+            if meta['trained_count']:
+                centroids = np.load(self._path('centroids.npy'))
+                assign = np.argmax(new_vectors @ centroids.T, axis=1).astype(np.int32)
+            else:
+                assign = np.full(len(keep), -1, dtype=np.int32)
+            with open(self._path('vectors.f32'), 'ab') as f:
+                f.write(new_vectors.tobytes())
+            with open(self._path('assign.i32'), 'ab') as f:
+                f.write(assign.tobytes())
+
+            with self._db_lock, self._db:
+                self._db.executemany(
+                    "INSERT INTO items (row, item_id, data) VALUES (?, ?, ?)",
+                    [(count + offset, ids[position], json.dumps(items[position], default=str))
+                     for offset, position in enumerate(keep)]
+                )
+            meta['count'] = count + len(keep)
+
+            if meta['count'] >= self.min_train_size and (
+                    not meta['trained_count'] or meta['count'] >= self.retrain_growth * meta['trained_count']):
+                self._train(meta)
+            self._write_meta(meta)
+            self._install_training(meta)
+        return len(keep)
+
+    def _train(self, meta: Dict, sample_size: int = 50_000):
+        """
+        Retrains the centroids and reassigns every row (caller holds the write lock).
+
+        The new centroids and assignments are staged next to the live files; they are only
+        moved into place by _install_training once meta.json records the training.
+        """
+        count, dim = meta['count'], meta['dim']
+        vectors = np.memmap(self._path('vectors.f32'), dtype=np.float32, mode='r', shape=(count, dim))
+        n_lists = int(np.clip(np.sqrt(count), 16, 4096))
+        rng = np.random.default_rng(42)
+        sample = np.asarray(vectors[np.sort(rng.choice(count, size=min(count, sample_size), replace=False))])
+        centroids = spherical_kmeans(sample, n_lists)
+
+        assign = np.empty(count, dtype=np.int32)
+        for start in range(0, count, 65536):
+            assign[start:start + 65536] = np.argmax(vectors[start:start + 65536] @ centroids.T, axis=1)
+        np.save(self._path('centroids.npy.tmp.npy'), centroids)
+        assign.tofile(self._path('assign.i32.tmp'))
+        meta['trained_count'] = count
+        meta['n_lists'] = n_lists
+
+    def _install_training(self, meta: Dict):
+        """Moves staged training files into place once meta.json covers them (caller holds the write lock)."""
+        staged = self._path('assign.i32.tmp')
+        if not os.path.exists(staged):
+            return
+        if os.path.getsize(staged) != meta['trained_count'] * 4:
+            # Staged by a training that died before writing meta.json: the live files still match it
+            for name in ('centroids.npy.tmp.npy', 'assign.i32.tmp'):
+                if os.path.exists(self._path(name)):
+                    os.remove(self._path(name))
+            return
+        if os.path.exists(self._path('centroids.npy.tmp.npy')):
+            os.replace(self._path('centroids.npy.tmp.npy'), self._path('centroids.npy'))
+        os.replace(staged, self._path('assign.i32'))
+
+    def search(self, query: np.ndarray, k: int = 10, exact: bool = False) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Finds the rows most similar to a query embedding.
+
+        Args:
+            query: L2-normalized query embedding.
+            k: Number of neighbours.
+            exact: Scan every row instead of the probed IVF lists.
+
+        Returns:
+            (row numbers, cosine similarities), most similar first.
+        """
+        self.refresh()
+        with self._lock:
+            vectors, centroids = self._vectors, self._centroids
+            list_rows, list_offsets = self._list_rows, self._list_offsets
+        if vectors is None:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        query = np.asarray(query, dtype=np.float32)
+
+        if exact or centroids is None:
+            scores = np.concatenate([
+                vectors[start:start + 65536] @ query for start in range(0, len(vectors), 65536)
+            ])
+            candidates = np.arange(len(vectors))
+        else:
+            probe = np.argsort(-(centroids @ query))[:self.n_probe]
+            candidates = np.concatenate([list_rows[list_offsets[i]:list_offsets[i + 1]] for i in probe])
+            candidates.sort()  # sequential reads from the memory map
+            scores = vectors[candidates] @ query
+
+        k = min(k, len(candidates))
+        if k == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return candidates[top], scores[top]
+
+    def get_items(self, rows) -> List[Dict]:
+        """Returns the stored item dictionaries for the given rows, in the same order."""
+        rows = [int(row) for row in rows]
+        found = {}
+        with self._db_lock:
+            for start in range(0, len(rows), 500):
+                batch = rows[start:start + 500]
+                for row, data in self._db.execute(
+                    f"SELECT row, data FROM items WHERE row IN ({','.join('?' * len(batch))})", batch
+                ):
+                    found[row] = json.loads(data)
+        return [found[row] for row in rows if row in found]
+
+
+def index_items(index: VectorIndex, items: List[Dict], embed: Callable[[List[str]], np.ndarray],
+                batch_size: int = 5000) -> int:
+    """
+    Embeds items (title plus body) and adds them to the index in batches.
+
+    Args:
+        index: Target index.
+        items: Item dictionaries.
+        embed: Function returning normalized embeddings for texts, e.g. RelevanceFilter.embed.
+        batch_size: Items embedded and appended per batch.
+
+    Returns:
+        Number of items added.
+    """
+    added = 0
+    for start in range(0, len(items), batch_size):
+        batch = items[start:start + batch_size]
+        texts = [f"{item.get('title') or ''}\n{item.get('content') or ''}".strip() for item in batch]
+        added += index.add(batch, embed(texts))
+    return added
+
+
+def main(argv: List[str]):
+    """Adds the items of CSV dumps to the default index."""
+    import pandas as pd
+    from app.ai_analyzer.relevance import RelevanceFilter
+    from app.core.config import SCRAPED_DATA_DIR
+
+    paths = argv or sorted(glob.glob(os.path.join(SCRAPED_DATA_DIR, "*.csv")))
+    index = VectorIndex()
+    relevance = RelevanceFilter()
+    for path in paths:
+        df = pd.read_csv(path)
+        items = df.astype(object).where(df.notna(), None).to_dict('records')
+        print(f"Indexed {index_items(index, items, relevance.embed)} new items from {path} ({len(index)} total)")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -1,26 +1,134 @@
+import json
 import os
+from pathlib import Path
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Repository root: relative data paths below resolve against it rather than the
+# working directory, so the web app (run from web/) and the scripts share one data/
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+
+def project_path(path: str) -> str:
+    """Resolves a relative path against PROJECT_ROOT; absolute paths are returned unchanged."""
+    return str(PROJECT_ROOT / path)
+
+
 # Reddit API Credentials
 REDDIT_CLIENT_ID = os.getenv("REDDIT_CLIENT_ID")
 REDDIT_CLIENT_SECRET = os.getenv("REDDIT_CLIENT_SECRET")
 REDDIT_USER_AGENT = os.getenv("REDDIT_USER_AGENT")
 
+# Further Reddit apps, each with its own request budget: a JSON list of objects with
+# client_id, client_secret and optionally user_agent. Replaces the single set above when set.
+REDDIT_CREDENTIALS = os.getenv("REDDIT_CREDENTIALS")
+# Reddit endpoints (point both at a local stand-in server to test without Reddit)
+REDDIT_OAUTH_URL = os.getenv("REDDIT_OAUTH_URL", "https://oauth.reddit.com")
+REDDIT_URL = os.getenv("REDDIT_URL", "https://www.reddit.com")
+
 # Basic PRAW settings (can be expanded)
 PRAW_SITE_NAME = os.getenv("PRAW_SITE_NAME", "default") # Optional: for custom PRAW configurations
 
+# Scraper concurrency settings
+# Number of worker threads used by RedditScraper.fetch_posts_and_comments (1 = sequential)
+SCRAPER_MAX_WORKERS = int(os.getenv("SCRAPER_MAX_WORKERS", "1"))
+# Request budget of each Reddit app, shared by all scraper workers (Reddit allows ~100 requests/minute per OAuth app)
+REDDIT_REQUESTS_PER_MINUTE = float(os.getenv("REDDIT_REQUESTS_PER_MINUTE", "100"))
+# SQLite file holding the apps' token buckets, so every process on the host shares each app's budget
+REDDIT_BUDGET_DB = project_path(os.getenv("REDDIT_BUDGET_DB", "data/reddit_budget.sqlite3"))
+# SQLite file recording items fetched by earlier crawls (used by incremental scraping)
+CRAWL_STATE_DB = project_path(os.getenv("CRAWL_STATE_DB", "data/crawl_state.sqlite3"))
+# SQLite file holding the progress of resumable crawl jobs (RedditScraper.crawl_to_csv)
+CRAWL_CHECKPOINT_DB = project_path(os.getenv("CRAWL_CHECKPOINT_DB", "data/crawl_checkpoints.sqlite3"))
+# Directory of the CSV files written by RedditScraper.save_to_csv and crawl_to_csv
+SCRAPED_DATA_DIR = project_path(os.getenv("SCRAPED_DATA_DIR", "data/scraped_data"))
+# Subreddit discovery cache (keyword -> subreddits), shared across processes
+DISCOVERY_CACHE_DB = project_path(os.getenv("DISCOVERY_CACHE_DB", "data/discovery_cache.sqlite3"))
+DISCOVERY_CACHE_TTL = float(os.getenv("DISCOVERY_CACHE_TTL", str(24 * 3600)))
+# API calls a crawl may spend expanding "load more comments" stubs (0 keeps only the
+# initially loaded comment tree), and the most one post may use
+COMMENT_EXPANSION_BUDGET = int(os.getenv("COMMENT_EXPANSION_BUDGET", "200"))
+COMMENT_EXPANSION_PER_POST = int(os.getenv("COMMENT_EXPANSION_PER_POST", "10"))
+# Items whose texts have at least this estimated Jaccard similarity are collapsed into
+# one weighted representative before analysis (0 disables near-duplicate collapsing)
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.8"))
+
+# Background validation jobs (see app.core.jobs)
+JOB_QUEUE_DB = project_path(os.getenv("JOB_QUEUE_DB", "data/jobs.sqlite3"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# Validation result cache (see app.core.result_cache): 'locmem' serves one process,
+# 'file' is shared by every web worker
+VALIDATION_CACHE_BACKEND = os.getenv("VALIDATION_CACHE_BACKEND", "file")
+VALIDATION_CACHE_DIR = project_path(os.getenv("VALIDATION_CACHE_DIR", "data/validation_cache"))
+# Results younger than this are served as is; older ones are served while a refresh runs
+VALIDATION_CACHE_FRESH_SECONDS = float(os.getenv("VALIDATION_CACHE_FRESH_SECONDS", "900"))
+# Results older than this are recomputed before being served (0 disables the cache)
+VALIDATION_CACHE_MAX_AGE = float(os.getenv("VALIDATION_CACHE_MAX_AGE", str(24 * 3600)))
+
+# Incremental topic model shared by every process: each update is applied to the latest saved model under a file lock
+TOPIC_MODEL_PATH = project_path(os.getenv("TOPIC_MODEL_PATH", "data/topic_model.joblib"))
+
+# Vector index of all historical scraped items (see app.ai_analyzer.vector_index)
+VECTOR_INDEX_DIR = project_path(os.getenv("VECTOR_INDEX_DIR", "data/vector_index"))
+# Whether items scraped by validations are added to the index
+VECTOR_INDEX_UPDATES = os.getenv("VECTOR_INDEX_UPDATES", "true").lower() == "true"
+
+# Daily per-subreddit, per-topic rollups of scraped items (see app.ai_analyzer.rollups)
+ROLLUP_DB = project_path(os.getenv("ROLLUP_DB", "data/rollups.sqlite3"))
+# Whether items scraped by validations are folded into the rollups
+ROLLUP_UPDATES = os.getenv("ROLLUP_UPDATES", "true").lower() == "true"
+
+# Logging and metrics (see app.core.instrumentation)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")  # 'text' or 'json'
+# Directory where worker processes publish their metrics for the metrics endpoint
+METRICS_DIR = project_path(os.getenv("METRICS_DIR", "data/metrics"))
+# Where cProfile dumps of profiled requests and jobs are written
+PROFILE_DIR = project_path(os.getenv("PROFILE_DIR", "data/profiles"))
+
 # Placeholder for other configurations
 # For example, database URLs, API keys for other services, etc.
 # DATABASE_URL = os.getenv("DATABASE_URL")
 
-# Validate that essential credentials are loaded
-if not all([REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET, REDDIT_USER_AGENT]):
-    raise ValueError(
-        "Missing one or more Reddit API credentials. "
-        "Ensure REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET, and REDDIT_USER_AGENT are set in your .env file."
-    )
+def require_reddit_credentials() -> list[dict]:
+    """
+    Validates that essential credentials are loaded.
+
+    Called when a Reddit client is first created rather than at import time, so
+    code that never talks to Reddit (the analyzer, job status views, benchmarks
+    with a fake client) does not need credentials.
+
+    Returns:
+        The credential sets of the configured Reddit apps: those listed in
+        REDDIT_CREDENTIALS, or the single REDDIT_CLIENT_ID/SECRET/USER_AGENT set.
+    """
+    if REDDIT_CREDENTIALS:
+        try:
+            credentials = json.loads(REDDIT_CREDENTIALS)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"REDDIT_CREDENTIALS is not valid JSON: {e}") from e
+        if not isinstance(credentials, list) or not credentials:
+            raise ValueError("REDDIT_CREDENTIALS must be a non-empty JSON list")
+        for index, credential in enumerate(credentials):
+            if not isinstance(credential, dict):
+                raise ValueError(
+                    f"REDDIT_CREDENTIALS entry {index} must be a JSON object, not {type(credential).__name__}."
+                )
+            credential.setdefault('user_agent', REDDIT_USER_AGENT)
+            if not all(credential.get(key) for key in ('client_id', 'client_secret', 'user_agent')):
+                raise ValueError(
+                    f"REDDIT_CREDENTIALS entry {index} needs client_id, client_secret and user_agent "
+                    "(or REDDIT_USER_AGENT)."
+                )
+        return credentials
+
+    if not all([REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET, REDDIT_USER_AGENT]):
+        raise ValueError(
+            "Missing one or more Reddit API credentials. "
+            "Ensure REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET, and REDDIT_USER_AGENT are set in your .env file."
+        )
+    return [{'client_id': REDDIT_CLIENT_ID, 'client_secret': REDDIT_CLIENT_SECRET, 'user_agent': REDDIT_USER_AGENT}]
 
 # You can add more configurations and validations as needed
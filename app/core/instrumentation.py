@@ -0,0 +1,212 @@
+"""
+Lightweight instrumentation shared by the scraper, the analyzer and the web app.
+
+- ``metrics`` collects per-stage timers and counters (API calls, items, bytes,
+  cache hits) in-process and renders them in the Prometheus text format.
+  Processes that do work outside the web server (the job workers) flush their
+  metrics to a directory, and the metrics endpoint merges every process's file.
+- ``profiled`` dumps a cProfile of a block of work (a request or a job) to a
+  .prof file for snakeviz, pstats, etc.
+- ``get_logger`` / ``configure_logging`` replace ad-hoc prints with standard
+  logging. Keyword fields passed via ``extra`` are kept as structured fields
+  and emitted as JSON lines when LOG_FORMAT is 'json'.
+"""
+import cProfile
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Tuple
+
+# Attributes every LogRecord has; anything else was passed through ``extra``
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats log records as one JSON object per line, including ``extra`` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES})
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Returns the logger for a module (use ``__name__``)."""
+    return logging.getLogger(name)
+
+
+def configure_logging(level: str = 'INFO', log_format: str = 'text'):
+    """
+    Sends log records of the ``app`` package to stderr. Meant for scripts and job
+    workers; the Django app configures logging through settings.LOGGING.
+
+    Args:
+        level: Minimum level name, e.g. 'INFO' or 'DEBUG'.
+        log_format: 'text' for human-readable lines or 'json' for JSON lines.
+    """
+    handler = logging.StreamHandler(sys.stderr)
+    if log_format == 'json':
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    logger = logging.getLogger('app')
+    logger.handlers[:] = [handler]
+    logger.setLevel(level.upper())
+    logger.propagate = False
+
+
+# (metric name, sorted label pairs)
+MetricKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _key(name: str, labels: Dict[str, Any]) -> MetricKey:
+    return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+
+class Metrics:
+    """
+    Thread-safe in-process counters and timers.
+
+    Counters only go up. Timers record the number of observations, their total
+    and their maximum, exported as ``<name>_seconds_count``/``_sum``/``_max``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[MetricKey, float] = {}
+        self._timers: Dict[MetricKey, list] = {}
+
+    def incr(self, name: str, value: float = 1, **labels: Any):
+        """Adds ``value`` to a counter."""
+        if not value:
+            return
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels: Any):
+        """Records one duration of a timer."""
+        key = _key(name, labels)
+        with self._lock:
+            timer = self._timers.setdefault(key, [0, 0.0, 0.0])
+            timer[0] += 1
+            timer[1] += seconds
+            timer[2] = max(timer[2], seconds)
+
+    @contextmanager
+    def timer(self, name: str, **labels: Any):
+        """Times the enclosed block, e.g. ``with metrics.timer('stage', stage='sentiment'):``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def snapshot(self) -> Dict[str, list]:
+        """Returns all values as JSON-serializable lists."""
+        with self._lock:
+            return {
+                'counters': [[name, dict(labels), value] for (name, labels), value in self._counters.items()],
+                'timers': [[name, dict(labels), *timer] for (name, labels), timer in self._timers.items()],
+            }
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._timers.clear()
+
+    def flush(self, directory: str):
+        """Writes this process's snapshot to ``<directory>/<pid>.json`` for the metrics endpoint."""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{os.getpid()}.json")
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp, path)
+
+    def render_prometheus(self, directory: str | None = None) -> str:
+        """
+        Renders this process's metrics, plus those flushed to ``directory`` by
+        other processes, in the Prometheus text exposition format.
+        """
+        snapshots = [self.snapshot()]
+        if directory and os.path.isdir(directory):
+            own_file = f"{os.getpid()}.json"
+            for filename in sorted(os.listdir(directory)):
+                if filename.endswith('.json') and filename != own_file:
+                    try:
+                        with open(os.path.join(directory, filename)) as f:
+                            snapshots.append(json.load(f))
+                    except (OSError, ValueError):
+                        continue # Being replaced or truncated; picked up on the next scrape
+        return render_snapshots(snapshots)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+def render_snapshots(snapshots: Iterable[Dict[str, list]]) -> str:
+    """Merges metric snapshots (summing counters and timers) into Prometheus text format."""
+    counters: Dict[MetricKey, float] = {}
+    timers: Dict[MetricKey, list] = {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot.get('counters', []):
+            key = _key(name, labels)
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, count, total, maximum in snapshot.get('timers', []):
+            timer = timers.setdefault(_key(name, labels), [0, 0.0, 0.0])
+            timer[0] += count
+            timer[1] += total
+            timer[2] = max(timer[2], maximum)
+
+    lines = []
+    for name in sorted({name for name, _ in counters}):
+        lines.append(f"# TYPE {name}_total counter")
+        lines.extend(f"{name}_total{_format_labels(labels)} {value:.15g}"
+                     for (metric, labels), value in sorted(counters.items()) if metric == name)
+    for name in sorted({name for name, _ in timers}):
+        series = [(labels, timer) for (metric, labels), timer in sorted(timers.items()) if metric == name]
+        lines.append(f"# TYPE {name}_seconds summary")
+        for labels, (count, total, _) in series:
+            lines.append(f"{name}_seconds_count{_format_labels(labels)} {count}")
+            lines.append(f"{name}_seconds_sum{_format_labels(labels)} {total:.6f}")
+        lines.append(f"# TYPE {name}_seconds_max gauge")
+        lines.extend(f"{name}_seconds_max{_format_labels(labels)} {maximum:.6f}" for labels, (_, _, maximum) in series)
+    return '\n'.join(lines) + '\n'
+
+
+@contextmanager
+def profiled(path: str):
+    """Profiles the enclosed block with cProfile and writes the stats to ``path``."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+
+
+# The metrics of the whole process
+metrics = Metrics()
@@ -0,0 +1,532 @@
+"""
+Background job subsystem for long-running validations.
+
+Jobs live in a SQLite table shared by every process, so any web worker can
+submit, and any web worker can report status for, any job. The work itself
+runs on a pool of worker processes. Identical submissions that arrive while a
+job is queued or running are coalesced onto that job.
+
+Workers append stage events (subreddits discovered, per-subreddit counts,
+running sentiment tallies, topics) to a per-job event log, which the web app
+streams to clients. A job can be cancelled while queued or running; a running
+job stops at its next event, before spending more API requests.
+
+A running job's worker refreshes its heartbeat every HEARTBEAT_INTERVAL
+seconds. Jobs whose worker died with a restart are reclaimed when a JobManager
+starts: running jobs whose heartbeat is older than STALE_AFTER fail, and queued
+jobs are handed to the new pool. Submissions only coalesce onto live jobs.
+Queued jobs can also be drained without a web worker with:
+    python -m app.core.jobs
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
+from typing import Any, Dict, List
+
+from app.core.config import project_path
+from app.core.instrumentation import configure_logging, get_logger, metrics, profiled
+
+logger = get_logger(__name__)
+
+DEFAULT_DB_PATH = project_path("data/jobs.sqlite3")
+
+# Job states
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+ACTIVE_STATES = (QUEUED, RUNNING)
+FINAL_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+# Seconds between a running job's checks for a cancel request
+CANCEL_CHECK_INTERVAL = 0.5
+# Seconds between a running job's heartbeats, and without one after which the job counts as dead
+HEARTBEAT_INTERVAL = 10
+STALE_AFTER = 60
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job when a client cancelled it."""
+
+
+def validation_key(problem_statement: str, keywords: List[str]) -> str:
+    """
+    Returns the coalescing key of a validation request: a hash of the
+    whitespace/case-normalized problem statement and the sorted keyword set.
+    """
+    normalized = {
+        'problem_statement': ' '.join((problem_statement or '').lower().split()),
+        'keywords': sorted({keyword.strip().lower() for keyword in keywords or [] if keyword.strip()}),
+    }
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class JobStore:
+    """SQLite-backed job table. Every call opens its own connection, so it is safe from any thread or process."""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, stale_after: float = STALE_AFTER):
+        """
+        Args:
+            db_path: SQLite file of the job table.
+            stale_after: Seconds without a heartbeat after which a running job counts as dead.
+        """
+        self.db_path = db_path
+        self.stale_after = stale_after
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    dedupe_key TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    stage TEXT,
+                    progress REAL NOT NULL DEFAULT 0,
+                    details TEXT,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    heartbeat_at REAL,
+                    finished_at REAL,
+                    cancel_requested INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            columns = {row['name'] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if 'cancel_requested' not in columns:
+                # Job tables created before jobs could be cancelled
+                conn.execute("ALTER TABLE jobs ADD COLUMN cancel_requested INTEGER NOT NULL DEFAULT 0")
+            if 'heartbeat_at' not in columns:
+                # Job tables created before heartbeats; their running jobs count as dead once stale
+                conn.execute("ALTER TABLE jobs ADD COLUMN heartbeat_at REAL")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_dedupe ON jobs (dedupe_key, status)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS job_events (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    job_id TEXT NOT NULL,
+                    event TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS job_events_job ON job_events (job_id, seq)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @contextmanager
+    def _connection(self):
+        conn = self._connect()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _fail_stale(self, conn: sqlite3.Connection, dedupe_key: str | None = None) -> List[str]:
+        """Marks running jobs without a recent heartbeat (all, or those with ``dedupe_key``) as failed."""
+        now = time.time()
+        query = ("SELECT id FROM jobs WHERE status = ? AND COALESCE(heartbeat_at, started_at, created_at) < ?"
+                 + (" AND dedupe_key = ?" if dedupe_key is not None else ""))
+        args = (RUNNING, now - self.stale_after) + ((dedupe_key,) if dedupe_key is not None else ())
+        stale = [row['id'] for row in conn.execute(query, args)]
+        error = f"The worker running this job stopped (no heartbeat for {self.stale_after:g}s)"
+        for job_id in stale:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?", (FAILED, error, now, job_id)
+            )
+            self._append_event(conn, job_id, FAILED, {'error': error})
+        return stale
+
+    def reclaim(self) -> tuple[List[str], List[str]]:
+        """
+        Reclaims jobs left behind by workers that died, e.g. with a restart.
+
+        Returns:
+            (ids of the stale running jobs now marked failed, ids of the queued
+            jobs, oldest first, which the caller should hand to a worker pool)
+        """
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            failed = self._fail_stale(conn)
+            conn.execute("COMMIT")
+        if failed:
+            logger.warning("Marked %d stale running jobs as failed", len(failed))
+        return failed, self.queued_ids()
+
+    def submit(self, kind: str, params: Dict[str, Any], dedupe_key: str) -> tuple[str, bool]:
+        """
+        Queues a job unless an identical live one is already queued or running.
+
+        A running job whose heartbeat is stale is marked failed first, so the
+        submission starts a new job instead of waiting on a dead one.
+
+        Returns:
+            (job id, True if the submission was coalesced onto an existing job)
+        """
+        conn = self._connect()
+        try:
+            # IMMEDIATE takes the write lock up front, so concurrent submitters cannot both insert
+            conn.execute("BEGIN IMMEDIATE")
+            self._fail_stale(conn, dedupe_key)
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE dedupe_key = ? AND status IN (?, ?) AND cancel_requested = 0 "
+                "ORDER BY created_at DESC LIMIT 1",
+                (dedupe_key, *ACTIVE_STATES)
+            ).fetchone()
+            if row is not None:
+                conn.execute("COMMIT")
+                return row['id'], True
+            job_id = uuid.uuid4().hex
+            conn.execute(
+                "INSERT INTO jobs (id, kind, dedupe_key, params, status, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, kind, dedupe_key, json.dumps(params), QUEUED, time.time())
+            )
+            conn.execute("COMMIT")
+            return job_id, False
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def claim(self, job_id: str) -> Dict[str, Any] | None:
+        """Marks a queued job as running. Returns the job, or None if another worker claimed it first."""
+        now = time.time()
+        with self._connection() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, started_at = ?, heartbeat_at = ? WHERE id = ? AND status = ?",
+                (RUNNING, now, now, job_id, QUEUED)
+            )
+            if cursor.rowcount == 0:
+                return None
+        return self.get(job_id)
+
+    def heartbeat(self, job_id: str):
+        """Records that the worker running the job is alive."""
+        with self._connection() as conn:
+            conn.execute("UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND status = ?", (time.time(), job_id, RUNNING))
+
+    def queued_ids(self) -> List[str]:
+        with self._connection() as conn:
+            return [row['id'] for row in conn.execute(
+                "SELECT id FROM jobs WHERE status = ? ORDER BY created_at", (QUEUED,)
+            )]
+
+    @staticmethod
+    def _append_event(conn: sqlite3.Connection, job_id: str, event: str, data: Dict[str, Any]):
+        conn.execute(
+            "INSERT INTO job_events (job_id, event, data, created_at) VALUES (?, ?, ?, ?)",
+            (job_id, event, json.dumps(data, default=str), time.time())
+        )
+
+    def add_event(self, job_id: str, event: str, data: Dict[str, Any]):
+        """Appends an event to the job's event log."""
+        with self._connection() as conn:
+            self._append_event(conn, job_id, event, data)
+
+    def events(self, job_id: str, after: int = 0, limit: int = 500) -> List[Dict[str, Any]]:
+        """
+        Returns the job's events after sequence number ``after``, oldest first.
+
+        Returns:
+            Dictionaries with 'id' (sequence number), 'event', 'data' and 'created_at'.
+        """
+        with self._connection() as conn:
+            rows = conn.execute(
+                "SELECT seq, event, data, created_at FROM job_events WHERE job_id = ? AND seq > ? ORDER BY seq LIMIT ?",
+                (job_id, after, limit)
+            ).fetchall()
+        return [
+            {'id': row['seq'], 'event': row['event'], 'data': json.loads(row['data']), 'created_at': row['created_at']}
+            for row in rows
+        ]
+
+    def update_progress(self, job_id: str, stage: str, progress: float, details: Dict[str, Any] | None = None):
+        """Records the job's current stage and also appends it to the event log as a 'progress' event."""
+        details = details or {}
+        with self._connection() as conn:
+            conn.execute(
+                "UPDATE jobs SET stage = ?, progress = ?, details = ? WHERE id = ?",
+                (stage, progress, json.dumps(details, default=str), job_id)
+            )
+            self._append_event(conn, job_id, 'progress', {'stage': stage, 'progress': progress, 'details': details})
+
+    def complete(self, job_id: str, result: Dict[str, Any]):
+        with self._connection() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, stage = 'done', progress = 1, result = ?, finished_at = ? WHERE id = ?",
+                (SUCCEEDED, json.dumps(result, default=str), time.time(), job_id)
+            )
+            # The summary only: the full result (with the topic matrix) is served by the result endpoint
+            self._append_event(conn, job_id, SUCCEEDED, {
+                key: result.get(key) for key in ('validation_score', 'sentiment_analysis', 'data_volume')
+            })
+
+    def fail(self, job_id: str, error: str):
+        with self._connection() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                (FAILED, error, time.time(), job_id)
+            )
+            self._append_event(conn, job_id, FAILED, {'error': error})
+
+    def request_cancel(self, job_id: str) -> str | None:
+        """
+        Cancels a queued job at once, or asks a running one to stop at its next event.
+
+        Returns:
+            The job's status afterwards ('running' while it winds down), or None if it does not exist.
+        """
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            status = row['status']
+            if status == QUEUED:
+                status = CANCELLED
+                conn.execute(
+                    "UPDATE jobs SET status = ?, cancel_requested = 1, finished_at = ? WHERE id = ?",
+                    (CANCELLED, time.time(), job_id)
+                )
+                self._append_event(conn, job_id, CANCELLED, {'stage': None})
+            elif status == RUNNING:
+                conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ?", (job_id,))
+            conn.execute("COMMIT")
+            return status
+
+    def is_cancel_requested(self, job_id: str) -> bool:
+        with self._connection() as conn:
+            row = conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row['cancel_requested'])
+
+    def cancel(self, job_id: str):
+        """Marks a running job that stopped on a cancel request as cancelled."""
+        with self._connection() as conn:
+            row = conn.execute("SELECT stage FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ?", (CANCELLED, time.time(), job_id)
+            )
+            self._append_event(conn, job_id, CANCELLED, {'stage': row['stage'] if row else None})
+
+    def get(self, job_id: str, include_result: bool = True) -> Dict[str, Any] | None:
+        """Returns a job as a dictionary, or None if it does not exist."""
+        with self._connection() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = {
+            'job_id': row['id'],
+            'kind': row['kind'],
+            'params': json.loads(row['params']),
+            'status': row['status'],
+            'stage': row['stage'],
+            'progress': row['progress'],
+            'details': json.loads(row['details']) if row['details'] else {},
+            'error': row['error'],
+            'created_at': row['created_at'],
+            'started_at': row['started_at'],
+            'heartbeat_at': row['heartbeat_at'],
+            'finished_at': row['finished_at'],
+        }
+        if include_result:
+            job['result'] = json.loads(row['result']) if row['result'] else None
+        return job
+
+
+def _run_validation_job(params: Dict[str, Any], progress, events, heartbeat) -> Dict[str, Any]:
+    from app.core.pipeline import run_validation
+    return run_validation(params['problem_statement'], params.get('keywords', []),
+                          progress=progress, events=events, heartbeat=heartbeat)
+
+
+# Job kinds and the functions that execute them (run inside worker processes), called
+# with the job's params and its progress, event and heartbeat callbacks
+JOB_HANDLERS = {
+    'validate': _run_validation_job,
+}
+
+
+def _init_worker():
+    from app.core.config import LOG_FORMAT, LOG_LEVEL
+    from app.core.registry import registry
+    configure_logging(LOG_LEVEL, LOG_FORMAT)
+    # Build the scraper and analyzer once per worker process
+    registry.warm_up('scraper', 'analyzer')
+
+
+def execute_job(db_path: str, job_id: str) -> str:
+    """
+    Claims and runs one job, recording progress, events and the outcome in the
+    job table. Jobs submitted with ``profile`` in their params are run under
+    cProfile and the stats are written to PROFILE_DIR/job-<id>.prof.
+
+    Every progress update, event and heartbeat checks (at most every
+    CANCEL_CHECK_INTERVAL seconds) whether the job was cancelled, and if so
+    raises JobCancelled to stop the handler. Independently of the handler, a
+    thread refreshes the job's heartbeat in the table every HEARTBEAT_INTERVAL
+    seconds, so the job is not reclaimed during long stages.
+
+    Returns:
+        The final job status.
+    """
+    from app.core.config import METRICS_DIR, PROFILE_DIR
+
+    store = JobStore(db_path)
+    job = store.claim(job_id)
+    if job is None:
+        return 'skipped'
+
+    last_check = time.monotonic()
+
+    def check_cancelled():
+        nonlocal last_check
+        if time.monotonic() - last_check >= CANCEL_CHECK_INTERVAL:
+            last_check = time.monotonic()
+            if store.is_cancel_requested(job_id):
+                raise JobCancelled(job_id)
+
+    def progress(stage: str, fraction: float, details: Dict[str, Any]):
+        check_cancelled()
+        store.update_progress(job_id, stage, round(fraction, 3), details)
+
+    def events(event: str, data: Dict[str, Any]):
+        check_cancelled()
+        store.add_event(job_id, event, data)
+
+    stop_heartbeat = threading.Event()
+
+    def beat():
+        while not stop_heartbeat.wait(HEARTBEAT_INTERVAL):
+            try:
+                store.heartbeat(job_id)
+            except sqlite3.Error as e:
+                logger.warning("Could not record the heartbeat of job %s: %s", job_id, e, extra={'job_id': job_id})
+
+    threading.Thread(target=beat, name=f"job-heartbeat-{job_id[:8]}", daemon=True).start()
+
+    status = FAILED
+    try:
+        with ExitStack() as stack:
+            stack.enter_context(metrics.timer('job', kind=job['kind']))
+            if job['params'].get('profile'):
+                stack.enter_context(profiled(os.path.join(PROFILE_DIR, f"job-{job_id}.prof")))
+            result = JOB_HANDLERS[job['kind']](job['params'], progress, events, check_cancelled)
+        store.complete(job_id, result)
+        status = SUCCEEDED
+    except JobCancelled:
+        logger.info("Job %s cancelled", job_id, extra={'job_id': job_id})
+        store.cancel(job_id)
+        status = CANCELLED
+    except Exception as e:
+        logger.exception("Error running job %s: %s", job_id, e, extra={'job_id': job_id})
+        store.fail(job_id, str(e))
+    finally:
+        stop_heartbeat.set()
+        metrics.incr('jobs', kind=job['kind'], status=status)
+        # Publish this worker's metrics to the web app's metrics endpoint
+        try:
+            metrics.flush(METRICS_DIR)
+        except OSError as e:
+            logger.warning("Could not write metrics to %s: %s", METRICS_DIR, e)
+    return status
+
+
+class JobManager:
+    """Submits jobs to the shared job table and runs them on a pool of worker processes."""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, max_workers: int = 2, stale_after: float = STALE_AFTER):
+        """
+        Reclaims jobs left behind by dead workers (see JobStore.reclaim) and
+        queues the waiting ones on this manager's pool.
+
+        Args:
+            db_path: SQLite file of the job table.
+            max_workers: Number of worker processes.
+            stale_after: Seconds without a heartbeat after which a running job counts as dead.
+        """
+        self.store = JobStore(db_path, stale_after=stale_after)
+        self.max_workers = max_workers
+        self._executor = None
+        _, queued = self.store.reclaim()
+        for job_id in queued:
+            # Other live managers may queue the same jobs; only one worker claims each
+            self._pool().submit(execute_job, self.store.db_path, job_id)
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forked copies of live PRAW sessions and sockets are not safe to reuse
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker
+            )
+        return self._executor
+
+    def submit_validation(self, problem_statement: str, keywords: List[str],
+                          profile: bool = False) -> tuple[str, bool]:
+        """
+        Queues a validation, coalescing it onto an identical queued or running one.
+
+        Args:
+            problem_statement: The problem to validate.
+            keywords: Keywords used to discover subreddits.
+            profile: Run the job under cProfile (see execute_job).
+
+        Returns:
+            (job id, True if coalesced onto an existing job)
+        """
+        params = {'problem_statement': problem_statement, 'keywords': list(keywords or [])}
+        if profile:
+            params['profile'] = True
+        job_id, coalesced = self.store.submit('validate', params, validation_key(problem_statement, keywords))
+        if not coalesced or self.store.get(job_id, include_result=False)['status'] == QUEUED:
+            # A queued job may have been submitted by a manager that has since died:
+            # queue it here too, and whichever pool gets to it first claims it
+            self._pool().submit(execute_job, self.store.db_path, job_id)
+        return job_id, coalesced
+
+    def get(self, job_id: str, include_result: bool = True) -> Dict[str, Any] | None:
+        return self.store.get(job_id, include_result=include_result)
+
+    def events(self, job_id: str, after: int = 0, limit: int = 500) -> List[Dict[str, Any]]:
+        return self.store.events(job_id, after=after, limit=limit)
+
+    def cancel(self, job_id: str) -> str | None:
+        """Cancels a job (see JobStore.request_cancel)."""
+        return self.store.request_cancel(job_id)
+
+    def shutdown(self, wait: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+def main():
+    """Runs every queued job in this process, e.g. after a restart dropped the in-memory pool."""
+    from app.core.config import JOB_QUEUE_DB
+
+    store = JobStore(JOB_QUEUE_DB)
+    _, queued = store.reclaim()
+    _init_worker()
+    for job_id in queued:
+        logger.info("Job %s: %s", job_id, execute_job(JOB_QUEUE_DB, job_id))
+
+
+if __name__ == '__main__':
+    main()
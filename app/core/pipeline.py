@@ -0,0 +1,184 @@
+from contextlib import closing
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+
+from app.core.registry import registry
+from app.scraper.items import ItemBatch
+
+# Signature of progress callbacks: (stage, fraction complete 0..1, details)
+ProgressCallback = Callable[[str, float, Dict[str, Any]], None]
+# Signature of event callbacks: (event name, data)
+EventCallback = Callable[[str, Dict[str, Any]], None]
+
+# Scraped items between two 'subreddit'/'sentiment' events of one subreddit
+EVENT_BATCH_ITEMS = 250
+
+
+def _no_progress(stage: str, progress: float, details: Dict[str, Any]):
+    pass
+
+
+class _ScrapeTally:
+    """
+    Running per-subreddit counts and sentiment tallies of the items scraped so far.
+
+    Sentiment is scored batch by batch with the analyzer's scorer, whose cache
+    then serves the same texts to the analysis stage. Tallies are weighted by
+    the items' current near-duplicate weights, so they match the raw data.
+    """
+
+    def __init__(self, analyzer, events: EventCallback, batch: ItemBatch):
+        self.analyzer = analyzer
+        self.events = events
+        self.batch = batch
+        self.rows = []
+        self.positive = []  # Per row: True, False, or None without text
+        self.subreddit = None
+        self.counts = {'posts': 0, 'comments': 0}
+
+    def add(self, row: int):
+        subreddit = self.batch.subreddit(row)
+        if subreddit != self.subreddit:
+            self.flush(complete=True)
+            self.subreddit = subreddit
+            self.counts = {'posts': 0, 'comments': 0}
+        self.rows.append(row)
+        self.counts['posts' if self.batch.type(row) == 'post' else 'comments'] += 1
+        if len(self.rows) - len(self.positive) >= EVENT_BATCH_ITEMS:
+            self.flush(complete=False)
+
+    def flush(self, complete: bool):
+        """Scores the items added since the last flush and reports the running totals."""
+        if self.subreddit is None:
+            return
+        from app.ai_analyzer.sentiment import COMPOUND
+
+        new_rows = self.rows[len(self.positive):]
+        if new_rows:
+            scores = self.analyzer.score_sentiment([self.batch.contents[row] or '' for row in new_rows])
+            if len(scores) == len(new_rows):
+                self.positive.extend(None if compound != compound else compound > 0
+                                     for compound in scores[:, COMPOUND].tolist())
+            else:
+                self.positive.extend([None] * len(new_rows))  # Scoring failed; leave these out
+
+        positive = negative = 0
+        weights = self.batch.weights
+        for row, is_positive in zip(self.rows, self.positive):
+            if is_positive is None:
+                continue
+            if is_positive:
+                positive += weights[row]
+            else:
+                negative += weights[row]
+        self.events('subreddit', {'subreddit': self.subreddit, 'complete': complete, **self.counts})
+        self.events('sentiment', {'positive': positive, 'negative': negative, 'items': len(self.rows)})
+
+
+def _with_heartbeat(items: Iterable[Dict[str, Any]], heartbeat: Callable[[], None]) -> Iterator[Dict[str, Any]]:
+    for item in items:
+        heartbeat()
+        yield item
+
+
+def run_validation(problem_statement: str, keywords: List[str],
+                   progress: ProgressCallback | None = None,
+                   events: EventCallback | None = None,
+                   heartbeat: Callable[[], None] | None = None) -> Dict[str, Any]:
+    """
+    Runs the full discovery -> scrape -> analyze pipeline for one problem statement.
+
+    With an event callback, partial insights are reported as they become
+    available: 'subreddits' (the discovered names), 'subreddit' (post and
+    comment counts of the subreddit being scraped, repeated every
+    EVENT_BATCH_ITEMS items and when it is complete), 'sentiment' (running
+    positive/negative tallies of everything scraped so far) and 'topics'
+    (the final topics). An exception raised by any callback, e.g. on a
+    cancel request, stops the crawl without queuing further API requests.
+
+    Args:
+        problem_statement: The problem to validate.
+        keywords: Keywords used to discover subreddits.
+        progress: Optional callback receiving (stage, fraction complete, details).
+        events: Optional callback receiving (event name, data).
+        heartbeat: Optional callback run for every scraped item, before
+                   near-duplicate collapsing holds items back.
+
+    Returns:
+        The result of RedditAnalyzer.validate_problem, plus the discovered
+        subreddits under 'subreddits' and their complaint trend under 'trend'
+        when rollups are updated (see RollupStore.complaint_trend).
+    """
+    from app.core.config import ROLLUP_UPDATES, VECTOR_INDEX_UPDATES
+
+    progress = progress or _no_progress
+    scraper = registry.scraper()
+    analyzer = registry.analyzer()
+
+    progress('discovering', 0.0, {'keywords': keywords})
+    subreddits = scraper._discover_subreddits(keywords)
+    progress('scraping', 0.1, {'subreddits': subreddits})
+    if events is not None:
+        events('subreddits', {'subreddits': subreddits})
+
+    # Items arrive grouped by subreddit, in discovery order
+    positions = {name: index for index, name in enumerate(subreddits)}
+    crawl = stream = scraper.iter_posts_and_comments(subreddits)
+    if heartbeat is not None:
+        stream = _with_heartbeat(stream, heartbeat)
+    # Items are held in a compact columnar batch, which the analysis and sinks read directly
+    batch = ItemBatch()
+    if analyzer.near_duplicate_threshold:
+        # Collapse near-duplicates while scraping so only representatives are held
+        from app.ai_analyzer.near_duplicates import NearDuplicateCollapser
+        rows = NearDuplicateCollapser(analyzer.near_duplicate_threshold).collapse_into(stream, batch)
+    else:
+        rows = batch.ingest(stream)
+    tally = _ScrapeTally(analyzer, events, batch) if events is not None else None
+    current_subreddit = None
+    # Closing the crawl stops its queued requests when a callback raises
+    with closing(crawl):
+        for row in rows:
+            subreddit = batch.subreddit(row)
+            if subreddit != current_subreddit:
+                current_subreddit = subreddit
+                done = positions.get(current_subreddit, 0) / max(len(subreddits), 1)
+                progress('scraping', 0.1 + 0.6 * done, {'subreddit': current_subreddit, 'items': len(batch)})
+            if tally is not None:
+                tally.add(row)
+    if tally is not None:
+        tally.flush(complete=True)
+
+    progress('analyzing', 0.7, {'items': len(batch)})
+    results = analyzer.validate_problem(batch, problem_statement)
+    if events is not None:
+        events('topics', {'topics': (results.get('topic_analysis') or {}).get('topics', {})})
+
+    if VECTOR_INDEX_UPDATES:
+        # The relevance stage has just embedded these items, so indexing reuses its cache
+        progress('indexing', 0.95, {'items': len(batch)})
+        analyzer.index_items(registry.vector_index(), batch)
+    if ROLLUP_UPDATES and results:
+        # Sentiment comes from the cache; the trend reads only the updated daily aggregates
+        progress('rollups', 0.98, {'items': len(batch)})
+        rollups = registry.rollups()
+        analyzer.update_rollups(rollups, batch)
+        results['trend'] = rollups.complaint_trend(subreddits=subreddits)
+    if results:
+        results['subreddits'] = subreddits
+    progress('done', 1.0, {'items': len(batch)})
+    return results
+
+
+def run_historical_validation(problem_statement: str, top_n: int = 1000) -> Dict[str, Any]:
+    """
+    Validates a problem statement against the most similar previously scraped
+    items in the vector index, without touching the Reddit API.
+
+    Args:
+        problem_statement: The problem to validate.
+        top_n: Number of most similar historical items to analyze.
+
+    Returns:
+        The result of RedditAnalyzer.validate_problem_historical.
+    """
+    return registry.analyzer().validate_problem_historical(registry.vector_index(), problem_statement, top_n=top_n)
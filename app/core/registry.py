@@ -0,0 +1,146 @@
+import threading
+import time
+from typing import Any, Callable, Dict
+
+from app.core.instrumentation import get_logger
+
+logger = get_logger(__name__)
+
+
+class ComponentRegistry:
+    """
+    Process-wide holder of the long-lived RedditScraper, RedditAnalyzer, JobManager,
+    VectorIndex, RollupStore and ValidationResultCache.
+
+    Building these is expensive (a PRAW login plus a validation request, the
+    NLTK lexicon check, model setup), so web workers build them once, usually at
+    startup via warm_up(), and share them across request threads. Both
+    components are safe to share: the scraper checks out a separate PRAW client
+    per thread, and the analyzer keeps per-call results local, reads a snapshot of
+    its topic model and updates that model on a background thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._components: Dict[str, Any] = {}
+        self._factories: Dict[str, Callable[[], Any]] = {
+            'scraper': self._default_scraper,
+            'analyzer': self._default_analyzer,
+            'jobs': self._default_jobs,
+            'vector_index': self._default_vector_index,
+            'rollups': self._default_rollups,
+            'result_cache': self._default_result_cache,
+        }
+        self.warm_up_seconds: Dict[str, float] = {}
+
+    @staticmethod
+    def _default_scraper():
+        from app.scraper.scraper import RedditScraper
+        return RedditScraper()
+
+    @staticmethod
+    def _default_analyzer():
+        from app.ai_analyzer.analyzer import RedditAnalyzer
+        from app.core.config import NEAR_DUPLICATE_THRESHOLD, TOPIC_MODEL_PATH
+        return RedditAnalyzer(topic_model_path=TOPIC_MODEL_PATH,
+                              near_duplicate_threshold=NEAR_DUPLICATE_THRESHOLD or None)
+
+    @staticmethod
+    def _default_jobs():
+        from app.core.config import JOB_QUEUE_DB, JOB_WORKERS
+        from app.core.jobs import JobManager
+        return JobManager(JOB_QUEUE_DB, max_workers=JOB_WORKERS)
+
+    @staticmethod
+    def _default_vector_index():
+        from app.ai_analyzer.vector_index import VectorIndex
+        from app.core.config import VECTOR_INDEX_DIR
+        return VectorIndex(VECTOR_INDEX_DIR)
+
+    @staticmethod
+    def _default_rollups():
+        from app.ai_analyzer.rollups import RollupStore
+        from app.core.config import ROLLUP_DB
+        return RollupStore(ROLLUP_DB)
+
+    @staticmethod
+    def _default_result_cache():
+        from app.core.config import VALIDATION_CACHE_FRESH_SECONDS, VALIDATION_CACHE_MAX_AGE
+        from app.core.result_cache import ValidationResultCache
+        return ValidationResultCache(fresh_seconds=VALIDATION_CACHE_FRESH_SECONDS,
+                                     max_age_seconds=VALIDATION_CACHE_MAX_AGE)
+
+    def configure(self, **factories: Callable[[], Any]):
+        """
+        Overrides how components are built, e.g. to inject a fake Reddit client:
+
+            registry.configure(scraper=lambda: RedditScraper(reddit=FakeReddit(...)))
+
+        Already built components are discarded.
+        """
+        with self._lock:
+            self._factories.update(factories)
+            for name in factories:
+                self._components.pop(name, None)
+
+    def get(self, name: str) -> Any:
+        """Returns the shared component ``name``, building it on first use."""
+        component = self._components.get(name)
+        if component is not None:
+            return component
+        with self._lock:
+            # Another thread may have built it while we waited for the lock
+            component = self._components.get(name)
+            if component is None:
+                start = time.perf_counter()
+                component = self._factories[name]()
+                self.warm_up_seconds[name] = round(time.perf_counter() - start, 3)
+                self._components[name] = component
+            return component
+
+    def scraper(self):
+        """Returns the shared RedditScraper."""
+        return self.get('scraper')
+
+    def analyzer(self):
+        """Returns the shared RedditAnalyzer."""
+        return self.get('analyzer')
+
+    def jobs(self):
+        """Returns the shared JobManager."""
+        return self.get('jobs')
+
+    def vector_index(self):
+        """Returns the shared VectorIndex of historical items."""
+        return self.get('vector_index')
+
+    def rollups(self):
+        """Returns the shared RollupStore of time-windowed aggregates."""
+        return self.get('rollups')
+
+    def result_cache(self):
+        """Returns the shared ValidationResultCache (needs Django's cache framework)."""
+        return self.get('result_cache')
+
+    def warm_up(self, *names: str):
+        """
+        Builds the given components (all by default) ahead of the first request.
+        A component that fails to build is reported and retried on first use.
+        """
+        for name in names or tuple(self._factories):
+            try:
+                self.get(name)
+                logger.info("Warmed up %s in %ss", name, self.warm_up_seconds[name],
+                            extra={'component': name, 'seconds': self.warm_up_seconds[name]})
+            except Exception as e:
+                logger.error("Error warming up %s: %s", name, e)
+
+    def reset(self):
+        """Drops all built components; they are rebuilt on next use."""
+        with self._lock:
+            self._components.clear()
+            self.warm_up_seconds.clear()
+
+
+# The registry shared by the whole process
+registry = ComponentRegistry()
@@ -0,0 +1,170 @@
+"""
+Cache of validation results with stale-while-revalidate.
+
+Dashboard users often resubmit the same problem statement and keywords within
+minutes. Results are cached under a key built from the request alone: the
+normalized problem statement and keyword set (see app.core.jobs.validation_key),
+the scraper settings that shape the corpus and the analyzer version, so a
+change to any of them is a miss. Building the key needs neither subreddit
+discovery nor a Reddit client, so a lookup never waits on the API.
+
+Each entry also records the subreddits its validation scraped and their marks
+in the rollups (RollupStore.subreddit_marks), which every validation job
+updates with the items it scraped. When another job or crawl has rolled up new
+or changed items of those subreddits since, the entry no longer describes the
+corpus and the lookup is a miss. Without rollup updates (ROLLUP_UPDATES off)
+freshness rests on the age limits alone.
+
+Storage is any Django cache backend (see CACHES in the web settings): the
+local-memory backend serves a single process, the file-based backend is shared
+by every web worker.
+
+An entry younger than ``fresh_seconds`` is served as is. An older one is still
+served instantly, but the caller queues a refresh job and records it with
+track(); the next lookup after that job succeeded adopts its result. Jobs run
+in worker processes, so entries are only ever written by the web process.
+"""
+import hashlib
+import time
+from typing import Any, Dict, List, Tuple
+
+from app.core.instrumentation import metrics
+from app.core.jobs import CANCELLED, FAILED, SUCCEEDED, validation_key
+
+# Lookup states
+FRESH = 'fresh'
+STALE = 'stale'
+PENDING = 'pending'
+MISS = 'miss'
+
+
+class ValidationResultCache:
+    """Validation results in a Django cache, refreshed in the background through the job queue."""
+
+    def __init__(self, cache=None, jobs=None, fresh_seconds: float = 900, max_age_seconds: float = 24 * 3600,
+                 alias: str = 'validation', rollups=None):
+        """
+        Args:
+            cache: Django cache to use (defaults to ``django.core.cache.caches[alias]``).
+            jobs: JobManager or JobStore whose finished jobs are adopted (defaults to the shared one).
+            fresh_seconds: Age up to which a result is served without a refresh.
+            max_age_seconds: Age after which a result is dropped instead of served stale.
+            alias: Django cache alias used when no cache is given.
+            rollups: RollupStore whose subreddit marks entries are checked against
+                     (defaults to the shared one).
+        """
+        if cache is None:
+            from django.core.cache import caches
+            cache = caches[alias]
+        self.cache = cache
+        self._jobs = jobs
+        self._rollups = rollups
+        self.fresh_seconds = fresh_seconds
+        self.max_age_seconds = max_age_seconds
+
+    @property
+    def jobs(self):
+        # Resolved on first use: the registry may be building this cache when it is created
+        if self._jobs is None:
+            from app.core.registry import registry
+            self._jobs = registry.jobs()
+        return self._jobs
+
+    @property
+    def rollups(self):
+        if self._rollups is None:
+            from app.core.registry import registry
+            self._rollups = registry.rollups()
+        return self._rollups
+
+    @staticmethod
+    def make_key(problem_statement: str, keywords: List[str], fingerprint: str, analyzer_version: str) -> str:
+        """Returns the cache key of a validation of the given corpus by the given analyzer."""
+        digest = hashlib.sha256(f"{fingerprint}|{analyzer_version}".encode('utf-8')).hexdigest()[:32]
+        return f"validation:{validation_key(problem_statement, keywords)}:{digest}"
+
+    def key_for(self, problem_statement: str, keywords: List[str], analyzer=None) -> str:
+        """
+        Returns the cache key of a validation request, without any API calls.
+
+        Args:
+            problem_statement: The problem to validate.
+            keywords: Keywords used to discover subreddits.
+            analyzer: RedditAnalyzer (defaults to the shared one).
+        """
+        from app.core.config import COMMENT_EXPANSION_BUDGET, COMMENT_EXPANSION_PER_POST
+        from app.core.registry import registry
+
+        analyzer = analyzer or registry.analyzer()
+        settings = f"comment-expansion-{COMMENT_EXPANSION_BUDGET}/{COMMENT_EXPANSION_PER_POST}"
+        return self.make_key(problem_statement, keywords, settings, analyzer.version)
+
+    def _entry(self, result: Dict[str, Any], stored_at: float) -> Dict[str, Any]:
+        subreddits = list(result.get('subreddits') or [])
+        return {'result': result, 'stored_at': stored_at, 'job_id': None, 'subreddits': subreddits,
+                'marks': self.rollups.subreddit_marks(subreddits)}
+
+    def _corpus_changed(self, entry: Dict[str, Any]) -> bool:
+        """Whether items of the entry's subreddits were rolled up since it was stored."""
+        if not entry.get('subreddits'):
+            return False
+        return self.rollups.subreddit_marks(entry['subreddits']) != entry['marks']
+
+    def _put(self, key: str, entry: Dict[str, Any]):
+        self.cache.set(key, entry, timeout=self.max_age_seconds)
+
+    def lookup(self, key: str) -> Tuple[Dict[str, Any] | None, str]:
+        """
+        Returns the cached result of a key and its state.
+
+        A tracked job that has succeeded since the last lookup replaces the
+        entry's result; one that failed, was cancelled or vanished is forgotten.
+        An entry whose subreddits have new or changed items in the rollups is
+        dropped, unless a tracked job (which itself rolls items up) is running.
+
+        Returns:
+            (result, FRESH or STALE), or (None, PENDING) while the first job for
+            the key is running, or (None, MISS).
+        """
+        entry = self.cache.get(key)
+        if entry is not None and entry.get('job_id'):
+            job = self.jobs.get(entry['job_id'])
+            if job is None or job['status'] in (FAILED, CANCELLED):
+                entry = dict(entry, job_id=None)
+                if entry['result'] is None:
+                    self.cache.delete(key)
+                    entry = None
+                else:
+                    self._put(key, entry)
+            elif job['status'] == SUCCEEDED:
+                entry = self._entry(job['result'], job['finished_at'] or time.time())
+                self._put(key, entry)
+
+        if (entry is not None and entry['result'] is not None and not entry.get('job_id')
+                and self._corpus_changed(entry)):
+            self.cache.delete(key)
+            entry = None
+            metrics.incr('cache_invalidations', cache='validation')
+
+        if entry is None:
+            state = MISS
+        elif entry['result'] is None:
+            state = PENDING
+        elif time.time() - entry['stored_at'] <= self.fresh_seconds:
+            state = FRESH
+        else:
+            state = STALE
+        metrics.incr('cache_lookups', cache='validation', result=state)
+        return (entry['result'] if state in (FRESH, STALE) else None), state
+
+    def track(self, key: str, job_id: str):
+        """Records the job computing (or refreshing) a key's result, to be adopted by a later lookup."""
+        entry = self.cache.get(key) or {'result': None, 'stored_at': None}
+        self._put(key, dict(entry, job_id=job_id))
+
+    def store(self, key: str, result: Dict[str, Any]):
+        """Stores a result computed outside the job queue."""
+        self._put(key, self._entry(result, time.time()))
+
+    def invalidate(self, key: str):
+        self.cache.delete(key)
@@ -0,0 +1,247 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from app.core.config import project_path
+
+DEFAULT_DB_PATH = project_path("data/crawl_checkpoints.sqlite3")
+
+
+class CrawlCheckpoint:
+    """
+    Persistent progress of one resumable crawl job, backed by SQLite.
+
+    For every subreddit the job records a cursor (the listing's PRAW ``after``
+    token, i.e. the fullname of the last finished post, and how far down the
+    listing that is) and whether the subreddit is done or failed; it also
+    records every finished post and the byte offset of the job's output file.
+
+    RedditScraper reports progress as items are consumed, but nothing is
+    persisted until ``commit`` is called with the output offset, right after
+    the caller made the corresponding rows durable. Progress and output
+    therefore always agree: a restarted job cuts the output back to the last
+    committed offset and continues from the committed cursors, so nothing is
+    fetched twice and no row is written twice.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, job_id: str = "default"):
+        """
+        Args:
+            db_path: SQLite file holding the checkpoints of all jobs. Use ":memory:" for a throwaway store.
+            job_id: Name of the crawl job; rerunning a job id resumes it.
+        """
+        self.db_path = db_path
+        self.job_id = job_id
+        if db_path != ":memory:":
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS crawl_jobs (
+                job_id TEXT PRIMARY KEY,
+                params TEXT NOT NULL,
+                output_path TEXT,
+                output_offset INTEGER NOT NULL DEFAULT 0,
+                rows_written INTEGER NOT NULL DEFAULT 0,
+                status TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS crawl_cursors (
+                job_id TEXT NOT NULL,
+                subreddit TEXT NOT NULL,
+                after TEXT,
+                position INTEGER NOT NULL DEFAULT 0,
+                status TEXT NOT NULL DEFAULT 'pending',
+                error TEXT,
+                PRIMARY KEY (job_id, subreddit)
+            );
+            CREATE TABLE IF NOT EXISTS crawl_done_posts (
+                job_id TEXT NOT NULL,
+                post_id TEXT NOT NULL,
+                PRIMARY KEY (job_id, post_id)
+            ) WITHOUT ROWID;
+        """)
+        self._conn.commit()
+        # Progress reported since the last commit
+        self._pending_cursors = {}
+        self._pending_posts = []
+        # Subreddits with a failure in this run: their cursor stays before the failed post
+        self._failed = set()
+        # Items of the posts reported done, including those committed by earlier runs
+        self.items_reported = 0
+
+    def begin(self, params: dict, output_path: str) -> dict:
+        """
+        Creates the job, or loads it when it already exists.
+
+        Args:
+            params: Crawl parameters, stored for reference.
+            output_path: Output file of a new job (an existing job keeps its own).
+
+        Returns:
+            The job: ``params``, ``output_path``, ``output_offset``, ``rows_written``
+            and ``status`` ('running', 'incomplete' or 'completed').
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO crawl_jobs (job_id, params, output_path, status, updated_at) "
+                "VALUES (?, ?, ?, 'running', ?)",
+                (self.job_id, json.dumps(params), output_path, time.time())
+            )
+            self._conn.execute(
+                "UPDATE crawl_jobs SET status = 'running' WHERE job_id = ? AND status = 'incomplete'", (self.job_id,)
+            )
+            row = self._conn.execute(
+                "SELECT params, output_path, output_offset, rows_written, status FROM crawl_jobs WHERE job_id = ?",
+                (self.job_id,)
+            ).fetchone()
+            self.items_reported = row[3]
+        return {
+            'params': json.loads(row[0]),
+            'output_path': row[1],
+            'output_offset': row[2],
+            'rows_written': row[3],
+            'status': row[4],
+        }
+
+    def cursor(self, subreddit: str) -> dict:
+        """Returns the committed ``after`` token, listing ``position`` and ``status`` of a subreddit."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT after, position, status FROM crawl_cursors WHERE job_id = ? AND subreddit = ?",
+                (self.job_id, subreddit)
+            ).fetchone()
+        if row is None:
+            return {'after': None, 'position': 0, 'status': 'pending'}
+        return {'after': row[0], 'position': row[1], 'status': row[2]}
+
+    def is_post_done(self, post_id: str) -> bool:
+        """Whether a post and its comments were committed by this job (e.g. before a restart)."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM crawl_done_posts WHERE job_id = ? AND post_id = ?", (self.job_id, post_id)
+            ).fetchone() is not None
+
+    def _pending_cursor(self, subreddit: str) -> dict:
+        cursor = self._pending_cursors.get(subreddit)
+        if cursor is None:
+            cursor = self._pending_cursors[subreddit] = {}
+        return cursor
+
+    def post_done(self, subreddit: str, post_id: str, position: int, items: int):
+        """
+        Reports that a post and its comments were handed to the consumer.
+
+        Args:
+            subreddit: Subreddit the post was listed in.
+            post_id: Reddit id of the post (without the ``post_`` prefix).
+            position: Number of listing entries up to and including the post.
+            items: Number of items yielded for the post.
+        """
+        with self._lock:
+            self.items_reported += items
+            self._pending_posts.append(post_id)
+            if subreddit not in self._failed:
+                cursor = self._pending_cursor(subreddit)
+                cursor['after'] = f"t3_{post_id}"
+                cursor['position'] = position
+
+    def post_failed(self, subreddit: str, post_id: str):
+        """Reports a post whose comments could not be loaded; the subreddit is retried on resume."""
+        with self._lock:
+            self._failed.add(subreddit)
+
+    def subreddit_finished(self, subreddit: str, error: str | None = None):
+        """
+        Reports that every listed post of a subreddit was handled.
+
+        Args:
+            subreddit: Subreddit name.
+            error: Why the listing stopped early, if it did.
+        """
+        with self._lock:
+            cursor = self._pending_cursor(subreddit)
+            if error is None and subreddit not in self._failed:
+                cursor['status'], cursor['error'] = 'done', None
+            else:
+                cursor['status'], cursor['error'] = 'failed', error or "comments of a post could not be loaded"
+
+    def commit(self, output_offset: int, rows_written: int):
+        """
+        Persists the progress reported so far, together with the output position, in one transaction.
+
+        Args:
+            output_offset: Byte offset up to which the output is durable.
+            rows_written: Total rows in the output up to that offset.
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO crawl_done_posts (job_id, post_id) VALUES (?, ?)",
+                [(self.job_id, post_id) for post_id in self._pending_posts]
+            )
+            for subreddit, cursor in self._pending_cursors.items():
+                self._conn.execute(
+                    "INSERT INTO crawl_cursors (job_id, subreddit) VALUES (?, ?) "
+                    "ON CONFLICT(job_id, subreddit) DO NOTHING",
+                    (self.job_id, subreddit)
+                )
+                for column in ('after', 'position', 'status', 'error'):
+                    if column in cursor:
+                        self._conn.execute(
+                            f"UPDATE crawl_cursors SET {column} = ? WHERE job_id = ? AND subreddit = ?",
+                            (cursor[column], self.job_id, subreddit)
+                        )
+            self._conn.execute(
+                "UPDATE crawl_jobs SET output_offset = ?, rows_written = ?, updated_at = ? WHERE job_id = ?",
+                (output_offset, rows_written, time.time(), self.job_id)
+            )
+            self._pending_posts.clear()
+            self._pending_cursors.clear()
+
+    def finish(self) -> str:
+        """
+        Marks the job 'completed', or 'incomplete' when a subreddit failed (rerun the job to retry it).
+
+        Returns:
+            The new status.
+        """
+        with self._lock, self._conn:
+            failed = self._conn.execute(
+                "SELECT COUNT(*) FROM crawl_cursors WHERE job_id = ? AND status != 'done'", (self.job_id,)
+            ).fetchone()[0]
+            status = 'incomplete' if failed else 'completed'
+            self._conn.execute(
+                "UPDATE crawl_jobs SET status = ?, updated_at = ? WHERE job_id = ?",
+                (status, time.time(), self.job_id)
+            )
+            self._failed.clear()
+        return status
+
+    def stats(self) -> dict:
+        """Returns the committed progress of the job."""
+        with self._lock:
+            subreddits = dict(self._conn.execute(
+                "SELECT status, COUNT(*) FROM crawl_cursors WHERE job_id = ? GROUP BY status", (self.job_id,)
+            ).fetchall())
+            posts = self._conn.execute(
+                "SELECT COUNT(*) FROM crawl_done_posts WHERE job_id = ?", (self.job_id,)
+            ).fetchone()[0]
+            rows = self._conn.execute(
+                "SELECT rows_written, status FROM crawl_jobs WHERE job_id = ?", (self.job_id,)
+            ).fetchone()
+        return {
+            'job_id': self.job_id,
+            'status': rows[1] if rows else None,
+            'rows_written': rows[0] if rows else 0,
+            'posts_done': posts,
+            'subreddits': subreddits,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,346 @@
+"""
+PRAW clients for several Reddit apps behind one cross-process rate limiter.
+
+Reddit budgets requests per OAuth app (roughly 100 per minute), so one app
+caps a crawl no matter how many threads or processes run it, and parallel web
+and job workers compete for the same budget. ClientPool takes several
+credential sets and keeps one token bucket per app in a SQLite file that every
+process on the host opens, so the buckets are global: a worker checks out a
+client of whichever app has the most budget left, and every request it sends
+is charged to that app's bucket.
+
+A 429 response blocks the app's bucket for the Retry-After time (or an
+exponential backoff) in every process, and later checkouts go to other apps.
+
+Point REDDIT_OAUTH_URL and REDDIT_URL at a local HTTP stand-in (see
+benchmarks/fake_reddit_server.py) to exercise the pool without Reddit.
+"""
+import itertools
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List
+
+from app.core.config import project_path
+
+DEFAULT_DB_PATH = project_path("data/reddit_budget.sqlite3")
+
+# Backoff after consecutive 429s without a Retry-After header: 2, 4, 8, ... seconds, at most 5 minutes
+BACKOFF_BASE_SECONDS = 2.0
+BACKOFF_MAX_SECONDS = 300.0
+# A 429 more than this long after the previous one starts the backoff over
+BACKOFF_RESET_SECONDS = 60.0
+
+
+class RateLimited(Exception):
+    """A request was answered with HTTP 429; its app is backing off."""
+
+    def __init__(self, app: str, delay: float):
+        super().__init__(f"Reddit app {app} is rate limited for {delay:.1f}s")
+        self.app = app
+        self.delay = delay
+
+
+def rate_limit_delay(error: BaseException) -> float | None:
+    """
+    Recognizes a 429 response raised by PRAW/prawcore.
+
+    Returns:
+        The Retry-After seconds (0 when absent) for a 429, otherwise None.
+    """
+    response = getattr(error, 'response', None)
+    if getattr(response, 'status_code', None) != 429:
+        return None
+    try:
+        return max(0.0, float(response.headers.get('retry-after') or 0))
+    except (AttributeError, TypeError, ValueError):
+        return 0.0
+
+
+def create_praw_client(credential: Dict[str, str]):
+    """Builds a PRAW client for one credential set, using the configured Reddit endpoints."""
+    from app.core.config import REDDIT_OAUTH_URL, REDDIT_URL
+    # Imported here so callers with an injected client never load PRAW
+    import praw
+    return praw.Reddit(
+        client_id=credential['client_id'],
+        client_secret=credential['client_secret'],
+        user_agent=credential['user_agent'],
+        oauth_url=REDDIT_OAUTH_URL,
+        reddit_url=REDDIT_URL,
+        check_for_updates=False
+    )
+
+
+class SharedRateLimiter:
+    """
+    Token buckets keyed by Reddit app, stored in SQLite.
+
+    Every change happens in an IMMEDIATE transaction, i.e. under SQLite's file
+    lock, so all processes opening the same file draw from the same buckets.
+    Timestamps are wall-clock time, which all processes on the host share.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, requests_per_minute: float = 100,
+                 burst: int = 10):
+        """
+        Args:
+            db_path: SQLite file shared by the processes. Use ":memory:" for buckets private to this process.
+            requests_per_minute: Sustained budget of each app.
+            burst: Requests an idle app may issue back-to-back.
+        """
+        if requests_per_minute <= 0:
+            raise ValueError("requests_per_minute must be positive")
+        self.db_path = db_path
+        self.rate = requests_per_minute / 60.0  # tokens per second
+        self.capacity = max(1, burst)
+        if db_path != ":memory:":
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS token_buckets (
+                app TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                blocked_until REAL NOT NULL DEFAULT 0,
+                strikes INTEGER NOT NULL DEFAULT 0,
+                last_throttled_at REAL NOT NULL DEFAULT 0,
+                calls INTEGER NOT NULL DEFAULT 0,
+                throttled INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _load(self, conn: sqlite3.Connection, app: str, now: float) -> Dict[str, float]:
+        row = conn.execute(
+            "SELECT tokens, updated_at, blocked_until, strikes, last_throttled_at FROM token_buckets WHERE app = ?",
+            (app,)
+        ).fetchone()
+        if row is None:
+            conn.execute("INSERT INTO token_buckets (app, tokens, updated_at) VALUES (?, ?, ?)",
+                         (app, float(self.capacity), now))
+            return {'tokens': float(self.capacity), 'blocked_until': 0.0, 'strikes': 0, 'last_throttled_at': 0.0}
+        tokens, updated_at, blocked_until, strikes, last_throttled_at = row
+        # Tokens accrue only once the app is no longer blocked
+        since = max(updated_at, blocked_until)
+        if now > since:
+            tokens = min(self.capacity, tokens + (now - since) * self.rate)
+        return {'tokens': tokens, 'blocked_until': blocked_until, 'strikes': strikes,
+                'last_throttled_at': last_throttled_at}
+
+    def try_acquire(self, app: str, tokens: int = 1) -> float:
+        """
+        Consumes ``tokens`` from an app's bucket if it has them.
+
+        Returns:
+            0 on success, otherwise the seconds until the bucket could have them.
+
+        Raises:
+            ValueError: If ``tokens`` exceeds the capacity, which no wait could satisfy.
+        """
+        if tokens > self.capacity:
+            raise ValueError(f"Cannot acquire {tokens} tokens from a bucket of capacity {self.capacity}")
+        with self._transaction() as conn:
+            now = time.time()
+            bucket = self._load(conn, app, now)
+            if bucket['blocked_until'] > now:
+                wait = bucket['blocked_until'] - now + max(0.0, tokens - bucket['tokens']) / self.rate
+            elif bucket['tokens'] >= tokens:
+                conn.execute(
+                    "UPDATE token_buckets SET tokens = ?, updated_at = ?, calls = calls + ? WHERE app = ?",
+                    (bucket['tokens'] - tokens, now, tokens, app)
+                )
+                return 0.0
+            else:
+                wait = (tokens - bucket['tokens']) / self.rate
+            return wait
+
+    def back_off(self, app: str, retry_after: float = 0.0) -> float:
+        """
+        Blocks an app after a 429 and empties its bucket.
+
+        Args:
+            app: The app that was rate limited.
+            retry_after: Seconds from the Retry-After header (0 if absent).
+
+        Returns:
+            The seconds the app is blocked for.
+        """
+        with self._transaction() as conn:
+            now = time.time()
+            bucket = self._load(conn, app, now)
+            if bucket['blocked_until'] > now:
+                # A request sent before the app was blocked: same episode, no further escalation
+                strikes = bucket['strikes']
+            elif now - bucket['last_throttled_at'] <= BACKOFF_RESET_SECONDS:
+                strikes = bucket['strikes'] + 1
+            else:
+                strikes = 1
+            delay = retry_after or min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** (strikes - 1))
+            blocked_until = max(bucket['blocked_until'], now + delay)
+            conn.execute(
+                "UPDATE token_buckets SET tokens = 0, updated_at = ?, blocked_until = ?, strikes = ?, "
+                "last_throttled_at = ?, throttled = throttled + 1 WHERE app = ?",
+                (now, blocked_until, strikes, now, app)
+            )
+            return blocked_until - now
+
+    def snapshot(self, apps: List[str]) -> Dict[str, Dict[str, float]]:
+        """Returns each app's available tokens and remaining block time, without consuming anything."""
+        snapshot = {}
+        with self._transaction() as conn:
+            now = time.time()
+            for app in apps:
+                bucket = self._load(conn, app, now)
+                snapshot[app] = {
+                    'tokens': round(bucket['tokens'], 3) if bucket['blocked_until'] <= now else 0.0,
+                    'blocked_seconds': round(max(0.0, bucket['blocked_until'] - now), 3),
+                }
+        return snapshot
+
+    def usage(self, apps: List[str]) -> Dict[str, Dict[str, int]]:
+        """Returns the requests charged to and the 429s received by each app, by all processes."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT app, calls, throttled FROM token_buckets WHERE app IN ({','.join('?' * len(apps))})", apps
+            ).fetchall()
+        usage = {app: {'calls': 0, 'throttled': 0} for app in apps}
+        for app, calls, throttled in rows:
+            usage[app] = {'calls': calls, 'throttled': throttled}
+        return usage
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ClientPool:
+    """
+    Thread-safe pool of PRAW clients over several Reddit apps.
+
+    PRAW instances are not thread-safe, so every thread checks out its own
+    client; idle clients are reused. A checkout picks the app with the most
+    budget left, and ``acquire()`` inside the checkout charges that app, so
+    the pool can stand in for a RateLimiter.
+    """
+
+    def __init__(self, credentials: List[Dict[str, str]], requests_per_minute: float = 100, burst: int = 10,
+                 db_path: str = ":memory:", client_factory: Callable[[Dict[str, str]], Any] | None = None):
+        """
+        Args:
+            credentials: Credential sets (client_id, client_secret, user_agent, optional name).
+            requests_per_minute: Budget of each app.
+            burst: Requests an idle app may issue back-to-back.
+            db_path: SQLite file of the buckets; processes sharing it share the budgets.
+            client_factory: Builds a client for a credential set (defaults to create_praw_client).
+        """
+        if not credentials:
+            raise ValueError("ClientPool needs at least one credential set")
+        self.credentials = list(credentials)
+        self.apps = [credential.get('name') or credential['client_id'] for credential in self.credentials]
+        if len(set(self.apps)) != len(self.apps):
+            raise ValueError("Credential sets must belong to different Reddit apps")
+        self.limiter = SharedRateLimiter(db_path, requests_per_minute, burst)
+        self.client_factory = client_factory or create_praw_client
+        self._idle = [queue.SimpleQueue() for _ in self.credentials]
+        self._local = threading.local()
+        self._rotation = itertools.count()
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.waited_seconds = 0.0
+
+    def _pick(self) -> int:
+        """Index of the app with the most tokens (the one unblocked soonest if all are blocked)."""
+        snapshot = self.limiter.snapshot(self.apps)
+        # Rotate the starting point so apps with equal budget take turns
+        start = next(self._rotation) % len(self.apps)
+        order = [(start + offset) % len(self.apps) for offset in range(len(self.apps))]
+        return min(order, key=lambda index: (snapshot[self.apps[index]]['blocked_seconds'],
+                                             -snapshot[self.apps[index]]['tokens']))
+
+    @contextmanager
+    def checkout(self):
+        """
+        Checks out a client of the app with the most budget for the calling thread.
+
+        A 429 raised inside the block puts that app into backoff and is re-raised
+        as RateLimited, so the caller can retry with another checkout.
+        """
+        index = self._pick()
+        try:
+            client = self._idle[index].get_nowait()
+        except queue.Empty:
+            client = self.client_factory(self.credentials[index])
+        previous = getattr(self._local, 'index', None)
+        self._local.index = index
+        try:
+            yield client
+        except Exception as e:
+            delay = rate_limit_delay(e)
+            if delay is None:
+                raise
+            raise RateLimited(self.apps[index], self.limiter.back_off(self.apps[index], delay)) from e
+        finally:
+            self._local.index = previous
+            self._idle[index].put(client)
+
+    def acquire(self, tokens: int = 1):
+        """
+        Blocks until ``tokens`` requests may be issued, then charges them to the
+        app checked out by this thread (or, outside a checkout, to any app).
+
+        Raises:
+            ValueError: If ``tokens`` exceeds the bucket capacity.
+        """
+        index = getattr(self._local, 'index', None)
+        candidates = [index] if index is not None else range(len(self.apps))
+        while True:
+            waits = []
+            for candidate in candidates:
+                wait = self.limiter.try_acquire(self.apps[candidate], tokens)
+                if wait == 0:
+                    with self._lock:
+                        self.calls += tokens
+                    return
+                waits.append(wait)
+            # Other processes may drain the bucket meanwhile, so re-check at least every second
+            wait = min(min(waits), 1.0)
+            time.sleep(wait)
+            with self._lock:
+                self.waited_seconds += wait
+
+    def stats(self) -> dict:
+        """
+        Budget report: this process's requests and waiting time, and per app the
+        requests and 429s of all processes plus the budget left right now.
+        """
+        snapshot = self.limiter.snapshot(self.apps)
+        usage = self.limiter.usage(self.apps)
+        with self._lock:
+            stats = {
+                'calls': self.calls,
+                'waited_seconds': round(self.waited_seconds, 3),
+                'requests_per_minute': self.limiter.rate * 60 * len(self.apps),
+            }
+        stats['apps'] = {app: {**usage[app], **snapshot[app]} for app in self.apps}
+        return stats
+
+    def close(self):
+        self.limiter.close()
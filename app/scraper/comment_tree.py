@@ -0,0 +1,153 @@
+"""
+Bounded, prioritized expansion of Reddit comment trees.
+
+Loading a submission's comments returns only part of a large thread; the rest
+is hidden behind ``MoreComments`` stubs ("load more comments" and "continue
+this thread"). ``replace_more(limit=0)`` drops every stub, and
+``replace_more(limit=None)`` resolves each one with its own request, which is
+unusably slow on big threads. ``expand_comment_tree`` spends a bounded number
+of requests instead: the most promising branches are expanded first, and the
+ids of several stubs are combined into one /api/morechildren request.
+"""
+import heapq
+import threading
+from typing import Callable, List
+
+# Reddit's /api/morechildren accepts at most 100 comment ids per request
+MORECHILDREN_BATCH = 100
+
+
+class ExpansionBudget:
+    """
+    Thread-safe number of expansion requests left for a whole crawl.
+
+    Shared by every worker loading comments, so a crawl never spends more than
+    ``calls`` requests on MoreComments stubs no matter how many posts it visits.
+    """
+
+    def __init__(self, calls: int):
+        self.calls = max(0, int(calls))
+        self.spent = 0
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        """Consumes one request from the budget, or returns False when it is used up."""
+        with self._lock:
+            if self.spent >= self.calls:
+                return False
+            self.spent += 1
+            return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'calls': self.calls, 'spent': self.spent}
+
+
+def parent_item_id(parent_fullname: str | None, post_id: str) -> str:
+    """
+    Maps a Reddit parent fullname to the scraper's item id.
+
+    Args:
+        parent_fullname: ``t1_<id>`` for a reply to a comment, ``t3_<id>`` for a
+                         top-level comment, or None when unknown.
+        post_id: Reddit id of the post the comment belongs to.
+
+    Returns:
+        ``comment_<id>`` or ``post_<id>``.
+    """
+    if parent_fullname and parent_fullname.startswith('t1_'):
+        return f"comment_{parent_fullname[3:]}"
+    return f"post_{post_id}"
+
+
+def _is_more_comments(node) -> bool:
+    # MoreComments stubs carry the ids of the comments they hide; comments don't
+    return hasattr(node, 'children')
+
+
+def expand_comment_tree(reddit, submission, nodes: list, budget: ExpansionBudget, max_calls: int,
+                        before_request: Callable[[], None] | None = None,
+                        limit: int | None = None) -> List:
+    """
+    Resolves the MoreComments stubs of one loaded submission, best branches first.
+
+    Every stub is ranked by the upvotes of the comment it hangs under (the
+    post's for top-level stubs) plus the number of replies it hides. The best
+    stub is expanded first; when it is a "load more comments" stub, the ids of
+    the next best ones fill the rest of the same /api/morechildren request.
+    Stubs found in the responses join the queue with their own rank.
+
+    Args:
+        reddit: Client the submission was loaded with.
+        submission: Submission whose comment tree was loaded.
+        nodes: Flattened comment tree, e.g. ``submission.comments.list()``,
+               with comments and stubs in breadth-first order.
+        budget: Requests left for the whole crawl.
+        max_calls: Most requests this post may use.
+        before_request: Called before every request (rate limiting, metrics).
+        limit: Stop expanding once this many comments are known.
+
+    Returns:
+        The comments of the loaded tree, followed by the expanded ones.
+    """
+    comments, seen = [], set()
+    scores = {submission.fullname: submission.score}
+    queue, counter = [], 0
+
+    def push(priority: float, children: tuple, stub):
+        nonlocal counter
+        heapq.heappush(queue, (-priority, counter, children, stub))
+        counter += 1
+
+    def add(found):
+        for node in found:
+            if _is_more_comments(node):
+                # Stubs parsed from a morechildren response have no submission, which
+                # PRAW needs to load a "continue this thread" stub's parent comment
+                node.submission = submission
+                priority = max(scores.get(node.parent_id, 0), 0) + (node.count or 0)
+                push(priority, tuple(node.children), node)
+            elif node.id not in seen:
+                seen.add(node.id)
+                comments.append(node)
+                scores[f"t1_{node.id}"] = node.score
+
+    add(nodes)
+    calls = 0
+    while queue and calls < max_calls and (limit is None or len(comments) < limit):
+        if not budget.take():
+            break
+        neg_priority, _, children, stub = heapq.heappop(queue)
+        if before_request is not None:
+            before_request()
+        calls += 1
+
+        if not children:
+            # "Continue this thread": the replies are loaded through their parent comment
+            found = stub.comments(update=False)
+            add(found.list() if hasattr(found, 'list') else found)
+            continue
+
+        batch = list(children[:MORECHILDREN_BATCH])
+        if len(children) > MORECHILDREN_BATCH:
+            push(-neg_priority, children[MORECHILDREN_BATCH:], None)
+        # Fill the rest of the request with the next best "load more comments" stubs
+        deferred = []
+        while queue and len(batch) < MORECHILDREN_BATCH:
+            entry = heapq.heappop(queue)
+            if not entry[2]:
+                deferred.append(entry)
+                continue
+            room = MORECHILDREN_BATCH - len(batch)
+            batch.extend(entry[2][:room])
+            if len(entry[2]) > room:
+                push(-entry[0], entry[2][room:], None)
+        for entry in deferred:
+            heapq.heappush(queue, entry)
+
+        add(reddit.post('api/morechildren/', data={
+            'children': ','.join(batch),
+            'link_id': submission.fullname,
+            'sort': getattr(submission, 'comment_sort', None) or 'confidence',
+        }))
+    return comments
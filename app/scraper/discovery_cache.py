@@ -0,0 +1,103 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from app.core.config import project_path
+
+DEFAULT_DB_PATH = project_path("data/discovery_cache.sqlite3")
+
+
+class DiscoveryCache:
+    """
+    Persistent TTL cache of subreddit discovery results, backed by SQLite.
+
+    Entries are keyed by the normalized keyword and the search limit and hold
+    each matching subreddit's name, subscriber count and activity. Repeat
+    discovery calls within the TTL need no API traffic, in this process or any
+    other process sharing the file.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, ttl_seconds: float = 24 * 3600):
+        """
+        Args:
+            db_path: SQLite file holding the cache. Use ":memory:" for a per-process cache.
+            ttl_seconds: How long a cached search result stays valid.
+        """
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        if db_path != ":memory:":
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS subreddit_discovery (
+                keyword TEXT NOT NULL,
+                search_limit INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                subreddits TEXT NOT NULL,
+                PRIMARY KEY (keyword, search_limit)
+            )
+        """)
+        self._conn.commit()
+        self._counters = {'hits': 0, 'misses': 0, 'expired': 0}
+
+    @staticmethod
+    def normalize(keyword: str) -> str:
+        return ' '.join(keyword.lower().split())
+
+    def get(self, keyword: str, search_limit: int) -> list[dict] | None:
+        """
+        Returns the cached subreddits for a keyword, or None on a miss or an expired entry.
+
+        Args:
+            keyword: Search keyword.
+            search_limit: Maximum number of subreddits requested for the keyword.
+
+        Returns:
+            List of dictionaries with name, subscribers and active_user_count, or None.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fetched_at, subreddits FROM subreddit_discovery WHERE keyword = ? AND search_limit = ?",
+                (self.normalize(keyword), search_limit)
+            ).fetchone()
+            if row is None:
+                self._counters['misses'] += 1
+                return None
+            if time.time() - row[0] > self.ttl_seconds:
+                self._counters['expired'] += 1
+                self._counters['misses'] += 1
+                return None
+            self._counters['hits'] += 1
+        return json.loads(row[1])
+
+    def put(self, keyword: str, search_limit: int, subreddits: list[dict]):
+        """Stores the search result of a keyword."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO subreddit_discovery (keyword, search_limit, fetched_at, subreddits) "
+                "VALUES (?, ?, ?, ?)",
+                (self.normalize(keyword), search_limit, time.time(), json.dumps(subreddits))
+            )
+
+    def purge_expired(self) -> int:
+        """Deletes expired entries. Returns the number deleted."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM subreddit_discovery WHERE fetched_at < ?", (time.time() - self.ttl_seconds,)
+            )
+        return cursor.rowcount
+
+    def stats(self) -> dict:
+        """Returns hit/miss counters since the cache was opened and the number of stored entries."""
+        with self._lock:
+            stats = dict(self._counters)
+            stats['entries'] = self._conn.execute("SELECT COUNT(*) FROM subreddit_discovery").fetchone()[0]
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        return stats
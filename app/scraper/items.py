@@ -0,0 +1,371 @@
+"""
+Compact in-memory storage for scraped items.
+
+A scraped item dict costs far more than its text: the dict itself, an
+``item_id`` and ``parent_id`` string, a full ``https://www.reddit.com`` URL
+and an ISO timestamp string per item. ItemBatch keeps the same items in
+columns instead:
+
+    subreddit, type   codes into per-batch tables of the distinct values
+    item_id           the base-36 Reddit id as a 64-bit integer
+    parent_id         the row of the parent item in the batch (-1 for posts)
+    url               the permalink suffix, omitted for comments whose
+                      permalink is their post's plus their id
+    created_utc       whole epoch seconds
+    upvotes, weight   integers
+
+Integer columns are stdlib arrays, so this module needs neither NumPy nor
+pandas. Titles and contents stay Python strings. Values that don't fit the
+compact form (ids that are not lowercase base 36, parents outside the batch,
+URLs on another host) are kept as they are.
+
+Iterating a batch yields the usual item dicts, built one at a time.
+save_to_csv writes a batch without building them, and to_frame() builds the
+DataFrame the analyzer consumes straight from the columns.
+"""
+import numbers
+from array import array
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Sequence
+
+from app.scraper.sinks import ITEM_FIELDS
+
+REDDIT_URL_PREFIX = "https://www.reddit.com"
+# Parent markers: no parent (posts), or a parent that is not in the batch
+NO_PARENT = -1
+OUTSIDE_PARENT = -2
+# created_utc of items without a timestamp
+MISSING_TIME = -(2 ** 63)
+
+_BASE36 = "0123456789abcdefghijklmnopqrstuvwxyz"
+# Two base-36 digits per entry, to decode ids in half the steps
+_BASE36_PAIRS = [high + low for high in _BASE36 for low in _BASE36]
+# Longest id whose base-36 value fits in a signed 64-bit integer
+_MAX_ID_LENGTH = 12
+
+
+def _encode_id(reddit_id: str) -> int | None:
+    """The integer of a lowercase base-36 id, or None if it would not round-trip."""
+    if (not reddit_id or len(reddit_id) > _MAX_ID_LENGTH or reddit_id[0] == '0'
+            or not all(char in _BASE36 for char in reddit_id)):
+        return None
+    return int(reddit_id, 36)
+
+
+def _decode_id(number: int) -> str:
+    pairs = []
+    while number:
+        number, pair = divmod(number, 1296)
+        pairs.append(_BASE36_PAIRS[pair])
+    return ''.join(reversed(pairs)).lstrip('0')
+
+
+def _to_epoch(created_utc) -> int:
+    if created_utc is None or created_utc == '':
+        return MISSING_TIME
+    if isinstance(created_utc, datetime):
+        return int(created_utc.timestamp())
+    if isinstance(created_utc, numbers.Real):
+        return MISSING_TIME if created_utc != created_utc else int(created_utc)
+    return int(datetime.fromisoformat(str(created_utc)).timestamp())
+
+
+def _to_int(value, default: int = 0) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+class ItemBatch:
+    """
+    Columnar batch of scraped items.
+
+    Behaves like a read-only sequence of item dicts (len, indexing, slicing,
+    iteration), plus append()/extend() and column accessors.
+    """
+
+    def __init__(self, items: Iterable[Dict[str, Any]] = ()):
+        """
+        Args:
+            items: Item dicts to add, e.g. RedditScraper.iter_posts_and_comments().
+        """
+        self._subreddits: List[str | None] = []
+        self._subreddit_codes: Dict[str | None, int] = {}
+        self._types: List[str | None] = ['post', 'comment']
+        self._type_codes: Dict[str | None, int] = {'post': 0, 'comment': 1}
+        self.subreddit_codes = array('I')
+        self.type_codes = array('B')
+        self.ids = array('q')
+        self.parents = array('q')
+        self.upvotes = array('q')
+        self.created = array('q')
+        self.weights = array('I')
+        # Whether the items carry near-duplicate weights (see NearDuplicateCollapser)
+        self.weighted = False
+        self.titles: List[str | None] = []
+        self.contents: List[str | None] = []
+        self._permalinks: List[str | None] = []
+        # Rare values that don't fit the columns, by row
+        self._odd_ids: Dict[int, str] = {}
+        self._outside_parents: Dict[int, str] = {}
+        # item_id -> row of the items of the post being appended, to resolve parents
+        self._context: Dict[str, int] = {}
+        self._context_post: int | None = None
+        # Epoch day -> ISO date prefix, for created_utc()
+        self._days: Dict[int, str] = {}
+        self.extend(items)
+
+    # Building -------------------------------------------------------------
+
+    def _intern(self, value, table: list, codes: dict) -> int:
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(table)
+            table.append(value)
+        return code
+
+    def append(self, item: Dict[str, Any], weight: int | None = None) -> int:
+        """
+        Adds one item.
+
+        Items are expected in stream order, a post before its comments, so a
+        comment's parent is usually found among the items just appended.
+
+        Args:
+            item: Item dict (ITEM_FIELDS, optionally weight).
+            weight: Overrides the item's near-duplicate weight.
+
+        Returns:
+            The row of the item.
+        """
+        row = len(self.ids)
+        item_type = item.get('type')
+        item_id = item.get('item_id') or ''
+        type_code = self._intern(item_type, self._types, self._type_codes)
+        prefix = f"{item_type}_"
+        number = _encode_id(item_id[len(prefix):]) if item_id.startswith(prefix) else None
+        if number is None:
+            self._odd_ids[row] = item_id
+            number = 0
+
+        parent_id = item.get('parent_id') or None
+        parent = self._context.get(parent_id, OUTSIDE_PARENT) if parent_id is not None else NO_PARENT
+        if parent == OUTSIDE_PARENT:
+            self._outside_parents[row] = parent_id
+        if type_code == 0 or parent < 0:
+            # A post, or an item whose parent is not among the previous ones, opens a new context
+            self._context = {}
+            self._context_post = row if type_code == 0 else None
+        self._context[item_id] = row
+
+        url = item.get('url')
+        if url is None:
+            permalink = ''  # Tells a missing URL apart from a derived one
+        elif url.startswith(REDDIT_URL_PREFIX):
+            permalink = url[len(REDDIT_URL_PREFIX):]
+            post = self._context_post
+            if (post is not None and post != row and item_id.startswith(prefix)
+                    and self._permalinks[post].startswith('/')
+                    and permalink == f"{self._permalinks[post]}{item_id[len(prefix):]}/"):
+                permalink = None  # Derived from the post's permalink
+        else:
+            permalink = url
+
+        self.subreddit_codes.append(self._intern(item.get('subreddit'), self._subreddits, self._subreddit_codes))
+        self.type_codes.append(type_code)
+        self.ids.append(number)
+        self.parents.append(parent)
+        self.upvotes.append(_to_int(item.get('upvotes')))
+        self.created.append(_to_epoch(item.get('created_utc')))
+        if weight is None:
+            weight = item.get('weight')
+        if weight is not None:
+            self.weighted = True
+        self.weights.append(max(1, _to_int(weight or 1, 1)))
+        self.titles.append(item.get('title'))
+        self.contents.append(item.get('content'))
+        self._permalinks.append(permalink)
+        return row
+
+    def extend(self, items: Iterable[Dict[str, Any]]) -> int:
+        """Adds many items; returns how many."""
+        count = 0
+        for item in items:
+            self.append(item)
+            count += 1
+        return count
+
+    def ingest(self, items: Iterable[Dict[str, Any]]) -> Iterator[int]:
+        """Adds items as they are consumed, yielding the row of each."""
+        for item in items:
+            yield self.append(item)
+
+    # Column access --------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def subreddit(self, row: int) -> str | None:
+        return self._subreddits[self.subreddit_codes[row]]
+
+    def type(self, row: int) -> str | None:
+        return self._types[self.type_codes[row]]
+
+    def item_id(self, row: int) -> str:
+        odd = self._odd_ids.get(row)
+        if odd is not None:
+            return odd
+        return f"{self._types[self.type_codes[row]]}_{_decode_id(self.ids[row])}"
+
+    def parent_id(self, row: int) -> str | None:
+        parent = self.parents[row]
+        if parent == NO_PARENT:
+            return None
+        if parent == OUTSIDE_PARENT:
+            return self._outside_parents[row]
+        return self.item_id(parent)
+
+    def url(self, row: int) -> str | None:
+        permalink = self._permalinks[row]
+        if permalink is None:
+            # Comment permalink: the post's permalink plus the comment id
+            post = row
+            while self.type_codes[post] != 0:
+                post = self.parents[post]
+            return f"{REDDIT_URL_PREFIX}{self._permalinks[post]}{self.item_id(row).split('_', 1)[1]}/"
+        if not permalink:
+            return None
+        return f"{REDDIT_URL_PREFIX}{permalink}" if permalink.startswith('/') else permalink
+
+    def created_utc(self, row: int) -> str | None:
+        """ISO timestamp, formatted like datetime.isoformat() of the UTC time."""
+        created = self.created[row]
+        if created == MISSING_TIME:
+            return None
+        day, seconds = divmod(created, 86400)
+        date = self._days.get(day)
+        if date is None:
+            date = self._days[day] = datetime.fromtimestamp(day * 86400, timezone.utc).strftime('%Y-%m-%dT')
+        hours, seconds = divmod(seconds, 3600)
+        minutes, seconds = divmod(seconds, 60)
+        return f"{date}{hours:02d}:{minutes:02d}:{seconds:02d}+00:00"
+
+    def _value(self, field: str, row: int):
+        if field == 'title':
+            return self.titles[row]
+        if field == 'content':
+            return self.contents[row]
+        if field == 'upvotes':
+            return self.upvotes[row]
+        if field == 'weight':
+            return self.weights[row]
+        return getattr(self, field)(row)
+
+    def row(self, row: int) -> Dict[str, Any]:
+        """The item dict of a row (with a weight key if the batch is weighted)."""
+        item = {field: self._value(field, row) for field in ITEM_FIELDS}
+        if self.weighted:
+            item['weight'] = self.weights[row]
+        return item
+
+    def iter_rows(self, fields: Sequence[str] = ITEM_FIELDS, chunk_size: int = 4096) -> Iterator[tuple]:
+        """
+        Yields each item as a tuple of ``fields``, without building dicts.
+
+        Values are built a column at a time, ``chunk_size`` rows at once.
+        """
+        for start in range(0, len(self), chunk_size):
+            rows = range(start, min(start + chunk_size, len(self)))
+            yield from zip(*(self.column(field, rows) for field in fields))
+
+    def column(self, field: str, rows: range | None = None) -> list:
+        """Values of a field (ITEM_FIELDS or weight) for ``rows`` (all by default), in row order."""
+        rows = rows if rows is not None else range(len(self))
+        if field in ('title', 'content'):
+            return (self.titles if field == 'title' else self.contents)[rows.start:rows.stop]
+        if field in ('upvotes', 'weight'):
+            return (self.upvotes if field == 'upvotes' else self.weights)[rows.start:rows.stop].tolist()
+        if field in ('subreddit', 'type'):
+            table = self._subreddits if field == 'subreddit' else self._types
+            codes = self.subreddit_codes if field == 'subreddit' else self.type_codes
+            return [table[code] for code in codes[rows.start:rows.stop]]
+        if field == 'parent_id':
+            # Most parents are a few rows up, so their ids are decoded once
+            ids = {}
+            values = []
+            for row in rows:
+                parent = self.parents[row]
+                if parent >= 0:
+                    parent_id = ids.get(parent)
+                    if parent_id is None:
+                        parent_id = ids[parent] = self.item_id(parent)
+                    values.append(parent_id)
+                else:
+                    values.append(self.parent_id(row))
+            return values
+        accessor = getattr(self, field)
+        return [accessor(row) for row in rows]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.row(row) for row in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ItemBatch index out of range")
+        return self.row(index)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for row in range(len(self)):
+            yield self.row(row)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (ItemBatch, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def to_frame(self, columns: Sequence[str] | None = None):
+        """
+        Builds a DataFrame from the columns.
+
+        subreddit and type become categoricals, created_utc a UTC datetime
+        column and the integer columns NumPy arrays, so no per-item dicts or
+        timestamp strings are created. item_id, parent_id and url are built
+        only when asked for.
+
+        Args:
+            columns: Columns to include (ITEM_FIELDS, plus weight if the batch is weighted, by default).
+        """
+        import numpy as np
+        import pandas as pd
+
+        if columns is None:
+            columns = ITEM_FIELDS + (['weight'] if self.weighted else [])
+        columns = list(columns)
+        data = {}
+        for column in columns:
+            if column in ('subreddit', 'type'):
+                table = self._subreddits if column == 'subreddit' else self._types
+                codes = np.array(self.subreddit_codes if column == 'subreddit' else self.type_codes, dtype=np.int32)
+                if None in table:
+                    # Categories cannot be null; missing values get code -1
+                    missing = table.index(None)
+                    codes = np.where(codes == missing, -1, codes - (codes > missing))
+                    table = [value for value in table if value is not None]
+                data[column] = pd.Categorical.from_codes(codes, categories=pd.Index(table, dtype=object))
+            elif column in ('title', 'content'):
+                values = np.empty(len(self), dtype=object)
+                values[:] = self.titles if column == 'title' else self.contents
+                data[column] = values
+            elif column in ('upvotes', 'weight'):
+                data[column] = np.array(self.upvotes if column == 'upvotes' else self.weights, dtype=np.int64)
+            elif column == 'created_utc':
+                created = np.array(self.created, dtype=np.int64)
+                seconds = np.where(created == MISSING_TIME, np.nan, created.astype(np.float64))
+                data[column] = pd.to_datetime(seconds, unit='s', utc=True)
+            else:
+                data[column] = self.column(column)
+        return pd.DataFrame(data, columns=columns)
@@ -0,0 +1,187 @@
+"""
+Columnar storage for scraped items.
+
+Items are appended to a Parquet dataset partitioned by subreddit and creation
+date (``subreddit=<name>/date=<YYYY-MM-DD>/part-*.parquet``) with typed columns,
+so reloading history does not re-parse CSV text or ISO timestamps, and readers
+only open the partitions and columns they ask for.
+
+One-shot import of the existing CSV dumps:
+    python -m app.scraper.parquet_store data/scraped_data/*.csv
+"""
+import glob
+import os
+import sys
+import uuid
+from datetime import datetime
+from typing import Iterable
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from app.core.config import SCRAPED_DATA_DIR, project_path
+from app.scraper.sinks import chunked
+
+DEFAULT_DATASET_ROOT = project_path("data/dataset")
+
+# Stored schema. subreddit and date are partition keys and live in the directory names.
+FILE_SCHEMA = pa.schema([
+    ('item_id', pa.string()),
+    ('parent_id', pa.string()),
+    ('type', pa.dictionary(pa.int32(), pa.string())),
+    ('title', pa.string()),
+    ('content', pa.string()),
+    ('upvotes', pa.int64()),
+    ('url', pa.string()),
+    ('created_utc', pa.timestamp('us', tz='UTC')),
+])
+PARTITION_SCHEMA = pa.schema([
+    ('subreddit', pa.string()),
+    ('date', pa.string()),
+])
+
+
+def _parse_timestamp(value) -> datetime | None:
+    if value is None or value == '':
+        return None
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+
+def items_to_table(items: list[dict]) -> pa.Table:
+    """
+    Converts item dictionaries into a typed Arrow table.
+
+    Args:
+        items: Item dictionaries as produced by RedditScraper.
+
+    Returns:
+        Table with the stored columns plus the ``subreddit`` and ``date`` partition columns.
+    """
+    created = [_parse_timestamp(item.get('created_utc')) for item in items]
+    columns = {
+        'item_id': pa.array([item.get('item_id') for item in items], pa.string()),
+        'parent_id': pa.array([item.get('parent_id') or None for item in items], pa.string()),
+        'type': pa.array([item.get('type') for item in items], pa.string()).dictionary_encode(),
+        'title': pa.array([item.get('title') or None for item in items], pa.string()),
+        'content': pa.array([item.get('content') for item in items], pa.string()),
+        'upvotes': pa.array([int(item.get('upvotes') or 0) for item in items], pa.int64()),
+        'url': pa.array([item.get('url') for item in items], pa.string()),
+        'created_utc': pa.array(created, pa.timestamp('us', tz='UTC')),
+        'subreddit': pa.array([item.get('subreddit') for item in items], pa.string()),
+        'date': pa.array([ts.date().isoformat() if ts else 'unknown' for ts in created], pa.string()),
+    }
+    return pa.table(columns)
+
+
+class ParquetItemStore:
+    """
+    Append-only, partitioned Parquet dataset of scraped items.
+
+    Usage:
+        store = ParquetItemStore()
+        store.append(scraper.iter_posts_and_comments(subreddits))
+        df = store.read(columns=['content', 'upvotes'], filters=[('subreddit', '=', 'UXDesign')])
+    """
+
+    def __init__(self, root: str = DEFAULT_DATASET_ROOT):
+        """
+        Args:
+            root: Directory holding the dataset.
+        """
+        self.root = root
+
+    def append(self, items: Iterable[dict], chunk_size: int = 50_000) -> int:
+        """
+        Appends items to the dataset. Existing files are never rewritten.
+
+        Args:
+            items: List or stream of item dictionaries.
+            chunk_size: Number of items converted and written per batch.
+
+        Returns:
+            Number of items written.
+        """
+        written = 0
+        for chunk in chunked(items, chunk_size):
+            table = items_to_table(chunk)
+            ds.write_dataset(
+                table,
+                self.root,
+                format='parquet',
+                partitioning=ds.partitioning(PARTITION_SCHEMA, flavor='hive'),
+                # A unique name per batch turns each write into an append
+                basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+                existing_data_behavior='overwrite_or_ignore',
+            )
+            written += len(chunk)
+        return written
+
+    def dataset(self) -> ds.Dataset:
+        """Returns the underlying pyarrow dataset; subreddit and date read back as categoricals."""
+        return ds.dataset(
+            self.root,
+            format='parquet',
+            partitioning=ds.HivePartitioning.discover(infer_dictionary=True),
+        )
+
+    def read(self, columns: list[str] | None = None, filters=None, as_pandas: bool = True):
+        """
+        Reads items, pushing column projection and filters down into the files.
+
+        Partition filters (subreddit, date) skip whole directories. Filters on
+        other columns (e.g. upvotes, created_utc) use Parquet row-group statistics.
+
+        Args:
+            columns: Columns to load, or None for all.
+            filters: A pyarrow compute expression, or DNF tuples such as
+                     ``[('subreddit', '=', 'UXDesign'), ('upvotes', '>=', 5)]``.
+            as_pandas: Return a pandas DataFrame instead of an Arrow table.
+
+        Returns:
+            pandas DataFrame (categorical type/subreddit columns) or pyarrow Table.
+        """
+        if not os.path.isdir(self.root):
+            table = pa.table({name: pa.array([], field.type) for name, field in
+                              zip(FILE_SCHEMA.names, FILE_SCHEMA)})
+            if columns is not None:
+                table = table.select([name for name in columns if name in table.column_names])
+            return table.to_pandas() if as_pandas else table
+
+        if filters is not None and not isinstance(filters, ds.Expression):
+            filters = pq.filters_to_expression(filters)
+        table = self.dataset().to_table(columns=columns, filter=filters)
+        return table.to_pandas() if as_pandas else table
+
+    def import_csv(self, csv_path: str) -> int:
+        """
+        Imports one CSV dump written by RedditScraper.save_to_csv.
+
+        Args:
+            csv_path: Path of the CSV file.
+
+        Returns:
+            Number of items imported.
+        """
+        import pandas as pd
+
+        # pandas handles the quoted multi-line content fields
+        df = pd.read_csv(csv_path, dtype={'upvotes': 'Int64'}, keep_default_na=False, na_values=[''])
+        df = df.astype(object).where(df.notna(), None)
+        return self.append(df.to_dict('records'))
+
+
+def main(argv: list[str]):
+    """Converts CSV dumps into the Parquet dataset."""
+    if not argv:
+        argv = sorted(glob.glob(os.path.join(SCRAPED_DATA_DIR, "*.csv")))
+    store = ParquetItemStore()
+    for path in argv:
+        count = store.import_csv(path)
+        print(f"Imported {count} items from {path} into {store.root}")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
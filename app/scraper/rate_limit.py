@@ -0,0 +1,70 @@
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket shared by every worker that talks to the Reddit API.
+
+    Reddit allows an OAuth app roughly 100 requests per minute. Every worker
+    calls ``acquire()`` before issuing a request, so the combined request rate
+    of all workers stays within that budget no matter how many threads run.
+    """
+
+    def __init__(self, requests_per_minute: float = 100, burst: int = 10):
+        """
+        Args:
+            requests_per_minute: Sustained request budget shared by all workers.
+            burst: Maximum number of requests that may be issued back-to-back
+                   after the bucket has been idle.
+        """
+        if requests_per_minute <= 0:
+            raise ValueError("requests_per_minute must be positive")
+        self.rate = requests_per_minute / 60.0  # tokens per second
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.waited_seconds = 0.0
+
+    def _refill(self, now: float):
+        elapsed = now - self._last_refill
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._last_refill = now
+
+    def acquire(self, tokens: int = 1):
+        """
+        Blocks until ``tokens`` requests may be issued, then consumes them.
+
+        Args:
+            tokens: Number of API requests the caller is about to make
+                    (at most the burst capacity).
+
+        Raises:
+            ValueError: If ``tokens`` exceeds the capacity, which no wait could satisfy.
+        """
+        if tokens > self.capacity:
+            raise ValueError(f"Cannot acquire {tokens} tokens from a bucket of capacity {self.capacity}")
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    self.calls += tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+            with self._lock:
+                self.waited_seconds += wait
+
+    def stats(self) -> dict:
+        """Returns how many requests went through the limiter and how long workers waited."""
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'waited_seconds': round(self.waited_seconds, 3),
+                'requests_per_minute': self.rate * 60,
+            }
@@ -1,9 +1,15 @@
-import praw
-import pandas as pd
 import os
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from typing import Iterable, Iterator
 try:
-    from app.core.config import REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET, REDDIT_USER_AGENT, PRAW_SITE_NAME
+    from app.core.config import (
+        PRAW_SITE_NAME, SCRAPER_MAX_WORKERS, REDDIT_REQUESTS_PER_MINUTE, REDDIT_BUDGET_DB, CRAWL_STATE_DB,
+        DISCOVERY_CACHE_DB, DISCOVERY_CACHE_TTL, COMMENT_EXPANSION_BUDGET, COMMENT_EXPANSION_PER_POST,
+        CRAWL_CHECKPOINT_DB, SCRAPED_DATA_DIR, LOG_LEVEL, LOG_FORMAT, project_path, require_reddit_credentials
+    )
 except ImportError:
     # Fallback for direct script execution
     import sys
@@ -11,32 +17,126 @@ except ImportError:
     root_dir = str(Path(__file__).resolve().parents[2])
     if root_dir not in sys.path:
         sys.path.append(root_dir)
-    from app.core.config import REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET, REDDIT_USER_AGENT, PRAW_SITE_NAME
+    from app.core.config import (
+        PRAW_SITE_NAME, SCRAPER_MAX_WORKERS, REDDIT_REQUESTS_PER_MINUTE, REDDIT_BUDGET_DB, CRAWL_STATE_DB,
+        DISCOVERY_CACHE_DB, DISCOVERY_CACHE_TTL, COMMENT_EXPANSION_BUDGET, COMMENT_EXPANSION_PER_POST,
+        CRAWL_CHECKPOINT_DB, SCRAPED_DATA_DIR, LOG_LEVEL, LOG_FORMAT, project_path, require_reddit_credentials
+    )
+from app.core.instrumentation import configure_logging, get_logger, metrics
+from app.scraper.checkpoint import CrawlCheckpoint
+from app.scraper.client_pool import ClientPool, RateLimited
+from app.scraper.comment_tree import ExpansionBudget, expand_comment_tree, parent_item_id
+from app.scraper.discovery_cache import DiscoveryCache
+from app.scraper.items import ItemBatch
+from app.scraper.rate_limit import RateLimiter
+from app.scraper.sinks import CSVSink
+from app.scraper.state_store import CrawlStateStore
+
+logger = get_logger(__name__)
+
+
+def _item_bytes(item: dict) -> int:
+    """Size of an item's text in UTF-8 bytes."""
+    return len((item.get('title') or '').encode('utf-8')) + len((item.get('content') or '').encode('utf-8'))
+
 
 class RedditScraper:
-    def __init__(self):
+    def __init__(self, reddit=None, max_workers: int = SCRAPER_MAX_WORKERS,
+                 requests_per_minute: float = REDDIT_REQUESTS_PER_MINUTE,
+                 state_store: CrawlStateStore | None = None, incremental: bool = False,
+                 discovery_cache: DiscoveryCache | bool = True,
+                 comment_expansion_budget: int = COMMENT_EXPANSION_BUDGET,
+                 comment_expansion_per_post: int = COMMENT_EXPANSION_PER_POST,
+                 client_pool: ClientPool | None = None, rate_limit_retries: int = 2,
+                 output_dir: str = SCRAPED_DATA_DIR):
         """
         Initializes the Reddit API connection using PRAW.
+
+        Args:
+            reddit: Optional pre-built Reddit client (e.g. a local fake PRAW client).
+                    When given, no login is performed and all workers share it.
+            max_workers: Number of worker threads used to fetch subreddits and comments.
+            requests_per_minute: Request budget of each Reddit app, shared by all workers.
+            state_store: Persistent crawl state used to skip items fetched by earlier runs.
+            incremental: Open the default crawl state store (CRAWL_STATE_DB) when
+                         no state_store is given.
+            discovery_cache: DiscoveryCache for subreddit discovery results, True to open
+                             the default one (DISCOVERY_CACHE_DB), or False to disable caching.
+            comment_expansion_budget: Requests each crawl may spend expanding "load more
+                                      comments" stubs (0 keeps only the initially loaded trees).
+            comment_expansion_per_post: Most expansion requests spent on one post.
+            client_pool: Pool of PRAW clients to use. By default one is built for the
+                         configured Reddit apps (see require_reddit_credentials), with
+                         budgets shared across processes through REDDIT_BUDGET_DB.
+            rate_limit_retries: Retries of a listing, search or comment load answered
+                                with HTTP 429 (each on the app with the most budget).
+            output_dir: Directory of the CSV files written by save_to_csv and crawl_to_csv.
         """
+        self.max_workers = max(1, int(max_workers))
+        if state_store is None and incremental:
+            state_store = CrawlStateStore(CRAWL_STATE_DB)
+        self.state_store = state_store
+        if discovery_cache is True:
+            discovery_cache = DiscoveryCache(DISCOVERY_CACHE_DB, ttl_seconds=DISCOVERY_CACHE_TTL)
+        self.discovery_cache = discovery_cache or None
+        self.comment_expansion_budget = comment_expansion_budget
+        self.comment_expansion_per_post = comment_expansion_per_post
+        self.rate_limit_retries = max(0, int(rate_limit_retries))
+        self.output_dir = output_dir
+        self.reddit = reddit if client_pool is None else None
+        self.client_pool = None
+
+        if self.reddit is not None:
+            self.rate_limiter = RateLimiter(requests_per_minute)
+            return
+
+        if client_pool is None:
+            client_pool = ClientPool(require_reddit_credentials(), requests_per_minute, db_path=REDDIT_BUDGET_DB)
+        self.client_pool = client_pool
+        # The pool charges each request to the app of the calling thread's client
+        self.rate_limiter = client_pool
+
         try:
-            self.reddit = praw.Reddit(
-                client_id=REDDIT_CLIENT_ID,
-                client_secret=REDDIT_CLIENT_SECRET,
-                user_agent=REDDIT_USER_AGENT
-                # site_name=PRAW_SITE_NAME # Include if you have custom praw.ini configurations
-            )
-            print("Attempting to connect to Reddit API...")
+            logger.info("Attempting to connect to Reddit API...")
             # Perform a simple read operation to check connection, 
             # e.g., try to access a known subreddit or a general API endpoint
-            # For script applications, self.reddit.user.me() might require specific OAuth setup.
+            # For script applications, reddit.user.me() might require specific OAuth setup.
             # A less intrusive check:
-            self.reddit.subreddits.search_by_name("test", exact=True) 
-            print("Successfully connected to Reddit API (validated by simple read operation).")
+            with self._client() as reddit:
+                self.rate_limiter.acquire()
+                metrics.incr('reddit_api_calls', endpoint='validate')
+                reddit.subreddits.search_by_name("test", exact=True)
+            logger.info("Successfully connected to Reddit API (validated by simple read operation).")
         except Exception as e:
-            print(f"Error connecting to Reddit API: {e}")
+            logger.error("Error connecting to Reddit API: %s", e)
             # Potentially re-raise the exception or handle it as per application's needs
             raise
 
+    @contextmanager
+    def _client(self):
+        """
+        Checks out a Reddit client for exclusive use by the calling thread.
+
+        PRAW instances are not thread-safe, so concurrent workers (and concurrent
+        callers sharing one scraper, e.g. Django request threads) each borrow their
+        own client from the ClientPool, which picks the Reddit app with the most
+        budget left and charges the thread's requests to it (see
+        app.scraper.client_pool). An injected client is shared as-is.
+        """
+        if self.client_pool is None:
+            yield self.reddit
+            return
+        with self.client_pool.checkout() as client:
+            yield client
+
+    def _rate_limited(self, error: RateLimited, attempt: int, what: str) -> bool:
+        """Logs a 429 and returns whether the request should be retried."""
+        metrics.incr('reddit_rate_limited')
+        retry = attempt < self.rate_limit_retries
+        logger.warning("%s was rate limited (%s)%s", what, error, ", retrying" if retry else "",
+                       extra={'app': error.app, 'backoff_seconds': round(error.delay, 3)})
+        return retry
+
     def _discover_subreddits(self, keywords: list[str], search_limit_per_keyword: int = 5) -> list[str]:
         """
         Discovers subreddits based on keywords using PRAW's search.
@@ -48,141 +148,499 @@ class RedditScraper:
         Returns:
             A list of unique subreddit display names.
         """
-        discovered_subreddits = set() # Use a set to automatically handle duplicates
-
-        if not keywords:
-            print("No keywords provided for subreddit discovery. Returning empty list.")
-            return []
+        discovered = self.discover_subreddits_detailed(keywords, search_limit_per_keyword)
 
-        print(f"Discovering subreddits for keywords: {keywords}")
-        for keyword in keywords:
-            try:
-                print(f"Searching for subreddits related to '{keyword}'...")
-                # PRAW's subreddits.search() returns a generator of Subreddit objects
-                search_results = self.reddit.subreddits.search(keyword, limit=search_limit_per_keyword)
-
-                count = 0
-                for subreddit in search_results:
-                    # We are interested in the display name (e.g., 'learnpython')
-                    discovered_subreddits.add(subreddit.display_name)
-                    count += 1
-                print(f"Found {count} subreddits for keyword '{keyword}'.")
-
-            except Exception as e:
-                print(f"Error during subreddit discovery for keyword '{keyword}': {e}")
-                # Continue to the next keyword even if one fails
-                continue
+        # Use a dict to drop duplicates while keeping keyword order
+        discovered_subreddits = {}
+        for subreddits in discovered.values():
+            for subreddit in subreddits:
+                discovered_subreddits.setdefault(subreddit['name'], None)
 
-        if not discovered_subreddits:
-            print("No subreddits found for the given keywords. Consider broader terms or check Reddit status.")
+        if keywords and not discovered_subreddits:
+            logger.warning("No subreddits found for the given keywords. Consider broader terms or check Reddit status.")
             # Optionally, return a default list or raise an error
             # For now, returning an empty list if nothing is found.
             # return ['learnpython', 'datascience'] # Example default
 
-        print(f"Discovered subreddits: {list(discovered_subreddits)}")
+        logger.info("Discovered subreddits: %s", list(discovered_subreddits),
+                    extra={'subreddits': list(discovered_subreddits)})
         return list(discovered_subreddits)
 
-    def fetch_posts_and_comments(self, subreddits: list[str], post_limit: int = 100, comment_limit_per_post: int = 20, min_upvotes_post: int = 3):
+    def discover_subreddits_detailed(self, keywords: list[str], search_limit_per_keyword: int = 5,
+                                     max_workers: int | None = None) -> dict[str, list[dict]]:
+        """
+        Resolves keywords to subreddits with their subscriber counts and activity.
+
+        Results come from the discovery cache when a fresh entry exists; the
+        remaining keywords are searched concurrently and then cached.
+
+        Args:
+            keywords: A list of keywords to search for.
+            search_limit_per_keyword: Max number of subreddits to find per keyword.
+            max_workers: Overrides the scraper's worker count for the searches.
+
+        Returns:
+            Mapping of keyword to a list of dictionaries with name, subscribers and active_user_count.
+        """
+        if not keywords:
+            logger.warning("No keywords provided for subreddit discovery. Returning empty list.")
+            return {}
+
+        with metrics.timer('stage', stage='discovery'):
+            return self._discover_subreddits_detailed(keywords, search_limit_per_keyword, max_workers)
+
+    def _discover_subreddits_detailed(self, keywords: list[str], search_limit_per_keyword: int,
+                                      max_workers: int | None) -> dict[str, list[dict]]:
+        logger.info("Discovering subreddits for keywords: %s", keywords, extra={'keywords': keywords})
+        unique_keywords = list(dict.fromkeys(keywords))
+        discovered = {}
+        misses = []
+        for keyword in unique_keywords:
+            cached = None
+            if self.discovery_cache is not None:
+                cached = self.discovery_cache.get(keyword, search_limit_per_keyword)
+            if cached is None:
+                misses.append(keyword)
+            else:
+                discovered[keyword] = cached
+
+        if misses:
+            workers = max(1, min(len(misses), max_workers or self.max_workers))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = executor.map(lambda keyword: self._search_subreddits(keyword, search_limit_per_keyword), misses)
+                for keyword, subreddits in zip(misses, results):
+                    if subreddits is None:
+                        continue # Search failed; try again next time rather than caching nothing
+                    discovered[keyword] = subreddits
+                    if self.discovery_cache is not None:
+                        self.discovery_cache.put(keyword, search_limit_per_keyword, subreddits)
+
+        if self.discovery_cache is not None:
+            hits = len(unique_keywords) - len(misses)
+            metrics.incr('cache_lookups', hits, cache='discovery', result='hit')
+            metrics.incr('cache_lookups', len(misses), cache='discovery', result='miss')
+            logger.info("Discovery cache: %d hits, %d misses", hits, len(misses),
+                        extra={'cache_hits': hits, 'cache_misses': len(misses)})
+
+        # Keep the caller's keyword order
+        return {keyword: discovered[keyword] for keyword in unique_keywords if keyword in discovered}
+
+    def _search_subreddits(self, keyword: str, search_limit: int) -> list[dict] | None:
+        """
+        Searches subreddits for one keyword.
+
+        Returns:
+            Dictionaries with name, subscribers and active_user_count, or None if the search failed.
+        """
+        for attempt in range(self.rate_limit_retries + 1):
+            try:
+                logger.debug("Searching for subreddits related to '%s'...", keyword)
+                subreddits = []
+                with self._client() as reddit:
+                    # PRAW's subreddits.search() returns a generator of Subreddit objects
+                    self.rate_limiter.acquire()
+                    metrics.incr('reddit_api_calls', endpoint='subreddit_search')
+                    for subreddit in reddit.subreddits.search(keyword, limit=search_limit):
+                        # We are interested in the display name (e.g., 'learnpython')
+                        subreddits.append({
+                            'name': subreddit.display_name,
+                            'subscribers': getattr(subreddit, 'subscribers', None),
+                            'active_user_count': getattr(subreddit, 'active_user_count', None),
+                        })
+                logger.debug("Found %d subreddits for keyword '%s'.", len(subreddits), keyword)
+                return subreddits
+            except RateLimited as e:
+                if not self._rate_limited(e, attempt, f"Subreddit search for '{keyword}'"):
+                    return None
+            except Exception as e:
+                logger.error("Error during subreddit discovery for keyword '%s': %s", keyword, e)
+                return None
+
+    def fetch_posts_and_comments(self, subreddits: list[str], post_limit: int = 100, comment_limit_per_post: int = 20,
+                                 min_upvotes_post: int = 3, max_workers: int | None = None, listing: str = 'hot'):
         """
         Fetches posts from specified subreddits and their comments.
 
+        Thin wrapper that collects iter_posts_and_comments() into a compact
+        ItemBatch (see app.scraper.items), which reads like a list of item dicts.
+
         Args:
             subreddits: A list of subreddit names.
             post_limit: Maximum number of posts to fetch per subreddit.
             comment_limit_per_post: Maximum number of comments to fetch per post.
                                     Set to None to fetch all top-level comments (be cautious).
             min_upvotes_post: Minimum upvotes for a post to be included.
+            max_workers: Overrides the scraper's worker count for this call (1 = sequential).
+            listing: Subreddit listing to crawl, 'hot' or 'new'.
 
         Returns:
-            A list of dictionaries, where each dictionary represents a post or a comment.
+            An ItemBatch of the posts and comments.
+        """
+        return ItemBatch(self.iter_posts_and_comments(
+            subreddits,
+            post_limit=post_limit,
+            comment_limit_per_post=comment_limit_per_post,
+            min_upvotes_post=min_upvotes_post,
+            max_workers=max_workers,
+            listing=listing
+        ))
+
+    def iter_posts_and_comments(self, subreddits: list[str], post_limit: int = 100, comment_limit_per_post: int = 20,
+                                min_upvotes_post: int = 3, max_workers: int | None = None,
+                                listing: str = 'hot', checkpoint: CrawlCheckpoint | None = None) -> Iterator[dict]:
+        """
+        Yields posts from specified subreddits and their comments as they arrive.
+
+        Subreddit listings and per-post comment loads are spread across a pool of
+        worker threads. Items are yielded in the same order as a sequential crawl,
+        each post followed by its comments. Only a small window of comment loads is
+        in flight at once, so memory use does not grow with the size of the crawl.
+
+        With a state store attached, the crawl is incremental: posts stored by an
+        earlier run are not yielded again, and their comments are only reloaded
+        when the post's comment count changed (yielding just the new comments).
+        The 'new' listing additionally stops paging at the subreddit's
+        high-water mark, which moves up only after a walk reached the old mark
+        (or the end of the listing) and all its posts were consumed.
+
+        Comment trees are expanded beyond what the first request loads, best
+        branches first, within a request budget shared by the whole crawl
+        (see app.scraper.comment_tree).
+
+        With a checkpoint, subreddits the job finished before are skipped,
+        listings continue after the job's last finished post, and progress is
+        reported to the checkpoint as the consumer takes the items (see
+        crawl_to_csv, which commits it).
+
+        Args:
+            subreddits: A list of subreddit names.
+            post_limit: Maximum number of posts to fetch per subreddit.
+            comment_limit_per_post: Maximum number of comments to fetch per post.
+                                    Set to None to fetch all top-level comments (be cautious).
+            min_upvotes_post: Minimum upvotes for a post to be included.
+            max_workers: Overrides the scraper's worker count for this call (1 = sequential).
+            listing: Subreddit listing to crawl, 'hot' or 'new'.
+            checkpoint: Progress of a resumable crawl job.
+
+        Yields:
+            Dictionaries representing a post or a comment.
         """
-        all_data = []
         processed_post_ids = set()
+        workers = max(1, max_workers or self.max_workers)
+        max_in_flight = workers * 2
+        item_count = 0
+        store = self.state_store
+        expansion_budget = ExpansionBudget(self.comment_expansion_budget)
 
         if not subreddits:
-            print("No subreddits provided to fetch_posts_and_comments. Using discovered/default subreddits.")
+            logger.warning("No subreddits provided to fetch_posts_and_comments. Using discovered/default subreddits.")
             # Example: use a keyword to discover some subreddits
             subreddits = self._discover_subreddits(keywords=["technology", "programming"])
                                                 # ^^^ Example keywords, can be passed from outside
 
-        for sub_name in subreddits:
-            try:
-                print(f"Fetching posts from r/{sub_name}...")
-                subreddit = self.reddit.subreddit(sub_name)
+        if checkpoint is not None:
+            # Subreddits the job finished before a restart
+            cursors = {sub_name: checkpoint.cursor(sub_name) for sub_name in subreddits}
+            subreddits = [sub_name for sub_name in subreddits if cursors[sub_name]['status'] != 'done']
 
-                # Fetching hot posts, can be changed to new, top, etc.
-                for post in subreddit.hot(limit=post_limit):
-                    if post.id in processed_post_ids:
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            listing_futures = []
+            for sub_name in subreddits:
+                # Only the chronological listing can stop at the high-water mark
+                stop_at_utc = store.high_water_mark(sub_name) if store is not None and listing == 'new' else None
+                after, position, limit = None, 0, post_limit
+                if checkpoint is not None:
+                    after, position = cursors[sub_name]['after'], cursors[sub_name]['position']
+                    limit = None if post_limit is None else max(0, post_limit - position)
+                listing_futures.append(executor.submit(
+                    self._fetch_subreddit_posts, sub_name, limit, min_upvotes_post, listing, stop_at_utc,
+                    after, position
+                ))
+
+            # Queue comment loads as each listing arrives, in subreddit order,
+            # so de-duplication (e.g. crossposts) matches a sequential crawl.
+            # Entries are posts, or (with a checkpoint) the end of a subreddit's listing.
+            pending = deque()
+            # Subreddits with a post whose comments failed to load; their marks stay put
+            failed_subreddits = set()
+            for sub_name, listing_future in zip(subreddits, listing_futures):
+                posts, listing_error, newest_utc = listing_future.result()
+                for post_data, num_comments, position in posts:
+                    post_id = post_data['item_id'][len('post_'):]
+                    if post_id in processed_post_ids:
                         continue # Skip if post already processed (e.g., crossposts)
+                    processed_post_ids.add(post_id)
+                    if checkpoint is not None and checkpoint.is_post_done(post_id):
+                        continue # Written before the job was restarted
+
+                    status = store.post_status(post_id, num_comments) if store is not None else 'new'
+                    if status == 'unchanged':
+                        continue # Already stored and no new comments since the last run
+
+                    comment_future = executor.submit(
+                        self._fetch_comments, post_id, sub_name, comment_limit_per_post, expansion_budget
+                    )
+                    pending.append(('post', (post_data, num_comments, status, comment_future, position, checkpoint,
+                                             failed_subreddits)))
+
+                    while len(pending) > max_in_flight:
+                        item_count += yield from self._emit_pending(*pending.popleft())
+                if checkpoint is not None or newest_utc is not None:
+                    pending.append(('subreddit_end', (checkpoint, sub_name, listing_error, newest_utc,
+                                                      failed_subreddits)))
+
+            while pending:
+                item_count += yield from self._emit_pending(*pending.popleft())
+        finally:
+            # Stop queued work if the consumer stops iterating early
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        logger.info("Fetched a total of %d items (posts and comments).", item_count, extra={'items': item_count})
+        logger.info("Comment expansion requests: %s", expansion_budget.stats())
+        if self.client_pool is not None:
+            logger.info("Request budget: %s", self.client_pool.stats())
+        if store is not None:
+            logger.info("Incremental crawl stats: %s", store.stats())
+
+    def _emit_pending(self, kind: str, entry: tuple) -> Iterator[dict]:
+        """
+        Emits one queued post, or handles the end of a subreddit's listing once
+        all its posts were consumed: reports it to the checkpoint and advances
+        the high-water mark.
+        """
+        if kind == 'post':
+            return (yield from self._emit_post(*entry))
+        checkpoint, sub_name, listing_error, newest_utc, failed_subreddits = entry
+        if checkpoint is not None:
+            checkpoint.subreddit_finished(sub_name, listing_error)
+        if newest_utc is not None and sub_name not in failed_subreddits:
+            self.state_store.advance_high_water_mark(sub_name, newest_utc)
+        return 0
+
+    def _emit_post(self, post_data: dict, num_comments: int, status: str, comment_future,
+                   position: int = 0, checkpoint: CrawlCheckpoint | None = None,
+                   failed_subreddits: set | None = None) -> Iterator[dict]:
+        """
+        Yields a post and its fetched comments, then records them in the state
+        store and reports them to the checkpoint.
 
-                    if post.score >= min_upvotes_post:
-                        post_data = {
-                            'item_id': f"post_{post.id}",
-                            'parent_id': None, # Posts don't have a parent in this context
-                            'type': 'post',
-                            'subreddit': sub_name,
-                            'title': post.title,
-                            'content': post.selftext,
-                            'upvotes': post.score,
-                            'url': f"https://www.reddit.com{post.permalink}",
-                            'created_utc': datetime.fromtimestamp(post.created_utc, timezone.utc).isoformat()
-                        }
-                        all_data.append(post_data)
-                        processed_post_ids.add(post.id)
-
-                        # Fetch comments for this post
-                        print(f"Fetching comments for post: {post.title[:50]}...")
-                        # Efficiently load comments:
-                        # replace_more(limit=0) fetches all top-level comments by removing "MoreComments" objects.
-                        # limit=None in replace_more would attempt to fetch *all* comments recursively, which can be very slow.
-                        # For fetching only top-level comments, limit=0 is appropriate.
-                        # If you need deeper comment threads, you might need a recursive approach or adjust the limit.
-                        post.comments.replace_more(limit=0) 
-
-                        comment_count = 0
-                        # post.comments.list() gives a flat list of all loaded comments (after replace_more)
-                        for comment in post.comments.list(): 
-                            if comment_limit_per_post is not None and comment_count >= comment_limit_per_post:
-                                break # Reached comment limit for this post
-
-                            comment_data = {
-                                'item_id': f"comment_{comment.id}",
-                                'parent_id': f"post_{post.id}",
-                                'type': 'comment',
+        Returns:
+            The number of items yielded.
+        """
+        store = self.state_store
+        sub_name = post_data['subreddit']
+        post_id = post_data['item_id'][len('post_'):]
+        comments = comment_future.result()
+        failed = comments is None
+        if failed:
+            if failed_subreddits is not None:
+                failed_subreddits.add(sub_name)
+            if checkpoint is not None:
+                # Left out entirely so a resumed job fetches the post again without duplicating it
+                checkpoint.post_failed(sub_name, post_id)
+                return 0
+            comments = []
+
+        count = 0
+        if status == 'new':
+            yield post_data
+            count += 1
+            metrics.incr('scraper_items', type='post')
+            metrics.incr('scraper_bytes', _item_bytes(post_data))
+        if store is not None and status == 'changed':
+            comments = store.filter_unseen(comments)
+        yield from comments
+        count += len(comments)
+        metrics.incr('scraper_items', len(comments), type='comment')
+        metrics.incr('scraper_bytes', sum(_item_bytes(comment) for comment in comments))
+        if store is not None and not failed:
+            # Recorded only after the consumer took the items, so a crash never marks unsaved items as seen
+            store.record(post_data, num_comments, comments)
+        if checkpoint is not None:
+            checkpoint.post_done(sub_name, post_id, position, count)
+        return count
+
+    def _fetch_subreddit_posts(self, sub_name: str, post_limit: int, min_upvotes_post: int,
+                               listing: str = 'hot', stop_at_utc: float | None = None,
+                               after: str | None = None, position: int = 0
+                               ) -> tuple[list[tuple[dict, int, int]], str | None, float | None]:
+        """
+        Fetches one listing of a subreddit.
+
+        Args:
+            sub_name: Subreddit name.
+            post_limit: Maximum number of posts to fetch.
+            min_upvotes_post: Minimum upvotes for a post to be included.
+            listing: 'hot' or 'new'.
+            stop_at_utc: For the 'new' listing, stop at the first post created at or
+                         before this epoch timestamp.
+            after: Fullname of the listing entry to continue after (PRAW ``after`` token).
+            position: Listing entries already consumed before ``after``.
+
+        Returns:
+            (post item dictionary, comment count, listing position) triples for the
+            posts that pass the upvote filter, the error that stopped the
+            listing early, if any, and the candidate high-water mark: the newest
+            post's created_utc if the walk went all the way down to
+            ``stop_at_utc`` (or the end of the listing), otherwise None.
+        """
+        posts = []
+        # Only a walk from the top of the 'new' listing can move the mark
+        newest_utc = None
+        track_mark = listing == 'new' and self.state_store is not None and not after
+        for attempt in range(self.rate_limit_retries + 1):
+            params = {'after': after} if after else None
+            try:
+                logger.debug("Fetching %s posts from r/%s...", listing, sub_name)
+                with metrics.timer('stage', stage='fetch_posts'), self._client() as reddit:
+                    subreddit = reddit.subreddit(sub_name)
+                    if listing == 'new':
+                        listing_posts = subreddit.new(limit=post_limit, params=params)
+                    else:
+                        # Fetching hot posts, can be changed to new, top, etc.
+                        listing_posts = subreddit.hot(limit=post_limit, params=params)
+
+                    # PRAW pages listings 100 posts per request.
+                    self.rate_limiter.acquire()
+                    metrics.incr('reddit_api_calls', endpoint='listing')
+                    reached_end = True
+                    for index, post in enumerate(listing_posts):
+                        if index and index % 100 == 0:
+                            self.rate_limiter.acquire()
+                            metrics.incr('reddit_api_calls', endpoint='listing')
+                        if stop_at_utc is not None and post.created_utc <= stop_at_utc:
+                            # Everything further down the 'new' listing was seen by an earlier run
+                            self.state_store.count_listing_stop()
+                            break
+                        if newest_utc is None or post.created_utc > newest_utc:
+                            newest_utc = post.created_utc
+                        if post.score >= min_upvotes_post:
+                            posts.append(({
+                                'item_id': f"post_{post.id}",
+                                'parent_id': None, # Posts don't have a parent in this context
+                                'type': 'post',
                                 'subreddit': sub_name,
-                                'title': None, # Comments don't have titles
-                                'content': comment.body,
-                                'upvotes': comment.score,
-                                'url': f"https://www.reddit.com{comment.permalink}",
-                                'created_utc': datetime.fromtimestamp(comment.created_utc, timezone.utc).isoformat()
-                            }
-                            all_data.append(comment_data)
-                            comment_count += 1
+                                'title': post.title,
+                                'content': post.selftext,
+                                'upvotes': post.score,
+                                'url': f"https://www.reddit.com{post.permalink}",
+                                'created_utc': datetime.fromtimestamp(post.created_utc, timezone.utc).isoformat()
+                            }, post.num_comments, position + 1))
+                        # A retry continues after the last post seen
+                        after, position = f"t3_{post.id}", position + 1
+                        if post_limit is not None:
+                            post_limit -= 1
+                            # The limit cut the walk short of the mark, unless it stops right here
+                            reached_end = post_limit > 0
+                return posts, None, newest_utc if track_mark and reached_end else None
+            except RateLimited as e:
+                if not self._rate_limited(e, attempt, f"Listing of r/{sub_name}"):
+                    return posts, str(e), None
+            except Exception as e:
+                logger.error("Error fetching data from r/%s: %s", sub_name, e)
+                return posts, str(e), None
+
+    def _fetch_comments(self, post_id: str, sub_name: str, comment_limit_per_post: int | None,
+                        expansion_budget: ExpansionBudget | None = None) -> list[dict] | None:
+        """
+        Loads the comment tree of one post.
+
+        Args:
+            post_id: Reddit id of the post (without the ``post_`` prefix).
+            sub_name: Subreddit the post belongs to.
+            comment_limit_per_post: Maximum number of comments to return, or None for all.
+            expansion_budget: Crawl-wide budget for expanding MoreComments stubs
+                              (None keeps only the initially loaded tree).
+
+        Returns:
+            Comment item dictionaries, or None when the comment tree could not be
+            loaded. ``parent_id`` is the parent comment for replies and the post
+            for top-level comments.
+        """
+        for attempt in range(self.rate_limit_retries + 1):
+            comments = []
+            try:
+                with metrics.timer('stage', stage='fetch_comments'), self._client() as reddit:
+                    post = reddit.submission(id=post_id)
+                    logger.debug("Fetching comments for post: %s...", post_id)
+                    # Loading the comment tree is one API request.
+                    self.rate_limiter.acquire()
+                    metrics.incr('reddit_api_calls', endpoint='comments')
+                    with metrics.timer('stage', stage='comment_tree'):
+                        forest = post.comments # First access loads the tree
+                        nodes = forest.list()
+
+                    # Expanding every MoreComments stub (replace_more(limit=None)) costs one request
+                    # per stub; spend a bounded number on the best branches instead.
+                    with metrics.timer('stage', stage='expand_comments'):
+                        tree = expand_comment_tree(
+                            reddit, post, nodes,
+                            budget=expansion_budget or ExpansionBudget(0),
+                            max_calls=self.comment_expansion_per_post,
+                            before_request=self._morechildren_request,
+                            limit=comment_limit_per_post
+                        )
+
+                    for comment in tree:
+                        if comment_limit_per_post is not None and len(comments) >= comment_limit_per_post:
+                            break # Reached comment limit for this post
+
+                        comments.append({
+                            'item_id': f"comment_{comment.id}",
+                            'parent_id': parent_item_id(getattr(comment, 'parent_id', None), post_id),
+                            'type': 'comment',
+                            'subreddit': sub_name,
+                            'title': None, # Comments don't have titles
+                            'content': comment.body,
+                            'upvotes': comment.score,
+                            'url': f"https://www.reddit.com{comment.permalink}",
+                            'created_utc': datetime.fromtimestamp(comment.created_utc, timezone.utc).isoformat()
+                        })
+                return comments
+            except RateLimited as e:
+                if not self._rate_limited(e, attempt, f"Comment load of post {post_id}"):
+                    return None
             except Exception as e:
-                print(f"Error fetching data from r/{sub_name}: {e}")
-                # Continue to the next subreddit
-                continue
+                logger.error("Error fetching comments for post %s in r/%s: %s", post_id, sub_name, e)
+                return None
 
-        print(f"Fetched a total of {len(all_data)} items (posts and comments).")
-        return all_data
+    def _morechildren_request(self):
+        """Rate limits and counts one comment expansion request."""
+        self.rate_limiter.acquire()
+        metrics.incr('reddit_api_calls', endpoint='morechildren')
 
 
-    def save_to_csv(self, data: list[dict], filename_prefix: str = "reddit_data"):
+    def save_to_csv(self, data: Iterable[dict], filename_prefix: str = "reddit_data", chunk_size: int = 1000):
         """
-        Saves the scraped data to a CSV file in the data/scraped_data/ directory.
+        Saves the scraped data to a CSV file in the output directory (SCRAPED_DATA_DIR by default).
+
+        Rows are streamed to disk in chunks, so ``data`` may be a generator such as
+        iter_posts_and_comments() and is never held in memory as a whole. An
+        ItemBatch is written from its columns.
 
         Args:
-            data: A list of dictionaries (output from fetch_posts_and_comments).
+            data: An ItemBatch (output from fetch_posts_and_comments), or an iterable
+                  of dictionaries (e.g. output from iter_posts_and_comments).
             filename_prefix: Prefix for the CSV filename. Timestamp will be appended.
-        """
-        if not data:
-            print("No data to save.")
-            return
+            chunk_size: Number of rows written per chunk.
 
-        df = pd.DataFrame(data)
+        Returns:
+            The path of the written file, or None if nothing was saved.
+        """
+        if isinstance(data, ItemBatch):
+            batch, first_item = data, None
+            empty = len(batch) == 0
+        else:
+            batch, data = None, iter(data)
+            first_item = next(data, None)
+            empty = first_item is None
+        if empty:
+            logger.info("No data to save.")
+            return None
 
         # Define the directory and ensure it exists
-        output_dir = "data/scraped_data"
+        output_dir = self.output_dir
         os.makedirs(output_dir, exist_ok=True)
 
         # Create a unique filename with a timestamp
@@ -191,21 +649,127 @@ class RedditScraper:
         filepath = os.path.join(output_dir, filename)
 
         try:
-            df.to_csv(filepath, index=False, encoding='utf-8')
-            print(f"Data successfully saved to {filepath}")
+            with CSVSink(filepath, chunk_size=chunk_size) as sink:
+                if batch is not None:
+                    rows = sink.write_batch(batch)
+                else:
+                    sink.write(first_item)
+                    rows = sink.write_all(data)
+            logger.info("Data successfully saved to %s (%d rows)", filepath, rows, extra={'path': filepath, 'rows': rows})
+            return filepath
         except Exception as e:
-            print(f"Error saving data to CSV: {e}")
+            logger.error("Error saving data to CSV: %s", e)
+            return None
+
+    def crawl_to_csv(self, job_id: str, subreddits: list[str], post_limit: int = 100,
+                     comment_limit_per_post: int = 20, min_upvotes_post: int = 3, listing: str = 'hot',
+                     checkpoint: CrawlCheckpoint | None = None, flush_size: int = 500) -> str | None:
+        """
+        Runs a resumable crawl job that writes its items to CSV as it goes.
+
+        Roughly every ``flush_size`` items, at the next post boundary, the rows
+        are written and fsynced, then the job's progress (subreddit cursors with
+        the PRAW ``after`` token, posts done, output offset) is committed to the
+        checkpoint. If the process
+        dies, running the same job id again cuts the CSV back to the last
+        commit and continues from there, without re-fetching finished posts or
+        writing duplicate rows. Subreddits that failed (e.g. a rate-limit ban)
+        are retried by the next run.
+
+        Args:
+            job_id: Name of the job; rerun it to resume.
+            subreddits: A list of subreddit names.
+            post_limit: Maximum number of posts to fetch per subreddit.
+            comment_limit_per_post: Maximum number of comments to fetch per post.
+            min_upvotes_post: Minimum upvotes for a post to be included.
+            listing: Subreddit listing to crawl, 'hot' or 'new'.
+            checkpoint: Checkpoint store (defaults to one in CRAWL_CHECKPOINT_DB).
+            flush_size: Items per durable batch.
+
+        Returns:
+            The path of the CSV file, or None if the crawl failed.
+        """
+        checkpoint = checkpoint or CrawlCheckpoint(CRAWL_CHECKPOINT_DB, job_id)
+        params = {
+            'subreddits': subreddits, 'post_limit': post_limit, 'comment_limit_per_post': comment_limit_per_post,
+            'min_upvotes_post': min_upvotes_post, 'listing': listing
+        }
+        job = checkpoint.begin(params, os.path.join(self.output_dir, f"crawl_{job_id}.csv"))
+        # Jobs begun before output paths were anchored stored them relative to the project
+        filepath = project_path(job['output_path'])
+        if job['status'] == 'completed':
+            logger.info("Crawl job %s already completed: %s", job_id, filepath)
+            return filepath
+        if job['output_offset']:
+            logger.info("Resuming crawl job %s at row %d", job_id, job['rows_written'],
+                        extra={'job_id': job_id, 'rows': job['rows_written']})
+
+        try:
+            with CSVSink(filepath, chunk_size=flush_size, resume_offset=job['output_offset']) as sink:
+                received = committed = job['rows_written']
+                items = self.iter_posts_and_comments(
+                    subreddits, post_limit=post_limit, comment_limit_per_post=comment_limit_per_post,
+                    min_upvotes_post=min_upvotes_post, listing=listing, checkpoint=checkpoint
+                )
+                for item in items:
+                    # Commit only when every row so far belongs to a finished post,
+                    # so the committed output never holds half a post
+                    if received - committed >= flush_size and checkpoint.items_reported == received:
+                        sink.flush(durable=True)
+                        checkpoint.commit(sink.offset, received)
+                        committed = received
+                    sink.write(item)
+                    received += 1
+                sink.flush(durable=True)
+                checkpoint.commit(sink.offset, received)
+            status = checkpoint.finish()
+            logger.info("Crawl job %s %s: %s", job_id, status, checkpoint.stats(), extra={'job_id': job_id})
+            return filepath
+        except Exception as e:
+            logger.error("Crawl job %s stopped, rerun it to resume: %s", job_id, e)
+            return None
+
+    def save_to_parquet(self, data: Iterable[dict], dataset_root: str = project_path("data/dataset"),
+                        chunk_size: int = 50_000):
+        """
+        Appends the scraped data to the partitioned Parquet dataset
+        (see app.scraper.parquet_store), instead of writing a new timestamped CSV.
+
+        Args:
+            data: A list or iterable of dictionaries (output from fetch_posts_and_comments
+                  or iter_posts_and_comments).
+            dataset_root: Directory of the Parquet dataset.
+            chunk_size: Number of items written per batch.
+
+        Returns:
+            Number of items written.
+        """
+        # pyarrow is only needed by callers that use the columnar backend
+        from app.scraper.parquet_store import ParquetItemStore
+
+        try:
+            count = ParquetItemStore(dataset_root).append(data, chunk_size=chunk_size)
+            if count:
+                logger.info("Data successfully appended to %s (%d rows)", dataset_root, count,
+                            extra={'path': dataset_root, 'rows': count})
+            else:
+                logger.info("No data to save.")
+            return count
+        except Exception as e:
+            logger.error("Error saving data to Parquet: %s", e)
+            return 0
 
 
 def main():
     """Main function to run the scraper"""
+    configure_logging(LOG_LEVEL, LOG_FORMAT)
     try:
         scraper = RedditScraper()
-        print("RedditScraper initialized successfully.")
+        logger.info("RedditScraper initialized successfully.")
 
         # Test subreddit discovery
         search_keywords = ["SaaS", "microservices", "indiehackers"]
-        print(f"\nAttempting to discover subreddits with keywords: {search_keywords}...")
+        logger.info("Attempting to discover subreddits with keywords: %s...", search_keywords)
         discovered_subreddits = scraper._discover_subreddits(
             keywords=search_keywords,
             search_limit_per_keyword=3
@@ -215,31 +779,27 @@ def main():
         if discovered_subreddits:
             target_subreddits = discovered_subreddits
         else:
-            print("\nNo subreddits discovered, using default list for scraping.")
+            logger.info("No subreddits discovered, using default list for scraping.")
             target_subreddits = ['learnpython', 'SideProject']
 
         if not target_subreddits:
-            print("\nNo target subreddits to scrape. Exiting.")
+            logger.info("No target subreddits to scrape. Exiting.")
             return
 
-        print(f"\nStarting to fetch posts and comments for subreddits: {target_subreddits}...")
-        scraped_data = scraper.fetch_posts_and_comments(
+        logger.info("Starting to fetch posts and comments for subreddits: %s...", target_subreddits)
+        scraped_items = scraper.iter_posts_and_comments(
             subreddits=target_subreddits,
             post_limit=5,
             comment_limit_per_post=3,
             min_upvotes_post=1
         )
 
-        if scraped_data:
-            print(f"\nFetched {len(scraped_data)} items. Saving to CSV...")
-            scraper.save_to_csv(scraped_data, filename_prefix="reddit_discovered_scrape")
-        else:
-            print("\nNo data was fetched. CSV will not be created.")
+        # Items are written to CSV while the crawl is still running
+        if scraper.save_to_csv(scraped_items, filename_prefix="reddit_discovered_scrape") is None:
+            logger.info("No data was fetched. CSV will not be created.")
 
     except Exception as e:
-        print(f"An error occurred during the scraping process: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("An error occurred during the scraping process: %s", e)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,142 @@
+import csv
+import os
+from itertools import islice
+from typing import Iterable, Iterator
+
+# Column order of every scraped item (matches the CSV files in data/scraped_data/)
+ITEM_FIELDS = [
+    'item_id', 'parent_id', 'type', 'subreddit', 'title',
+    'content', 'upvotes', 'url', 'created_utc',
+]
+
+
+def chunked(items: Iterable[dict], chunk_size: int) -> Iterator[list[dict]]:
+    """
+    Groups a stream of items into lists of at most ``chunk_size`` items.
+
+    Args:
+        items: Any iterable of items, e.g. RedditScraper.iter_posts_and_comments().
+        chunk_size: Maximum number of items per chunk.
+
+    Yields:
+        Lists of items, in stream order.
+    """
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class CSVSink:
+    """
+    Writes scraped items to a CSV file in fixed-size chunks.
+
+    Only one chunk is held in memory at a time, so a crawl of any size can be
+    written while it is still running. The output has the same columns and
+    layout as the pandas-based CSV files in data/scraped_data/.
+
+    Usage:
+        with CSVSink(path) as sink:
+            sink.write_all(scraper.iter_posts_and_comments(subreddits))
+    """
+
+    def __init__(self, filepath: str, chunk_size: int = 1000, fieldnames: list[str] = ITEM_FIELDS,
+                 resume_offset: int = 0):
+        """
+        Args:
+            filepath: Destination CSV file. Parent directories are created.
+            chunk_size: Number of rows buffered before they are written and flushed.
+            fieldnames: Column order of the output file.
+            resume_offset: Continue an existing file instead of replacing it. The
+                           file is cut back to this byte offset (see ``offset``) first,
+                           dropping any rows written after it.
+        """
+        self.filepath = filepath
+        self.chunk_size = max(1, chunk_size)
+        self.fieldnames = fieldnames
+        self.resume_offset = resume_offset
+        self.rows_written = 0
+        self._buffer = []
+        self._file = None
+        self._writer = None
+
+    def open(self):
+        directory = os.path.dirname(self.filepath)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        resume = self.resume_offset > 0 and os.path.exists(self.filepath)
+        if resume:
+            os.truncate(self.filepath, self.resume_offset)
+        self._file = open(self.filepath, 'a' if resume else 'w', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(
+            self._file, fieldnames=self.fieldnames, extrasaction='ignore', lineterminator='\n'
+        )
+        if not resume:
+            self._writer.writeheader()
+        return self
+
+    def write(self, item: dict):
+        """Buffers one item, writing the buffer out once it reaches ``chunk_size``."""
+        self._buffer.append(item)
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+
+    def write_all(self, items: Iterable[dict]) -> int:
+        """
+        Consumes a stream of items.
+
+        Returns:
+            Total number of rows written by this sink so far.
+        """
+        for item in items:
+            self.write(item)
+        self.flush()
+        return self.rows_written
+
+    def write_batch(self, batch) -> int:
+        """
+        Writes an ItemBatch straight from its columns, without building item dicts.
+
+        Returns:
+            Total number of rows written by this sink so far.
+        """
+        self.flush()
+        self._writer.writer.writerows(batch.iter_rows(self.fieldnames))
+        self.rows_written += len(batch)
+        self._file.flush()
+        return self.rows_written
+
+    def flush(self, durable: bool = False):
+        """
+        Writes any buffered rows to disk.
+
+        Args:
+            durable: Also fsync the file, so the rows survive a crash of the machine.
+        """
+        if self._buffer:
+            self._writer.writerows(self._buffer)
+            self.rows_written += len(self._buffer)
+            self._buffer = []
+        self._file.flush()
+        if durable:
+            os.fsync(self._file.fileno())
+
+    @property
+    def offset(self) -> int:
+        """Size in bytes of the rows flushed so far (a resume_offset for later runs)."""
+        return self._file.tell()
+
+    def close(self):
+        if self._file is None:
+            return
+        self.flush()
+        self._file.close()
+        self._file = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,195 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+from app.core.config import project_path
+
+DEFAULT_DB_PATH = project_path("data/crawl_state.sqlite3")
+
+
+class CrawlStateStore:
+    """
+    Persistent record of what previous crawls already fetched, backed by SQLite.
+
+    Holds every seen ``item_id``, the comment count of each post at the time its
+    comments were fetched, and a per-subreddit ``created_utc`` high-water mark.
+    RedditScraper consults it to skip posts and comment trees that have not
+    changed since the last run, and the counters show how many API calls
+    that saved.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        """
+        Args:
+            db_path: SQLite file holding the crawl state. Use ":memory:" for a throwaway store.
+        """
+        self.db_path = db_path
+        if db_path != ":memory:":
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS seen_items (
+                item_id TEXT PRIMARY KEY,
+                subreddit TEXT NOT NULL,
+                created_utc REAL,
+                num_comments INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS subreddit_marks (
+                subreddit TEXT PRIMARY KEY,
+                high_water_utc REAL NOT NULL
+            );
+        """)
+        self._conn.commit()
+        self._counters = {
+            'posts_new': 0,
+            'posts_unchanged': 0,
+            'posts_changed': 0,
+            'comment_fetches_saved': 0,
+            'comments_skipped': 0,
+            'listings_stopped_early': 0,
+        }
+
+    @staticmethod
+    def _to_epoch(created_utc) -> float | None:
+        if created_utc is None:
+            return None
+        if isinstance(created_utc, (int, float)):
+            return float(created_utc)
+        return datetime.fromisoformat(created_utc).timestamp()
+
+    def post_status(self, post_id: str, num_comments: int) -> str:
+        """
+        Classifies a listed post against the stored state and updates the counters.
+
+        Args:
+            post_id: Reddit id of the post (without the ``post_`` prefix).
+            num_comments: Comment count reported by the listing.
+
+        Returns:
+            'new' if the post was never stored, 'changed' if its comment count
+            differs from the stored one, otherwise 'unchanged'.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT num_comments FROM seen_items WHERE item_id = ?", (f"post_{post_id}",)
+            ).fetchone()
+            if row is None:
+                self._counters['posts_new'] += 1
+                return 'new'
+            if row[0] != num_comments:
+                self._counters['posts_changed'] += 1
+                return 'changed'
+            self._counters['posts_unchanged'] += 1
+            # The comment tree is not reloaded, which is one API call saved
+            self._counters['comment_fetches_saved'] += 1
+            return 'unchanged'
+
+    def filter_unseen(self, items: list[dict]) -> list[dict]:
+        """
+        Drops items whose ``item_id`` is already stored.
+
+        Args:
+            items: Item dictionaries, e.g. the comments of a changed post.
+
+        Returns:
+            The items not seen by a previous crawl, in their original order.
+        """
+        if not items:
+            return []
+        ids = [item['item_id'] for item in items]
+        with self._lock:
+            seen = set()
+            # Stay below SQLite's bound-parameter limit
+            for start in range(0, len(ids), 500):
+                batch = ids[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                seen.update(row[0] for row in self._conn.execute(
+                    f"SELECT item_id FROM seen_items WHERE item_id IN ({placeholders})", batch
+                ))
+            self._counters['comments_skipped'] += len(seen)
+        return [item for item in items if item['item_id'] not in seen]
+
+    def record(self, post_data: dict, num_comments: int, comments: list[dict]):
+        """
+        Stores a post with its comment count and comments in one transaction.
+
+        The subreddit's high-water mark is left alone: it may only move once a
+        listing walk reached it (see advance_high_water_mark).
+
+        Args:
+            post_data: Post item dictionary.
+            num_comments: Comment count of the post when its comments were fetched.
+            comments: Comment item dictionaries fetched for the post.
+        """
+        subreddit = post_data['subreddit']
+        rows = [(post_data['item_id'], subreddit, self._to_epoch(post_data['created_utc']), num_comments)]
+        rows.extend(
+            (comment['item_id'], subreddit, self._to_epoch(comment['created_utc']), None)
+            for comment in comments
+        )
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO seen_items (item_id, subreddit, created_utc, num_comments) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(item_id) DO UPDATE SET "
+                "num_comments = COALESCE(excluded.num_comments, seen_items.num_comments)",
+                rows
+            )
+
+    def advance_high_water_mark(self, subreddit: str, created_utc):
+        """
+        Moves a subreddit's high-water mark up to ``created_utc`` (never down).
+
+        Only call this once every post of a 'new' listing walk, from its newest
+        post down to the previous mark, has been recorded: later crawls stop
+        paging at the mark, so a post below it that was never reached would be
+        skipped for good.
+
+        Args:
+            subreddit: Subreddit name.
+            created_utc: Newest post timestamp of the walk (epoch seconds or ISO string).
+        """
+        newest = self._to_epoch(created_utc)
+        if newest is None:
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO subreddit_marks (subreddit, high_water_utc) VALUES (?, ?) "
+                "ON CONFLICT(subreddit) DO UPDATE SET "
+                "high_water_utc = MAX(subreddit_marks.high_water_utc, excluded.high_water_utc)",
+                (subreddit, newest)
+            )
+
+    def high_water_mark(self, subreddit: str) -> float | None:
+        """Returns the newest post ``created_utc`` (epoch seconds) stored for a subreddit, if any."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT high_water_utc FROM subreddit_marks WHERE subreddit = ?", (subreddit,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def count_listing_stop(self):
+        """Records a listing walk that stopped at the high-water mark instead of paging further."""
+        with self._lock:
+            self._counters['listings_stopped_early'] += 1
+
+    def stats(self) -> dict:
+        """
+        Returns the hit/skip counters of this store since it was opened.
+
+        ``comment_fetches_saved`` is the number of comment-tree API requests avoided.
+        """
+        with self._lock:
+            stats = dict(self._counters)
+            stats['items_stored'] = self._conn.execute("SELECT COUNT(*) FROM seen_items").fetchone()[0]
+        listed = stats['posts_new'] + stats['posts_changed'] + stats['posts_unchanged']
+        stats['post_hit_rate'] = round(stats['posts_unchanged'] / listed, 3) if listed else 0.0
+        return stats
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1 @@
+# Benchmarks and local fakes for exercising the pipeline without Reddit credentials
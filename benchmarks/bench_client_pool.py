@@ -0,0 +1,103 @@
+"""
+Several scraper processes crawling through real PRAW clients against the local
+Reddit stand-in (benchmarks.fake_reddit_server), which enforces a per-app
+budget and answers excess requests with HTTP 429.
+
+Modes:
+    shared    every process opens the same budget database, so each app's
+              budget is shared across processes (ClientPool's default setup)
+    isolated  every process keeps private buckets, as independent workers
+              without coordination would
+
+Reports the wall time, the items scraped, the requests the server accepted
+and the 429s it sent, and the accepted request rate against the combined
+budget of all apps.
+
+Usage:
+    python -m benchmarks.bench_client_pool [--processes 4] [--apps 2] [--rpm 600]
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+root_dir = str(Path(__file__).resolve().parents[1])
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+from benchmarks.fake_reddit import build_synthetic_reddit
+from benchmarks.fake_reddit_server import FakeRedditServer
+
+MODES = ('shared', 'isolated')
+
+
+def _crawl(url: str, credentials: list, subreddits: list, db_path: str, args) -> tuple[int, dict]:
+    # Runs in a fresh process: the endpoints must be set before app.core.config is imported
+    os.environ['REDDIT_OAUTH_URL'] = os.environ['REDDIT_URL'] = url
+    from app.scraper.client_pool import ClientPool
+    from app.scraper.scraper import RedditScraper
+
+    pool = ClientPool(credentials, args.rpm, burst=args.burst, db_path=db_path)
+    scraper = RedditScraper(client_pool=pool, max_workers=args.workers, requests_per_minute=args.rpm,
+                            discovery_cache=False)
+    items = scraper.fetch_posts_and_comments(subreddits, post_limit=args.posts,
+                                             comment_limit_per_post=args.comments, min_upvotes_post=0)
+    return len(items), pool.stats()
+
+
+def run(mode: str, args) -> dict:
+    reddit = build_synthetic_reddit(args.subreddits, args.posts, args.comments, latency=args.latency,
+                                    hidden_replies_per_comment=1)
+    credentials = [{'client_id': f"app{i}", 'client_secret': 'secret', 'user_agent': 'bench_client_pool'}
+                   for i in range(args.apps)]
+    subreddits = [f"sub{i}" for i in range(args.subreddits)]
+    # Reddit counts requests over a window of minutes, so the server tolerates a larger burst than the pool issues
+    with FakeRedditServer(reddit, requests_per_minute=args.rpm, burst=args.burst * 4) as server, \
+            tempfile.TemporaryDirectory() as tmp:
+        shared_db = os.path.join(tmp, 'budget.sqlite3')
+        jobs = [(server.url, credentials, subreddits[i::args.processes],
+                 shared_db if mode == 'shared' else ':memory:', args) for i in range(args.processes)]
+        start = time.perf_counter()
+        with multiprocessing.get_context('spawn').Pool(args.processes) as pool:
+            results = pool.starmap(_crawl, jobs)
+        elapsed = time.perf_counter() - start
+        served = server.stats()
+    return {
+        'seconds': elapsed,
+        'items': sum(count for count, _ in results),
+        'requests': sum(app['requests'] for app in served.values()),
+        'throttled': sum(app['throttled'] for app in served.values()),
+        'waited': sum(stats['waited_seconds'] for _, stats in results),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=4, help="Scraper threads per process")
+    parser.add_argument("--apps", type=int, default=2, help="Reddit apps (credential sets)")
+    parser.add_argument("--rpm", type=float, default=600, help="Budget of each app, requests per minute")
+    parser.add_argument("--burst", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.01, help="Seconds per simulated API request")
+    parser.add_argument("--subreddits", type=int, default=8)
+    parser.add_argument("--posts", type=int, default=10)
+    parser.add_argument("--comments", type=int, default=5)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    args = parser.parse_args()
+
+    budget = args.rpm * args.apps
+    print(f"\n{args.processes} processes x {args.workers} workers, {args.apps} apps x {args.rpm:.0f} req/min")
+    print(f"{'mode':<10}{'seconds':>9}{'items':>8}{'requests':>10}{'429s':>7}{'req/min':>9}{'of budget':>11}"
+          f"{'waited s':>10}")
+    for mode in args.modes:
+        result = run(mode, args)
+        rate = result['requests'] / result['seconds'] * 60
+        print(f"{mode:<10}{result['seconds']:>9.2f}{result['items']:>8}{result['requests']:>10}"
+              f"{result['throttled']:>7}{rate:>9.0f}{rate / budget:>10.0%}{result['waited']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
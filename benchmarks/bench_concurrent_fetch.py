@@ -0,0 +1,56 @@
+"""
+Compares sequential and concurrent RedditScraper.fetch_posts_and_comments
+against the local fake Reddit client.
+
+Usage:
+    python -m benchmarks.bench_concurrent_fetch [--workers 8] [--latency 0.05]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+root_dir = str(Path(__file__).resolve().parents[1])
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+from app.scraper.scraper import RedditScraper
+from benchmarks.fake_reddit import build_synthetic_reddit
+
+
+def run(workers: int, latency: float, n_subreddits: int, posts: int, comments: int):
+    reddit = build_synthetic_reddit(n_subreddits, posts, comments, latency=latency)
+    # Use a generous budget so the benchmark measures concurrency, not throttling
+    scraper = RedditScraper(reddit=reddit, max_workers=workers, requests_per_minute=1_000_000,
+                            discovery_cache=False)
+    start = time.perf_counter()
+    data = scraper.fetch_posts_and_comments(
+        [f"sub{i}" for i in range(n_subreddits)],
+        post_limit=posts,
+        comment_limit_per_post=comments,
+        min_upvotes_post=0,
+    )
+    return data, time.perf_counter() - start, reddit.request_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per simulated API request")
+    parser.add_argument("--subreddits", type=int, default=20)
+    parser.add_argument("--posts", type=int, default=10)
+    parser.add_argument("--comments", type=int, default=5)
+    args = parser.parse_args()
+
+    sequential, seq_time, seq_requests = run(1, args.latency, args.subreddits, args.posts, args.comments)
+    concurrent, con_time, con_requests = run(args.workers, args.latency, args.subreddits, args.posts, args.comments)
+
+    assert sequential == concurrent, "Concurrent fetch returned different items than sequential fetch"
+
+    print(f"\nitems: {len(sequential)}  requests: {seq_requests} (sequential) / {con_requests} (concurrent)")
+    print(f"sequential            : {seq_time:8.2f}s")
+    print(f"concurrent ({args.workers:>2} workers): {con_time:8.2f}s  speedup x{seq_time / con_time:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Import-time regression benchmark based on ``python -X importtime``.
+
+Every entry point is imported in a fresh interpreter without Reddit
+credentials. The benchmark reports the cumulative import time, the heaviest
+top-level packages pulled in, and fails (exit status 1) when an entry point
+loads a heavy dependency it is supposed to defer until first use.
+
+Usage:
+    python -m benchmarks.bench_import_time [--repeats 5] [--top 5]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+root_dir = str(Path(__file__).resolve().parents[1])
+
+# Entry point -> heavy packages it must not import eagerly
+ENTRY_POINTS = {
+    'app.core.config': ('praw', 'pandas', 'numpy', 'nltk', 'sklearn', 'torch'),
+    'app.core.registry': ('praw', 'pandas', 'numpy', 'nltk', 'sklearn', 'torch'),
+    'app.core.jobs': ('praw', 'pandas', 'numpy', 'nltk', 'sklearn', 'torch'),
+    'app.scraper.scraper': ('praw', 'pandas', 'numpy', 'nltk', 'sklearn', 'torch'),
+    'app.ai_analyzer': ('praw', 'pandas', 'numpy', 'nltk', 'sklearn', 'torch'),
+    'app.ai_analyzer.topic_matrix': ('praw', 'pandas', 'nltk', 'sklearn', 'torch'),
+    'app.ai_analyzer.analyzer': ('praw', 'nltk', 'torch', 'sentence_transformers'),
+}
+
+
+def import_profile(module: str) -> dict[str, tuple[int, int]]:
+    """
+    Imports ``module`` in a fresh interpreter with -X importtime.
+
+    Returns:
+        Mapping of every imported module to (self, cumulative) microseconds.
+    """
+    env = {key: value for key, value in os.environ.items() if not key.startswith('REDDIT_')}
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [root_dir, env.get('PYTHONPATH')]))
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=root_dir, env=env, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{completed.stderr[-2000:]}")
+
+    profile = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        if name == ' site':
+            profile.clear() # Interpreter startup, not part of the measured import
+            continue
+        profile[name.strip()] = (int(self_us), int(cumulative_us))
+    return profile
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=5, help="Fresh interpreters per entry point")
+    parser.add_argument("--top", type=int, default=5, help="Heaviest top-level packages listed")
+    args = parser.parse_args()
+
+    failures = []
+    for module, forbidden in ENTRY_POINTS.items():
+        timings, profile = [], {}
+        for _ in range(args.repeats):
+            profile = import_profile(module)
+            timings.append(profile[module][1])
+
+        top_level = {}
+        for name, (_, cumulative) in profile.items():
+            if '.' not in name and not name.startswith('_') and name != 'app':
+                top_level[name] = cumulative
+        heaviest = sorted(top_level.items(), key=lambda item: -item[1])[:args.top]
+        loaded = sorted(name for name in forbidden if name in profile)
+
+        print(f"{module:<30} median {statistics.median(timings) / 1000:8.1f} ms   "
+              f"heaviest: {', '.join(f'{name} {us / 1000:.0f}ms' for name, us in heaviest)}")
+        if loaded:
+            failures.append(f"{module} eagerly imports {', '.join(loaded)}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
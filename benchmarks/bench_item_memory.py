@@ -0,0 +1,118 @@
+"""
+Memory of scraped items held as a list of dicts (what fetch_posts_and_comments
+used to return) against an ItemBatch (app.scraper.items), on corpora seeded
+from data/scraped_data.
+
+Retained sizes are deep sizes: every object reachable from the container is
+counted once, including the title and content strings both layouts keep.
+Strings are fresh per item, as they are when decoded from API responses. The
+per-item overhead leaves out those titles and contents.
+
+Also compares building the DataFrame the analyzer consumes (its size and
+build time) and writing the items with save_to_csv.
+
+Usage:
+    python -m benchmarks.bench_item_memory [--sizes 10k 100k]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from array import array
+from pathlib import Path
+
+root_dir = str(Path(__file__).resolve().parents[1])
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+import pandas as pd
+
+from app.scraper.items import ItemBatch
+from app.scraper.scraper import RedditScraper
+from benchmarks.corpus import STANDARD_SIZES, build_corpus
+
+# Columns of the frame RedditAnalyzer.validate_problem works on
+ANALYZED_COLUMNS = ['subreddit', 'type', 'title', 'content', 'upvotes']
+
+
+def deep_size(root, exclude: set | None = None) -> int:
+    """Bytes of ``root`` and every object reachable through containers, each counted once."""
+    seen = set(exclude or ())
+    stack = [root]
+    total = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set)):
+            stack.extend(obj)
+        elif isinstance(obj, ItemBatch):
+            stack.append(vars(obj))
+        elif not isinstance(obj, (str, int, float, array, type(None))):
+            raise TypeError(f"Unexpected object in items: {type(obj).__name__}")
+    return total
+
+
+def _fresh(items: list[dict]) -> list[dict]:
+    # Copies every string, so no two items share one (as with JSON-decoded responses)
+    return [{key: ''.join(list(value)) if isinstance(value, str) else value for key, value in item.items()}
+            for item in items]
+
+
+def _timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def run(size: int) -> dict:
+    items = _fresh(build_corpus(size))
+    batch, build = _timed(lambda: ItemBatch(items))
+    assert batch == items, "ItemBatch does not round-trip the items"
+    results = {
+        'items': len(items),
+        'dicts_mb': deep_size(items) / 2 ** 20,
+        'batch_mb': deep_size(batch) / 2 ** 20,
+        'build_s': build,
+    }
+    texts = {id(item[field]) for item in items for field in ('title', 'content') if item[field] is not None}
+    results['dict_overhead'] = deep_size(items, texts) / len(items)
+    results['batch_overhead'] = deep_size(batch, texts) / len(items)
+
+    dict_frame, results['dict_frame_s'] = _timed(lambda: pd.DataFrame(items, columns=ANALYZED_COLUMNS))
+    batch_frame, results['batch_frame_s'] = _timed(lambda: batch.to_frame(ANALYZED_COLUMNS))
+    results['dict_frame_mb'] = dict_frame.memory_usage(deep=True).sum() / 2 ** 20
+    results['batch_frame_mb'] = batch_frame.memory_usage(deep=True).sum() / 2 ** 20
+    del dict_frame, batch_frame
+
+    for name, data in (('dict', items), ('batch', batch)):
+        with tempfile.TemporaryDirectory() as tmp:
+            scraper = RedditScraper(reddit=object(), discovery_cache=False, output_dir=tmp)
+            path, results[f'{name}_csv_s'] = _timed(lambda: scraper.save_to_csv(data))
+            assert path is not None, "save_to_csv failed"
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", choices=list(STANDARD_SIZES), default=['10k', '100k'])
+    args = parser.parse_args()
+
+    print(f"\n{'items':>9}{'dicts MB':>10}{'batch MB':>10}{'ratio':>7}{'overhead B/item':>17}{'build s':>9}"
+          f"{'frame MB':>15}{'frame s':>15}{'save_to_csv s':>15}")
+    print(f"{'':>36}{'dicts / batch':>17}{'':>9}{'dicts / batch':>15}{'dicts / batch':>15}{'dicts / batch':>15}")
+    for name in args.sizes:
+        r = run(STANDARD_SIZES[name])
+        print(f"{r['items']:>9}{r['dicts_mb']:>10.1f}{r['batch_mb']:>10.1f}{r['dicts_mb'] / r['batch_mb']:>6.1f}x"
+              f"{r['dict_overhead']:>10.0f} / {r['batch_overhead']:<4.0f}"
+              f"{r['build_s']:>9.2f}{r['dict_frame_mb']:>8.1f} / {r['batch_frame_mb']:<4.1f}"
+              f"{r['dict_frame_s']:>8.2f} / {r['batch_frame_s']:<4.2f}{r['dict_csv_s']:>8.2f} / {r['batch_csv_s']:<4.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Measures per-request validation latency with components rebuilt on every
+request (the old behaviour) versus shared components from the registry,
+using the local fake Reddit client. Requests run the same pipeline the
+Django job workers execute (app.core.pipeline.run_validation).
+
+Usage:
+    python -m benchmarks.bench_request_latency [--requests 20] [--latency 0.02]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+root_dir = str(Path(__file__).resolve().parents[1])
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+# Keep benchmark items out of the real vector index
+os.environ.setdefault("VECTOR_INDEX_UPDATES", "false")
+
+from app.ai_analyzer.analyzer import RedditAnalyzer
+from app.core.pipeline import run_validation
+from app.core.registry import registry
+from app.scraper.scraper import RedditScraper
+from benchmarks.fake_reddit import build_synthetic_reddit
+
+
+def make_scraper_factory(latency: float):
+    def build():
+        reddit = build_synthetic_reddit(n_subreddits=5, posts_per_subreddit=5, comments_per_post=3, latency=latency)
+        # Same validation round trip RedditScraper performs after a real login
+        reddit.subreddits.search_by_name("test", exact=True)
+        return RedditScraper(reddit=reddit, requests_per_minute=1_000_000, discovery_cache=False)
+    return build
+
+
+def time_requests(n_requests: int, rebuild: bool) -> list[float]:
+    timings = []
+    for _ in range(n_requests):
+        if rebuild:
+            registry.reset()
+        start = time.perf_counter()
+        results = run_validation("Invoicing is painful", ["sub"])
+        timings.append(time.perf_counter() - start)
+        assert results, "Validation returned no results"
+    return timings
+
+
+def report(label: str, timings: list[float]):
+    timings = sorted(timings)
+    p95 = timings[int(0.95 * (len(timings) - 1))]
+    print(f"{label:<28}: median {statistics.median(timings) * 1000:8.1f} ms   p95 {p95 * 1000:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds per simulated API request")
+    args = parser.parse_args()
+
+    registry.configure(scraper=make_scraper_factory(args.latency), analyzer=RedditAnalyzer)
+
+    before = time_requests(args.requests, rebuild=True)
+    registry.warm_up('scraper', 'analyzer')
+    after = time_requests(args.requests, rebuild=False)
+
+    report("per-request components", before)
+    report("shared components (warm)", after)
+
+
+if __name__ == "__main__":
+    main()
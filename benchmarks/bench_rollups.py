@@ -0,0 +1,90 @@
+"""
+Complaint trend queries from the rollups (app.ai_analyzer.rollups) against a
+scan of the whole corpus, on corpora seeded from data/scraped_data.
+
+Sentiment and topics are drawn at random, so neither path pays for scoring;
+the scan is a pandas group-by over already scored items, i.e. a lower bound
+for recomputing the trend from raw CSVs.
+
+Also reports ingestion throughput, and the cost of re-ingesting a batch that
+is already rolled up.
+
+Usage:
+    python -m benchmarks.bench_rollups [--sizes 10k 100k] [--queries 50]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+root_dir = str(Path(__file__).resolve().parents[1])
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+import numpy as np
+
+from app.ai_analyzer.rollups import RollupStore, upvote_weight
+from benchmarks.corpus import STANDARD_SIZES, build_corpus
+
+
+def _scan_trend(items: list[dict], compound: np.ndarray, subreddits: list[str]) -> dict:
+    import pandas as pd
+
+    df = pd.DataFrame(items)
+    df = df[df['subreddit'].isin(subreddits)]
+    scores = compound[df.index.to_numpy()]
+    weights = np.array([upvote_weight(upvotes) for upvotes in df['upvotes']])
+    week = pd.to_datetime(df['created_utc'], utc=True).dt.tz_localize(None).dt.to_period('W-SUN')
+    frame = pd.DataFrame({'week': week.to_numpy(), 'negative': np.where(scores > 0, 0.0, weights), 'weight': weights})
+    totals = frame.groupby('week')[['negative', 'weight']].sum()
+    return totals.tail(8).to_dict()
+
+
+def run(size: int, queries: int, batch_size: int):
+    items = build_corpus(size)
+    rng = np.random.default_rng(42)
+    compound = rng.uniform(-1, 1, len(items)).astype(np.float32)
+    topics = [f'topic{topic}' if topic else '' for topic in rng.integers(0, 6, len(items))]
+    subreddits = sorted({item['subreddit'] for item in items})[:2]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = RollupStore(os.path.join(tmp, 'rollups.sqlite3'))
+        start = time.perf_counter()
+        for offset in range(0, len(items), batch_size):
+            store.add(items[offset:offset + batch_size], compound[offset:offset + batch_size],
+                      topics[offset:offset + batch_size])
+        ingest = time.perf_counter() - start
+
+        start = time.perf_counter()
+        store.add(items[:batch_size], compound[:batch_size], topics[:batch_size])
+        reingest = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(queries):
+            store.complaint_trend(subreddits=subreddits, period='week')
+        query = (time.perf_counter() - start) / queries
+        store.close()
+
+    start = time.perf_counter()
+    _scan_trend(items, compound, subreddits)
+    scan = time.perf_counter() - start
+    return len(items), ingest, reingest, query, scan
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", choices=list(STANDARD_SIZES), default=['10k', '100k'])
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=5000, help="Items per ingested batch")
+    args = parser.parse_args()
+
+    print(f"\n{'items':>9}{'ingest items/s':>16}{'re-ingest batch':>17}{'rollup query':>14}{'corpus scan':>13}")
+    for name in args.sizes:
+        count, ingest, reingest, query, scan = run(STANDARD_SIZES[name], args.queries, args.batch_size)
+        print(f"{count:>9}{count / ingest:>16.0f}{reingest * 1000:>15.1f}ms{query * 1000:>12.2f}ms{scan * 1000:>11.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
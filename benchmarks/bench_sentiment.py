@@ -0,0 +1,90 @@
+"""
+Compares the original per-text VADER loop with BatchSentimentScorer on the
+sample CSV in data/scraped_data, replicated to the requested corpus size.
+
+Usage:
+    python -m benchmarks.bench_sentiment [--size 100000] [--jobs 4]
+"""
+import argparse
+import glob
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+root_dir = str(Path(__file__).resolve().parents[1])
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+import nltk
+from nltk.sentiment import SentimentIntensityAnalyzer
+
+from app.ai_analyzer.sentiment import BatchSentimentScorer, sentiment_counts
+
+
+def load_sample_texts(size: int) -> list[str]:
+    """Returns ``size`` texts from the sample CSV, repeated as needed."""
+    frames = [pd.read_csv(path) for path in sorted(glob.glob(f"{root_dir}/data/scraped_data/*.csv"))]
+    texts = pd.concat(frames)['content'].fillna('').tolist()
+    repeats = -(-size // len(texts))
+    return (texts * repeats)[:size]
+
+
+def loop_baseline(texts: list[str]) -> dict:
+    """The pre-batch RedditAnalyzer.analyze_sentiment loop plus validate_problem's label count."""
+    analyzer = SentimentIntensityAnalyzer()
+    results = []
+    for text in texts:
+        if not text or not isinstance(text, str):
+            continue
+        scores = analyzer.polarity_scores(text)
+        results.append({
+            'label': 'POSITIVE' if scores['compound'] > 0 else 'NEGATIVE',
+            'score': abs(scores['compound']),
+            'details': scores
+        })
+    return {
+        'positive': sum(1 for result in results if result['label'] == 'POSITIVE'),
+        'negative': sum(1 for result in results if result['label'] == 'NEGATIVE')
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100_000, help="Number of texts to score")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--unique", action="store_true",
+                        help="Make every text unique so in-batch de-duplication does not help")
+    args = parser.parse_args()
+
+    try:
+        nltk.data.find('vader_lexicon')
+    except LookupError:
+        nltk.download('vader_lexicon')
+
+    texts = load_sample_texts(args.size)
+    if args.unique:
+        texts = [f"{text} #{i}" if text else text for i, text in enumerate(texts)]
+
+    start = time.perf_counter()
+    baseline = loop_baseline(texts)
+    loop_time = time.perf_counter() - start
+
+    scorer = BatchSentimentScorer(n_jobs=args.jobs)
+    start = time.perf_counter()
+    scores = scorer.score(texts)
+    batch_time = time.perf_counter() - start
+
+    assert sentiment_counts(scores) == baseline, "Batch scorer disagrees with the loop"
+
+    print(f"texts: {len(texts)}  result array: {scores.nbytes / 1e6:.1f} MB ({scores.dtype})")
+    print(f"per-item loop : {loop_time:8.2f}s  ({len(texts) / loop_time:,.0f} texts/s)")
+    print(f"batch scorer  : {batch_time:8.2f}s  ({len(texts) / batch_time:,.0f} texts/s)  "
+          f"speedup x{loop_time / batch_time:.1f}  jobs={scorer.n_jobs}")
+    print(f"mean compound : {np.nanmean(scores[:, 0]):.4f}")
+
+
+if __name__ == "__main__":
+    main()
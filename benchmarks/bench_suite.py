@@ -0,0 +1,168 @@
+"""
+Throughput and peak memory of the main pipeline paths on corpora seeded from
+data/scraped_data and scaled to 10k, 100k or 1M items (see benchmarks.corpus).
+
+Paths:
+    scrape    RedditScraper.iter_posts_and_comments against a fake Reddit replaying the corpus
+    save      RedditScraper.save_to_csv of the corpus
+    sentiment RedditAnalyzer.score_sentiment of every item (sentiment cache disabled)
+    topics    RedditAnalyzer.extract_topics on a fresh topic model
+    dedup     NearDuplicateCollapser.collapse streaming over the corpus
+    validate  RedditAnalyzer.validate_problem end to end
+
+The corpus replicas differ only by a suffix, so near-duplicate collapsing is
+off in validate unless --near-duplicates is given (it would analyze the
+recorded items only).
+
+Every (path, size) case runs in a fresh process. "peak MiB" is that process's
+additional peak RSS over the loaded corpus; "child MiB" is the peak RSS of the
+largest process it started (e.g. a sentiment scoring pool worker).
+
+Usage:
+    python -m benchmarks.bench_suite [--sizes 10k 100k] [--paths scrape sentiment] [--latency 0.0]
+    python -m benchmarks.bench_suite --sizes 1m --paths sentiment topics
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+root_dir = str(Path(__file__).resolve().parents[1])
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+# Keep benchmark items out of the real vector index
+os.environ.setdefault("VECTOR_INDEX_UPDATES", "false")
+
+from benchmarks.corpus import STANDARD_SIZES, build_corpus
+
+PATHS = ('scrape', 'save', 'sentiment', 'topics', 'dedup', 'validate')
+PROBLEM = "Breaking into UX design without experience is hard"
+
+
+def _peak_rss_mib(who=resource.RUSAGE_SELF) -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(who).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _run_scrape(items, args):
+    from app.scraper.scraper import RedditScraper
+    from benchmarks.fake_reddit import build_reddit_from_items
+
+    reddit = build_reddit_from_items(items, latency=args.latency)
+    scraper = RedditScraper(reddit=reddit, max_workers=args.workers, requests_per_minute=1_000_000_000,
+                            discovery_cache=False)
+    subreddits = list(dict.fromkeys(item['subreddit'] for item in items))
+
+    def run():
+        count = 0
+        for _ in scraper.iter_posts_and_comments(subreddits, post_limit=None, comment_limit_per_post=None,
+                                                 min_upvotes_post=-10**9):
+            count += 1
+        return count
+    return run
+
+
+def _run_save(items, args):
+    from app.scraper.scraper import RedditScraper
+    from benchmarks.fake_reddit import FakeReddit
+
+    scraper = RedditScraper(reddit=FakeReddit({}), discovery_cache=False,
+                            output_dir=tempfile.mkdtemp(prefix="bench_save_"))
+    return lambda: len(items) if scraper.save_to_csv(iter(items), filename_prefix="bench") else 0
+
+
+def _analyzer(args):
+    from app.ai_analyzer.analyzer import RedditAnalyzer
+    return RedditAnalyzer(sentiment_cache=False, relevance_filter=args.relevance,
+                          near_duplicate_threshold=0.8 if args.near_duplicates else None)
+
+
+def _run_sentiment(items, args):
+    analyzer = _analyzer(args)
+    texts = [item['content'] for item in items]
+    return lambda: len(analyzer.score_sentiment(texts))
+
+
+def _run_topics(items, args):
+    analyzer = _analyzer(args)
+    texts = [item['content'] for item in items]
+    return lambda: analyzer.extract_topics(texts)['document_topic_matrix']['shape'][0]
+
+
+def _run_dedup(items, args):
+    from app.ai_analyzer.near_duplicates import NearDuplicateCollapser
+
+    return lambda: sum(1 for _ in NearDuplicateCollapser().collapse(items))
+
+
+def _run_validate(items, args):
+    import pandas as pd
+
+    analyzer = _analyzer(args)
+    df = pd.DataFrame(items)
+    return lambda: analyzer.validate_problem(df, PROBLEM).get('data_volume', 0)
+
+
+RUNNERS = {
+    'scrape': _run_scrape,
+    'save': _run_save,
+    'sentiment': _run_sentiment,
+    'topics': _run_topics,
+    'dedup': _run_dedup,
+    'validate': _run_validate,
+}
+
+
+def run_case(path: str, size: int, args) -> dict:
+    """Builds the corpus and runs one path on it (inside a fresh worker process)."""
+    items = build_corpus(size)
+    run = RUNNERS[path](items, args)
+    baseline = _peak_rss_mib()
+    start = time.perf_counter()
+    processed = run()
+    seconds = time.perf_counter() - start
+    return {
+        'path': path,
+        'size': size,
+        'processed': processed,
+        'seconds': seconds,
+        'items_per_second': size / seconds if seconds else float('inf'),
+        'peak_mib': max(0.0, _peak_rss_mib() - baseline),
+        'child_peak_mib': _peak_rss_mib(resource.RUSAGE_CHILDREN),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", default=['10k', '100k'],
+                        help=f"Corpus sizes: {', '.join(STANDARD_SIZES)} or an item count")
+    parser.add_argument("--paths", nargs="+", default=list(PATHS), choices=PATHS)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds per simulated API request (scrape)")
+    parser.add_argument("--workers", type=int, default=8, help="Scraper worker threads (scrape)")
+    parser.add_argument("--relevance", action="store_true",
+                        help="Enable the embedding relevance stage in validate (needs the cached model)")
+    parser.add_argument("--near-duplicates", action="store_true",
+                        help="Enable near-duplicate collapsing in validate")
+    args = parser.parse_args()
+
+    sizes = [STANDARD_SIZES.get(size.lower()) or int(size) for size in args.sizes]
+    print(f"{'path':<10} {'items':>9} {'processed':>10} {'seconds':>9} {'items/s':>11} {'peak MiB':>9} "
+          f"{'child MiB':>10}")
+    context = multiprocessing.get_context('spawn')
+    for size in sizes:
+        for path in args.paths:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                result = pool.submit(run_case, path, size, args).result()
+            print(f"{result['path']:<10} {result['size']:>9} {result['processed']:>10} {result['seconds']:>9.2f} "
+                  f"{result['items_per_second']:>11,.0f} {result['peak_mib']:>9.1f} {result['child_peak_mib']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Compares the response size and serialization time of the document-topic
+matrix encodings on the sample CSV in data/scraped_data, replicated to the
+requested corpus size.
+
+Usage:
+    python -m benchmarks.bench_topic_matrix [--size 100000] [--top-k 2]
+"""
+import argparse
+import glob
+import json
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+root_dir = str(Path(__file__).resolve().parents[1])
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+from app.ai_analyzer.topic_engine import IncrementalTopicModel
+from app.ai_analyzer.topic_matrix import MATRIX_FORMATS, encode_topic_matrix
+
+
+def measure(label: str, build, repeats: int = 3):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        body = json.dumps({'document_topic_matrix': build()})
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<22}: {len(body) / 1024:10.1f} KiB   encode+json {best * 1000:9.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=None, help="Number of documents (default: the sample as is)")
+    parser.add_argument("--top-k", type=int, default=2, help="Topics per document in the topk format")
+    args = parser.parse_args()
+
+    frames = [pd.read_csv(path) for path in sorted(glob.glob(f"{root_dir}/data/scraped_data/*.csv"))]
+    texts = [text for text in pd.concat(frames)['content'].fillna('').tolist() if text]
+    if args.size:
+        texts = (texts * -(-args.size // len(texts)))[:args.size]
+
+    model = IncrementalTopicModel(n_components=5)
+    model.partial_fit(texts)
+    matrix = model.transform(texts)
+    print(f"documents: {matrix.shape[0]}  topics: {matrix.shape[1]}")
+
+    measure("tolist (previous)", matrix.tolist)
+    for matrix_format in MATRIX_FORMATS:
+        measure(matrix_format, lambda: encode_topic_matrix(matrix, matrix_format, args.top_k))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Measures recall and latency of VectorIndex searches against exhaustive search.
+
+The sample dataset is embedded with the relevance model (which must be cached
+locally) and replicated with small perturbations up to --size items, so the
+benchmark also covers index sizes well beyond the sample. With --synthetic,
+clustered random vectors replace the embeddings and no model is needed.
+
+Usage:
+    python -m benchmarks.bench_vector_index [--size 100000] [--k 100] [--probes 4 8 16 32]
+    python -m benchmarks.bench_vector_index --synthetic --size 1000000
+"""
+import argparse
+import glob
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+root_dir = str(Path(__file__).resolve().parents[1])
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+from app.ai_analyzer.vector_index import VectorIndex
+
+PROBLEMS = [
+    "Finding a UX job without industry experience is hard",
+    "Portfolio reviews take too long and give vague feedback",
+    "Recruiters ghost candidates after design challenges",
+    "Junior designers cannot get interviews",
+    "Design tools are too expensive for freelancers",
+]
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def sample_embeddings(size: int, noise: float, rng: np.random.Generator):
+    import pandas as pd
+    from app.ai_analyzer.relevance import RelevanceFilter
+
+    path = sorted(glob.glob(str(Path(root_dir) / "data" / "scraped_data" / "*.csv")))[0]
+    df = pd.read_csv(path)
+    texts = (df['title'].fillna('') + '\n' + df['content'].fillna('')).str.strip().tolist()
+    relevance = RelevanceFilter()
+    base = relevance.embed(texts)
+    queries = relevance.embed(PROBLEMS)
+    copies = base[rng.integers(0, len(base), size=size)]
+    return normalize(copies + rng.normal(scale=noise, size=copies.shape)), queries
+
+
+def synthetic_embeddings(size: int, dim: int, rng: np.random.Generator):
+    centers = normalize(rng.normal(size=(256, dim)))
+    vectors = centers[rng.integers(0, len(centers), size=size)]
+    vectors = normalize(vectors + rng.normal(scale=0.08, size=vectors.shape))
+    queries = normalize(centers[:len(PROBLEMS)] + rng.normal(scale=0.08, size=(len(PROBLEMS), dim)))
+    return vectors, queries
+
+
+def time_searches(index: VectorIndex, queries: np.ndarray, k: int, exact: bool, repeats: int):
+    timings, results = [], []
+    for _ in range(repeats):
+        for query in queries:
+            start = time.perf_counter()
+            rows, _ = index.search(query, k=k, exact=exact)
+            timings.append(time.perf_counter() - start)
+            results.append(rows)
+    return timings, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100_000, help="Number of indexed items")
+    parser.add_argument("--k", type=int, default=100, help="Neighbours per query")
+    parser.add_argument("--probes", type=int, nargs="+", default=[4, 8, 16, 32])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--noise", type=float, default=0.02, help="Perturbation of replicated sample embeddings")
+    parser.add_argument("--synthetic", action="store_true", help="Use clustered random vectors")
+    parser.add_argument("--dim", type=int, default=384, help="Dimension of synthetic vectors")
+    parser.add_argument("--batch", type=int, default=50_000, help="Items appended per add() call")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    if args.synthetic:
+        vectors, queries = synthetic_embeddings(args.size, args.dim, rng)
+    else:
+        vectors, queries = sample_embeddings(args.size, args.noise, rng)
+
+    with tempfile.TemporaryDirectory() as root:
+        index = VectorIndex(root)
+        start = time.perf_counter()
+        for offset in range(0, len(vectors), args.batch):
+            batch = vectors[offset:offset + args.batch]
+            index.add([{'item_id': str(offset + i)} for i in range(len(batch))], batch)
+        build_time = time.perf_counter() - start
+        print(f"indexed {len(index)} items in {build_time:.1f}s ({len(index) / build_time:,.0f} items/s)")
+
+        exact_timings, truth = time_searches(index, queries, args.k, exact=True, repeats=args.repeats)
+        print(f"{'exact':<12}: median {statistics.median(exact_timings) * 1000:8.2f} ms   recall 1.000")
+        for n_probe in args.probes:
+            index.n_probe = n_probe
+            timings, found = time_searches(index, queries, args.k, exact=False, repeats=args.repeats)
+            recall = np.mean([len(np.intersect1d(a, b)) / len(b) for a, b in zip(found, truth) if len(b)])
+            print(f"n_probe={n_probe:<4}: median {statistics.median(timings) * 1000:8.2f} ms   recall {recall:.3f}")
+
+
+if __name__ == "__main__":
+    main()
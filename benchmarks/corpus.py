@@ -0,0 +1,73 @@
+"""
+Benchmark corpora seeded from the recorded crawls in data/scraped_data.
+
+The recorded items are replicated up to the requested size. Every replica gets
+its own ids, its own subreddits (``<name>_<replica>``) and slightly varied text,
+so de-duplication and caches do not make large corpora artificially cheap.
+"""
+import glob
+from pathlib import Path
+
+import pandas as pd
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "data" / "scraped_data"
+
+# Corpus sizes reported by the benchmark suite
+STANDARD_SIZES = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+
+
+def load_recorded_items(paths: list[str] | None = None) -> list[dict]:
+    """
+    Reads recorded items from CSV files written by RedditScraper.save_to_csv.
+
+    Args:
+        paths: CSV files (defaults to every file in data/scraped_data).
+
+    Returns:
+        Item dictionaries with missing values as None.
+    """
+    paths = paths or sorted(glob.glob(str(DATA_DIR / "*.csv")))
+    if not paths:
+        raise FileNotFoundError(f"No recorded CSV files in {DATA_DIR}")
+    df = pd.concat([pd.read_csv(path) for path in paths], ignore_index=True)
+    df = df.drop_duplicates('item_id')
+    return df.astype(object).where(df.notna(), None).to_dict('records')
+
+
+def _replicate(item: dict, replica: int) -> dict:
+    if replica == 0:
+        return dict(item)
+    suffix = f"r{replica}"
+    copy = dict(item)
+    copy['item_id'] = f"{item['item_id']}{suffix}"
+    if item['parent_id']:
+        copy['parent_id'] = f"{item['parent_id']}{suffix}"
+    copy['subreddit'] = f"{item['subreddit']}_{replica}"
+    if item['content']:
+        copy['content'] = f"{item['content']} ({suffix})"
+    if item['url']:
+        copy['url'] = item['url'].replace(f"/r/{item['subreddit']}/", f"/r/{copy['subreddit']}/") + suffix
+    return copy
+
+
+def scale_items(items: list[dict], size: int) -> list[dict]:
+    """
+    Replicates recorded items into a corpus of exactly ``size`` items.
+
+    Whole replicas are added until the size is reached, and the last one is
+    truncated.
+    """
+    scaled = []
+    replica = 0
+    while len(scaled) < size:
+        for item in items:
+            scaled.append(_replicate(item, replica))
+            if len(scaled) == size:
+                break
+        replica += 1
+    return scaled
+
+
+def build_corpus(size: int, paths: list[str] | None = None) -> list[dict]:
+    """Loads the recorded items and scales them to ``size`` items."""
+    return scale_items(load_recorded_items(paths), size)
@@ -0,0 +1,340 @@
+"""
+A local stand-in for ``praw.Reddit``.
+
+Only the small surface used by ``RedditScraper`` is implemented. Every call that
+would hit the network on a real client sleeps for ``latency`` seconds and is
+counted, so concurrency and caching changes can be measured offline. The data
+is either generated (build_synthetic_reddit) or replayed from recorded items
+(build_reddit_from_items).
+"""
+import threading
+import time
+from datetime import datetime
+
+
+class FakeComment:
+    def __init__(self, id: str, body: str, score: int, permalink: str, created_utc: float,
+                 parent_id: str | None = None):
+        self.id = id
+        self.body = body
+        self.score = score
+        self.permalink = permalink
+        self.created_utc = created_utc
+        self.parent_id = parent_id # Fullname, t1_<comment> or t3_<post>
+
+
+class FakeMoreComments:
+    """
+    A "load more comments" stub hiding the comments with the ids in ``children``,
+    or a "continue this thread" stub (no children) hiding the replies to its parent.
+
+    Like PRAW's, ``submission`` is only set on stubs of a loaded comment tree;
+    loading a thread reads it, so stubs parsed from a morechildren response need
+    it attached first.
+    """
+
+    def __init__(self, parent_id: str, children: list[str], reddit: "FakeReddit | None" = None):
+        self.parent_id = parent_id
+        self.children = children
+        self.count = len(children)
+        self._reddit = reddit
+
+    def comments(self, update: bool = True) -> "FakeCommentForest":
+        if self.children:
+            raise NotImplementedError("load more comments stubs are expanded through FakeReddit.post")
+        # PRAW requests /comments/<submission id>/_/<parent id>
+        submission_id = self.submission.id
+        self._reddit._request()
+        replies = self._reddit._by_id[submission_id].continued_comments.get(self.parent_id[3:], [])
+        return FakeCommentForest(self._reddit, list(replies))
+
+
+class FakeCommentForest:
+    def __init__(self, reddit: "FakeReddit", comments: list):
+        self._reddit = reddit
+        self._comments = comments
+
+    def replace_more(self, limit=0):
+        # limit=0 only drops MoreComments stubs, which costs no requests
+        self._comments = [node for node in self._comments if not isinstance(node, FakeMoreComments)]
+        return []
+
+    def list(self) -> list:
+        return list(self._comments)
+
+
+class FakeSubmission:
+    def __init__(self, id: str, title: str, selftext: str, score: int, permalink: str,
+                 created_utc: float, comments: list | None = None, hidden_comments: list[FakeComment] | None = None,
+                 continued_comments: dict[str, list[FakeComment]] | None = None):
+        self.id = id
+        self.title = title
+        self.selftext = selftext
+        self.score = score
+        self.permalink = permalink
+        self.created_utc = created_utc
+        self._comments = comments or []
+        self.hidden_comments = hidden_comments or [] # Behind the MoreComments stubs in ``comments``
+        # Comment id -> replies behind a "continue this thread" stub returned with that comment
+        self.continued_comments = continued_comments or {}
+        self.num_comments = (sum(isinstance(node, FakeComment) for node in self._comments) + len(self.hidden_comments)
+                             + sum(len(replies) for replies in self.continued_comments.values()))
+        self._reddit = None
+
+    @property
+    def fullname(self) -> str:
+        return f"t3_{self.id}"
+
+    @property
+    def comments(self) -> FakeCommentForest:
+        self._reddit._request()
+        return FakeCommentForest(self._reddit, self._comments)
+
+
+class FakeSubreddit:
+    def __init__(self, reddit: "FakeReddit", display_name: str, subscribers: int = 0):
+        self._reddit = reddit
+        self.display_name = display_name
+        self.subscribers = subscribers
+        self.active_user_count = subscribers // 100
+
+    def _listing(self, posts, limit, params):
+        after = (params or {}).get('after')
+        if after:
+            # Continue after the post named by the ``after`` fullname
+            ids = [f"t3_{post.id}" for post in posts]
+            posts = posts[ids.index(after) + 1:] if after in ids else []
+        if limit is not None:
+            posts = posts[:limit]
+        for index, post in enumerate(posts):
+            if index % 100 == 0:
+                self._reddit._request()
+            yield post
+
+    def hot(self, limit=100, params=None):
+        return self._listing(self._reddit._posts.get(self.display_name, []), limit, params)
+
+    def new(self, limit=100, params=None):
+        posts = sorted(self._reddit._posts.get(self.display_name, []),
+                       key=lambda post: post.created_utc, reverse=True)
+        return self._listing(posts, limit, params)
+
+
+class FakeSubreddits:
+    def __init__(self, reddit: "FakeReddit"):
+        self._reddit = reddit
+
+    def search(self, query: str, limit=None):
+        self._reddit._request()
+        query = query.lower()
+        names = [name for name in self._reddit._posts if query in name.lower()]
+        if limit is not None:
+            names = names[:limit]
+        return [self._reddit.subreddit(name) for name in names]
+
+    def search_by_name(self, query: str, exact: bool = False):
+        self._reddit._request()
+        return [self._reddit.subreddit(name) for name in self._reddit._posts
+                if (name == query if exact else name.startswith(query))]
+
+
+class FakeReddit:
+    """
+    In-memory Reddit client.
+
+    Args:
+        posts_by_subreddit: Mapping of subreddit name to its hot posts, in order.
+        latency: Seconds each simulated API request takes.
+    """
+
+    def __init__(self, posts_by_subreddit: dict[str, list[FakeSubmission]], latency: float = 0.0):
+        self._posts = posts_by_subreddit
+        self._by_id = {}
+        self._hidden = {}
+        self._continued = {}
+        for posts in posts_by_subreddit.values():
+            for post in posts:
+                post._reddit = self
+                self._by_id[post.id] = post
+                for node in post._comments:
+                    if isinstance(node, FakeMoreComments):
+                        node._reddit, node.submission = self, post
+                self._hidden.update((comment.id, comment) for comment in post.hidden_comments)
+                self._continued.update(post.continued_comments)
+        self.latency = latency
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self.subreddits = FakeSubreddits(self)
+
+    def _request(self):
+        with self._lock:
+            self.request_count += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def subreddit(self, name: str) -> FakeSubreddit:
+        return FakeSubreddit(self, name, subscribers=1000 * len(self._posts.get(name, [])))
+
+    def submission(self, id: str) -> FakeSubmission:
+        return self._by_id[id]
+
+    def post(self, path: str, data: dict):
+        # Only /api/morechildren is simulated: returns the requested hidden comments
+        self._request()
+        if path.strip('/') != 'api/morechildren':
+            raise NotImplementedError(path)
+        ids = data['children'].split(',')
+        if len(ids) > 100:
+            raise ValueError("morechildren accepts at most 100 ids")
+        found = []
+        for id in ids:
+            comment = self._hidden.get(id)
+            if comment is None:
+                continue
+            found.append(comment)
+            if id in self._continued:
+                # Parsed from the response, so without a submission (see FakeMoreComments)
+                found.append(FakeMoreComments(f"t1_{id}", [], reddit=self))
+        return found
+
+
+def build_synthetic_reddit(n_subreddits: int = 20, posts_per_subreddit: int = 10,
+                           comments_per_post: int = 5, latency: float = 0.0,
+                           hidden_replies_per_comment: int = 0, continued_replies_per_reply: int = 0) -> FakeReddit:
+    """
+    Builds a deterministic fake Reddit with generated posts and comments.
+
+    Args:
+        n_subreddits: Number of subreddits.
+        posts_per_subreddit: Hot posts per subreddit.
+        comments_per_post: Comments per post.
+        latency: Seconds each simulated API request takes.
+        hidden_replies_per_comment: Replies to every comment that are only
+                                    reachable through a MoreComments stub.
+        continued_replies_per_reply: Replies to every hidden reply that are only
+                                     reachable through the "continue this thread"
+                                     stub returned with it.
+
+    Returns:
+        A FakeReddit instance.
+    """
+    base_time = 1746600000.0
+    posts_by_subreddit = {}
+    for s in range(n_subreddits):
+        name = f"sub{s}"
+        posts = []
+        for p in range(posts_per_subreddit):
+            post_id = f"s{s}p{p}"
+            comments = [
+                FakeComment(
+                    id=f"{post_id}c{c}",
+                    body=f"Comment {c} on post {p}: this tool is frustrating and slow to use",
+                    score=c + 1,
+                    permalink=f"/r/{name}/comments/{post_id}/_/{post_id}c{c}/",
+                    created_utc=base_time + p * 60 + c,
+                    parent_id=f"t3_{post_id}",
+                )
+                for c in range(comments_per_post)
+            ]
+            hidden, continued = [], {}
+            for comment in list(comments):
+                replies = [
+                    FakeComment(
+                        id=f"{comment.id}r{r}",
+                        body=f"Reply {r}: same here, the export keeps failing",
+                        score=r,
+                        permalink=f"/r/{name}/comments/{post_id}/_/{comment.id}r{r}/",
+                        created_utc=comment.created_utc + r + 1,
+                        parent_id=f"t1_{comment.id}",
+                    )
+                    for r in range(hidden_replies_per_comment)
+                ]
+                if replies:
+                    hidden.extend(replies)
+                    comments.append(FakeMoreComments(f"t1_{comment.id}", [reply.id for reply in replies]))
+                for reply in replies:
+                    if continued_replies_per_reply:
+                        continued[reply.id] = [
+                            FakeComment(
+                                id=f"{reply.id}d{d}",
+                                body=f"Deeper reply {d}: it also drops my saved filters",
+                                score=d,
+                                permalink=f"/r/{name}/comments/{post_id}/_/{reply.id}d{d}/",
+                                created_utc=reply.created_utc + d + 1,
+                                parent_id=f"t1_{reply.id}",
+                            )
+                            for d in range(continued_replies_per_reply)
+                        ]
+            posts.append(FakeSubmission(
+                id=post_id,
+                title=f"Post {p} in r/{name}",
+                selftext=f"I keep running into the same problem with invoicing in r/{name}.",
+                score=10 + p,
+                permalink=f"/r/{name}/comments/{post_id}/post_{p}/",
+                created_utc=base_time + p * 60,
+                comments=comments,
+                hidden_comments=hidden,
+                continued_comments=continued,
+            ))
+        posts_by_subreddit[name] = posts
+    return FakeReddit(posts_by_subreddit, latency=latency)
+
+
+def build_reddit_from_items(items: list[dict], latency: float = 0.0) -> FakeReddit:
+    """
+    Builds a fake Reddit that replays recorded items, e.g. a CSV written by
+    RedditScraper.save_to_csv (see benchmarks.corpus).
+
+    Posts keep their recorded order within each subreddit, and comments are
+    attached to the post their parent_id chain leads to.
+
+    Args:
+        items: Item dictionaries with the scraper's columns.
+        latency: Seconds each simulated API request takes.
+
+    Returns:
+        A FakeReddit instance.
+    """
+    def epoch(value) -> float:
+        return datetime.fromisoformat(value).timestamp() if isinstance(value, str) else float(value or 0)
+
+    def permalink(url) -> str:
+        return url[len("https://www.reddit.com"):] if isinstance(url, str) else ""
+
+    def parent_fullname(parent_id) -> str:
+        kind, _, id = parent_id.partition('_')
+        return f"t1_{id}" if kind == 'comment' else f"t3_{id}"
+
+    # Replies are filed under their thread's post (found by following parent links)
+    post_of = {item['item_id']: item['parent_id'] for item in items if item['type'] == 'comment'}
+
+    def thread_post(parent_id):
+        while parent_id in post_of:
+            parent_id = post_of[parent_id]
+        return parent_id
+
+    comments_by_post = {}
+    for item in items:
+        if item['type'] == 'comment':
+            comments_by_post.setdefault(thread_post(item['parent_id']), []).append(FakeComment(
+                id=item['item_id'][len('comment_'):],
+                body=item['content'] or "",
+                score=int(item['upvotes']),
+                permalink=permalink(item['url']),
+                created_utc=epoch(item['created_utc']),
+                parent_id=parent_fullname(item['parent_id']),
+            ))
+
+    posts_by_subreddit = {}
+    for item in items:
+        if item['type'] == 'post':
+            posts_by_subreddit.setdefault(item['subreddit'], []).append(FakeSubmission(
+                id=item['item_id'][len('post_'):],
+                title=item['title'] or "",
+                selftext=item['content'] or "",
+                score=int(item['upvotes']),
+                permalink=permalink(item['url']),
+                created_utc=epoch(item['created_utc']),
+                comments=comments_by_post.get(item['item_id'], []),
+            ))
+    return FakeReddit(posts_by_subreddit, latency=latency)
@@ -0,0 +1,270 @@
+"""
+A local HTTP stand-in for the Reddit API, serving a FakeReddit.
+
+Real PRAW clients talk to it when REDDIT_OAUTH_URL and REDDIT_URL point at
+``server.url``, so the whole HTTP path (OAuth tokens, listings, comment trees,
+/api/morechildren, 429 handling) runs offline. Only the endpoints used by
+RedditScraper are implemented.
+
+Each client id gets a bearer token, and every API request is counted against
+that app. With ``requests_per_minute`` set, each app has a token bucket like
+Reddit's budget: a request beyond it is answered with HTTP 429 and a
+Retry-After header. X-Ratelimit headers are not sent, so prawcore does not
+throttle itself and only the caller's rate limiting is measured.
+
+Usage:
+    with FakeRedditServer(build_synthetic_reddit(), requests_per_minute=100) as server:
+        os.environ['REDDIT_OAUTH_URL'] = os.environ['REDDIT_URL'] = server.url
+        ...
+        print(server.stats())
+"""
+import base64
+import json
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from benchmarks.fake_reddit import FakeMoreComments, FakeReddit
+
+
+def _listing(children: list, after: str | None = None) -> dict:
+    return {'kind': 'Listing', 'data': {'after': after, 'before': None, 'dist': len(children), 'children': children}}
+
+
+def _subreddit_thing(reddit: FakeReddit, name: str) -> dict:
+    subreddit = reddit.subreddit(name)
+    return {'kind': 't5', 'data': {
+        'id': name, 'name': f"t5_{name}", 'display_name': name,
+        'subscribers': subreddit.subscribers, 'active_user_count': subreddit.active_user_count,
+    }}
+
+
+def _submission_thing(post, subreddit: str) -> dict:
+    return {'kind': 't3', 'data': {
+        'id': post.id, 'name': post.fullname, 'subreddit': subreddit, 'title': post.title,
+        'selftext': post.selftext, 'score': post.score, 'permalink': post.permalink,
+        'created_utc': post.created_utc, 'num_comments': post.num_comments,
+    }}
+
+
+def _comment_thing(node, link_id: str, subreddit: str) -> dict:
+    if isinstance(node, FakeMoreComments):
+        return {'kind': 'more', 'data': {
+            'id': node.children[0] if node.children else '_', 'name': f"t1_{node.children[0] if node.children else '_'}",
+            'parent_id': node.parent_id, 'count': node.count, 'children': list(node.children), 'depth': 0,
+        }}
+    return {'kind': 't1', 'data': {
+        'id': node.id, 'name': f"t1_{node.id}", 'body': node.body, 'score': node.score,
+        'permalink': node.permalink, 'created_utc': node.created_utc, 'parent_id': node.parent_id,
+        'link_id': link_id, 'subreddit': subreddit, 'replies': '',
+    }}
+
+
+class _AppBucket:
+    def __init__(self, capacity: int, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+
+    def take(self) -> float:
+        """Consumes one token; returns 0, or the seconds until one is available."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class FakeRedditServer:
+    """
+    Threaded HTTP server answering Reddit API requests from a FakeReddit.
+
+    Args:
+        reddit: The data to serve (e.g. build_synthetic_reddit()); its latency
+                is applied to every API request.
+        requests_per_minute: Budget of each app, or None for no limit.
+        burst: Requests an idle app may issue back-to-back.
+        host: Interface to listen on.
+        port: Port to listen on (0 picks a free one).
+    """
+
+    def __init__(self, reddit: FakeReddit, requests_per_minute: float | None = None, burst: int = 10,
+                 host: str = "127.0.0.1", port: int = 0):
+        self.reddit = reddit
+        self.requests_per_minute = requests_per_minute
+        self.burst = max(1, burst)
+        self._buckets = {}
+        self._requests = {}
+        self._throttled = {}
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeRedditServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeRedditServer":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def stats(self) -> dict:
+        """Requests served and 429s sent, per app."""
+        with self._lock:
+            apps = sorted(set(self._requests) | set(self._throttled))
+            return {app: {'requests': self._requests.get(app, 0), 'throttled': self._throttled.get(app, 0)}
+                    for app in apps}
+
+    def _charge(self, app: str) -> float:
+        """Counts a request by an app; returns 0, or the Retry-After seconds if it is over budget."""
+        with self._lock:
+            if self.requests_per_minute:
+                bucket = self._buckets.get(app)
+                if bucket is None:
+                    bucket = self._buckets[app] = _AppBucket(self.burst, self.requests_per_minute / 60.0)
+                wait = bucket.take()
+                if wait:
+                    self._throttled[app] = self._throttled.get(app, 0) + 1
+                    return wait
+            self._requests[app] = self._requests.get(app, 0) + 1
+            return 0.0
+
+    # Endpoints -------------------------------------------------------------
+
+    def _search_subreddits(self, params: dict) -> dict:
+        query = params.get('q', '').lower()
+        names = [name for name in self.reddit._posts if query in name.lower()]
+        limit = int(params.get('limit') or 25)
+        return _listing([_subreddit_thing(self.reddit, name) for name in names[:limit]])
+
+    def _search_names(self, params: dict) -> dict:
+        query = params.get('query', '')
+        exact = str(params.get('exact', '')).lower() == 'true'
+        return {'names': [name for name in self.reddit._posts if (name == query if exact else name.startswith(query))]}
+
+    def _subreddit_listing(self, name: str, listing: str, params: dict) -> dict:
+        posts = self.reddit._posts.get(name, [])
+        if listing == 'new':
+            posts = sorted(posts, key=lambda post: post.created_utc, reverse=True)
+        after = params.get('after')
+        if after:
+            names = [post.fullname for post in posts]
+            posts = posts[names.index(after) + 1:] if after in names else []
+        limit = int(params.get('limit') or 25)
+        page = posts[:limit]
+        return _listing([_submission_thing(post, name) for post in page],
+                        after=page[-1].fullname if len(posts) > limit else None)
+
+    def _comments(self, post_id: str) -> list:
+        post = self.reddit._by_id[post_id]
+        subreddit = post.permalink.split('/')[2]
+        return [
+            _listing([_submission_thing(post, subreddit)]),
+            _listing([_comment_thing(node, post.fullname, subreddit) for node in post._comments]),
+        ]
+
+    def _morechildren(self, params: dict) -> dict:
+        ids = [id for id in params.get('children', '').split(',') if id]
+        if len(ids) > 100:
+            return {'json': {'errors': [['TOO_MANY_IDS', 'at most 100 ids', 'children']]}}
+        link_id = params.get('link_id', '')
+        post = self.reddit._by_id.get(link_id.removeprefix('t3_'))
+        subreddit = post.permalink.split('/')[2] if post else None
+        things = [_comment_thing(self.reddit._hidden[id], link_id, subreddit) for id in ids if id in self.reddit._hidden]
+        return {'json': {'errors': [], 'data': {'things': things}}}
+
+    def _route(self, method: str, path: str, params: dict):
+        """Returns the JSON body of an API request, or None for an unknown endpoint."""
+        parts = [part for part in path.split('/') if part]
+        if method == 'GET' and parts == ['subreddits', 'search']:
+            return self._search_subreddits(params)
+        if method == 'POST' and parts == ['api', 'search_reddit_names']:
+            return self._search_names(params)
+        if method == 'GET' and len(parts) == 3 and parts[0] == 'r' and parts[2] in ('hot', 'new'):
+            return self._subreddit_listing(parts[1], parts[2], params)
+        if method == 'GET' and len(parts) >= 2 and parts[0] == 'comments' and parts[1] in self.reddit._by_id:
+            return self._comments(parts[1])
+        if method == 'POST' and parts == ['api', 'morechildren']:
+            return self._morechildren(params)
+        return None
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body, headers: dict | None = None):
+                payload = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=UTF-8')
+                self.send_header('Content-Length', str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _params(self) -> dict:
+                url = urlsplit(self.path)
+                params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+                length = int(self.headers.get('Content-Length') or 0)
+                if length:
+                    body = self.rfile.read(length).decode('utf-8')
+                    params.update((key, values[-1]) for key, values in parse_qs(body).items())
+                return params
+
+            def _access_token(self):
+                auth = self.headers.get('Authorization', '')
+                if not auth.startswith('Basic '):
+                    return self._send(401, {'error': 401})
+                client_id = base64.b64decode(auth[6:]).decode('utf-8').split(':', 1)[0]
+                self._send(200, {'access_token': f"token-{client_id}", 'token_type': 'bearer',
+                                 'expires_in': 86400, 'scope': '*'})
+
+            def _handle(self, method: str):
+                params = self._params()
+                path = urlsplit(self.path).path
+                if method == 'POST' and path.rstrip('/') == '/api/v1/access_token':
+                    return self._access_token()
+                auth = self.headers.get('Authorization', '')
+                if not auth.lower().startswith('bearer token-'):
+                    return self._send(401, {'message': 'Unauthorized', 'error': 401})
+                app = auth[len('bearer token-'):]
+                retry_after = server._charge(app)
+                if retry_after:
+                    return self._send(429, {'message': 'Too Many Requests', 'error': 429},
+                                      {'Retry-After': str(math.ceil(retry_after))})
+                server.reddit._request()  # Applies the simulated latency
+                body = server._route(method, path, params)
+                if body is None:
+                    return self._send(404, {'message': 'Not Found', 'error': 404})
+                self._send(200, body)
+
+            def do_GET(self):
+                self._handle('GET')
+
+            def do_POST(self):
+                self._handle('POST')
+
+        return Handler
@@ -0,0 +1,29 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+root_dir = str(Path(__file__).resolve().parents[1])
+if root_dir not in sys.path:
+    sys.path.insert(0, root_dir)
+
+
+@pytest.fixture
+def api_client():
+    """DRF test client for the dashboard; the shared components are restored afterwards."""
+    web_dir = str(Path(root_dir) / "web")
+    if web_dir not in sys.path:
+        sys.path.insert(0, web_dir)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'reddit_validator.settings')
+    os.environ.setdefault('WARM_UP_COMPONENTS', 'false')
+    import django
+    django.setup()
+    from django.test import override_settings
+    from rest_framework.test import APIClient
+
+    from app.core.registry import registry
+    factories, components = dict(registry._factories), dict(registry._components)
+    with override_settings(ALLOWED_HOSTS=['testserver']):
+        yield APIClient()
+    registry._factories, registry._components = factories, components
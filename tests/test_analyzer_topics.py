@@ -0,0 +1,56 @@
+import pytest
+
+from app.ai_analyzer.analyzer import RedditAnalyzer
+from benchmarks.corpus import load_recorded_items
+
+
+@pytest.fixture(scope="module")
+def texts():
+    return [item['content'] for item in load_recorded_items() if isinstance(item['content'], str) and item['content']]
+
+
+def _analyzer(**kwargs):
+    return RedditAnalyzer(sentiment_cache=False, relevance_filter=False, near_duplicate_threshold=None, **kwargs)
+
+
+def test_requests_never_modify_the_published_model(texts):
+    analyzer = _analyzer()
+    first = analyzer.extract_topics(texts[:200])
+    assert len(first['topics']) == 5
+    analyzer.flush_topic_updates()
+    published = analyzer.topic_engine
+    assert published.n_docs == 200
+
+    result = analyzer.extract_topics(texts[200:], topic_matrix_format='dense')
+    # The response uses the snapshot taken when the request started
+    assert result['topics'] == published.top_terms(n_terms=9)
+    analyzer.flush_topic_updates()
+    assert published.n_docs == 200
+    assert analyzer.topic_engine is not published
+    assert analyzer.topic_engine.n_docs == len(texts)
+
+
+def test_updates_are_saved(tmp_path, texts):
+    path = str(tmp_path / "topics.joblib")
+    analyzer = _analyzer(topic_model_path=path)
+    analyzer.extract_topics(texts)
+    analyzer.flush_topic_updates()
+
+    reloaded = _analyzer(topic_model_path=path)
+    assert reloaded.topic_engine.n_docs == len(texts)
+    assert reloaded.extract_topics(texts[:5], update=False)['topics'] == analyzer.topic_engine.top_terms(n_terms=9)
+
+
+def test_processes_sharing_a_model_file_keep_each_others_updates(tmp_path, texts):
+    path = str(tmp_path / "topics.joblib")
+    # Both started before either saved, like two job workers
+    first, second = _analyzer(topic_model_path=path), _analyzer(topic_model_path=path)
+    first.extract_topics(texts[:200])
+    first.flush_topic_updates()
+    second.extract_topics(texts[200:])
+    second.flush_topic_updates()
+    assert second.topic_engine.n_docs == len(texts)
+
+    first.extract_topics(texts[:50])
+    first.flush_topic_updates()
+    assert _analyzer(topic_model_path=path).topic_engine.n_docs == len(texts) + 50
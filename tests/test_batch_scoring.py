@@ -0,0 +1,69 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.ai_analyzer.analyzer import RedditAnalyzer
+from app.ai_analyzer.batch import SharedArrays, score_problems
+from benchmarks.corpus import load_recorded_items
+
+
+def _arrays(n_items=300, n_problems=10, dim=8, seed=0):
+    rng = np.random.default_rng(seed)
+    embeddings = rng.normal(size=(n_items, dim)).astype(np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    problems = rng.normal(size=(n_problems, dim)).astype(np.float32)
+    problems /= np.linalg.norm(problems, axis=1, keepdims=True)
+    sentiment = rng.dirichlet(np.ones(3), size=n_items)
+    compound = sentiment[:, 2] - sentiment[:, 0]
+    return {
+        'sentiment': np.column_stack([sentiment, compound]).astype(np.float32),
+        'topic_matrix': rng.random((n_items, 5)).astype(np.float32),
+        'has_text': (rng.random(n_items) > 0.1).astype(np.uint8),
+        'weights': rng.integers(1, 4, n_items),
+        'embeddings': embeddings,
+        'problems': problems,
+    }
+
+
+def _assert_same(actual, expected):
+    assert len(actual) == len(expected)
+    for got, want in zip(actual, expected):
+        np.testing.assert_array_equal(got.pop('document_topic_matrix'), want.pop('document_topic_matrix'))
+        assert got == want
+
+
+def test_process_pool_scores_match_serial_scores():
+    arrays = _arrays()
+    params = {'threshold': 0.2, 'top_k': 100, 'min_items': 5}
+    serial = score_problems(arrays, params, 10, n_jobs=1)
+    pooled = score_problems(arrays, params, 10, n_jobs=2, parallel_threshold=2)
+    _assert_same(pooled, serial)
+    assert {result['relevance']['items_relevant'] for result in serial} <= set(range(5, 101))
+    assert serial[0]['data_volume'] > serial[0]['relevance']['items_relevant']
+
+
+def test_shared_blocks_are_released():
+    with SharedArrays(_arrays(n_items=20, n_problems=2)) as shared:
+        names = [block_name for block_name, _, _ in shared.descriptors.values()]
+        block = shared_memory.SharedMemory(name=names[0])
+        block.close()
+    for name in names:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+
+def test_batch_results_match_single_validations():
+    items = [item for item in load_recorded_items() if isinstance(item['content'], str) and item['content']][:200]
+    data = pd.DataFrame(items)
+    problems = ["Exports are slow", "Login keeps failing"]
+    analyzer = RedditAnalyzer(sentiment_cache=False, relevance_filter=False, near_duplicate_threshold=None)
+    batch = analyzer.validate_problems(data, problems, n_jobs=1)
+    assert [result['problem_statement'] for result in batch['results']] == problems
+    assert set(batch['timings']) == {'near_duplicates', 'sentiment', 'topics', 'embeddings', 'scoring'}
+
+    single = analyzer.validate_problem(data, problems[0])
+    for result in batch['results']:
+        assert result['sentiment_analysis'] == single['sentiment_analysis']
+        assert result['data_volume'] == single['data_volume'] == len(items)
@@ -0,0 +1,51 @@
+import argparse
+import tempfile
+
+import pytest
+
+from app.scraper.scraper import RedditScraper
+from benchmarks.bench_suite import PATHS, run_case
+from benchmarks.corpus import load_recorded_items, scale_items
+from benchmarks.fake_reddit import build_reddit_from_items
+
+FIELDS = ('item_id', 'parent_id', 'type', 'subreddit', 'title', 'upvotes', 'url', 'created_utc')
+
+
+@pytest.fixture(scope="module")
+def recorded():
+    return load_recorded_items()
+
+
+def test_scaled_replicas_are_distinct(recorded):
+    scaled = scale_items(recorded, 2 * len(recorded) + 7)
+    assert len(scaled) == 2 * len(recorded) + 7
+    assert len({item['item_id'] for item in scaled}) == len(scaled)
+    assert scaled[:len(recorded)] == recorded
+
+    original, copy = recorded[1], scaled[len(recorded) + 1]
+    assert copy['subreddit'] == f"{original['subreddit']}_1"
+    assert copy['item_id'] == f"{original['item_id']}r1"
+    assert copy['parent_id'] == (f"{original['parent_id']}r1" if original['parent_id'] else None)
+    assert f"/r/{copy['subreddit']}/" in copy['url']
+
+
+def test_fake_reddit_replays_the_recorded_items(recorded):
+    scraper = RedditScraper(reddit=build_reddit_from_items(recorded), requests_per_minute=1_000_000,
+                            discovery_cache=False, comment_expansion_budget=0)
+    subreddits = list(dict.fromkeys(item['subreddit'] for item in recorded))
+    replayed = list(scraper.iter_posts_and_comments(subreddits, post_limit=None, comment_limit_per_post=None,
+                                                    min_upvotes_post=-10**9))
+    by_id = {item['item_id']: item for item in recorded}
+    assert sorted(item['item_id'] for item in replayed) == sorted(by_id)
+    for item in replayed:
+        assert {field: item[field] for field in FIELDS} == {field: by_id[item['item_id']][field] for field in FIELDS}
+
+
+def test_every_path_runs(tmp_path, monkeypatch):
+    monkeypatch.setattr(tempfile, 'tempdir', str(tmp_path))
+    args = argparse.Namespace(latency=0.0, workers=4, relevance=False, near_duplicates=False)
+    for path in PATHS:
+        result = run_case(path, 200, args)
+        assert result['size'] == 200
+        assert 0 < result['processed'] <= 200
+        assert result['items_per_second'] > 0
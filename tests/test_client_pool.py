@@ -0,0 +1,55 @@
+import os
+
+import pytest
+
+from app.core import config
+from app.scraper.client_pool import DEFAULT_DB_PATH, ClientPool, SharedRateLimiter
+
+CREDENTIALS = [{'client_id': 'app1', 'client_secret': 's1', 'user_agent': 'ua'},
+               {'client_id': 'app2', 'client_secret': 's2', 'user_agent': 'ua'}]
+
+
+@pytest.mark.parametrize("value, message", [
+    ('[{"client_id": "a", "client_secret": "b", "user_agent": "ua"}, "c"]', "entry 1 must be a JSON object"),
+    ('[{"client_id": "a"}]', "entry 0 needs client_id, client_secret and user_agent"),
+    ('{"client_id": "a"}', "non-empty JSON list"),
+    ('[{"client_id": ', "not valid JSON"),
+])
+def test_malformed_credentials_are_rejected(monkeypatch, value, message):
+    monkeypatch.setattr(config, 'REDDIT_CREDENTIALS', value)
+    monkeypatch.setattr(config, 'REDDIT_USER_AGENT', None)
+    with pytest.raises(ValueError, match=message):
+        config.require_reddit_credentials()
+
+
+def test_credentials_default_to_the_shared_user_agent(monkeypatch):
+    monkeypatch.setattr(config, 'REDDIT_CREDENTIALS', '[{"client_id": "a", "client_secret": "b"}]')
+    monkeypatch.setattr(config, 'REDDIT_USER_AGENT', 'validator/1.0')
+    credentials = config.require_reddit_credentials()
+    assert credentials == [{'client_id': 'a', 'client_secret': 'b', 'user_agent': 'validator/1.0'}]
+
+
+def test_default_budget_file_is_under_the_project_root():
+    assert os.path.isabs(DEFAULT_DB_PATH)
+    assert DEFAULT_DB_PATH == str(config.PROJECT_ROOT / "data" / "reddit_budget.sqlite3")
+
+
+def test_limiters_on_one_file_share_the_buckets(tmp_path):
+    path = str(tmp_path / "budget.sqlite3")
+    first = SharedRateLimiter(path, requests_per_minute=6, burst=3)
+    second = SharedRateLimiter(path, requests_per_minute=6, burst=3)
+    assert first.try_acquire('app1', 2) == 0
+    assert second.try_acquire('app1', 1) == 0
+    # The bucket is empty for both; refilling one token takes ten seconds
+    assert second.try_acquire('app1') > 9
+    assert first.try_acquire('app2', 3) == 0
+
+
+def test_acquiring_more_than_the_capacity_raises():
+    pool = ClientPool(CREDENTIALS, requests_per_minute=60, burst=3, client_factory=lambda credential: object())
+    with pytest.raises(ValueError):
+        pool.acquire(4)
+    with pytest.raises(ValueError):
+        pool.limiter.try_acquire('app1', 4)
+    pool.acquire(3)
+    assert pool.stats()['calls'] == 3
@@ -0,0 +1,32 @@
+from app.scraper.comment_tree import ExpansionBudget, expand_comment_tree
+from app.scraper.scraper import RedditScraper
+from benchmarks.fake_reddit import build_synthetic_reddit
+
+
+def test_continued_threads_returned_by_morechildren_are_loaded():
+    reddit = build_synthetic_reddit(1, 1, 2, hidden_replies_per_comment=2, continued_replies_per_reply=2)
+    post = reddit.submission('s0p0')
+    tree = expand_comment_tree(reddit, post, post.comments.list(), ExpansionBudget(100), max_calls=100)
+    ids = [comment.id for comment in tree]
+    assert len(ids) == len(set(ids)) == post.num_comments == 2 + 4 + 8
+    assert 's0p0c1r0d1' in ids
+
+
+def test_expansion_stops_at_the_budget():
+    reddit = build_synthetic_reddit(1, 1, 2, hidden_replies_per_comment=2, continued_replies_per_reply=2)
+    post = reddit.submission('s0p0')
+    budget = ExpansionBudget(2)
+    tree = expand_comment_tree(reddit, post, post.comments.list(), budget, max_calls=100)
+    assert budget.stats() == {'calls': 2, 'spent': 2}
+    assert 2 < len(tree) < post.num_comments
+
+
+def test_scraper_keeps_comments_of_continued_threads():
+    reddit = build_synthetic_reddit(1, 2, 3, hidden_replies_per_comment=1, continued_replies_per_reply=1)
+    scraper = RedditScraper(reddit=reddit, requests_per_minute=1_000_000, discovery_cache=False,
+                            comment_expansion_budget=100, comment_expansion_per_post=10)
+    items = list(scraper.iter_posts_and_comments(['sub0'], post_limit=2, comment_limit_per_post=50,
+                                                 min_upvotes_post=0))
+    comments = {item['item_id']: item for item in items if item['type'] == 'comment'}
+    assert len(comments) == 2 * (3 + 3 + 3)
+    assert comments['comment_s0p1c2r0d0']['parent_id'] == 'comment_s0p1c2r0'
@@ -0,0 +1,72 @@
+import csv
+import os
+
+
+from app.scraper import sinks
+from app.scraper.checkpoint import CrawlCheckpoint
+from app.scraper.scraper import RedditScraper
+from benchmarks.fake_reddit import build_synthetic_reddit
+
+SUBREDDITS = ['sub0', 'sub1', 'sub2']
+
+
+def _crawl(tmp_path, reddit, job_id="job"):
+    scraper = RedditScraper(reddit=reddit, requests_per_minute=1_000_000, discovery_cache=False,
+                            comment_expansion_budget=0, output_dir=str(tmp_path / "scraped_data"))
+    checkpoint = CrawlCheckpoint(str(tmp_path / "checkpoints.sqlite3"), job_id)
+    try:
+        return scraper.crawl_to_csv(job_id, SUBREDDITS, post_limit=8, min_upvotes_post=0,
+                                    checkpoint=checkpoint, flush_size=10)
+    finally:
+        checkpoint.close()
+
+
+def _rows(path):
+    with open(path, newline='') as f:
+        return [row['item_id'] for row in csv.DictReader(f)]
+
+
+def test_resumed_crawl_writes_every_item_once(tmp_path, monkeypatch):
+    reference = build_synthetic_reddit(3, 8, 3)
+    expected = _rows(_crawl(tmp_path, reference, job_id="reference"))
+    assert len(expected) == 3 * 8 * 4
+
+    # Kill the first run mid-batch, after several commits
+    write = sinks.CSVSink.write
+    written = 0
+
+    def failing_write(self, item):
+        nonlocal written
+        written += 1
+        if written > 47:
+            raise RuntimeError("process killed")
+        write(self, item)
+
+    monkeypatch.setattr(sinks.CSVSink, 'write', failing_write)
+    reddit = build_synthetic_reddit(3, 8, 3)
+    assert _crawl(tmp_path, reddit) is None
+    requests_before = reddit.request_count
+
+    # Resumed from another working directory, the crawl continues the same file
+    (tmp_path / "elsewhere").mkdir()
+    monkeypatch.chdir(tmp_path / "elsewhere")
+    monkeypatch.setattr(sinks.CSVSink, 'write', write)
+    path = _crawl(tmp_path, reddit)
+    rows = _rows(path)
+    assert len(rows) == len(set(rows))
+    assert sorted(rows) == sorted(expected)
+    # Finished posts are not fetched again
+    assert reddit.request_count - requests_before < reference.request_count
+
+    assert os.path.isabs(path) and not os.listdir(tmp_path / "elsewhere")
+    # A completed job is not run again
+    assert _crawl(tmp_path, reddit) == path
+    assert _rows(path) == rows
+
+
+def test_csv_output_is_under_the_project_root(tmp_path, monkeypatch):
+    from app.core import config
+
+    monkeypatch.chdir(tmp_path)
+    scraper = RedditScraper(reddit=build_synthetic_reddit(1, 1, 1), discovery_cache=False)
+    assert scraper.output_dir == config.SCRAPED_DATA_DIR == str(config.PROJECT_ROOT / "data" / "scraped_data")
@@ -0,0 +1,56 @@
+import time
+
+from app.scraper import discovery_cache
+from app.scraper.discovery_cache import DiscoveryCache
+from app.scraper.scraper import RedditScraper
+from benchmarks.fake_reddit import build_synthetic_reddit
+
+
+def _scraper(reddit, cache):
+    return RedditScraper(reddit=reddit, requests_per_minute=1_000_000, discovery_cache=cache, max_workers=4)
+
+
+def test_discovery_is_served_from_the_cache_until_the_ttl(tmp_path, monkeypatch):
+    reddit = build_synthetic_reddit(12, 1, 0)
+    path = str(tmp_path / "discovery.sqlite3")
+    scraper = _scraper(reddit, DiscoveryCache(path, ttl_seconds=60))
+
+    discovered = scraper.discover_subreddits_detailed(['sub1', 'sub2', 'sub1'], search_limit_per_keyword=3)
+    assert list(discovered) == ['sub1', 'sub2']
+    assert [sub['name'] for sub in discovered['sub1']] == ['sub1', 'sub10', 'sub11']
+    assert discovered['sub1'][0]['subscribers'] == 1000
+    assert reddit.request_count == 2
+
+    # Repeat lookups, normalized keywords and other processes sharing the file need no requests
+    assert scraper.discover_subreddits_detailed(['sub1', ' SUB2 '], search_limit_per_keyword=3) == {
+        'sub1': discovered['sub1'], ' SUB2 ': discovered['sub2']}
+    other = _scraper(reddit, DiscoveryCache(path, ttl_seconds=60))
+    assert other._discover_subreddits(['sub2', 'sub1'], search_limit_per_keyword=3) == ['sub2', 'sub1', 'sub10', 'sub11']
+    assert reddit.request_count == 2
+    # A different search limit is another entry
+    scraper.discover_subreddits_detailed(['sub1'], search_limit_per_keyword=1)
+    assert reddit.request_count == 3
+
+    now = time.time()
+    monkeypatch.setattr(discovery_cache.time, 'time', lambda: now + 61)
+    scraper.discover_subreddits_detailed(['sub1', 'sub2'], search_limit_per_keyword=3)
+    assert reddit.request_count == 5
+    assert scraper.discovery_cache.stats()['expired'] == 2
+    assert scraper.discovery_cache.purge_expired() == 1  # the search_limit=1 entry
+
+
+def test_failed_searches_are_not_cached(tmp_path, monkeypatch):
+    reddit = build_synthetic_reddit(3, 1, 0)
+    scraper = _scraper(reddit, DiscoveryCache(str(tmp_path / "discovery.sqlite3")))
+    search = reddit.subreddits.search
+
+    def flaky(query, limit=None):
+        if query == 'sub2':
+            raise RuntimeError("search unavailable")
+        return search(query, limit=limit)
+
+    monkeypatch.setattr(reddit.subreddits, 'search', flaky)
+    assert list(scraper.discover_subreddits_detailed(['sub1', 'sub2'])) == ['sub1']
+    monkeypatch.setattr(reddit.subreddits, 'search', search)
+    assert list(scraper.discover_subreddits_detailed(['sub1', 'sub2'])) == ['sub1', 'sub2']
+    assert scraper.discovery_cache.stats()['hits'] == 1
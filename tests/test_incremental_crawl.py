@@ -0,0 +1,56 @@
+from benchmarks.fake_reddit import FakeSubmission, build_synthetic_reddit
+from app.scraper.scraper import RedditScraper
+from app.scraper.state_store import CrawlStateStore
+
+
+def _scraper(reddit, store):
+    return RedditScraper(reddit=reddit, state_store=store, requests_per_minute=1_000_000,
+                         discovery_cache=False, comment_expansion_budget=0)
+
+
+def _post_ids(scraper, **kwargs):
+    items = scraper.iter_posts_and_comments(['sub0'], listing='new', min_upvotes_post=0, **kwargs)
+    return [item['item_id'] for item in items if item['type'] == 'post']
+
+
+def test_complete_walk_advances_the_mark_and_the_next_run_stops_at_it():
+    reddit = build_synthetic_reddit(1, 5, 1)
+    store = CrawlStateStore(":memory:")
+    assert len(_post_ids(_scraper(reddit, store))) == 5
+    newest = max(post.created_utc for post in reddit._posts['sub0'])
+    assert store.high_water_mark('sub0') == newest
+
+    reddit._posts['sub0'].append(FakeSubmission('fresh', 'Fresh post', 'text', 5, '/r/sub0/comments/fresh/_/',
+                                                newest + 600))
+    reddit._by_id['fresh'] = reddit._posts['sub0'][-1]
+    reddit._posts['sub0'][-1]._reddit = reddit
+    assert _post_ids(_scraper(reddit, store)) == ['post_fresh']
+    assert store.stats()['listings_stopped_early'] == 1
+    assert store.high_water_mark('sub0') == newest + 600
+
+
+def test_walk_cut_short_by_the_post_limit_keeps_the_mark():
+    reddit = build_synthetic_reddit(1, 6, 1)
+    store = CrawlStateStore(":memory:")
+    first = _post_ids(_scraper(reddit, store), post_limit=2)
+    assert len(first) == 2
+    assert store.high_water_mark('sub0') is None
+
+    # The older posts the limit cut off are still reached
+    second = _post_ids(_scraper(reddit, store))
+    assert sorted(first + second) == sorted(f"post_s0p{p}" for p in range(6))
+
+
+def test_interrupted_walk_keeps_the_mark():
+    reddit = build_synthetic_reddit(1, 6, 1)
+    store = CrawlStateStore(":memory:")
+    crawl = _scraper(reddit, store).iter_posts_and_comments(['sub0'], listing='new', min_upvotes_post=0)
+    taken = [next(crawl) for _ in range(4)]  # Two posts with their comment, then the consumer stops
+    crawl.close()
+    assert store.high_water_mark('sub0') is None
+
+    rest = _post_ids(_scraper(reddit, store))
+    taken_posts = [item['item_id'] for item in taken if item['type'] == 'post']
+    # Nothing is skipped; the last post taken was not recorded yet, so it comes again
+    assert set(taken_posts + rest) == {f"post_s0p{p}" for p in range(6)}
+    assert store.high_water_mark('sub0') == max(post.created_utc for post in reddit._posts['sub0'])
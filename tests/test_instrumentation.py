@@ -0,0 +1,61 @@
+import json
+import logging
+import pstats
+
+from app.core import config
+from app.core.instrumentation import JsonFormatter, Metrics, render_snapshots
+
+
+def test_snapshots_from_several_processes_are_merged():
+    web, worker = Metrics(), Metrics()
+    web.incr('reddit_api_calls', endpoint='listing')
+    worker.incr('reddit_api_calls', 2, endpoint='listing')
+    worker.incr('reddit_api_calls', endpoint='comments')
+    web.observe('stage', 0.5, stage='sentiment')
+    worker.observe('stage', 1.5, stage='sentiment')
+
+    text = render_snapshots([web.snapshot(), json.loads(json.dumps(worker.snapshot()))])
+    assert 'reddit_api_calls_total{endpoint="listing"} 3' in text
+    assert 'reddit_api_calls_total{endpoint="comments"} 1' in text
+    assert 'stage_seconds_count{stage="sentiment"} 2' in text
+    assert 'stage_seconds_sum{stage="sentiment"} 2.000000' in text
+    assert 'stage_seconds_max{stage="sentiment"} 1.500000' in text
+
+
+def test_json_log_lines_keep_extra_fields():
+    record = logging.LogRecord('app.scraper', logging.INFO, __file__, 1, "Fetched %d items", (12,), None)
+    record.items = 12
+    entry = json.loads(JsonFormatter().format(record))
+    assert (entry['message'], entry['items'], entry['level']) == ("Fetched 12 items", 12, 'INFO')
+
+
+def test_metrics_endpoint_reports_requests_and_worker_metrics(api_client, tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'METRICS_DIR', str(tmp_path / "metrics"))
+    # A job worker's flushed metrics
+    worker = Metrics()
+    worker.incr('jobs_finished', status='done')
+    (tmp_path / "metrics").mkdir()
+    (tmp_path / "metrics" / "4242.json").write_text(json.dumps(worker.snapshot()))
+
+    api_client.get('/metrics')
+    response = api_client.get('/metrics')
+    assert response.status_code == 200
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+    text = response.content.decode()
+    assert 'http_request_seconds_count{method="GET",view="metrics"}' in text
+    assert 'http_responses_total{status="200"}' in text
+    assert 'jobs_finished_total{status="done"} 1' in text
+
+
+def test_requests_are_profiled_on_request(api_client, tmp_path, monkeypatch):
+    from django.test import override_settings
+
+    monkeypatch.setattr(config, 'PROFILE_DIR', str(tmp_path / "profiles"))
+    with override_settings(PROFILE_HEADER_ENABLED=False, PROFILE_REQUESTS=False):
+        assert 'X-Profile-File' not in api_client.get('/metrics', HTTP_X_PROFILE='1')
+    with override_settings(PROFILE_HEADER_ENABLED=True, PROFILE_REQUESTS=False):
+        response = api_client.get('/metrics', HTTP_X_PROFILE='1')
+        assert 'X-Profile-File' not in api_client.get('/metrics')
+    path = response['X-Profile-File']
+    assert path.startswith(str(tmp_path / "profiles")) and path.endswith('.prof')
+    assert pstats.Stats(path).total_calls > 0
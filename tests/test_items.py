@@ -0,0 +1,69 @@
+import pandas as pd
+import pytest
+
+from app.scraper.items import ItemBatch
+from app.scraper.scraper import RedditScraper
+from app.scraper.sinks import ITEM_FIELDS
+from benchmarks.corpus import load_recorded_items
+from benchmarks.fake_reddit import build_synthetic_reddit
+
+POST = {'item_id': 'post_1abc', 'parent_id': None, 'type': 'post', 'subreddit': 'sub0', 'title': 'Title',
+        'content': 'Body', 'upvotes': 12, 'url': 'https://www.reddit.com/r/sub0/comments/1abc/title/',
+        'created_utc': '2024-03-04T10:00:00+00:00'}
+COMMENT = {'item_id': 'comment_k9x', 'parent_id': 'post_1abc', 'type': 'comment', 'subreddit': 'sub0',
+           'title': None, 'content': 'Reply', 'upvotes': -3,
+           'url': 'https://www.reddit.com/r/sub0/comments/1abc/title/k9x/', 'created_utc': '2024-03-04T11:30:05+00:00'}
+# Values that don't fit the compact columns
+ODD_ITEMS = [
+    {**POST, 'item_id': 'post_0leading', 'url': 'https://example.com/article', 'created_utc': None},
+    {**COMMENT, 'item_id': 'comment_UPPER', 'parent_id': 'post_0leading', 'url': None},
+    {**COMMENT, 'item_id': 'comment_zz', 'parent_id': 'comment_elsewhere', 'subreddit': None,
+     'url': 'https://www.reddit.com/r/sub0/comments/other/zz/'},
+    {**COMMENT, 'item_id': 'nocolon', 'type': 'note', 'parent_id': None, 'upvotes': 0, 'content': None},
+]
+
+
+@pytest.fixture(scope="module")
+def scraped_items():
+    scraper = RedditScraper(reddit=build_synthetic_reddit(2, 5, 3), requests_per_minute=1_000_000,
+                            discovery_cache=False, comment_expansion_budget=0)
+    return list(scraper.iter_posts_and_comments(['sub0', 'sub1'], post_limit=5, min_upvotes_post=0))
+
+
+@pytest.mark.parametrize("source", ["scraped", "recorded", "odd"])
+def test_items_round_trip(scraped_items, source):
+    items = {'scraped': scraped_items, 'recorded': load_recorded_items()[:500],
+             'odd': [POST, COMMENT] + ODD_ITEMS}[source]
+    batch = ItemBatch(items)
+    assert len(batch) == len(items)
+    assert batch == items
+    assert list(batch) == items
+    assert batch[-1] == items[-1] and batch[1:4] == items[1:4]
+    assert list(batch.iter_rows(chunk_size=3)) == [tuple(item[field] for field in ITEM_FIELDS) for item in items]
+    assert 'weight' not in batch[0]
+
+
+def test_comment_urls_are_derived_from_their_post():
+    batch = ItemBatch([POST, COMMENT])
+    assert batch._permalinks[1] is None
+    assert batch.url(1) == COMMENT['url']
+
+
+def test_weighted_batches_carry_weights():
+    batch = ItemBatch([{**POST, 'weight': 3}, COMMENT])
+    assert batch.weighted
+    assert [item['weight'] for item in batch] == [3, 1]
+
+    batch = ItemBatch()
+    batch.append(POST, weight=2)
+    assert batch[0] == {**POST, 'weight': 2}
+    assert list(batch.to_frame().columns) == ITEM_FIELDS + ['weight']
+
+
+def test_frame_matches_the_item_dicts(scraped_items):
+    items = scraped_items + ODD_ITEMS
+    frame = ItemBatch(items).to_frame()
+    expected = pd.DataFrame(items, columns=ITEM_FIELDS)
+    expected['created_utc'] = pd.to_datetime(expected['created_utc'], utc=True).astype(frame['created_utc'].dtype)
+    assert isinstance(frame['subreddit'].dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(frame.astype({'subreddit': object, 'type': object}), expected, check_dtype=False)
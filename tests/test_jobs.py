@@ -0,0 +1,112 @@
+import time
+
+import pytest
+
+from app.core import config, jobs
+from app.core.jobs import CANCELLED, FAILED, QUEUED, RUNNING, SUCCEEDED, JobStore, execute_job, validation_key
+
+KEY = validation_key("Exports are slow", ["excel", "Export"])
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(str(tmp_path / "jobs.sqlite3"), stale_after=0.2)
+
+
+@pytest.fixture(autouse=True)
+def metrics_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'METRICS_DIR', str(tmp_path / "metrics"))
+
+
+def test_identical_submissions_coalesce(store):
+    job_id, coalesced = store.submit('validate', {}, KEY)
+    assert not coalesced
+    assert store.submit('validate', {}, validation_key("exports  are SLOW", ["export", "excel"])) == (job_id, True)
+    assert store.submit('validate', {}, validation_key("Imports are slow", ["excel"]))[0] != job_id
+
+    store.claim(job_id)
+    assert store.submit('validate', {}, KEY) == (job_id, True)
+
+
+def test_submissions_do_not_coalesce_onto_dead_jobs(store):
+    job_id, _ = store.submit('validate', {}, KEY)
+    store.claim(job_id)
+    time.sleep(0.3)
+
+    new_id, coalesced = store.submit('validate', {}, KEY)
+    assert not coalesced and new_id != job_id
+    dead = store.get(job_id)
+    assert dead['status'] == FAILED and 'heartbeat' in dead['error']
+    assert store.events(job_id)[-1]['event'] == FAILED
+
+
+def test_heartbeats_keep_running_jobs_alive(store):
+    job_id, _ = store.submit('validate', {}, KEY)
+    store.claim(job_id)
+    for _ in range(3):
+        time.sleep(0.1)
+        store.heartbeat(job_id)
+    assert store.submit('validate', {}, KEY) == (job_id, True)
+    assert store.get(job_id)['status'] == RUNNING
+
+
+def test_reclaim_fails_stale_jobs_and_returns_queued_ones(store):
+    running, _ = store.submit('validate', {}, KEY)
+    store.claim(running)
+    queued, _ = store.submit('validate', {}, validation_key("Other problem", []))
+    time.sleep(0.3)
+
+    assert store.reclaim() == ([running], [queued])
+    assert store.get(running)['status'] == FAILED
+    assert store.get(queued)['status'] == QUEUED
+
+
+def test_execute_job_runs_a_queued_job_once(store, monkeypatch):
+    calls = []
+
+    def handler(params, progress, events, heartbeat):
+        calls.append(params)
+        progress('analyzing', 0.5, {})
+        return {'validation_score': 7}
+
+    monkeypatch.setitem(jobs.JOB_HANDLERS, 'test', handler)
+    job_id, _ = store.submit('test', {'n': 1}, KEY)
+    assert execute_job(store.db_path, job_id) == SUCCEEDED
+    assert execute_job(store.db_path, job_id) == 'skipped'
+
+    job = store.get(job_id)
+    assert calls == [{'n': 1}]
+    assert job['status'] == SUCCEEDED and job['result'] == {'validation_score': 7}
+    assert job['heartbeat_at'] >= job['started_at']
+
+
+def test_cancelling_a_queued_job(store):
+    job_id, _ = store.submit('validate', {}, KEY)
+    assert store.request_cancel(job_id) == CANCELLED
+    assert store.claim(job_id) is None
+    assert store.events(job_id)[-1]['event'] == CANCELLED
+    # A cancelled job is never coalesced onto
+    assert store.submit('validate', {}, KEY)[0] != job_id
+    assert store.request_cancel('missing') is None
+
+
+def test_cancelling_a_running_job_stops_it_at_its_next_event(store, monkeypatch):
+    monkeypatch.setattr(jobs, 'CANCEL_CHECK_INTERVAL', 0)
+    job_id, _ = store.submit('test', {}, KEY)
+    reached = []
+
+    def handler(params, progress, events, heartbeat):
+        progress('scraping', 0.1, {})
+        assert store.request_cancel(job_id) == RUNNING
+        # Identical submissions no longer coalesce onto a job that is winding down
+        assert store.submit('test', {}, KEY)[0] != job_id
+        events('subreddit_done', {'subreddit': 'excel'})
+        reached.append('after cancel')
+        return {}
+
+    monkeypatch.setitem(jobs.JOB_HANDLERS, 'test', handler)
+    assert execute_job(store.db_path, job_id) == CANCELLED
+    assert reached == []
+    job = store.get(job_id)
+    assert job['status'] == CANCELLED and job['result'] is None
+    assert [event['event'] for event in store.events(job_id)] == ['progress', CANCELLED]
@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+from app.core import config
+from app.scraper.scraper import RedditScraper
+from benchmarks.bench_import_time import ENTRY_POINTS, import_profile
+
+
+@pytest.fixture
+def no_credentials(monkeypatch):
+    for name in ('REDDIT_CREDENTIALS', 'REDDIT_CLIENT_ID', 'REDDIT_CLIENT_SECRET', 'REDDIT_USER_AGENT'):
+        monkeypatch.setattr(config, name, None)
+
+
+@pytest.mark.parametrize("module", list(ENTRY_POINTS))
+def test_entry_points_defer_heavy_imports(module):
+    profile = import_profile(module)
+    assert module in profile
+    assert [name for name in ENTRY_POINTS[module] if name in profile] == []
+
+
+def test_credentials_are_checked_when_the_first_client_is_built(no_credentials):
+    with pytest.raises(ValueError, match="REDDIT_CLIENT_ID"):
+        config.require_reddit_credentials()
+    with pytest.raises(ValueError, match="REDDIT_CLIENT_ID"):
+        RedditScraper(discovery_cache=False)
+
+
+def test_credential_sets(no_credentials, monkeypatch):
+    monkeypatch.setattr(config, 'REDDIT_USER_AGENT', "validator/1.0")
+    monkeypatch.setattr(config, 'REDDIT_CREDENTIALS', json.dumps([
+        {'client_id': 'a', 'client_secret': 'x'},
+        {'client_id': 'b', 'client_secret': 'y', 'user_agent': 'other/2.0'},
+    ]))
+    assert config.require_reddit_credentials() == [
+        {'client_id': 'a', 'client_secret': 'x', 'user_agent': 'validator/1.0'},
+        {'client_id': 'b', 'client_secret': 'y', 'user_agent': 'other/2.0'},
+    ]
+
+    for value in ('not json', '[]', json.dumps([{'client_id': 'a'}])):
+        monkeypatch.setattr(config, 'REDDIT_CREDENTIALS', value)
+        with pytest.raises(ValueError, match="REDDIT_CREDENTIALS"):
+            config.require_reddit_credentials()
+
+    monkeypatch.setattr(config, 'REDDIT_CREDENTIALS', None)
+    monkeypatch.setattr(config, 'REDDIT_CLIENT_ID', 'a')
+    monkeypatch.setattr(config, 'REDDIT_CLIENT_SECRET', 'x')
+    assert config.require_reddit_credentials() == [
+        {'client_id': 'a', 'client_secret': 'x', 'user_agent': 'validator/1.0'}]
@@ -0,0 +1,66 @@
+import pandas as pd
+
+from app.ai_analyzer.analyzer import RedditAnalyzer
+from app.ai_analyzer.near_duplicates import NearDuplicateCollapser, collapse_texts
+from app.scraper.items import ItemBatch
+from benchmarks.corpus import load_recorded_items
+
+BOT = "I am a bot, and this action was performed automatically. Please contact the moderators of this subreddit"
+WEEKLY = "Weekly career questions thread for {}: ask anything about breaking into UX, portfolios and interviews"
+
+
+def _item(n, content, **fields):
+    return {'item_id': f"comment_{n}", 'parent_id': 'post_1', 'type': 'comment', 'subreddit': 'sub0',
+            'title': None, 'content': content, 'upvotes': 1, 'url': None, 'created_utc': None, **fields}
+
+
+def _corpus():
+    """Recorded items none of which is a near-duplicate of another."""
+    items = [item for item in load_recorded_items() if isinstance(item['content'], str) and len(item['content']) > 80]
+    keep, weights = collapse_texts([item['content'] for item in items])
+    return [items[position] for position in keep[weights == 1]][:150]
+
+
+def test_repeated_texts_collapse_into_weighted_representatives():
+    distinct = [item['content'] for item in _corpus()]
+    texts = (distinct[:50] + [BOT] * 7 + [WEEKLY.format(f"2024-03-{day:02d}") for day in range(1, 5)]
+             + distinct[50:] + [f"{BOT}."] + [''] * 3)
+    keep, weights = collapse_texts(texts)
+    # Every distinct text survives; the bot and weekly repeats fold into their first occurrence
+    assert len(keep) == len(distinct) + 2 + 3
+    assert weights.sum() == len(texts)
+    assert weights[keep.tolist().index(50)] == 8
+    assert weights[keep.tolist().index(57)] == 4
+    # Texts without words are never merged
+    assert list(weights[-3:]) == [1, 1, 1]
+
+
+def test_streaming_matches_batch_collapsing():
+    items = _corpus()[:40]
+    stream = items[:20] + [_item(n, BOT) for n in range(5)] + items[20:] + [dict(items[3], item_id='comment_x')]
+    collapsed = list(NearDuplicateCollapser().collapse(stream))
+    keep, weights = collapse_texts([item['content'] for item in stream])
+    assert [item['item_id'] for item in collapsed] == [stream[position]['item_id'] for position in keep]
+    assert [item['weight'] for item in collapsed] == weights.tolist()
+
+    batch = ItemBatch()
+    rows = list(NearDuplicateCollapser().collapse_into(stream, batch))
+    assert rows == list(range(len(collapsed)))
+    assert [item['weight'] for item in batch] == weights.tolist()
+
+
+def test_weighted_counts_match_the_raw_data():
+    items = _corpus()[:60]
+    raw = pd.DataFrame(items + [_item(n, BOT) for n in range(9)])
+    collapsing = RedditAnalyzer(sentiment_cache=False, relevance_filter=False, near_duplicate_threshold=0.8)
+    plain = RedditAnalyzer(sentiment_cache=False, relevance_filter=False, near_duplicate_threshold=None)
+
+    collapsed, stats = collapsing.collapse_near_duplicates(raw)
+    assert (stats['items'], stats['representatives']) == (69, 61)
+    result = collapsing.validate_problem(raw, "Breaking into UX is hard")
+    expected = plain.validate_problem(raw, "Breaking into UX is hard")
+    assert result['sentiment_analysis'] == expected['sentiment_analysis']
+    assert result['data_volume'] == expected['data_volume'] == 69
+    assert result['near_duplicates']['representatives'] == 61
+    # Already collapsed data is not collapsed again
+    assert collapsing.collapse_near_duplicates(collapsed)[1] == {'enabled': True, 'items': 69, 'representatives': 61}
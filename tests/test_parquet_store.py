@@ -0,0 +1,54 @@
+import pandas as pd
+
+from app.scraper.parquet_store import ParquetItemStore
+from app.scraper.scraper import RedditScraper
+from app.scraper.sinks import CSVSink
+from benchmarks.fake_reddit import build_synthetic_reddit
+
+
+def _scraped():
+    scraper = RedditScraper(reddit=build_synthetic_reddit(3, 6, 3), requests_per_minute=1_000_000,
+                            discovery_cache=False, comment_expansion_budget=0)
+    return list(scraper.iter_posts_and_comments(['sub0', 'sub1', 'sub2'], min_upvotes_post=0))
+
+
+def test_csv_import_round_trips_the_items(tmp_path):
+    items = _scraped()
+    path = str(tmp_path / "crawl.csv")
+    with CSVSink(path) as sink:
+        sink.write_all(items)
+    store = ParquetItemStore(str(tmp_path / "dataset"))
+    assert store.import_csv(path) == len(items)
+
+    df = store.read().set_index('item_id').loc[[item['item_id'] for item in items]]
+    expected = pd.DataFrame(items).set_index('item_id')
+    assert list(df['subreddit'].astype(str)) == list(expected['subreddit'])
+    assert list(df['type'].astype(str)) == list(expected['type'])
+    assert list(df['upvotes']) == list(expected['upvotes'])
+    assert list(df['content']) == list(expected['content'])
+    assert list(df['created_utc']) == list(pd.to_datetime(expected['created_utc'], utc=True))
+    assert df['parent_id'].where(df['parent_id'].notna(), None).tolist() == expected['parent_id'].tolist()
+
+
+def test_reads_filter_partitions_and_columns(tmp_path):
+    items = _scraped()
+    store = ParquetItemStore(str(tmp_path / "dataset"))
+    assert store.append(items, chunk_size=10) == len(items)
+    assert store.append(items[:5]) == 5  # appends never rewrite earlier files
+
+    sub1 = [item for item in items if item['subreddit'] == 'sub1']
+    df = store.read(columns=['item_id', 'upvotes'], filters=[('subreddit', '=', 'sub1')])
+    assert list(df.columns) == ['item_id', 'upvotes']
+    assert sorted(df['item_id']) == sorted(item['item_id'] for item in sub1)
+
+    threshold = sorted(item['upvotes'] for item in items)[len(items) // 2]
+    table = store.read(columns=['item_id'], filters=[('upvotes', '>=', threshold)], as_pandas=False)
+    assert sorted(table.column('item_id').to_pylist()) == sorted(
+        item['item_id'] for item in items + items[:5] if item['upvotes'] >= threshold
+    )
+
+
+def test_missing_dataset_reads_empty(tmp_path):
+    store = ParquetItemStore(str(tmp_path / "missing"))
+    assert store.read(columns=['item_id', 'content']).empty
+    assert store.read(as_pandas=False).num_rows == 0
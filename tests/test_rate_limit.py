@@ -0,0 +1,50 @@
+import threading
+import time
+
+import pytest
+
+from app.scraper.rate_limit import RateLimiter
+
+
+def test_burst_is_served_without_waiting():
+    limiter = RateLimiter(requests_per_minute=60, burst=5)
+    start = time.monotonic()
+    for _ in range(5):
+        limiter.acquire()
+    assert time.monotonic() - start < 0.1
+    assert limiter.stats()['calls'] == 5
+
+
+def test_requests_beyond_the_burst_wait_for_the_rate():
+    limiter = RateLimiter(requests_per_minute=600, burst=2)  # 10 tokens per second
+    start = time.monotonic()
+    for _ in range(4):
+        limiter.acquire()
+    # Two tokens had to be refilled at 10 per second
+    assert time.monotonic() - start >= 0.18
+    assert limiter.stats()['waited_seconds'] > 0
+
+
+def test_rate_holds_across_threads():
+    limiter = RateLimiter(requests_per_minute=1200, burst=1)  # 20 tokens per second
+    threads = [threading.Thread(target=lambda: [limiter.acquire() for _ in range(3)]) for _ in range(4)]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # 12 requests with one token up front: at least 11 refills at 20 per second
+    assert time.monotonic() - start >= 0.5
+    assert limiter.stats()['calls'] == 12
+
+
+def test_acquiring_more_than_the_capacity_raises():
+    limiter = RateLimiter(requests_per_minute=60, burst=3)
+    with pytest.raises(ValueError):
+        limiter.acquire(4)
+    limiter.acquire(3)  # The whole capacity is still fine
+
+
+def test_rate_must_be_positive():
+    with pytest.raises(ValueError):
+        RateLimiter(requests_per_minute=0)
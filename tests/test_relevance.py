@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+from app.ai_analyzer.analyzer import RedditAnalyzer
+from app.ai_analyzer.relevance import RelevanceFilter, select_top
+from benchmarks.corpus import load_recorded_items
+
+VOCABULARY = ['export', 'excel', 'slow', 'login', 'password', 'dark', 'mode']
+
+
+class KeywordEncoder:
+    """Stands in for a sentence-transformers model: embeds texts as normalized keyword counts."""
+
+    def __init__(self):
+        self.encoded = 0
+
+    def encode(self, texts, batch_size, convert_to_numpy, normalize_embeddings, show_progress_bar):
+        self.encoded += len(texts)
+        vectors = np.array([[text.lower().count(word) for word in VOCABULARY] + [0.1] for text in texts],
+                           dtype=np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _filter(**kwargs):
+    relevance = RelevanceFilter(**kwargs)
+    relevance._model = KeywordEncoder()
+    return relevance
+
+
+def _frame(items):
+    return pd.DataFrame(items, columns=['subreddit', 'type', 'title', 'content', 'upvotes'])
+
+
+def test_select_top_keeps_threshold_matches_within_bounds():
+    similarities = np.array([0.1, 0.9, 0.5, 0.4, 0.8])
+    assert select_top(similarities, 0.45, None, 0).tolist() == [1, 2, 4]
+    assert select_top(similarities, 0.45, 2, 0).tolist() == [1, 4]
+    # min_items keeps the best matches even below the threshold
+    assert select_top(similarities, 0.95, None, 2).tolist() == [1, 4]
+    assert select_top(similarities, 0.95, None, 10).tolist() == [0, 1, 2, 3, 4]
+
+
+def test_only_relevant_items_are_analyzed():
+    relevance = _filter(threshold=0.5, min_items=1)
+    analyzer = RedditAnalyzer(sentiment_cache=False, relevance_filter=relevance, near_duplicate_threshold=None)
+    data = _frame([
+        ('sub0', 'post', 'Excel export', 'The export to excel is so slow', 4),
+        ('sub0', 'comment', None, 'Slow export every single time', 2),
+        ('sub0', 'comment', None, 'I forgot my password at login', 1),
+        ('sub1', 'post', 'Dark mode', 'Please add dark mode', 9),
+    ])
+    relevant, stats = analyzer.select_relevant(data, "Exporting to Excel is slow")
+    assert relevant.index.tolist() == [0, 1]
+    assert (stats['enabled'], stats['items_considered'], stats['items_relevant']) == (True, 4, 2)
+
+    # Embeddings of items seen before come from the cache
+    encoded = relevance._model.encoded
+    analyzer.select_relevant(data, "Exporting to Excel is slow")
+    assert relevance._model.encoded == encoded
+    assert relevance.stats()['cache_hits'] >= 5
+
+
+def test_missing_model_falls_back_to_every_item(tmp_path):
+    relevance = RelevanceFilter(model_name=str(tmp_path / "no-such-model"), cache_folder=str(tmp_path))
+    analyzer = RedditAnalyzer(sentiment_cache=False, relevance_filter=relevance, near_duplicate_threshold=None)
+    items = [item for item in load_recorded_items() if isinstance(item['content'], str) and item['content']][:80]
+    data = pd.DataFrame(items)
+
+    relevant, stats = analyzer.select_relevant(data, "Exports are slow")
+    assert relevant is data
+    assert stats == {'enabled': False, 'items_considered': 80, 'items_relevant': 80}
+    result = analyzer.validate_problem(data, "Exports are slow")
+    assert result['relevance'] == stats
@@ -0,0 +1,88 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from django.core.cache.backends.locmem import LocMemCache
+
+from app.ai_analyzer.rollups import RollupStore
+from app.core.jobs import JobStore, validation_key
+from app.core.registry import registry
+from app.core.result_cache import FRESH, MISS, PENDING, STALE, ValidationResultCache
+
+ANALYZER = SimpleNamespace(version="analyzer-test")
+RESULT = {'validation_score': 61.5, 'subreddits': ['sub0']}
+
+
+def _item(item_id, subreddit='sub0', upvotes=3):
+    return {'item_id': item_id, 'subreddit': subreddit, 'type': 'post', 'upvotes': upvotes,
+            'created_utc': '2024-03-04T10:00:00'}
+
+
+@pytest.fixture
+def rollups(tmp_path):
+    store = RollupStore(str(tmp_path / "rollups.sqlite3"))
+    store.add([_item('p1')], np.array([-0.5]), [''])
+    return store
+
+
+@pytest.fixture
+def jobs(tmp_path):
+    return JobStore(str(tmp_path / "jobs.sqlite3"))
+
+
+@pytest.fixture
+def cache(tmp_path, rollups, jobs):
+    return ValidationResultCache(LocMemCache(str(tmp_path), {}), jobs=jobs, rollups=rollups)
+
+
+def test_keys_are_built_without_the_scraper(cache, monkeypatch):
+    def no_scraper():
+        raise AssertionError("the key must not need a Reddit client")
+
+    monkeypatch.setitem(registry._factories, 'scraper', no_scraper)
+    monkeypatch.delitem(registry._components, 'scraper', raising=False)
+    key = cache.key_for("Exports are slow", ["excel", "Export"], analyzer=ANALYZER)
+    assert key == cache.key_for("exports  are SLOW", ["export", "excel"], analyzer=ANALYZER)
+    assert key != cache.key_for("Exports are slow", ["excel"], analyzer=ANALYZER)
+    assert key != cache.key_for("Exports are slow", ["excel", "Export"], analyzer=SimpleNamespace(version="other"))
+
+
+def test_hit_and_miss(cache):
+    key = cache.key_for("Exports are slow", ["excel"], analyzer=ANALYZER)
+    assert cache.lookup(key) == (None, MISS)
+    cache.store(key, RESULT)
+    assert cache.lookup(key) == (RESULT, FRESH)
+    assert cache.lookup(cache.key_for("Imports are slow", ["excel"], analyzer=ANALYZER)) == (None, MISS)
+
+    cache.fresh_seconds = 0
+    assert cache.lookup(key) == (RESULT, STALE)
+
+
+def test_new_items_of_the_entrys_subreddits_invalidate_it(cache, rollups):
+    key = cache.key_for("Exports are slow", ["excel"], analyzer=ANALYZER)
+    cache.store(key, RESULT)
+    # Items of other subreddits, or the same items again, leave the entry alone
+    rollups.add([_item('q1', subreddit='sub1')], np.array([0.2]), [''])
+    rollups.add([_item('p1')], np.array([-0.5]), [''])
+    assert cache.lookup(key) == (RESULT, FRESH)
+
+    rollups.add([_item('p1', upvotes=40)], np.array([-0.5]), [''])
+    assert cache.lookup(key) == (None, MISS)
+
+    cache.store(key, RESULT)
+    rollups.add([_item('p2')], np.array([0.4]), [''])
+    assert cache.lookup(key) == (None, MISS)
+
+
+def test_finished_jobs_are_adopted_with_the_corpus_they_rolled_up(cache, rollups, jobs):
+    key = cache.key_for("Exports are slow", ["excel"], analyzer=ANALYZER)
+    job_id, _ = jobs.submit('validate', {}, validation_key("Exports are slow", ["excel"]))
+    cache.track(key, job_id)
+    jobs.claim(job_id)
+    # The running job rolls up what it scraped; that must not drop its own entry
+    rollups.add([_item('p2')], np.array([0.4]), [''])
+    assert cache.lookup(key) == (None, PENDING)
+
+    jobs.complete(job_id, RESULT)
+    assert cache.lookup(key) == (RESULT, FRESH)
+    assert cache.lookup(key) == (RESULT, FRESH)
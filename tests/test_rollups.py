@@ -0,0 +1,122 @@
+import sqlite3
+
+import numpy as np
+import pytest
+
+from app.ai_analyzer.analyzer import RedditAnalyzer
+from app.ai_analyzer.rollups import SCHEMA_VERSION, RollupStore
+from benchmarks.corpus import load_recorded_items
+
+ITEMS = [
+    {'item_id': 'p1', 'subreddit': 'sub0', 'type': 'post', 'upvotes': 10, 'created_utc': '2024-03-04T10:00:00'},
+    {'item_id': 'c1', 'subreddit': 'sub0', 'type': 'comment', 'upvotes': 2, 'created_utc': '2024-03-04T11:00:00'},
+    {'item_id': 'p2', 'subreddit': 'sub1', 'type': 'post', 'upvotes': 0, 'created_utc': '2024-03-12T09:00:00'},
+    {'item_id': 'c2', 'subreddit': 'sub1', 'type': 'comment', 'upvotes': 5, 'weight': 3,
+     'created_utc': '2024-03-13T09:00:00'},
+]
+COMPOUND = np.array([-0.6, 0.4, -0.2, np.nan])
+TOPICS = ['billing', 'billing', 'support', None]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = RollupStore(str(tmp_path / "rollups.sqlite3"))
+    yield store
+    store.close()
+
+
+def test_reingesting_an_item_replaces_its_contribution(store):
+    assert store.add(ITEMS, COMPOUND, TOPICS) == 4
+    assert store.add(ITEMS, COMPOUND, TOPICS) == 0
+
+    rescraped = [{**ITEMS[0], 'upvotes': 500}]
+    assert store.add(rescraped, COMPOUND[:1], TOPICS[:1]) == 1
+    fresh = RollupStore(":memory:")
+    fresh.add(rescraped + ITEMS[1:], COMPOUND, TOPICS)
+    assert store.trend(period='week') == fresh.trend(period='week')
+    assert sum(bucket['items'] for bucket in store.trend()) == 6
+
+
+def test_rebuild_recomputes_the_incremental_aggregates(store):
+    store.add(ITEMS[:2], COMPOUND[:2], TOPICS[:2])
+    store.add(ITEMS[2:], COMPOUND[2:], TOPICS[2:])
+    store.add([{**ITEMS[1], 'upvotes': 40}], COMPOUND[1:2], ['support'])
+    incremental = store.trend(period='day')
+    by_topic = store.trend(topics=['support'], period='day')
+
+    store.rebuild()
+    assert store.trend(period='day') == incremental
+    assert store.trend(topics=['support'], period='day') == by_topic
+
+
+def test_trends_filter_by_topic_key(store):
+    store.add(ITEMS, COMPOUND, TOPICS)
+    assert sum(bucket['items'] for bucket in store.trend(topics=['billing'])) == 2
+    assert sum(bucket['items'] for bucket in store.trend(topics=['support'])) == 1
+    assert sum(bucket['items'] for bucket in store.trend(topics=['billing', 'support'])) == 3
+    assert store.trend(topics=['unknown']) == []
+
+
+def test_topic_numbers_of_older_rollups_are_dropped(tmp_path):
+    path = str(tmp_path / "rollups.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE rollup_items (item_id TEXT PRIMARY KEY, day TEXT NOT NULL, subreddit TEXT NOT NULL,
+                                   topic INTEGER NOT NULL, is_comment INTEGER NOT NULL, weight INTEGER NOT NULL,
+                                   upvotes INTEGER NOT NULL, compound REAL)
+    """)
+    conn.execute("CREATE TABLE daily_rollups (day TEXT, subreddit TEXT, topic INTEGER, items INTEGER)")
+    conn.executemany("INSERT INTO rollup_items VALUES (?, ?, ?, ?, ?, ?, ?, ?)", [
+        ('p1', '2024-03-04', 'sub0', 1, 0, 1, 10, -0.6),
+        ('c1', '2024-03-04', 'sub0', 2, 1, 2, 3, 0.4),
+    ])
+    conn.commit()
+    conn.close()
+
+    store = RollupStore(path)
+    [bucket] = store.trend(period='day')
+    assert (bucket['items'], bucket['posts'], bucket['comments'], bucket['negative']) == (3, 1, 2, 1)
+    assert store.trend(topics=['1']) == []
+    assert store._conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    store.close()
+
+
+def test_analyzer_rolls_items_up_by_topic_key(store):
+    items = [item for item in load_recorded_items() if isinstance(item['content'], str) and item['content']][:300]
+    analyzer = RedditAnalyzer(sentiment_cache=False, relevance_filter=False, near_duplicate_threshold=None)
+    analyzer.topic_engine.partial_fit([item['content'] for item in items])
+
+    assert analyzer.update_rollups(store, items) == len(items)
+    keys = analyzer.topic_engine.topic_keys
+    rows = store._conn.execute("SELECT DISTINCT topic FROM rollup_items").fetchall()
+    assert {topic for topic, in rows} <= set(keys) | {''}
+    total = sum(sum(bucket['items'] for bucket in store.trend(topics=[key])) for key in keys)
+    assert total == sum(1 for topic, in store._conn.execute("SELECT topic FROM rollup_items") if topic)
+
+
+def test_trend_view_resolves_topics_written_by_another_model(tmp_path, api_client):
+    from app.core.registry import registry
+
+    items = [item for item in load_recorded_items() if isinstance(item['content'], str) and item['content']][:300]
+    path = str(tmp_path / "rollups.sqlite3")
+    # A job worker's model writes the rollups...
+    writer = RedditAnalyzer(sentiment_cache=False, relevance_filter=False, near_duplicate_threshold=None)
+    writer.topic_engine.partial_fit([item['content'] for item in items])
+    writer.update_rollups(RollupStore(path), items)
+    # ...while the web process has its own model, with other keys
+    reader = RedditAnalyzer(sentiment_cache=False, relevance_filter=False, near_duplicate_threshold=None)
+    reader.topic_engine.partial_fit([item['content'] for item in items[:150]])
+    assert not set(reader.topic_engine.topic_keys) & set(writer.topic_engine.topic_keys)
+    store = RollupStore(path)
+    registry.configure(rollups=lambda: store, analyzer=lambda: reader)
+
+    response = api_client.get('/api/trends/', {'topic': 'topic_2', 'period': 'day', 'periods': 10_000})
+    assert response.status_code == 200, response.data
+    key = writer.topic_engine.topic_keys[1]
+    expected = sum(bucket['items'] for bucket in store.trend(topics=[key]))
+    assert expected > 0
+    assert sum(bucket['items'] for bucket in response.data['trend']['buckets']) == expected
+    assert store.topic_keys_by_name()['topic_2'] == key
+
+    response = api_client.get('/api/trends/', {'topic': 'topic_9'})
+    assert response.status_code == 400
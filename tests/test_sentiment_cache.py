@@ -0,0 +1,62 @@
+import numpy as np
+
+from app.ai_analyzer.sentiment import BatchSentimentScorer
+from app.ai_analyzer.sentiment_cache import SentimentCache, content_key
+
+ROW = np.array([0.5, 0.4, 0.1, 0.5], dtype=np.float32)
+
+
+def test_memory_and_disk_hits(tmp_path):
+    path = str(tmp_path / "sentiment.sqlite3")
+    key = content_key("slow exports")
+    cache = SentimentCache("v1", db_path=path)
+    assert cache.get_many([key]) == {}
+    cache.put_many({key: ROW})
+    np.testing.assert_array_equal(cache.get_many([key])[key], ROW)
+
+    reopened = SentimentCache("v1", db_path=path)
+    np.testing.assert_array_equal(reopened.get_many([key])[key], ROW)
+    stats = reopened.stats()
+    assert (stats['disk_hits'], stats['misses']) == (1, 0)
+    assert cache.stats()['memory_hits'] == 1
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = SentimentCache("v1", max_entries=2)
+    keys = [content_key(text) for text in ("a", "b", "c")]
+    cache.put_many({keys[0]: ROW, keys[1]: ROW})
+    cache.get_many([keys[0]])
+    cache.put_many({keys[2]: ROW})
+    assert set(cache.get_many(keys)) == {keys[0], keys[2]}
+    assert cache.stats()['evictions'] == 1
+
+
+def test_versions_share_a_file_without_evicting_each_other(tmp_path):
+    path = str(tmp_path / "sentiment.sqlite3")
+    key = content_key("slow exports")
+    old = SentimentCache("v1", db_path=path)
+    old.put_many({key: ROW})
+    new = SentimentCache("v2", db_path=path)
+    assert new.get_many([key]) == {}  # Another version's score is never served
+    new.put_many({key: ROW * 2})
+
+    # Opening the file with either version keeps both entries
+    np.testing.assert_array_equal(SentimentCache("v1", db_path=path).get_many([key])[key], ROW)
+    np.testing.assert_array_equal(SentimentCache("v2", db_path=path).get_many([key])[key], ROW * 2)
+    assert new.stats()['disk_entries'] == 2
+
+    assert new.prune_versions() == 1
+    assert SentimentCache("v1", db_path=path).get_many([key]) == {}
+    assert new.stats()['disk_entries'] == 1
+
+
+def test_scorer_reuses_cached_scores():
+    scorer = BatchSentimentScorer(cache=True)
+    texts = ["I love this tool", "The export keeps failing", "", "I love this tool"]
+    first = scorer.score(texts)
+    second = scorer.score(texts)
+    np.testing.assert_array_equal(first, second)
+    assert np.isnan(first[2]).all()
+    stats = scorer.cache.stats()
+    # Duplicates are scored once: two distinct texts missed, then hit
+    assert (stats['misses'], stats['memory_hits']) == (2, 2)
@@ -0,0 +1,51 @@
+import csv
+
+from app.scraper.scraper import RedditScraper
+from app.scraper.sinks import ITEM_FIELDS, CSVSink, chunked
+from benchmarks.fake_reddit import build_synthetic_reddit
+
+
+def _scraper(reddit, **kwargs):
+    return RedditScraper(reddit=reddit, requests_per_minute=1_000_000, discovery_cache=False,
+                         comment_expansion_budget=0, **kwargs)
+
+
+def test_concurrent_crawl_matches_a_sequential_one():
+    reddit = build_synthetic_reddit(6, 8, 4, latency=0.002)
+    subreddits = [f"sub{n}" for n in range(6)]
+    sequential = list(_scraper(reddit).iter_posts_and_comments(subreddits, min_upvotes_post=0, max_workers=1))
+    concurrent = list(_scraper(reddit, max_workers=8).iter_posts_and_comments(subreddits, min_upvotes_post=0))
+    assert concurrent == sequential
+    assert len(sequential) == 6 * 8 * 5
+    # Each post is followed by its comments
+    assert [item['type'] for item in sequential[:5]] == ['post'] + ['comment'] * 4
+    assert list(_scraper(reddit, max_workers=8).fetch_posts_and_comments(subreddits, min_upvotes_post=0)) == sequential
+
+
+def test_crawl_only_loads_comments_ahead_of_the_consumer():
+    reddit = build_synthetic_reddit(1, 60, 2)
+    crawl = _scraper(reddit, max_workers=2).iter_posts_and_comments(['sub0'], post_limit=60, min_upvotes_post=0)
+    first = next(crawl)
+    assert first['type'] == 'post'
+    # The listing plus a small window of comment loads, not all 60 posts' comments
+    assert reddit.request_count <= 1 + 2 * 2 + 1
+    # Stopping early cancels the queued loads
+    crawl.close()
+    assert reddit.request_count <= 1 + 2 * 2 + 1
+
+
+def test_csv_is_written_from_a_stream_in_chunks(tmp_path):
+    scraper = _scraper(build_synthetic_reddit(2, 5, 3))
+    items = list(scraper.iter_posts_and_comments(['sub0', 'sub1'], min_upvotes_post=0))
+
+    path = str(tmp_path / "crawl.csv")
+    with CSVSink(path, chunk_size=7) as sink:
+        assert sink.write_all(scraper.iter_posts_and_comments(['sub0', 'sub1'], min_upvotes_post=0)) == len(items)
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        assert reader.fieldnames == ITEM_FIELDS
+        rows = list(reader)
+    assert [row['item_id'] for row in rows] == [item['item_id'] for item in items]
+    assert rows[0]['content'] == items[0]['content']
+    assert scraper.save_to_csv(iter([])) is None
+    assert [chunk for chunk in chunked(items, 7)] == [items[start:start + 7] for start in range(0, len(items), 7)]
@@ -0,0 +1,117 @@
+import os
+
+import numpy as np
+import pytest
+from sklearn.decomposition import NMF
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from app.ai_analyzer.topic_engine import IncrementalTopicModel
+from benchmarks.corpus import load_recorded_items
+
+
+@pytest.fixture(scope="module")
+def texts():
+    return [item['content'] for item in load_recorded_items() if isinstance(item['content'], str) and item['content']]
+
+
+def _full_refit_topics(texts, n_terms=9):
+    # What the analyzer computed before the incremental model: a full TF-IDF + NMF refit
+    vectorizer = TfidfVectorizer(max_features=1000, stop_words='english', max_df=0.95, min_df=2)
+    nmf = NMF(n_components=5, random_state=42).fit(vectorizer.fit_transform(texts))
+    terms = vectorizer.get_feature_names_out()
+    return [set(terms[np.argsort(topic)[::-1][:n_terms]]) for topic in nmf.components_]
+
+
+@pytest.mark.parametrize("batches", [1, 4])
+def test_incremental_topics_match_a_full_refit(texts, batches):
+    model = IncrementalTopicModel(n_components=5)
+    for batch in np.array_split(np.array(texts, dtype=object), batches):
+        model.partial_fit(list(batch))
+
+    reference = _full_refit_topics(texts)
+    for terms in model.top_terms(n_terms=9).values():
+        overlap = max(len(set(terms) & topic) for topic in reference)
+        assert overlap >= 6, terms
+
+
+def test_topics_keep_their_numbers_across_updates(texts):
+    model = IncrementalTopicModel(n_components=5)
+    half = len(texts) // 2
+    model.partial_fit(texts[:half])
+    before = model.top_terms(n_terms=9)
+    keys_before = model.topic_keys_by_name()
+    model.partial_fit(texts[half:])
+    after = model.top_terms(n_terms=9)
+    keys_after = model.topic_keys_by_name()
+    # A weak topic may give way to a theme only the new documents carry; the rest must stay put
+    kept = 0
+    for name, terms in before.items():
+        overlaps = {other: len(set(terms) & set(other_terms)) for other, other_terms in after.items()}
+        best = max(overlaps, key=overlaps.get)
+        if overlaps[best] >= 5:
+            assert best == name
+            assert keys_after[name] == keys_before[name]
+            kept += 1
+    assert kept >= 3
+    assert len(set(model.topic_keys)) == 5
+
+
+def test_replaced_topics_get_new_keys(texts):
+    model = IncrementalTopicModel(n_components=5, sample_size=200)
+    model.partial_fit(texts[:200])
+    keys = list(model.topic_keys)
+    # The reservoir fills with unrelated themes, so no topic stays the same one
+    themes = [["tomato", "compost", "seedling"], ["guitar", "chord", "amplifier"], ["marathon", "sprint", "stretch"],
+              ["espresso", "grinder", "roast"], ["telescope", "nebula", "eyepiece"]]
+    unrelated = []
+    for n in range(4000):
+        theme = themes[n % 5]
+        unrelated.append(f"{' '.join(theme)} {theme[n % 3]} note{n % 7}")
+    model.partial_fit(unrelated)
+    assert not set(model.topic_keys) & set(keys)
+
+
+def test_refits_wait_for_the_corpus_to_grow(texts):
+    model = IncrementalTopicModel(n_components=5, refit_growth=0.5)
+    model.partial_fit(texts[:200])
+    nmf = model.nmf
+    model.partial_fit(texts[200:260])
+    # Counted and sampled, but the topics are those of the first fit
+    assert model.n_docs == 260 and model.nmf is nmf and model.fitted_docs == 200
+    model.partial_fit(texts[260:300])
+    assert model.nmf is not nmf and model.fitted_docs == 300
+
+    model.partial_fit(texts[300:310])
+    nmf = model.nmf
+    assert model.refit().nmf is not nmf and model.fitted_docs == 310
+
+
+def test_reservoir_stays_bounded(texts):
+    model = IncrementalTopicModel(n_components=5, sample_size=100, batch_size=64)
+    model.partial_fit(texts)
+    assert model.sample.shape[0] == 100
+    assert model.n_docs == len(texts)
+    assert len(model.vocabulary) <= model.max_features
+    assert model.transform(texts[:3]).shape == (3, 5)
+
+
+def test_save_and_load_round_trip(tmp_path, texts):
+    path = str(tmp_path / "model" / "topics.joblib")
+    model = IncrementalTopicModel(n_components=5).partial_fit(texts)
+    model.save(path)
+    model.save(path)
+    assert os.listdir(tmp_path / "model") == ["topics.joblib"]
+
+    loaded = IncrementalTopicModel.load_or_create(path, n_components=5)
+    assert loaded.top_terms() == model.top_terms()
+    assert loaded.topic_keys == model.topic_keys
+    np.testing.assert_allclose(loaded.transform(texts[:10]), model.transform(texts[:10]))
+
+
+def test_incompatible_state_starts_a_new_model(tmp_path):
+    import joblib
+
+    path = str(tmp_path / "topics.joblib")
+    joblib.dump({'version': 1}, path)
+    model = IncrementalTopicModel.load_or_create(path, n_components=3)
+    assert not model.is_fitted and model.n_components == 3
@@ -0,0 +1,52 @@
+import json
+
+import numpy as np
+import pytest
+
+from app.ai_analyzer.topic_matrix import decode_topic_matrix, encode_topic_matrix, reencode_result
+
+MATRIX = np.array([[0.1, 0.7, 0.2], [0.5, 0.0, 0.25], [0.0, 0.0, 0.0]], dtype=np.float32)
+
+
+def test_float32_round_trips_exactly():
+    rng = np.random.default_rng(0)
+    matrix = rng.random((50, 7)).astype(np.float32)
+    payload = json.loads(json.dumps(encode_topic_matrix(matrix)))
+    assert payload['shape'] == [50, 7]
+    np.testing.assert_array_equal(decode_topic_matrix(payload), matrix)
+
+
+def test_topk_keeps_the_strongest_topics():
+    payload = encode_topic_matrix(MATRIX, 'topk', top_k=2)
+    assert payload['topics'] == [[1, 2], [0, 2], [0, 1]]
+    np.testing.assert_allclose(payload['weights'], [[0.7, 0.2], [0.5, 0.25], [0.0, 0.0]])
+    np.testing.assert_allclose(decode_topic_matrix(payload), [[0, 0.7, 0.2], [0.5, 0, 0.25], [0, 0, 0]])
+    # k never exceeds the number of topics
+    assert encode_topic_matrix(MATRIX, 'topk', top_k=5)['k'] == 3
+
+
+@pytest.mark.parametrize("matrix_format", ['topk', 'float32', 'dense'])
+def test_empty_matrices_round_trip(matrix_format):
+    decoded = decode_topic_matrix(encode_topic_matrix(np.empty((0, 0)), matrix_format))
+    assert decoded.shape == (0, 0)
+
+
+def test_unknown_formats_are_rejected():
+    with pytest.raises(ValueError):
+        encode_topic_matrix(MATRIX, 'csv')
+    with pytest.raises(ValueError):
+        decode_topic_matrix({'format': 'csv', 'shape': [0, 0]})
+
+
+def test_stored_results_are_reencoded():
+    legacy = {'validation_score': 50.0, 'topic_analysis': {'topics': {'topic_1': ['a']},
+                                                           'document_topic_matrix': MATRIX.tolist()}}
+    dense = reencode_result(legacy, 'dense')
+    assert dense['topic_analysis']['document_topic_matrix']['data'] == np.round(MATRIX, 4).tolist()
+    assert dense['topic_analysis']['topics'] == legacy['topic_analysis']['topics']
+    assert isinstance(legacy['topic_analysis']['document_topic_matrix'], list)  # input untouched
+
+    topk = reencode_result(reencode_result(legacy, 'float32'), 'topk', top_k=1)
+    assert topk['topic_analysis']['document_topic_matrix']['topics'] == [[1], [0], [0]]
+    assert 'document_topic_matrix' not in reencode_result(legacy, None)['topic_analysis']
+    assert reencode_result({}, 'topk') == {}
@@ -0,0 +1,106 @@
+import json
+import os
+import threading
+
+import numpy as np
+
+from app.ai_analyzer.vector_index import VectorIndex
+
+
+def _items(start, stop, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(stop, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    items = [{'item_id': f"t3_{n}", 'title': f"post {n}"} for n in range(start, stop)]
+    return items, vectors[start:stop]
+
+
+def test_append_and_reopen(tmp_path):
+    root = str(tmp_path / "index")
+    index = VectorIndex(root, min_train_size=50)
+    items, vectors = _items(0, 40)
+    assert index.add(items, vectors) == 40
+    assert index.add(items[:10], vectors[:10]) == 0
+
+    # The second append crosses min_train_size, so the IVF lists are trained
+    items, vectors = _items(0, 120)
+    assert index.add(items, vectors) == 80
+    reopened = VectorIndex(root, min_train_size=50)
+    assert len(reopened) == 120
+    for row in (0, 45, 119):
+        rows, scores = reopened.search(vectors[row], k=1, exact=True)
+        assert rows[0] == row and scores[0] > 0.99
+        assert reopened.get_items(rows) == [items[row]]
+    rows, _ = reopened.search(vectors[77], k=5)
+    assert rows[0] == 77
+
+
+def test_add_after_an_interrupted_add(tmp_path):
+    root = str(tmp_path / "index")
+    index = VectorIndex(root)
+    items, vectors = _items(0, 30)
+    index.add(items[:20], vectors[:20])
+
+    # An add that committed its item rows and vectors but died before writing meta.json
+    with index._db:
+        index._db.executemany(
+            "INSERT INTO items (row, item_id, data) VALUES (?, ?, ?)",
+            [(20 + n, item['item_id'], json.dumps(item)) for n, item in enumerate(items[20:])]
+        )
+    with open(index._path('vectors.f32'), 'ab') as f:
+        f.write(vectors[20:25].tobytes())
+
+    reopened = VectorIndex(root)
+    assert len(reopened) == 20
+    assert reopened.add(items[20:], vectors[20:]) == 10
+    assert len(reopened) == 30
+    rows, _ = reopened.search(vectors[27], k=1, exact=True)
+    assert rows[0] == 27 and reopened.get_items(rows) == [items[27]]
+
+
+def test_training_is_installed_only_with_its_meta(tmp_path):
+    root = str(tmp_path / "index")
+    index = VectorIndex(root, min_train_size=50)
+    items, vectors = _items(0, 200)
+    index.add(items[:60], vectors[:60])
+    index.add(items[60:70], vectors[60:70])
+    trained = (open(index._path('centroids.npy'), 'rb').read(), open(index._path('assign.i32'), 'rb').read())
+
+    # A retraining that died after staging its files but before writing meta.json
+    index._train(index._read_meta())
+    assert os.path.exists(index._path('assign.i32.tmp'))
+    assert index.add(items[:70], vectors[:70]) == 0
+    assert not os.path.exists(index._path('assign.i32.tmp'))
+    assert (open(index._path('centroids.npy'), 'rb').read(), open(index._path('assign.i32'), 'rb').read()) == trained
+    assert index._read_meta()['trained_count'] == 60
+
+    # One that died after meta.json recorded it is finished by the next writer
+    meta = index._read_meta()
+    index._train(meta)
+    index._write_meta(meta)
+    assert index.add(items[70:], vectors[70:]) == 130
+    assert not os.path.exists(index._path('assign.i32.tmp'))
+    assert os.path.getsize(index._path('assign.i32')) == 200 * 4
+    rows, _ = VectorIndex(root, min_train_size=50).search(vectors[150], k=1)
+    assert rows[0] == 150
+
+
+def test_items_can_be_read_while_another_thread_adds(tmp_path):
+    index = VectorIndex(str(tmp_path / "index"), min_train_size=100)
+    items, vectors = _items(0, 2000)
+    index.add(items[:10], vectors[:10])
+    errors = []
+
+    def read():
+        try:
+            for _ in range(200):
+                assert index.get_items(range(10)) == items[:10]
+        except Exception as exc:
+            errors.append(exc)
+
+    reader = threading.Thread(target=read)
+    reader.start()
+    for start in range(10, 2000, 50):
+        index.add(items[start:start + 50], vectors[start:start + 50])
+    reader.join()
+    assert not errors
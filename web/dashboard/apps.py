@@ -0,0 +1,28 @@
+import os
+import sys
+
+from django.apps import AppConfig
+from django.conf import settings
+
+# Management commands that serve requests; every other command (check, migrate, ...) skips warm-up
+SERVER_COMMANDS = {'runserver'}
+
+
+def _serves_requests(argv: list[str]) -> bool:
+    """Whether this process will serve requests: a WSGI/ASGI server, or runserver's serving child."""
+    if os.path.basename(argv[0]) not in ('manage.py', 'django-admin'):
+        return True
+    if len(argv) < 2 or argv[1] not in SERVER_COMMANDS:
+        return False
+    # With the autoreloader, only the child process started with RUN_MAIN serves requests
+    return '--noreload' in argv or os.environ.get('RUN_MAIN') == 'true'
+
+
+class DashboardConfig(AppConfig):
+    name = 'dashboard'
+
+    def ready(self):
+        """Build the shared scraper and analyzer once per process, before the first request."""
+        if getattr(settings, 'WARM_UP_COMPONENTS', True) and _serves_requests(sys.argv):
+            from app.core.registry import registry
+            registry.warm_up('scraper', 'analyzer')
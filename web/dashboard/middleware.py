@@ -0,0 +1,44 @@
+import os
+import time
+
+from django.conf import settings
+
+from app.core.instrumentation import metrics, profiled
+
+
+class RequestInstrumentationMiddleware:
+    """
+    Records the latency of every request and optionally profiles it.
+
+    A request is run under cProfile when settings.PROFILE_REQUESTS is on, or
+    when it carries an ``X-Profile: 1`` header and settings.PROFILE_HEADER_ENABLED
+    allows that. The stats go to PROFILE_DIR and their path is returned in the
+    ``X-Profile-File`` response header. Validation jobs submitted by a profiled
+    request are profiled too (see app.core.jobs.execute_job).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def _should_profile(self, request) -> bool:
+        if getattr(settings, 'PROFILE_REQUESTS', False):
+            return True
+        return getattr(settings, 'PROFILE_HEADER_ENABLED', False) and request.headers.get('X-Profile') == '1'
+
+    def __call__(self, request):
+        request.profiled = self._should_profile(request)
+        start = time.perf_counter()
+        if request.profiled:
+            from app.core.config import PROFILE_DIR
+            path = os.path.join(PROFILE_DIR, f"request-{time.strftime('%Y%m%d_%H%M%S')}-{time.time_ns() % 10**9}.prof")
+            with profiled(path):
+                response = self.get_response(request)
+            response['X-Profile-File'] = path
+        else:
+            response = self.get_response(request)
+
+        match = getattr(request, 'resolver_match', None)
+        metrics.observe('http_request', time.perf_counter() - start,
+                        view=match.url_name if match and match.url_name else 'unmatched', method=request.method)
+        metrics.incr('http_responses', status=response.status_code)
+        return response
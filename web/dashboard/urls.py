@@ -0,0 +1,13 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('', views.dashboard_view, name='dashboard'),
+    path('api/validate/', views.ProblemValidationView.as_view(), name='validate'),
+    path('api/jobs/<str:job_id>/', views.JobStatusView.as_view(), name='job-status'),
+    path('api/jobs/<str:job_id>/result/', views.JobResultView.as_view(), name='job-result'),
+    path('api/jobs/<str:job_id>/events/', views.job_events_view, name='job-events'),
+    path('api/jobs/<str:job_id>/cancel/', views.JobCancelView.as_view(), name='job-cancel'),
+    path('api/trends/', views.TrendView.as_view(), name='trends'),
+    path('metrics', views.metrics_view, name='metrics'),
+]
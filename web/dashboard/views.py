@@ -1,33 +1,112 @@
+import json
+import time
+
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import render
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from app.scraper.scraper import RedditScraper
-from app.ai_analyzer.analyzer import RedditAnalyzer
+from app.core.instrumentation import get_logger
+from app.core.registry import registry
+
+logger = get_logger(__name__)
+
+# Seconds between checks for new job events, and between keep-alive comments on an idle stream
+EVENT_POLL_SECONDS = 0.5
+EVENT_KEEPALIVE_SECONDS = 15
+
+
+def _result_encoding(request):
+    """
+    Reads the topic matrix encoding requested by the query parameters.
+
+    Returns:
+        (matrix format or None for 'none', top_k, None) or (None, None, error Response).
+    """
+    from app.ai_analyzer.topic_matrix import MATRIX_FORMATS
+
+    matrix_format = request.query_params.get('topic_matrix', 'topk')
+    if matrix_format not in MATRIX_FORMATS + ('none',):
+        return None, None, Response({
+            'status': 'error',
+            'message': f"topic_matrix must be one of {', '.join(MATRIX_FORMATS + ('none',))}"
+        }, status=400)
+    try:
+        top_k = int(request.query_params.get('top_k', 2))
+    except ValueError:
+        return None, None, Response({'status': 'error', 'message': 'top_k must be an integer'}, status=400)
+    return (None if matrix_format == 'none' else matrix_format), top_k, None
 
 class ProblemValidationView(APIView):
     """API view for problem validation workflow"""
     
     def post(self, request):
-        """Handle problem validation request"""
+        """
+        Queue a problem validation job and return its id immediately.
+
+        Discovery, scraping and analysis run on the background job workers;
+        poll JobStatusView for progress and the result. An identical request
+        submitted while a job is still queued or running gets that job's id.
+
+        A cached result for the same problem, keywords, corpus and analyzer
+        version is returned at once (200, encoded like JobResultView). When it
+        is older than VALIDATION_CACHE_FRESH_SECONDS it is still returned, and
+        a refresh job is queued; its id is in 'refresh_job_id'.
+        """
+        from app.core.config import VALIDATION_CACHE_MAX_AGE
+        from app.core.result_cache import STALE
+
         problem_statement = request.data.get('problem_statement')
         keywords = request.data.get('keywords', [])
-        
+
+        if not problem_statement:
+            return Response({
+                'status': 'error',
+                'message': 'problem_statement is required'
+            }, status=400)
+        matrix_format, top_k, error = _result_encoding(request)
+        if error is not None:
+            return error
+
+        profile = getattr(request, 'profiled', False)
+        cache, cache_key = None, None
+        if VALIDATION_CACHE_MAX_AGE > 0 and not profile:
+            try:
+                cache = registry.result_cache()
+                cache_key = cache.key_for(problem_statement, keywords)
+                result, state = cache.lookup(cache_key)
+            except Exception as e:
+                # The cache only saves work; validate from scratch without it
+                logger.warning("Validation cache unavailable: %s", e)
+                cache, result, state = None, None, None
+            if result is not None:
+                from app.ai_analyzer.topic_matrix import reencode_result
+
+                response = {'status': 'success', 'cached': state}
+                if state == STALE:
+                    try:
+                        job_id, _ = registry.jobs().submit_validation(problem_statement, keywords)
+                        cache.track(cache_key, job_id)
+                        response['refresh_job_id'] = job_id
+                    except Exception as e:
+                        logger.warning("Could not queue a validation refresh: %s", e)
+                response['results'] = reencode_result(result, matrix_format, top_k)
+                return Response(response)
+
         try:
-            # Initialize our existing components
-            scraper = RedditScraper()
-            analyzer = RedditAnalyzer()
-            
-            # Use scraper to collect data
-            discovered_subreddits = scraper._discover_subreddits(keywords)
-            scraped_data = scraper.fetch_posts_and_comments(discovered_subreddits)
-            
-            # Use analyzer to process data
-            validation_results = analyzer.validate_problem(scraped_data, problem_statement)
-            
+            job_id, coalesced = registry.jobs().submit_validation(
+                problem_statement, keywords, profile=profile
+            )
+            if cache is not None:
+                cache.track(cache_key, job_id)
             return Response({
-                'status': 'success',
-                'results': validation_results
-            })
+                'status': 'accepted',
+                'job_id': job_id,
+                'coalesced': coalesced,
+                'status_url': f"/api/jobs/{job_id}/",
+                'result_url': f"/api/jobs/{job_id}/result/",
+                'events_url': f"/api/jobs/{job_id}/events/",
+                'cancel_url': f"/api/jobs/{job_id}/cancel/"
+            }, status=202)
             
         except Exception as e:
             return Response({
@@ -35,6 +114,172 @@ class ProblemValidationView(APIView):
                 'message': str(e)
             }, status=500)
 
+class JobStatusView(APIView):
+    """API view reporting the status and progress of a validation job"""
+
+    def get(self, request, job_id):
+        """Return job status, current stage and progress (0-1)"""
+        job = registry.jobs().get(job_id, include_result=False)
+        if job is None:
+            return Response({'status': 'error', 'message': 'Job not found'}, status=404)
+        return Response(job)
+
+class JobResultView(APIView):
+    """API view returning the result of a finished validation job"""
+
+    def get(self, request, job_id):
+        """
+        Return the validation results, or 409 while the job has not succeeded.
+
+        The document-topic matrix is returned as each document's top topics by
+        default. Query parameters select another form:
+            topic_matrix=topk|float32|dense|none  (float32 is base64, dense is the full nested list)
+            top_k=<n>                             topics per document for topk
+        """
+        from app.ai_analyzer.topic_matrix import reencode_result
+
+        matrix_format, top_k, error = _result_encoding(request)
+        if error is not None:
+            return error
+
+        job = registry.jobs().get(job_id)
+        if job is None:
+            return Response({'status': 'error', 'message': 'Job not found'}, status=404)
+        if job['status'] == 'failed':
+            return Response({'status': 'error', 'message': job['error']}, status=500)
+        if job['status'] != 'succeeded':
+            return Response({
+                'status': job['status'],
+                'stage': job['stage'],
+                'progress': job['progress']
+            }, status=409)
+        return Response({
+            'status': 'success',
+            'results': reencode_result(job['result'], matrix_format, top_k)
+        })
+
+class JobCancelView(APIView):
+    """API view cancelling a validation job"""
+
+    def post(self, request, job_id):
+        """
+        Cancel a queued job at once, or stop a running one at its next stage event
+        (its queued Reddit requests are dropped). Returns 409 for a finished job.
+        """
+        from app.core.jobs import CANCELLED, RUNNING
+
+        status = registry.jobs().cancel(job_id)
+        if status is None:
+            return Response({'status': 'error', 'message': 'Job not found'}, status=404)
+        if status == RUNNING:
+            return Response({'status': 'cancelling', 'job_id': job_id}, status=202)
+        if status == CANCELLED:
+            return Response({'status': 'cancelled', 'job_id': job_id})
+        return Response({'status': status, 'message': 'Job already finished'}, status=409)
+
+class TrendView(APIView):
+    """API view reporting complaint trends from the time-windowed rollups"""
+
+    def get(self, request):
+        """
+        Return per-period aggregates and the complaint growth of the selected items.
+
+        Query parameters:
+            subreddit=<name>      repeatable; all subreddits by default
+            topic=<topic>         repeatable; topic_<n> of the topic model the rollups were
+                                  last written with, or a stable topic key; all topics by default
+            period=day|week       default week
+            periods=<n>           periods ending at 'until' (default 8)
+            until=YYYY-MM-DD      last day (defaults to the latest day with items)
+        """
+        from app.ai_analyzer.rollups import PERIODS
+
+        period = request.query_params.get('period', 'week')
+        if period not in PERIODS:
+            return Response({'status': 'error', 'message': f"period must be one of {', '.join(PERIODS)}"},
+                            status=400)
+        try:
+            periods = int(request.query_params.get('periods', 8))
+            if periods < 1:
+                raise ValueError
+        except ValueError:
+            return Response({'status': 'error', 'message': 'periods must be a positive integer'}, status=400)
+        # Rollups are keyed by stable topic keys, which outlive the topic numbers. The job
+        # workers' topic models write them, so names resolve against the rollups, not this
+        # process's model.
+        rollups = registry.rollups()
+        topics = request.query_params.getlist('topic')
+        if any(topic.startswith('topic_') for topic in topics):
+            keys = rollups.topic_keys_by_name()
+            unknown = [topic for topic in topics if topic.startswith('topic_') and topic not in keys]
+            if unknown:
+                return Response({'status': 'error', 'message': f"Unknown topic: {', '.join(unknown)}"}, status=400)
+            topics = [keys.get(topic, topic) for topic in topics]
+        try:
+            trend = rollups.complaint_trend(
+                subreddits=request.query_params.getlist('subreddit') or None,
+                topics=topics or None,
+                period=period,
+                periods=periods,
+                until=request.query_params.get('until') or None
+            )
+        except ValueError as e:
+            return Response({'status': 'error', 'message': str(e)}, status=400)
+        return Response({'status': 'success', 'trend': trend})
+
+def _job_event_stream(job_id: str, after: int):
+    """Yields the job's events as server-sent events until it finishes."""
+    from app.core.jobs import FINAL_STATES
+
+    jobs = registry.jobs()
+    last_sent = time.monotonic()
+    while True:
+        events = jobs.events(job_id, after=after)
+        for event in events:
+            after = event['id']
+            yield f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+            if event['event'] in FINAL_STATES:
+                return
+        if events:
+            last_sent = time.monotonic()
+            continue
+        job = jobs.get(job_id, include_result=False)
+        if job is None or job['status'] in FINAL_STATES:
+            return # E.g. finished before it had an event log
+        if time.monotonic() - last_sent >= EVENT_KEEPALIVE_SECONDS:
+            last_sent = time.monotonic()
+            yield ": keep-alive\n\n"
+        time.sleep(EVENT_POLL_SECONDS)
+
+def job_events_view(request, job_id):
+    """
+    Server-sent event stream of a job's stage events, ending with its final status.
+
+    Events: progress, subreddits, subreddit, sentiment, topics, then succeeded,
+    failed or cancelled (see app.core.pipeline.run_validation). Each event's id
+    is its sequence number: a reconnecting client sends it back in the
+    Last-Event-ID header (or ?after=<id>) to resume where it left off.
+    """
+    if registry.jobs().get(job_id, include_result=False) is None:
+        return HttpResponse(json.dumps({'status': 'error', 'message': 'Job not found'}),
+                            status=404, content_type='application/json')
+    try:
+        after = int(request.headers.get('Last-Event-ID') or request.GET.get('after') or 0)
+    except ValueError:
+        after = 0
+    response = StreamingHttpResponse(_job_event_stream(job_id, after), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no' # Keep reverse proxies from buffering the stream
+    return response
+
+def metrics_view(request):
+    """Prometheus metrics of this web process and of the job worker processes"""
+    from app.core.config import METRICS_DIR
+    from app.core.instrumentation import metrics
+
+    return HttpResponse(metrics.render_prometheus(METRICS_DIR),
+                        content_type='text/plain; version=0.0.4; charset=utf-8')
+
 def dashboard_view(request):
     """Main dashboard view"""
-    return render(request, 'dashboard/index.html')
\ No newline at end of file
+    return render(request, 'dashboard/index.html')
@@ -30,6 +30,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'dashboard.middleware.RequestInstrumentationMiddleware',
 ]
 
 ROOT_URLCONF = 'reddit_validator.urls'
@@ -90,6 +91,54 @@ STATICFILES_DIRS = [BASE_DIR / 'static']
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Caches: validation results (see app.core.result_cache) in their own alias
+from app.core.config import VALIDATION_CACHE_BACKEND, VALIDATION_CACHE_DIR, VALIDATION_CACHE_MAX_AGE
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'validation': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'validation-results',
+        'TIMEOUT': VALIDATION_CACHE_MAX_AGE,
+        'OPTIONS': {'MAX_ENTRIES': 1000},
+    } if VALIDATION_CACHE_BACKEND == 'locmem' else {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': VALIDATION_CACHE_DIR,
+        'TIMEOUT': VALIDATION_CACHE_MAX_AGE,
+        'OPTIONS': {'MAX_ENTRIES': 1000},
+    },
+}
+
+# Build the shared RedditScraper/RedditAnalyzer at startup (see dashboard.apps.DashboardConfig)
+WARM_UP_COMPONENTS = os.getenv('WARM_UP_COMPONENTS', 'true').lower() == 'true'
+
+# Profile every request with cProfile (dumps go to PROFILE_DIR, see app.core.config)
+PROFILE_REQUESTS = os.getenv('PROFILE_REQUESTS', 'false').lower() == 'true'
+# Allow profiling single requests with an "X-Profile: 1" header
+PROFILE_HEADER_ENABLED = os.getenv('PROFILE_HEADER_ENABLED', str(DEBUG)).lower() == 'true'
+
+# Logging: standard log lines, or JSON lines with structured fields when LOG_FORMAT=json
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'text': {'format': '%(asctime)s %(levelname)s %(name)s: %(message)s'},
+        'json': {'()': 'app.core.instrumentation.JsonFormatter'},
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'formatter': os.getenv('LOG_FORMAT', 'text'),
+        },
+    },
+    'loggers': {
+        'app': {'handlers': ['console'], 'level': os.getenv('LOG_LEVEL', 'INFO'), 'propagate': False},
+        'django': {'handlers': ['console'], 'level': 'INFO'},
+    },
+}
+
 # Reddit API settings (imported from main app config)
 from app.core.config import (
     REDDIT_CLIENT_ID,